@@ -2,10 +2,16 @@
 
 from __future__ import annotations
 
+import contextlib
 import csv
 import datetime
+import importlib.util
+import io
+import itertools
+import json
+import sys
 from pathlib import Path
-from typing import override, TYPE_CHECKING
+from typing import NamedTuple, override, TYPE_CHECKING
 
 from colorama import Fore
 
@@ -13,7 +19,42 @@ from nummus.commands.base import Command
 
 if TYPE_CHECKING:
     import argparse
-    import io
+    from collections.abc import Generator, Iterator
+    from decimal import Decimal
+    from typing import IO
+
+    from nummus.models.currency import Currency
+
+
+FORMATS = ("csv", "jsonl", "parquet")
+COMPRESSIONS = ("gzip", "zstd")
+
+HEADER = (
+    "Date",
+    "Account",
+    "Payee",
+    "Memo",
+    "Category",
+    "Amount",
+)
+
+# Rows per parquet row group, bounds memory used while writing
+_PARQUET_BATCH = 10000
+
+# Amounts are stored as Decimal6
+_PARQUET_AMOUNT_SCALE = 6
+
+
+class _Row(NamedTuple):
+    """Transaction row before formatting."""
+
+    date: datetime.date
+    account: str
+    payee: str | None
+    memo: str | None
+    category: str
+    amount: Decimal
+    currency: Currency
 
 
 class Export(Command):
@@ -21,7 +62,7 @@ class Export(Command):
 
     NAME = "export"
     HELP = "export transactions to a CSV"
-    DESCRIPTION = "Export all transactions within a date to CSV"
+    DESCRIPTION = "Export all transactions within a date to CSV, JSON lines, or parquet"
 
     def __init__(
         self,
@@ -32,23 +73,34 @@ class Export(Command):
         end: datetime.date | None,
         *,
         no_bars: bool,
+        output_format: str = "csv",
+        compression: str | None = None,
     ) -> None:
         """Initialize export command.
 
         Args:
             path_db: Path to Portfolio DB
             path_password: Path to password file, None will prompt when necessary
-            csv_path: Path to CSV output
+            csv_path: Path to output, "-" will write to stdout
             start: Start date to filter transactions
             end: End date to filter transactions
             no_bars: True will disable progress bars
+            output_format: Format of output, one of FORMATS
+            compression: Compression of output, one of COMPRESSIONS or None
 
         """
-        super().__init__(path_db, path_password)
+        if str(csv_path) == "-":
+            # Keep stdout clean for piping
+            with contextlib.redirect_stdout(sys.stderr):
+                super().__init__(path_db, path_password)
+        else:
+            super().__init__(path_db, path_password)
         self._csv_path = csv_path
         self._start = start
         self._end = end
         self._no_bars = no_bars
+        self._output_format = output_format
+        self._compression = compression
 
     @override
     @classmethod
@@ -65,11 +117,24 @@ class Export(Command):
             type=datetime.date.fromisoformat,
             help="date of last transaction to export",
         )
+        parser.add_argument(
+            "--format",
+            dest="output_format",
+            default="csv",
+            choices=FORMATS,
+            help="format of output",
+        )
+        parser.add_argument(
+            "--compress",
+            dest="compression",
+            choices=COMPRESSIONS,
+            help="compress output",
+        )
         parser.add_argument(
             "csv_path",
             metavar="CSV_PATH",
             type=Path,
-            help="path to CSV file to export",
+            help="path to file to export, '-' for stdout",
         )
         parser.add_argument(
             "--no-bars",
@@ -80,33 +145,115 @@ class Export(Command):
 
     @override
     def run(self) -> int:
+        if self._output_format == "parquet" and not _available("pyarrow"):
+            print(
+                f"{Fore.RED}Parquet export requires pyarrow, "
+                "install nummus-financial[export]",
+                file=sys.stderr,
+            )
+            return 1
+        if self._compression == "zstd" and not _available("zstandard"):
+            print(
+                f"{Fore.RED}zstd compression requires zstandard, "
+                "install nummus-financial[export]",
+                file=sys.stderr,
+            )
+            return 1
 
+        to_stdout = str(self._csv_path) == "-"
         with (
             self._p.begin_session(),
-            self._csv_path.open("w", encoding="utf-8") as file,
+            _open_output(
+                None if to_stdout else self._csv_path,
+                # Parquet compresses internally
+                None if self._output_format == "parquet" else self._compression,
+            ) as file,
         ):
-            n = write_csv(file, self._start, self._end, no_bars=self._no_bars)
-        print(f"{Fore.GREEN}{n} transactions exported to {self._csv_path}")
+            if self._output_format == "parquet":
+                n = write_parquet(
+                    file,
+                    self._start,
+                    self._end,
+                    compression=self._compression,
+                    no_bars=self._no_bars,
+                )
+            else:
+                text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+                write = write_jsonl if self._output_format == "jsonl" else write_csv
+                n = write(text, self._start, self._end, no_bars=self._no_bars)
+                # Leave file open for _open_output to close
+                text.detach()
+        dest = "stdout" if to_stdout else self._csv_path
+        print(
+            f"{Fore.GREEN}{n} transactions exported to {dest}",
+            file=sys.stderr if to_stdout else sys.stdout,
+        )
         return 0
 
 
-def write_csv(
-    file: io.TextIOBase,
+def _available(module: str) -> bool:
+    """Check if an optional module is installed without importing it.
+
+    Args:
+        module: Name of module
+
+    Returns:
+        True if module can be imported
+
+    """
+    return importlib.util.find_spec(module) is not None
+
+
+@contextlib.contextmanager
+def _open_output(path: Path | None, compression: str | None) -> Iterator[IO[bytes]]:
+    """Open binary output file with optional compression.
+
+    Args:
+        path: Path to output, None will write to stdout
+        compression: Compression of output, one of COMPRESSIONS or None
+
+    Yields:
+        Stream to write to
+
+    """
+    with contextlib.ExitStack() as stack:
+        raw: IO[bytes]
+        if path is None:
+            raw = sys.stdout.buffer
+            # Flush after compression is closed
+            stack.callback(raw.flush)
+        else:
+            raw = stack.enter_context(path.open("wb"))
+        if compression == "gzip":
+            import gzip
+
+            gz = gzip.GzipFile(fileobj=raw, mode="wb")
+            # GzipFile is a BufferedIOBase which typeshed doesn't count as IO
+            yield stack.enter_context(gz)  # type: ignore[misc]
+        elif compression == "zstd":
+            import zstandard
+
+            compressor = zstandard.ZstdCompressor()
+            yield stack.enter_context(compressor.stream_writer(raw, closefd=False))
+        else:
+            yield raw
+
+
+def _yield_rows(
     start: datetime.date | None,
     end: datetime.date | None,
     *,
     no_bars: bool,
-) -> int:
-    """Write transactions to CSV file.
+) -> Generator[_Row]:
+    """Yield transaction rows.
 
     Args:
-        file: Destination file to write to
         start: Start date to filter transactions
         end: End date to filter transactions
         no_bars: True will disable progress bars
 
-    Returns:
-        Number of transactions exported
+    Yields:
+        Row of each TransactionSplit
 
     """
     # Defer for faster time to main
@@ -114,7 +261,6 @@ def write_csv(
 
     from nummus import sql
     from nummus.models.account import Account
-    from nummus.models.currency import CURRENCY_FORMATS
     from nummus.models.transaction import TransactionCategory, TransactionSplit
 
     query = Account.query(
@@ -148,17 +294,9 @@ def write_csv(
         query = query.where(
             TransactionSplit.date_ord <= end.toordinal(),
         )
-    n = sql.count(query)
-
-    header = [
-        "Date",
-        "Account",
-        "Payee",
-        "Memo",
-        "Category",
-        "Amount",
-    ]
-    lines: list[list[str]] = []
+    # Counting is a second pass, only needed for the progress bar
+    n = None if no_bars else sql.count(query)
+
     for (
         date,
         acct_id,
@@ -173,20 +311,157 @@ def write_csv(
         disable=no_bars,
     ):
         acct_name, currency = accounts[acct_id]
-        cf = CURRENCY_FORMATS[currency]
-
-        lines.append(
-            [
-                datetime.date.fromordinal(date).isoformat(),
-                acct_name,
-                payee or "",
-                memo or "",
-                categories[t_cat_id],
-                cf(amount),
-            ],
+        yield _Row(
+            datetime.date.fromordinal(date),
+            acct_name,
+            payee,
+            memo,
+            categories[t_cat_id],
+            amount,
+            currency,
+        )
+
+
+def _yield_formatted(
+    start: datetime.date | None,
+    end: datetime.date | None,
+    *,
+    no_bars: bool,
+) -> Generator[tuple[str, ...]]:
+    """Yield formatted transaction rows.
+
+    Args:
+        start: Start date to filter transactions
+        end: End date to filter transactions
+        no_bars: True will disable progress bars
+
+    Yields:
+        Row matching HEADER
+
+    """
+    from nummus.models.currency import CURRENCY_FORMATS
+
+    for row in _yield_rows(start, end, no_bars=no_bars):
+        yield (
+            row.date.isoformat(),
+            row.account,
+            row.payee or "",
+            row.memo or "",
+            row.category,
+            CURRENCY_FORMATS[row.currency](row.amount),
         )
 
+
+def write_csv(
+    file: io.TextIOBase,
+    start: datetime.date | None,
+    end: datetime.date | None,
+    *,
+    no_bars: bool,
+) -> int:
+    """Write transactions to CSV file.
+
+    Rows are written as they are read so memory use is constant.
+
+    Args:
+        file: Destination file to write to
+        start: Start date to filter transactions
+        end: End date to filter transactions
+        no_bars: True will disable progress bars
+
+    Returns:
+        Number of transactions exported
+
+    """
     writer = csv.writer(file)
-    writer.writerow(header)
-    writer.writerows(lines)
+    writer.writerow(HEADER)
+    n = 0
+    for row in _yield_formatted(start, end, no_bars=no_bars):
+        writer.writerow(row)
+        n += 1
+    return n
+
+
+def write_jsonl(
+    file: io.TextIOBase,
+    start: datetime.date | None,
+    end: datetime.date | None,
+    *,
+    no_bars: bool,
+) -> int:
+    """Write transactions to JSON lines file.
+
+    Args:
+        file: Destination file to write to
+        start: Start date to filter transactions
+        end: End date to filter transactions
+        no_bars: True will disable progress bars
+
+    Returns:
+        Number of transactions exported
+
+    """
+    n = 0
+    for row in _yield_formatted(start, end, no_bars=no_bars):
+        file.write(json.dumps(dict(zip(HEADER, row, strict=True))))
+        file.write("\n")
+        n += 1
+    return n
+
+
+def write_parquet(
+    file: IO[bytes],
+    start: datetime.date | None,
+    end: datetime.date | None,
+    *,
+    compression: str | None,
+    no_bars: bool,
+) -> int:
+    """Write transactions to parquet file.
+
+    Columns are typed: Date as date32, Amount as a decimal of Decimal6 scale
+    with the ISO code of its Currency alongside. Rows are written in row
+    groups of _PARQUET_BATCH.
+
+    Args:
+        file: Destination file to write to
+        start: Start date to filter transactions
+        end: End date to filter transactions
+        compression: Parquet compression codec, one of COMPRESSIONS or None
+        no_bars: True will disable progress bars
+
+    Returns:
+        Number of transactions exported
+
+    """
+    # Optional dependency, defer for faster time to main
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("Date", pa.date32()),
+            ("Account", pa.string()),
+            ("Payee", pa.string()),
+            ("Memo", pa.string()),
+            ("Category", pa.string()),
+            ("Amount", pa.decimal128(38, _PARQUET_AMOUNT_SCALE)),
+            ("Currency", pa.string()),
+        ],
+    )
+
+    rows = _yield_rows(start, end, no_bars=no_bars)
+    n = 0
+    with pq.ParquetWriter(
+        file,
+        schema,
+        compression=compression or "none",
+    ) as writer:
+        for batch in itertools.batched(rows, _PARQUET_BATCH):
+            columns: list[list[object]] = [
+                list(column) for column in zip(*batch, strict=True)
+            ]
+            columns[-1] = [row.currency.name for row in batch]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            n += len(batch)
     return n
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import contextlib
 import sys
 from pathlib import Path
 from typing import override, TYPE_CHECKING
@@ -68,23 +69,25 @@ class Import(Command):
         # Back up Portfolio
         _, tar_ver = p.backup()
 
-        count = 0
-
         path_debug = p.path.with_suffix(".importer_debug")
 
+        files: list[Path] = []
+        for path in self._paths:
+            if not path.exists():
+                print(f"{Fore.RED}File does not exist: {path}", file=sys.stderr)
+                self._restore(tar_ver, path_debug)
+                return -1
+            if path.is_dir():
+                files.extend(f for f in path.iterdir() if f.is_file())
+            else:
+                files.append(path)
+
+        count = 0
         try:
-            for path in self._paths:
-                if not path.exists():
-                    print(f"{Fore.RED}File does not exist: {path}", file=sys.stderr)
-                    self._restore(tar_ver, path_debug)
-                    return -1
-                if path.is_dir():
-                    for f in path.iterdir():
-                        if f.is_file():
-                            p.import_file(f, path_debug, force=self._force)
-                            count += 1
-                else:
-                    p.import_file(path, path_debug, force=self._force)
+            # Parse files in parallel, write to database one at a time
+            with contextlib.closing(p.parse_files(files)) as results:
+                for path, parsed in zip(files, results, strict=True):
+                    p.import_file(path, path_debug, force=self._force, parsed=parsed)
                     count += 1
         except exc.FileAlreadyImportedError as e:
             print(f"{Fore.RED}{e}", file=sys.stderr)
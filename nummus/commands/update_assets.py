@@ -27,6 +27,9 @@ class UpdateAssets(Command):
         path_password: Path | None,
         *,
         no_bars: bool,
+        workers: int | None = None,
+        timeout: float | None = None,
+        full: bool = False,
     ) -> None:
         """Initialize update-assets command.
 
@@ -34,10 +37,16 @@ class UpdateAssets(Command):
             path_db: Path to Portfolio DB
             path_password: Path to password file, None will prompt when necessary
             no_bars: True will disable progress bars
+            workers: Maximum number of concurrent downloads, None for default
+            timeout: Seconds to wait for each asset, None for default
+            full: True will download full histories instead of the missing tails
 
         """
         super().__init__(path_db, path_password)
         self._no_bars = no_bars
+        self._workers = workers
+        self._timeout = timeout
+        self._full = full
 
     @override
     @classmethod
@@ -48,6 +57,23 @@ class UpdateAssets(Command):
             action="store_true",
             help="disable progress bars",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="maximum number of concurrent downloads",
+        )
+        parser.add_argument(
+            "--timeout",
+            metavar="SECONDS",
+            type=float,
+            help="seconds to wait for each asset to download",
+        )
+        parser.add_argument(
+            "--full",
+            default=False,
+            action="store_true",
+            help="download full price histories instead of only new prices",
+        )
 
     @override
     def run(self) -> int:
@@ -59,7 +85,12 @@ class UpdateAssets(Command):
         _, tar_ver = p.backup()
 
         try:
-            updated = p.update_assets(no_bars=self._no_bars)
+            updated = p.update_assets(
+                no_bars=self._no_bars,
+                max_workers=self._workers,
+                timeout=self._timeout,
+                full=self._full,
+            )
         except Exception:  # pragma: no cover
             # No immediate exception thrown, can't easily test
             portfolio.Portfolio.restore(p, tar_ver=tar_ver)
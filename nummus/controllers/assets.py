@@ -18,6 +18,7 @@ from nummus.models.account import Account
 from nummus.models.asset import (
     Asset,
     AssetCategory,
+    AssetFetch,
     AssetSector,
     AssetSplit,
     AssetValuation,
@@ -260,6 +261,7 @@ def asset(uri: str) -> str | werkzeug.Response:
             )
         if flask.request.method == "DELETE":
             with s.begin_nested():
+                AssetFetch.query().where(AssetFetch.asset_id == a.id_).delete()
                 AssetSector.query().where(AssetSector.asset_id == a.id_).delete()
                 AssetSplit.query().where(AssetSplit.asset_id == a.id_).delete()
                 AssetValuation.query().where(AssetValuation.asset_id == a.id_).delete()
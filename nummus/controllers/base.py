@@ -3,28 +3,40 @@
 from __future__ import annotations
 
 import datetime
+import functools
+import gzip
+import hashlib
 import json
 import re
 import textwrap
 from decimal import Decimal
 from pathlib import Path
-from typing import NamedTuple, overload, TypedDict
+from typing import NamedTuple, overload, TYPE_CHECKING, TypedDict
 
 import flask
 import flask.typing
+import numpy as np
 
 from nummus import exceptions as exc
-from nummus import sql, utils, web
+from nummus import sql, utils, vectorized, web
 from nummus.models.base import (
     Base,
     BaseEnum,
 )
+from nummus.models.cache import session_cache
+from nummus.models.data_version import DataVersion
 from nummus.models.transaction_category import (
     TransactionCategory,
     TransactionCategoryGroup,
 )
 from nummus.version import __version__
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from nummus.models.cache import ResultCache
+    from nummus.vectorized import IntArray
+
 type Routes = dict[str, tuple[flask.typing.RouteCallable, list[str]]]
 
 
@@ -91,6 +103,28 @@ class ChartData(TypedDict):
     max: list[Decimal] | None
 
 
+class ChartArrays(TypedDict):
+    """Compact chart data, see chart_arrays."""
+
+    start: str
+    n: int
+    unit: str
+    mode: str
+    scale: int
+
+    min: list[int] | None
+    avg: list[int]
+    max: list[int] | None
+
+
+class Fragment(NamedTuple):
+    """Rendered response held by fragment_cache."""
+
+    data: bytes
+    status: int
+    headers: list[tuple[str, str]]
+
+
 class NamePair(NamedTuple):
     """Key & name pair."""
 
@@ -118,8 +152,12 @@ LIMIT_TICKS_MONTHS = 50  # if n_days > LIMIT_TICKS_MONTHS then have ticks on the
 LIMIT_TICKS_WEEKS = 20  # if n_days > LIMIT_TICKS_WEEKS then have ticks on Sunday
 # else tick each day
 
+LIMIT_COMPRESS = 1024  # if body is larger than LIMIT_COMPRESS bytes then gzip it
+COMPRESS_MIMETYPES = {"application/json", "text/html"}
+
 HTTP_CODE_OK = 200
 HTTP_CODE_REDIRECT = 302
+HTTP_CODE_NOT_MODIFIED = 304
 HTTP_CODE_BAD_REQUEST = 400
 HTTP_CODE_FORBIDDEN = 403
 
@@ -381,6 +419,72 @@ def page(content_template: str, title: str, **context: object) -> flask.Response
     return response
 
 
+def fragment_cache[**P](
+    func: Callable[P, str | flask.Response],
+) -> Callable[P, flask.Response]:
+    """Cache a rendered response and answer revalidations with 304.
+
+    Responses are keyed on endpoint, query args, client's date, and HX-Request.
+    The ETag adds the DataVersions, so any commit changes it and a matching
+    If-None-Match skips rendering entirely. Large bodies are gzipped.
+
+    Args:
+        func: Route to cache, must only depend on the key and portfolio
+
+    Returns:
+        Wrapped route
+
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> flask.Response:
+        request = flask.request
+        key = (
+            "fragment",
+            request.endpoint,
+            tuple(sorted(request.args.items(multi=True))),
+            today_client().isoformat(),
+            request.headers.get("HX-Request", "false"),
+        )
+        p = web.portfolio
+        cache: ResultCache | None = None
+        with p.begin_session():
+            if (usable := session_cache()) is None:
+                versions = DataVersion.fetch()
+            else:
+                cache, versions = usable
+        stamp = repr((__version__, versions, key)).encode()
+        etag = hashlib.sha256(stamp).hexdigest()
+
+        # Weak comparison since compress_response weakens the ETag
+        if request.if_none_match.contains_weak(etag):
+            response = flask.Response(status=HTTP_CODE_NOT_MODIFIED)
+        else:
+            fragment = None if cache is None else cache.get(versions, key)
+            if not isinstance(fragment, Fragment):
+                response = flask.make_response(func(*args, **kwargs))
+                fragment = Fragment(
+                    response.get_data(),
+                    response.status_code,
+                    list(response.headers.items()),
+                )
+                if cache is not None and fragment.status == HTTP_CODE_OK:
+                    cache.set_(versions, key, fragment)
+            response = flask.Response(
+                fragment.data,
+                fragment.status,
+                fragment.headers,
+            )
+
+        response.set_etag(etag)
+        # Browser must revalidate, which is a 304 until the portfolio changes
+        response.headers["Cache-Control"] = "no-cache"
+        response.vary.add("HX-Request")
+        return compress_response(response)
+
+    return wrapper
+
+
 def update_client_timezone(response: flask.Response) -> flask.Response:
     """Update the client's timezone.
 
@@ -415,6 +519,56 @@ def today_client() -> datetime.date:
     return datetime.datetime.now(tz).date()
 
 
+def compress_response(response: flask.Response) -> flask.Response:
+    """Compress large text responses if the client accepts gzip.
+
+    Used by fragment_cache for the chart and fragment endpoints, which carry
+    the large payloads.
+
+    Args:
+        response: HTTP response
+
+    Returns:
+        Modified HTTP response
+
+    """
+    response.vary.add("Accept-Encoding")
+    if not _should_compress(response):
+        return response
+    data = response.get_data()
+    if len(data) <= LIMIT_COMPRESS:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    # Compressed body is a different representation of the same resource
+    etag, is_weak = response.get_etag()
+    if etag and not is_weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def _should_compress(response: flask.Response) -> bool:
+    """Test if a response can be compressed.
+
+    Args:
+        response: HTTP response
+
+    Returns:
+        True if response is a complete text body and the client accepts gzip
+
+    """
+    if response.status_code != HTTP_CODE_OK:
+        return False
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    return (
+        response.mimetype in COMPRESS_MIMETYPES
+        and "gzip" in flask.request.accept_encodings
+    )
+
+
 def change_redirect_to_htmx(response: flask.Response) -> flask.Response:
     """Change redirect responses to HX-Redirect.
 
@@ -546,6 +700,29 @@ def ctx_to_json(d: dict[str, object], precision: int = 2) -> str:
     return json.dumps(d, default=default, separators=(",", ":")).replace("'", "\\'")
 
 
+def json_response(obj: object) -> flask.Response:
+    """Create a JSON response without whitespace.
+
+    Args:
+        obj: Object to serialize, Decimals are converted to float
+
+    Returns:
+        JSON response
+
+    """
+    return flask.Response(
+        json.dumps(obj, default=_json_default, separators=(",", ":")),
+        mimetype="application/json",
+    )
+
+
+def _json_default(obj: object) -> str | float:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    msg = f"Unknown type {type(obj)}"
+    raise TypeError(msg)
+
+
 def validate_string(
     value: str,
     *,
@@ -814,85 +991,85 @@ def chart_data(
         ChartData for each values
 
     """
+    all_values = values if isinstance(values, tuple) else (values,)
     n = end_ord - start_ord + 1
-    if n > LIMIT_DOWNSAMPLE:
+    if n <= LIMIT_DOWNSAMPLE:
+        labels, mode = date_labels(start_ord, end_ord)
+        results = tuple(
+            ChartData(labels=labels, mode=mode, min=None, avg=v, max=None)
+            for v in all_values
+        )
+    else:
         periods = utils.period_months(start_ord, end_ord)
-        labels: list[str] = list(periods.keys())
-        if isinstance(values, tuple):
-            values_min: list[list[Decimal]] = []
-            values_avg: list[list[Decimal]] = []
-            values_max: list[list[Decimal]] = []
-
-            for _ in range(len(values)):
-                values_min.append([])
-                values_avg.append([])
-                values_max.append([])
-
-            for period_ord, period_end_ord in periods.values():
-                i_start = period_ord - start_ord
-                i_end = period_end_ord - start_ord
-
-                for i, v in enumerate(values):
-                    values_sliced = v[i_start : i_end + 1]
-                    values_min[i].append(min(values_sliced))
-                    values_max[i].append(max(values_sliced))
-                    values_avg[i].append(
-                        Decimal(sum(values_sliced) / len(values_sliced)),
-                    )
-
-            return tuple(
-                ChartData(
-                    labels=labels,
-                    mode="years",
-                    min=v_min,
-                    avg=v_avg,
-                    max=v_max,
-                )
-                for v_min, v_avg, v_max in zip(
-                    values_min,
-                    values_avg,
-                    values_max,
-                    strict=True,
-                )
-            )
-
-        v_min: list[Decimal] = []
-        v_avg: list[Decimal] = []
-        v_max: list[Decimal] = []
-
-        for period_ord, period_end_ord in periods.values():
-            i_start = period_ord - start_ord
-            i_end = period_end_ord - start_ord
-            values_sliced = values[i_start : i_end + 1]
-
-            v_min.append(min(values_sliced))
-            v_max.append(max(values_sliced))
-            v_avg.append(Decimal(sum(values_sliced) / len(values_sliced)))
-
-        return ChartData(
-            labels=labels,
-            mode="years",
-            min=v_min,
-            avg=v_avg,
-            max=v_max,
+        labels = list(periods.keys())
+        v_min, v_avg, v_max = vectorized.downsample(
+            [vectorized.to_array(v) for v in all_values],
+            [period_ord - start_ord for period_ord, _ in periods.values()],
         )
-
-    dates = date_labels(start_ord, end_ord)
-    if isinstance(values, tuple):
-        return tuple(
+        results = tuple(
             ChartData(
-                labels=dates[0],
-                mode=dates[1],
-                min=None,
-                avg=v,
-                max=None,
+                labels=labels,
+                mode="years",
+                min=vectorized.to_decimals(v_min[i]),
+                avg=vectorized.to_decimals(v_avg[i]),
+                max=vectorized.to_decimals(v_max[i]),
             )
-            for v in values
+            for i in range(len(all_values))
         )
-    return ChartData(
-        labels=dates[0],
-        mode=dates[1],
-        min=None,
-        avg=values,
-        max=None,
-    )
+    return results if isinstance(values, tuple) else results[0]
+
+
+def chart_arrays(
+    start_ord: int,
+    end_ord: int,
+    arrays: Sequence[IntArray],
+    precision: int = 2,
+) -> list[ChartArrays]:
+    """Prepare compact chart data by downsampling if necessary.
+
+    Same downsampling as chart_data, straight from fixed point arrays. Labels
+    become the first label and the number of labels.
+
+    Args:
+        start_ord: Start date ordinal
+        end_ord: End date ordinal
+        arrays: One or more daily Decimal6 fixed point arrays to prepare
+        precision: Number of decimal places to keep
+
+    Returns:
+        ChartArrays for each arrays
+
+    """
+    n = end_ord - start_ord + 1
+    v_min: IntArray | None = None
+    v_max: IntArray | None = None
+    if n <= LIMIT_DOWNSAMPLE:
+        labels, mode = date_labels(start_ord, end_ord)
+        unit = "days"
+        v_avg = np.stack(arrays)
+    else:
+        periods = utils.period_months(start_ord, end_ord)
+        labels = list(periods.keys())
+        mode = "years"
+        unit = "months"
+        v_min, v_avg, v_max = vectorized.downsample(
+            arrays,
+            [period_ord - start_ord for period_ord, _ in periods.values()],
+        )
+
+    def to_list(array: IntArray) -> list[int]:
+        return vectorized.rescale(array, precision).tolist()
+
+    return [
+        {
+            "start": labels[0],
+            "n": len(labels),
+            "unit": unit,
+            "mode": mode,
+            "scale": precision,
+            "min": None if v_min is None else to_list(v_min[i]),
+            "avg": to_list(v_avg[i]),
+            "max": None if v_max is None else to_list(v_max[i]),
+        }
+        for i in range(len(arrays))
+    ]
@@ -68,6 +68,7 @@ def page() -> flask.Response:
         )
 
 
+@base.fragment_cache
 def dashboard() -> str:
     """GET /h/dashboard/emergency-fund.
 
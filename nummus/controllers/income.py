@@ -38,6 +38,7 @@ def page() -> flask.Response:
     )
 
 
+@base.fragment_cache
 def chart() -> flask.Response:
     """GET /h/income/chart.
 
@@ -79,6 +80,7 @@ def chart() -> flask.Response:
     return response
 
 
+@base.fragment_cache
 def dashboard() -> str:
     """GET /h/dashboard/income.
 
@@ -7,9 +7,10 @@ from decimal import Decimal
 from typing import TYPE_CHECKING, TypedDict
 
 import flask
+import numpy as np
 from sqlalchemy import func
 
-from nummus import sql, utils, web
+from nummus import sql, vectorized, web
 from nummus.controllers import base
 from nummus.models.account import Account
 from nummus.models.asset import Asset
@@ -24,16 +25,23 @@ if TYPE_CHECKING:
 
     from nummus.controllers.base import Routes
     from nummus.models.currency import Currency, CurrencyFormat
+    from nummus.vectorized import IntArray
 
 
-class AccountContext(TypedDict):
-    """Type definition for Account context."""
+class AccountArrays(TypedDict):
+    """Type definition for compact Account chart data."""
 
     name: str
     uri: str
-    min: list[Decimal] | None
-    avg: list[Decimal]
-    max: list[Decimal] | None
+    avg: list[int]
+
+
+class ChartPayload(TypedDict):
+    """Type definition for compact chart data."""
+
+    chart: base.ChartArrays
+    accounts: list[AccountArrays]
+    currency_format: dict[str, object]
 
 
 class Context(TypedDict):
@@ -43,8 +51,6 @@ class Context(TypedDict):
     end: datetime.date
     period: str
     period_options: dict[str, str]
-    chart: base.ChartData
-    accounts: list[AccountContext]
     net_worth: Decimal
     assets: Decimal
     liabilities: Decimal
@@ -74,6 +80,7 @@ def page() -> flask.Response:
     )
 
 
+@base.fragment_cache
 def chart() -> flask.Response:
     """GET /h/net-worth/chart.
 
@@ -103,6 +110,7 @@ def chart() -> flask.Response:
     return response
 
 
+@base.fragment_cache
 def dashboard() -> str:
     """GET /h/dashboard/net-worth.
 
@@ -112,88 +120,114 @@ def dashboard() -> str:
     """
     p = web.portfolio
     with p.begin_session():
-        ctx = ctx_chart(
-            base.today_client(),
-            base.DEFAULT_PERIOD,
-        )
+        today = base.today_client()
+        ctx = ctx_chart(today, base.DEFAULT_PERIOD)
+        payload = ctx_payload(today, base.DEFAULT_PERIOD)
     return flask.render_template(
         "net-worth/dashboard.jinja",
         ctx=ctx,
+        payload=payload,
     )
 
 
-def ctx_chart(
+@base.fragment_cache
+def chart_json() -> flask.Response:
+    """GET /h/net-worth/chart.json.
+
+    Returns:
+        JSON response of ChartPayload
+
+    """
+    args = flask.request.args
+    p = web.portfolio
+    with p.begin_session():
+        payload = ctx_payload(
+            base.today_client(),
+            args.get("period", base.DEFAULT_PERIOD),
+        )
+    return base.json_response(payload)
+
+
+def period_dates(
     today: datetime.date,
     period: str,
-) -> Context:
-    """Get the context to build the net worth chart.
+) -> tuple[datetime.date, datetime.date]:
+    """Get the dates of a chart period.
 
     Args:
         today: Today's date
         period: Selected chart period
 
     Returns:
-        Dictionary HTML context
+        tuple(start, end)
 
     """
     start, end = base.parse_period(period, today)
-
     if start is None:
         query = TransactionSplit.query(func.min(TransactionSplit.date_ord)).where(
             TransactionSplit.asset_id.is_(None),
         )
         start_ord = sql.scalar(query)
         start = datetime.date.fromordinal(start_ord) if start_ord else end
-    start_ord = start.toordinal()
-    end_ord = end.toordinal()
+    return start, end
+
+
+def value_arrays(start_ord: int, end_ord: int) -> dict[int, IntArray]:
+    """Get the value of each included Account in the base currency.
+
+    Args:
+        start_ord: First date ordinal to evaluate
+        end_ord: Last date ordinal to evaluate (inclusive)
+
+    Returns:
+        dict{Account.id_: Decimal6 fixed point array}
 
+    """
     account_currencies: dict[int, Currency] = {
         acct.id_: acct.currency
         for acct in sql.yield_(Account.query())
         if acct.do_include(start_ord)
     }
 
-    base_currency = Config.base_currency()
     forex = Asset.get_forex(
         start_ord,
         end_ord,
-        base_currency,
+        Config.base_currency(),
         set(account_currencies.values()),
     )
 
-    acct_values, _, _ = Account.get_value_all(
+    values, _, _ = Account.get_value_arrays_all(
         start_ord,
         end_ord,
         ids=account_currencies.keys(),
+        forex=forex,
     )
-    acct_values = {
-        acct_id: utils.element_multiply(values, forex[account_currencies[acct_id]])
-        for acct_id, values in acct_values.items()
-    }
+    return values
 
-    total: list[Decimal] = [
-        Decimal(sum(item)) for item in zip(*acct_values.values(), strict=True)
-    ] or [Decimal()] * (end_ord - start_ord + 1)
-    data_tuple = base.chart_data(start_ord, end_ord, (total, *acct_values.values()))
 
-    mapping = Account.map_name()
+def ctx_chart(
+    today: datetime.date,
+    period: str,
+) -> Context:
+    """Get the context to build the net worth chart.
 
-    ctx_accounts: list[AccountContext] = [
-        {
-            "name": mapping[acct_id],
-            "uri": Account.id_to_uri(acct_id),
-            "min": data_tuple[i + 1]["min"],
-            "avg": data_tuple[i + 1]["avg"],
-            "max": data_tuple[i + 1]["max"],
-        }
-        for i, acct_id in enumerate(acct_values)
-    ]
-    ctx_accounts = sorted(ctx_accounts, key=lambda item: -item["avg"][-1])
+    Args:
+        today: Today's date
+        period: Selected chart period
+
+    Returns:
+        Dictionary HTML context
+
+    """
+    start, end = period_dates(today, period)
+    # Chart values come from ctx_payload, only the last day is needed here
+    end_ord = end.toordinal()
+    acct_values = value_arrays(end_ord, end_ord)
 
     assets = Decimal()
     liabilities = Decimal()
     for values in acct_values.values():
-        v = values[-1]
+        v = vectorized.to_decimals(values)[-1]
         if v > 0:
             assets += v
         else:
@@ -212,19 +246,62 @@ def ctx_chart(
         "end": end,
         "period": period,
         "period_options": base.PERIOD_OPTIONS,
-        "chart": data_tuple[0],
-        "accounts": ctx_accounts,
         "net_worth": assets + liabilities,
         "assets": assets,
         "liabilities": liabilities,
         "assets_w": asset_width,
         "liabilities_w": liabilities_width,
-        "currency_format": CURRENCY_FORMATS[base_currency],
+        "currency_format": CURRENCY_FORMATS[Config.base_currency()],
+    }
+
+
+def ctx_payload(today: datetime.date, period: str) -> ChartPayload:
+    """Get the compact chart data of a net worth chart.
+
+    Args:
+        today: Today's date
+        period: Selected chart period
+
+    Returns:
+        ChartPayload
+
+    """
+    start, end = period_dates(today, period)
+    start_ord = start.toordinal()
+    end_ord = end.toordinal()
+
+    acct_values = value_arrays(start_ord, end_ord)
+    total = np.zeros(end_ord - start_ord + 1, dtype=np.int64)
+    for values in acct_values.values():
+        total += values
+
+    chart, *charts = base.chart_arrays(
+        start_ord,
+        end_ord,
+        [total, *acct_values.values()],
+    )
+
+    mapping = Account.map_name()
+    accounts: list[AccountArrays] = [
+        {
+            "name": mapping[acct_id],
+            "uri": Account.id_to_uri(acct_id),
+            "avg": item["avg"],
+        }
+        for acct_id, item in zip(acct_values, charts, strict=True)
+    ]
+    accounts = sorted(accounts, key=lambda item: -item["avg"][-1])
+
+    return {
+        "chart": chart,
+        "accounts": accounts,
+        "currency_format": CURRENCY_FORMATS[Config.base_currency()]._asdict(),
     }
 
 
 ROUTES: Routes = {
     "/net-worth": (page, ["GET"]),
     "/h/net-worth/chart": (chart, ["GET"]),
+    "/h/net-worth/chart.json": (chart_json, ["GET"]),
     "/h/dashboard/net-worth": (dashboard, ["GET"]),
 }
@@ -24,7 +24,6 @@ from nummus.models.currency import (
     CURRENCY_FORMATS,
 )
 from nummus.models.transaction import TransactionSplit
-from nummus.sql import yield_
 
 if TYPE_CHECKING:
 
@@ -106,6 +105,7 @@ def page() -> flask.Response:
     )
 
 
+@base.fragment_cache
 def chart() -> flask.Response:
     """GET /h/performance/chart.
 
@@ -144,6 +144,7 @@ def chart() -> flask.Response:
     return response
 
 
+@base.fragment_cache
 def dashboard() -> str:
     """GET /h/dashboard/performance.
 
@@ -160,15 +161,10 @@ def dashboard() -> str:
         end_ord = end.toordinal()
         n = end_ord - start_ord + 1
 
-        indices: dict[str, Decimal] = {}
-        query = (
-            Asset.query(Asset.name)
-            .where(Asset.category == AssetCategory.INDEX)
-            .order_by(Asset.name)
-        )
-        for (name,) in yield_(query):
-            twrr = Asset.index_twrr(name, start_ord, end_ord)
-            indices[name] = twrr[-1]
+        indices: dict[str, Decimal] = {
+            name: twrr[-1]
+            for name, twrr in Asset.index_twrr_all(start_ord, end_ord).items()
+        }
 
         acct_values, acct_profits, _ = Account.get_value_all(
             start_ord,
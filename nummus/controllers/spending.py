@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import datetime
 import operator
+from collections import defaultdict
+from decimal import Decimal
 from typing import NamedTuple, TYPE_CHECKING, TypedDict
 
 import flask
@@ -18,6 +20,7 @@ from nummus.models.currency import (
     CURRENCY_FORMATS,
 )
 from nummus.models.label import Label, LabelLink
+from nummus.models.rollup import MonthlyRollup
 from nummus.models.transaction import TransactionSplit
 from nummus.models.transaction_category import (
     TransactionCategory,
@@ -25,11 +28,12 @@ from nummus.models.transaction_category import (
 )
 
 if TYPE_CHECKING:
-    from decimal import Decimal
+    from collections.abc import Iterable
 
     from sqlalchemy import orm
 
     from nummus.models.currency import Currency, CurrencyFormat
+    from nummus.models.rollup import RollupTotal
 
 
 class OptionsContext(TypedDict):
@@ -41,20 +45,25 @@ class OptionsContext(TypedDict):
     options_label: list[base.NamePair]
 
 
-class Context(OptionsContext):
-    """Type definition for context."""
+class ChartContext(OptionsContext):
+    """Type definition for chart totals context."""
 
     no_matches: bool
     selected_period: str | None
+    by_account: list[tuple[str, Decimal]]
+    by_payee: list[tuple[str | None, Decimal]]
+    by_category: list[tuple[str, Decimal]]
+    by_label: list[tuple[str | None, Decimal]]
+
+
+class Context(ChartContext):
+    """Type definition for context."""
+
     selected_account: str | None
     selected_category: str | None
     selected_label: str | None
     start: str | None
     end: str | None
-    by_account: list[tuple[str, Decimal]]
-    by_payee: list[tuple[str | None, Decimal]]
-    by_category: list[tuple[str, Decimal]]
-    by_label: list[tuple[str | None, Decimal]]
     currency_format: CurrencyFormat
 
 
@@ -101,6 +110,7 @@ def page() -> flask.Response:
     )
 
 
+@base.fragment_cache
 def chart() -> flask.Response:
     """GET /h/spending/chart.
 
@@ -142,6 +152,7 @@ def chart() -> flask.Response:
     return response
 
 
+@base.fragment_cache
 def dashboard() -> str:
     """GET /h/dashboard/spending.
 
@@ -170,6 +181,67 @@ def dashboard() -> str:
     )
 
 
+def skipped_ids(
+    selected_currency: Currency,
+    *,
+    is_income: bool,
+) -> tuple[set[int], set[int]]:
+    """Get the categories and accounts excluded from the chart.
+
+    Args:
+        selected_currency: Currency to filter by
+        is_income: True will select income transactions,
+            False will select expense transactions
+
+    Returns:
+        tuple(TransactionCategory.id_ to skip, Account.id_ to skip)
+
+    """
+    skip_groups = {
+        (
+            TransactionCategoryGroup.EXPENSE
+            if is_income
+            else TransactionCategoryGroup.INCOME
+        ),
+        TransactionCategoryGroup.TRANSFER,
+    }
+    query = TransactionCategory.query(TransactionCategory.id_).where(
+        (TransactionCategory.name == "securities traded")
+        | TransactionCategory.group.in_(skip_groups),
+    )
+    skip_ids = set(sql.col0(query))
+    query = Account.query(Account.id_).where(Account.currency != selected_currency)
+    skip_acct_ids = set(sql.col0(query))
+    return skip_ids, skip_acct_ids
+
+
+def period_dates(
+    selected_period: str | None,
+    selected_start: str | None,
+    selected_end: str | None,
+) -> tuple[datetime.date | None, datetime.date | None]:
+    """Get the dates of a period.
+
+    Args:
+        selected_period: Name of period from args
+        selected_start: ISO date string of start from args
+        selected_end: ISO date string of end from args
+
+    Returns:
+        tuple(start, end), None for no limit
+
+    """
+    if not selected_period or selected_period == "all":
+        return None, None
+    if selected_period == "custom":
+        return utils.parse_date(selected_start), utils.parse_date(selected_end)
+    if "-" in selected_period:
+        start = datetime.date.fromisoformat(selected_period + "-01")
+        return start, utils.end_of_month(start)
+    year = int(selected_period)
+    return datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+
+
 def data_query(
     selected_currency: Currency,
     selected_account: str | None = None,
@@ -198,21 +270,7 @@ def data_query(
         DataQuery
 
     """
-    skip_groups = {
-        (
-            TransactionCategoryGroup.EXPENSE
-            if is_income
-            else TransactionCategoryGroup.INCOME
-        ),
-        TransactionCategoryGroup.TRANSFER,
-    }
-    query = TransactionCategory.query(TransactionCategory.id_).where(
-        (TransactionCategory.name == "securities traded")
-        | TransactionCategory.group.in_(skip_groups),
-    )
-    skip_ids = set(sql.col0(query))
-    query = Account.query(Account.id_).where(Account.currency != selected_currency)
-    skip_acct_ids = set(sql.col0(query))
+    skip_ids, skip_acct_ids = skipped_ids(selected_currency, is_income=is_income)
     query = TransactionSplit.query().where(
         TransactionSplit.category_id.not_in(skip_ids),
         TransactionSplit.account_id.not_in(skip_acct_ids),
@@ -221,21 +279,9 @@ def data_query(
 
     any_filters = False
 
-    start = None
-    end = None
     if selected_period and selected_period != "all":
         any_filters = True
-        if selected_period == "custom":
-            start = utils.parse_date(selected_start)
-            end = utils.parse_date(selected_end)
-        elif "-" in selected_period:
-            start = datetime.date.fromisoformat(selected_period + "-01")
-            end = utils.end_of_month(start)
-        else:
-            year = int(selected_period)
-            start = datetime.date(year, 1, 1)
-            end = datetime.date(year, 12, 31)
-
+        start, end = period_dates(selected_period, selected_start, selected_end)
         if start:
             clauses["start"] = TransactionSplit.date_ord >= start.toordinal()
         if end:
@@ -294,6 +340,78 @@ def ctx_options(
     """
     query = dat_query.query
 
+    clauses = dat_query.clauses.copy()
+    clauses.pop("account", None)
+    query_options = (
+        query.with_entities(TransactionSplit.account_id)  # nummus: ignore
+        .where(*clauses.values())
+        .distinct()
+    )
+    acct_ids: set[int] = {acct_id for acct_id, in sql.yield_(query_options)}
+
+    clauses = dat_query.clauses.copy()
+    clauses.pop("category", None)
+    query_options = (
+        query.with_entities(TransactionSplit.category_id)  # nummus: ignore
+        .where(*clauses.values())
+        .distinct()
+    )
+    cat_ids: set[int] = {cat_id for cat_id, in sql.yield_(query_options)}
+
+    clauses = dat_query.clauses.copy()
+    clauses.pop("label", None)
+    query_options = (
+        query.join(LabelLink)
+        .with_entities(LabelLink.label_id)  # nummus: ignore
+        .where(*clauses.values())
+        .distinct()
+    )
+    label_ids: set[int] = {label_id for label_id, in sql.yield_(query_options)}
+
+    return ctx_options_ids(
+        today,
+        accounts,
+        categories,
+        labels,
+        acct_ids,
+        cat_ids,
+        label_ids,
+        selected_account,
+        selected_category,
+        selected_label,
+    )
+
+
+def ctx_options_ids(
+    today: datetime.date,
+    accounts: dict[int, str],
+    categories: base.CategoryGroups,
+    labels: dict[int, str],
+    acct_ids: set[int],
+    cat_ids: set[int],
+    label_ids: set[int],
+    selected_account: str | None = None,
+    selected_category: str | None = None,
+    selected_label: str | None = None,
+) -> OptionsContext:
+    """Get the context to build the options from the ids with matches.
+
+    Args:
+        today: Today's date
+        accounts: Account name mapping
+        categories: TransactionCategory name mapping
+        labels: Label name mapping
+        acct_ids: Account.id_ with matches ignoring the account filter
+        cat_ids: TransactionCategory.id_ with matches ignoring the category filter
+        label_ids: Label.id_ with matches ignoring the label filter
+        selected_account: URI of account from args
+        selected_category: URI of category from args
+        selected_label: URI of label from args
+
+    Returns:
+        OptionsContext
+
+    """
     month = utils.start_of_month(today)
     last_months = [utils.date_add_months(month, i) for i in range(0, -3, -1)]
     options_period = [
@@ -304,17 +422,10 @@ def ctx_options(
         base.NamePair("custom", "Custom date range"),
     ]
 
-    clauses = dat_query.clauses.copy()
-    clauses.pop("account", None)
-    query_options = (
-        query.with_entities(TransactionSplit.account_id)  # nummus: ignore
-        .where(*clauses.values())
-        .distinct()
-    )
     options_account = sorted(
         [
             base.NamePair(Account.id_to_uri(acct_id), accounts[acct_id])
-            for acct_id, in sql.yield_(query_options)
+            for acct_id in acct_ids
         ],
         key=operator.itemgetter(0),
     )
@@ -322,16 +433,7 @@ def ctx_options(
         acct_id = Account.uri_to_id(selected_account)
         options_account = [base.NamePair(selected_account, accounts[acct_id])]
 
-    clauses = dat_query.clauses.copy()
-    clauses.pop("category", None)
-    query_options = (
-        query.with_entities(TransactionSplit.category_id)  # nummus: ignore
-        .where(*clauses.values())
-        .distinct()
-    )
-    options_uris = {
-        TransactionCategory.id_to_uri(r[0]) for r in sql.yield_(query_options)
-    }
+    options_uris = {TransactionCategory.id_to_uri(cat_id) for cat_id in cat_ids}
     if selected_category:
         options_uris.add(selected_category)
     options_category = {
@@ -344,18 +446,10 @@ def ctx_options(
         if items
     }
 
-    clauses = dat_query.clauses.copy()
-    clauses.pop("label", None)
-    query_options = (
-        query.join(LabelLink)
-        .with_entities(LabelLink.label_id)  # nummus: ignore
-        .where(*clauses.values())
-        .distinct()
-    )
     options_label = sorted(
         [
             base.NamePair(Label.id_to_uri(label_id), labels[label_id])
-            for label_id, in sql.yield_(query_options)
+            for label_id in label_ids
         ],
         key=operator.itemgetter(1),
     )
@@ -371,7 +465,28 @@ def ctx_options(
     }
 
 
-def ctx_chart(
+def _by_amount[T](
+    amounts: Iterable[tuple[T, Decimal]],
+    *,
+    is_income: bool,
+) -> list[tuple[T, Decimal]]:
+    """Sort chart totals from largest to smallest, skipping zeros.
+
+    Args:
+        amounts: Iterable of (name, amount)
+        is_income: False will invert amount signs
+
+    Returns:
+        list[(name, amount)]
+
+    """
+    result = [
+        (name, amount if is_income else -amount) for name, amount in amounts if amount
+    ]
+    return sorted(result, key=operator.itemgetter(1), reverse=True)
+
+
+def ctx_splits(
     today: datetime.date,
     selected_account: str | None,
     selected_category: str | None,
@@ -381,31 +496,30 @@ def ctx_chart(
     selected_end: str | None,
     *,
     is_income: bool,
-) -> tuple[Context, str]:
-    """Get the context to build the chart data.
+) -> ChartContext:
+    """Get the chart totals context from TransactionSplits.
 
     Args:
         today: Today's date
         selected_account: Selected account for filtering
         selected_category: Selected category for filtering
-        selected_period: Selected period for filtering
         selected_label: Selected label for filtering
+        selected_period: Selected period for filtering
         selected_start: Selected start date for custom period
         selected_end: Selected end date for custom period
         is_income: True will select income transactions,
             False will select expense and invert amount signs
 
     Returns:
-        tuple(Context, title)
+        ChartContext
 
     """
     accounts = Account.map_name()
-    base_currency = Config.base_currency()
     categories_emoji = TransactionCategory.map_name_emoji()
     labels = Label.map_name()
 
     dat_query = data_query(
-        base_currency,
+        Config.base_currency(),
         selected_account,
         selected_period,
         selected_start,
@@ -439,34 +553,25 @@ def ctx_chart(
         TransactionSplit.account_id,
         func.sum(TransactionSplit.amount),
     ).group_by(TransactionSplit.account_id)
-    by_account: list[tuple[str, Decimal]] = [
-        (accounts[account_id], amount if is_income else -amount)
-        for account_id, amount in sql.yield_(query)
-        if amount
-    ]
-    by_account = sorted(by_account, key=operator.itemgetter(1), reverse=True)
+    by_account = _by_amount(
+        ((accounts[acct_id], amount) for acct_id, amount in sql.yield_(query)),
+        is_income=is_income,
+    )
 
     query = final_query.with_entities(  # nummus: ignore
         TransactionSplit.payee,
         func.sum(TransactionSplit.amount),
     ).group_by(TransactionSplit.payee)
-    by_payee: list[tuple[str | None, Decimal]] = [
-        (payee, amount if is_income else -amount)
-        for payee, amount in sql.yield_(query)
-        if amount
-    ]
-    by_payee = sorted(by_payee, key=operator.itemgetter(1), reverse=True)
+    by_payee = _by_amount(sql.yield_(query), is_income=is_income)
 
     query = final_query.with_entities(  # nummus: ignore
         TransactionSplit.category_id,
         func.sum(TransactionSplit.amount),
     ).group_by(TransactionSplit.category_id)
-    by_category: list[tuple[str, Decimal]] = [
-        (categories_emoji[cat_id], amount if is_income else -amount)
-        for cat_id, amount in sql.yield_(query)
-        if amount
-    ]
-    by_category = sorted(by_category, key=operator.itemgetter(1), reverse=True)
+    by_category = _by_amount(
+        ((categories_emoji[cat_id], amount) for cat_id, amount in sql.yield_(query)),
+        is_income=is_income,
+    )
 
     query = (
         final_query.join(LabelLink, full=True)
@@ -492,11 +597,6 @@ def ctx_chart(
         "no_matches": n_matches == 0,
         **options,
         "selected_period": selected_period,
-        "selected_account": selected_account,
-        "selected_category": selected_category,
-        "selected_label": selected_label,
-        "start": selected_start,
-        "end": selected_end,
         "by_account": by_account,
         "by_payee": by_payee,
         "by_category": by_category,
@@ -505,7 +605,180 @@ def ctx_chart(
             for label, amount, is_selected in by_label
             if not is_selected or len(by_label) == 1
         ],
-        "currency_format": CURRENCY_FORMATS[base_currency],
+    }
+
+
+def ctx_rollup(
+    today: datetime.date,
+    selected_account: str | None,
+    selected_category: str | None,
+    selected_period: str | None,
+    selected_start: str | None,
+    selected_end: str | None,
+    *,
+    is_income: bool,
+) -> ChartContext:
+    """Get the chart totals context from the MonthlyRollup.
+
+    Whole months are summed from the rollup, only partial months scan
+    TransactionSplits. Cannot filter by label since labels of a
+    TransactionSplit are not grouped together in the rollup.
+
+    Args:
+        today: Today's date
+        selected_account: Selected account for filtering
+        selected_category: Selected category for filtering
+        selected_period: Selected period for filtering
+        selected_start: Selected start date for custom period
+        selected_end: Selected end date for custom period
+        is_income: True will select income transactions,
+            False will select expense and invert amount signs
+
+    Returns:
+        ChartContext
+
+    """
+    accounts = Account.map_name()
+    categories_emoji = TransactionCategory.map_name_emoji()
+    labels = Label.map_name()
+
+    skip_ids, skip_acct_ids = skipped_ids(Config.base_currency(), is_income=is_income)
+    start, end = period_dates(selected_period, selected_start, selected_end)
+    acct_id = selected_account and Account.uri_to_id(selected_account)
+    cat_id = selected_category and TransactionCategory.uri_to_id(selected_category)
+
+    def get_totals(
+        start: datetime.date | None,
+        end: datetime.date | None,
+    ) -> tuple[list[RollupTotal], set[int], set[int]]:
+        totals = MonthlyRollup.get_totals(start, end, skip_acct_ids, skip_ids)
+        acct_ids = {
+            t.account_id for t in totals if not cat_id or t.category_id == cat_id
+        }
+        cat_ids = {
+            t.category_id for t in totals if not acct_id or t.account_id == acct_id
+        }
+        totals = [
+            t
+            for t in totals
+            if (not acct_id or t.account_id == acct_id)
+            and (not cat_id or t.category_id == cat_id)
+        ]
+        return totals, acct_ids, cat_ids
+
+    totals, acct_ids, cat_ids = get_totals(start, end)
+    options = ctx_options_ids(
+        today,
+        accounts,
+        base.tranaction_category_groups(),
+        labels,
+        acct_ids,
+        cat_ids,
+        {t.label_id for t in totals if t.label_id is not None},
+        selected_account,
+        selected_category,
+    )
+
+    n_matches = sum(t.n_splits for t in totals if t.label_id is None)
+    if not n_matches:
+        # If no matches, reset period to all
+        selected_period = None
+        if start or end:
+            totals, _, _ = get_totals(None, None)
+            n_matches = sum(t.n_splits for t in totals if t.label_id is None)
+
+    by_account: dict[int, Decimal] = defaultdict(Decimal)
+    by_payee: dict[str | None, Decimal] = defaultdict(Decimal)
+    by_category: dict[int, Decimal] = defaultdict(Decimal)
+    by_label: dict[int | None, Decimal] = defaultdict(Decimal)
+    for t in totals:
+        if t.label_id is None:
+            by_account[t.account_id] += t.amount
+            by_payee[t.payee] += t.amount
+            by_category[t.category_id] += t.amount
+            by_label[None] += t.amount_unlabeled
+        else:
+            by_label[t.label_id] += t.amount
+
+    return {
+        "no_matches": n_matches == 0,
+        **options,
+        "selected_period": selected_period,
+        "by_account": _by_amount(
+            ((accounts[k], v) for k, v in by_account.items()),
+            is_income=is_income,
+        ),
+        "by_payee": _by_amount(by_payee.items(), is_income=is_income),
+        "by_category": _by_amount(
+            ((categories_emoji[k], v) for k, v in by_category.items()),
+            is_income=is_income,
+        ),
+        "by_label": _by_amount(
+            ((labels.get(k) if k else None, v) for k, v in by_label.items()),
+            is_income=is_income,
+        ),
+    }
+
+
+def ctx_chart(
+    today: datetime.date,
+    selected_account: str | None,
+    selected_category: str | None,
+    selected_label: str | None,
+    selected_period: str | None,
+    selected_start: str | None,
+    selected_end: str | None,
+    *,
+    is_income: bool,
+) -> tuple[Context, str]:
+    """Get the context to build the chart data.
+
+    Args:
+        today: Today's date
+        selected_account: Selected account for filtering
+        selected_category: Selected category for filtering
+        selected_period: Selected period for filtering
+        selected_label: Selected label for filtering
+        selected_start: Selected start date for custom period
+        selected_end: Selected end date for custom period
+        is_income: True will select income transactions,
+            False will select expense and invert amount signs
+
+    Returns:
+        tuple(Context, title)
+
+    """
+    if selected_label:
+        # Label filter needs the other labels of each TransactionSplit
+        ctx = ctx_splits(
+            today,
+            selected_account,
+            selected_category,
+            selected_label,
+            selected_period,
+            selected_start,
+            selected_end,
+            is_income=is_income,
+        )
+    else:
+        ctx = ctx_rollup(
+            today,
+            selected_account,
+            selected_category,
+            selected_period,
+            selected_start,
+            selected_end,
+            is_income=is_income,
+        )
+
+    return {
+        **ctx,
+        "selected_account": selected_account,
+        "selected_category": selected_category,
+        "selected_label": selected_label,
+        "start": selected_start,
+        "end": selected_end,
+        "currency_format": CURRENCY_FORMATS[Config.base_currency()],
     }, ("Income" if is_income else "Spending")
 
 
@@ -10,13 +10,14 @@ from itertools import starmap
 from typing import NamedTuple, NotRequired, TYPE_CHECKING, TypedDict
 
 import flask
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 
 from nummus import exceptions as exc
 from nummus import sql, utils, web
 from nummus.controllers import base
 from nummus.models.account import Account
 from nummus.models.asset import Asset
+from nummus.models.cache import cached
 from nummus.models.config import Config
 from nummus.models.currency import (
     Currency,
@@ -101,6 +102,7 @@ class TableContext(OptionsContext):
     query_total: Decimal
     no_matches: bool
     next_page: str | None
+    continues_date: bool
     any_filters: bool
     search: str | None
     selected_period: str | None
@@ -112,6 +114,13 @@ class TableContext(OptionsContext):
     currency_format: CurrencyFormat
 
 
+class TableSummary(NamedTuple):
+    """Type definition for result of _table_summary()."""
+
+    total: Decimal
+    matches: tuple[int, ...] | None
+
+
 class TableQuery(NamedTuple):
     """Type definition for result of table_query()."""
 
@@ -124,20 +133,6 @@ class TableQuery(NamedTuple):
         """Build the final query with clauses."""
         return self.query.where(*self.clauses.values())
 
-    def where(self, **clauses: sql.ColumnClause) -> TableQuery:
-        """Add clauses to query.
-
-        Args:
-            clauses: New clauses to add
-
-        Returns:
-            New TableQuery
-
-        """
-        new_clauses = self.clauses.copy()
-        new_clauses.update(clauses)
-        return TableQuery(self.query, new_clauses, any_filters=True)
-
 
 def page_all() -> flask.Response:
     """GET /transactions.
@@ -1147,7 +1142,7 @@ def ctx_table(
         selected_period: Selected period for filtering
         selected_start: Selected start date for custom period
         selected_end: Selected end date for custom period
-        page_start: Offset or date_ord of page
+        page_start: Offset into search matches or cursor of previous page
         uncleared: True will filter to only uncleared
         acct_uri: Account uri to get transactions for, None will use filter queries
 
@@ -1163,22 +1158,24 @@ def ctx_table(
         currency_formats[acct_id] = CURRENCY_FORMATS[currency]
 
     categories_emoji = TransactionCategory.map_name_emoji()
-    categories = {
-        cat_id: TransactionCategory.clean_emoji_name(name)
-        for cat_id, name in categories_emoji.items()
-    }
 
     query = Asset.query(Asset.id_, Asset.name, Asset.ticker)
     assets = sql.to_dict_tuple(query)
     labels = Label.map_name()
 
-    if page_start is None:
-        page_start_int = None
-    else:
+    # Search pages are an offset into the matches, others continue after the
+    # (date, split uri) of the previous page's last row, a bare date starts on it
+    offset: int | None = None
+    cursor: tuple[int, int | None] | None = None
+    if page_start is not None:
         try:
-            page_start_int = int(page_start)
+            offset = int(page_start)
         except ValueError:
-            page_start_int = datetime.date.fromisoformat(page_start).toordinal()
+            date_str, _, t_split_uri = page_start.partition("_")
+            cursor = (
+                datetime.date.fromisoformat(date_str).toordinal(),
+                TransactionSplit.uri_to_id(t_split_uri) if t_split_uri else None,
+            )
 
     tbl_query = table_query(
         acct_uri,
@@ -1198,63 +1195,57 @@ def ctx_table(
         selected_category,
     )
 
-    # Do search
-    try:
-        matches = TransactionSplit.search(
-            tbl_query.final_query,
-            search_str or "",
-            categories,
-        )
-    except exc.EmptySearchError:
-        matches = None
-
-    if matches is not None:
-        tbl_query = tbl_query.where(search=TransactionSplit.id_.in_(matches))
-        t_split_order = {t_split_id: i for i, t_split_id in enumerate(matches)}
-    else:
-        t_split_order = {}
-
-    final_query = tbl_query.final_query
-    query_total = final_query.with_entities(  # nummus: ignore
-        func.sum(TransactionSplit.amount),
+    # Same for every page so computed once per filter set
+    summary = _table_summary(
+        search_str,
+        acct_uri,
+        selected_account,
+        selected_period,
+        selected_start,
+        selected_end,
+        selected_category,
+        uncleared=uncleared,
     )
+    matches = summary.matches
 
+    final_query = tbl_query.final_query
+    next_page: str | None = None
     if matches is not None:
-        i_start = page_start_int or 0
+        i_start = offset or 0
         page = matches[i_start : i_start + PAGE_LEN]
         final_query = final_query.where(TransactionSplit.id_.in_(page))
-        next_page = i_start + PAGE_LEN
+        if i_start + PAGE_LEN < len(matches):
+            next_page = str(i_start + PAGE_LEN)
+        t_split_order = {t_split_id: i for i, t_split_id in enumerate(page)}
     else:
-        # Find the fewest dates to include that will make page at least
-        # PAGE_LEN long
-        included_date_ords: set[int] = set()
-        query_page_count = final_query.with_entities(  # nummus: ignore
-            TransactionSplit.date_ord,
-            func.count(),
-        ).group_by(TransactionSplit.date_ord)
-        if page_start_int:
-            query_page_count = query_page_count.where(
-                TransactionSplit.date_ord <= page_start_int,
-            )
-        page_count = 0
-        # Limit to PAGE_LEN since at most there is one txn per day
-        for date_ord, count in sql.yield_(query_page_count.limit(PAGE_LEN)):
-            included_date_ords.add(date_ord)
-            page_count += count
-            if page_count >= PAGE_LEN:
-                break
-
-        final_query = final_query.where(
-            TransactionSplit.date_ord.in_(included_date_ords),
+        t_split_order = {}
+        # Seek past the previous page, deep pages cost the same as the first
+        final_query = final_query.order_by(None).order_by(
+            TransactionSplit.date_ord.desc(),
+            TransactionSplit.id_.desc(),
         )
-
-        next_page = (
-            None
-            if len(included_date_ords) == 0
-            else datetime.date.fromordinal(min(included_date_ords) - 1)
+        if cursor is not None and cursor[1] is None:
+            final_query = final_query.where(TransactionSplit.date_ord <= cursor[0])
+        elif cursor is not None:
+            final_query = final_query.where(
+                tuple_(TransactionSplit.date_ord, TransactionSplit.id_) < cursor,
+            )
+        # Last row of this page and the first of the next if there is one
+        query_keys = (
+            final_query.with_entities(  # nummus: ignore
+                TransactionSplit.date_ord,
+                TransactionSplit.id_,
+            )
+            .offset(PAGE_LEN - 1)
+            .limit(2)
         )
+        keys = list(sql.yield_(query_keys))
+        if len(keys) > 1:
+            date_ord, t_split_id = keys[0]
+            date = datetime.date.fromordinal(date_ord)
+            next_page = f"{date}_{TransactionSplit.id_to_uri(t_split_id)}"
+        final_query = final_query.limit(PAGE_LEN)
 
-    n_matches = sql.count(final_query)
     groups = _table_results(
         final_query,
         assets,
@@ -1276,9 +1267,15 @@ def ctx_table(
     return {
         "uri": acct_uri,
         "transactions": groups,
-        "query_total": sql.scalar(query_total) or Decimal(),
-        "no_matches": n_matches == 0 and page_start_int is None,
-        "next_page": None if n_matches < PAGE_LEN else str(next_page),
+        "query_total": summary.total,
+        "no_matches": not groups and page_start is None,
+        "next_page": next_page,
+        "continues_date": bool(
+            cursor
+            and cursor[1] is not None
+            and groups
+            and groups[0][0].toordinal() == cursor[0],
+        ),
         "any_filters": tbl_query.any_filters,
         "search": search_str,
         **options,
@@ -1292,6 +1289,70 @@ def ctx_table(
     }, title
 
 
+@cached
+def _table_summary(
+    search_str: str | None,
+    acct_uri: str | None,
+    selected_account: str | None,
+    selected_period: str | None,
+    selected_start: str | None,
+    selected_end: str | None,
+    selected_category: str | None,
+    *,
+    uncleared: bool,
+) -> TableSummary:
+    """Get the parts of the transaction table that don't depend on the page.
+
+    Args:
+        search_str: String to search for
+        acct_uri: Account uri to get transactions for, None will use filter queries
+        selected_account: Selected account for filtering
+        selected_period: Selected period for filtering
+        selected_start: Selected start date for custom period
+        selected_end: Selected end date for custom period
+        selected_category: Selected category for filtering
+        uncleared: True will filter to only uncleared
+
+    Returns:
+        TableSummary
+
+    """
+    tbl_query = table_query(
+        acct_uri,
+        selected_account,
+        selected_period,
+        selected_start,
+        selected_end,
+        selected_category,
+        uncleared=uncleared,
+    )
+    final_query = tbl_query.final_query
+
+    categories = {
+        cat_id: TransactionCategory.clean_emoji_name(name)
+        for cat_id, name in TransactionCategory.map_name_emoji().items()
+    }
+    try:
+        matches = TransactionSplit.search(final_query, search_str or "", categories)
+    except exc.EmptySearchError:
+        query = final_query.with_entities(  # nummus: ignore
+            func.sum(TransactionSplit.amount),
+        )
+        return TableSummary(sql.scalar(query) or Decimal(), None)
+
+    # Too many matches to bind as parameters, sum while scanning instead
+    matched = set(matches)
+    query = final_query.with_entities(  # nummus: ignore
+        TransactionSplit.id_,
+        TransactionSplit.amount,
+    )
+    total = sum(
+        (amount for t_split_id, amount in sql.yield_(query) if t_split_id in matched),
+        start=Decimal(),
+    )
+    return TableSummary(total, tuple(matches))
+
+
 def _table_results(
     query: orm.Query[TransactionSplit],
     assets: dict[int, tuple[str, str | None]],
@@ -105,35 +105,32 @@ class UnknownImporterError(Exception):
 class EmptyImportError(Exception):
     """Error when a file does not return any transactions."""
 
-    def __init__(self, path: Path, importer: object) -> None:
+    def __init__(self, path: Path, importer: str) -> None:
         """Initialize EmptyImportError.
 
         Args:
             path: Path to empty file
-            importer: Importer used on file
+            importer: Name of importer used on file
 
         """
-        self.importer = importer.__class__.__name__
-        msg = (
-            f"No transactions imported for {path} using importer "
-            f"{importer.__class__.__name__}"
-        )
+        self.importer = importer
+        msg = f"No transactions imported for {path} using importer {importer}"
         super().__init__(msg)
 
 
 class FailedImportError(Exception):
     """Error when an importer fails to import a file."""
 
-    def __init__(self, path: Path, importer: object) -> None:
+    def __init__(self, path: Path, importer: str) -> None:
         """Initialize FailedImportError.
 
         Args:
             path: Path to empty file
-            importer: Importer used on file
+            importer: Name of importer used on file
 
         """
-        self.importer = importer.__class__.__name__
-        msg = f"{importer.__class__.__name__} failed to import {path}"
+        self.importer = importer
+        msg = f"{importer} failed to import {path}"
         super().__init__(msg)
 
 
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import importlib.util
-from typing import TYPE_CHECKING
+import multiprocessing
+import os
+import traceback
+from typing import NamedTuple, TYPE_CHECKING
 
 import pdfplumber
 
@@ -12,9 +16,29 @@ from nummus.importers.base import TransactionImporter
 from nummus.importers.raw_csv import CSVTransactionImporter
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Generator, Sequence
     from pathlib import Path
 
+    from nummus.importers.base import TxnDicts
+
+
+class ParsedFile(NamedTuple):
+    """Result of parsing a file, returned from worker processes."""
+
+    importer: str | None
+    debug: bytes
+    txns: TxnDicts
+    error: str | None
+
+
+class _WorkerState:
+    """Importers loaded by each worker process."""
+
+    importers: Sequence[type[TransactionImporter]] = ()
+
+
+_worker = _WorkerState()
+
 
 def get_importers(extra: Path | None) -> Sequence[type[TransactionImporter]]:
     """Get a list of importers from a directory.
@@ -64,6 +88,51 @@ def get_importers(extra: Path | None) -> Sequence[type[TransactionImporter]]:
     return tuple(available)
 
 
+def _read_file(path: Path) -> tuple[bytes | None, list[str] | None, bytes]:
+    """Read a file for importers.
+
+    Args:
+        path: Path to file
+
+    Returns:
+        (contents of file, contents of PDF pages as text, contents for debug file)
+
+    """
+    if path.suffix.lower() == ".pdf":
+        with pdfplumber.open(path) as pdf:
+            pages = [page.extract_text() for page in pdf.pages]
+            buf_pdf = [page for page in pages if page]
+        debug = "\n--- [Page Boundary] ---\n".join(buf_pdf).encode()
+        return None, buf_pdf, debug
+    buf = path.read_bytes()
+    return buf, None, buf
+
+
+def _find_importer(
+    path: Path,
+    buf: bytes | None,
+    buf_pdf: list[str] | None,
+    available: Sequence[type[TransactionImporter]],
+) -> TransactionImporter | None:
+    """Find the best importer for a file's contents.
+
+    Args:
+        path: Path to file
+        buf: Contents of file
+        buf_pdf: Contents of PDF pages as text
+        available: Available importers for portfolio
+
+    Returns:
+        Initialized Importer or None if an importer cannot be found
+
+    """
+    suffix = path.suffix.lower()
+    for i in available:
+        if i.is_importable(suffix, buf=buf, buf_pdf=buf_pdf):
+            return i(buf=buf, buf_pdf=buf_pdf)
+    return None
+
+
 def get_importer(
     path: Path,
     path_debug: Path,
@@ -83,22 +152,99 @@ def get_importer(
         UnknownImporterError: if an importer cannot be found
 
     """
-    suffix = path.suffix.lower()
+    buf, buf_pdf, debug = _read_file(path)
+    path_debug.write_bytes(debug)
 
-    buf: bytes | None = None
-    buf_pdf: list[str] | None = None
-    if suffix == ".pdf":
-        buf_pdf = []
-        with pdfplumber.open(path) as pdf:
-            pages = [page.extract_text() for page in pdf.pages]
-            buf_pdf = [page for page in pages if page]
-        path_debug.write_text("\n--- [Page Boundary] ---\n".join(buf_pdf), "utf-8")
-    else:
-        buf = path.read_bytes()
-        path_debug.write_bytes(buf)
+    i = _find_importer(path, buf, buf_pdf, available)
+    if i is None:
+        raise exc.UnknownImporterError(path)
+    return i
 
-    for i in available:
-        if i.is_importable(suffix, buf=buf, buf_pdf=buf_pdf):
-            return i(buf=buf, buf_pdf=buf_pdf)
 
-    raise exc.UnknownImporterError(path)
+def parse_file(
+    path: Path,
+    available: Sequence[type[TransactionImporter]],
+) -> ParsedFile:
+    """Parse a file with the best importer.
+
+    Importer errors are captured instead of raised so the result can be
+    returned from a worker process.
+
+    Args:
+        path: Path to file
+        available: Available importers for portfolio
+
+    Returns:
+        ParsedFile
+
+    """
+    buf, buf_pdf, debug = _read_file(path)
+    i = _find_importer(path, buf, buf_pdf, available)
+    if i is None:
+        return ParsedFile(None, debug, [], None)
+    try:
+        txns = i.run()
+    except Exception:  # noqa: BLE001
+        return ParsedFile(i.__class__.__name__, debug, [], traceback.format_exc())
+    return ParsedFile(i.__class__.__name__, debug, txns, None)
+
+
+def _init_worker(extra: Path | None) -> None:
+    """Load importers in a worker process.
+
+    Args:
+        extra: Path to extra importers directory
+
+    """
+    _worker.importers = get_importers(extra)
+
+
+def _parse_file_worker(path: Path) -> ParsedFile:
+    """Parse a file in a worker process.
+
+    Args:
+        path: Path to file
+
+    Returns:
+        ParsedFile
+
+    """
+    return parse_file(path, _worker.importers)
+
+
+def parse_files(
+    paths: Sequence[Path],
+    extra: Path | None,
+    max_workers: int | None = None,
+) -> Generator[ParsedFile]:
+    """Parse files in parallel worker processes.
+
+    Args:
+        paths: Paths to files
+        extra: Path to extra importers directory
+        max_workers: Maximum number of worker processes, None for CPU count
+
+    Yields:
+        ParsedFile for each path, in order
+
+    """
+    n_workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    if n_workers <= 1:
+        available = get_importers(extra)
+        for path in paths:
+            yield parse_file(path, available)
+        return
+
+    # Custom importers are loaded from files so can't be pickled, load in each
+    # Spawn to avoid forking open database connections
+    executor = concurrent.futures.ProcessPoolExecutor(
+        n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(extra,),
+    )
+    try:
+        yield from executor.map(_parse_file_worker, paths)
+    finally:
+        # Stop parsing remaining files if caller stopped early
+        executor.shutdown(cancel_futures=True)
@@ -12,6 +12,7 @@ from packaging.version import Version
 from sqlalchemy.schema import CreateTable
 
 from nummus import sql
+from nummus.models import rollup, search, snapshot
 from nummus.models.base import Base
 from nummus.models.utils import dump_table_configs, get_constraints
 
@@ -167,6 +168,11 @@ class Migrator(ABC):
         stmt = "PRAGMA foreign_keys = OFF"
         s.execute(sqlalchemy.text(stmt))
 
+        # Triggers on other tables referencing this one block the rename
+        # SchemaMigrator creates them again
+        search.drop_triggers(s)
+        rollup.drop_triggers(s)
+
         # Create new table
         s.execute(sqlalchemy.text("\n".join(new_config)))
 
@@ -195,6 +201,33 @@ class Migrator(ABC):
 
         self.pending_schema_updates.add(model)
 
+    @staticmethod
+    def update_indexes(model: type[Base]) -> None:
+        """Create indexes missing from a table and drop ones not in the model.
+
+        Args:
+            model: Table to modify
+
+        """
+        s = model.session()
+        table: sqlalchemy.Table = model.sql_table()
+        # Indexes of constraints have no sql and can't be dropped
+        stmt = f"""
+            SELECT name
+            FROM sqlite_master
+            WHERE
+                type='index'
+                AND tbl_name='{model.__tablename__}'
+                AND sql IS NOT NULL
+            """.strip()  # noqa: S608
+        existing = set(s.execute(sqlalchemy.text(stmt)).scalars())
+        wanted = {index.name for index in table.indexes}
+        for name in sorted(existing - wanted):
+            s.execute(sqlalchemy.text(f'DROP INDEX "{name}"'))
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(s.connection())
+
     @staticmethod
     def drop_table(table_name: str) -> None:
         """Drop a table.
@@ -227,4 +260,12 @@ class SchemaMigrator(Migrator):
                 table: sqlalchemy.Table = model.sql_table()
                 create_stmt = CreateTable(table).compile(s.get_bind()).string.strip()
                 self.recreate_table(model, create_stmt=create_stmt)
+                # Dropping the old table dropped its indexes
+                self.update_indexes(model)
+        if self.pending_schema_updates:
+            # Dropping a table drops its triggers too
+            with p.begin_session() as s:
+                snapshot.create_triggers(s)
+                rollup.create_triggers(s)
+                search.create_triggers(s)
         return []
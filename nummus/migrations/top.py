@@ -10,6 +10,7 @@ from nummus.migrations.v0_11 import MigratorV0_11
 from nummus.migrations.v0_13 import MigratorV0_13
 from nummus.migrations.v0_15 import MigratorV0_15
 from nummus.migrations.v0_16 import MigratorV0_16
+from nummus.migrations.v0_17 import MigratorV0_17
 
 if TYPE_CHECKING:
     from nummus.migrations.base import Migrator
@@ -21,4 +22,5 @@ MIGRATORS: list[type[Migrator]] = [
     MigratorV0_13,
     MigratorV0_15,
     MigratorV0_16,
+    MigratorV0_17,
 ]
@@ -0,0 +1,57 @@
+"""Migrator to v0.17.0."""
+
+from __future__ import annotations
+
+from typing import override, TYPE_CHECKING
+
+import sqlalchemy
+
+from nummus.migrations.base import Migrator
+from nummus.models import rollup, search, snapshot
+from nummus.models.asset import AssetFetch, AssetValuation
+from nummus.models.base import Base
+from nummus.models.data_version import DataVersion
+from nummus.models.rollup import MonthlyRollup
+from nummus.models.snapshot import AssetQtySnapshot, CashSnapshot
+from nummus.models.transaction import TransactionSplit
+
+if TYPE_CHECKING:
+    from nummus import portfolio
+
+
+class MigratorV0_17(Migrator):
+    """Migrator to v0.17.0."""
+
+    _VERSION = "0.17.0"
+
+    @override
+    def migrate(self, p: portfolio.Portfolio) -> list[str]:
+        comments: list[str] = []
+
+        with p.begin_session() as s:
+            # Creating the tables creates the triggers that maintain them
+            Base.metadata.create_all(
+                s.get_bind(),
+                [
+                    CashSnapshot.sql_table(),
+                    AssetQtySnapshot.sql_table(),
+                    AssetFetch.sql_table(),
+                    DataVersion.sql_table(),
+                    MonthlyRollup.sql_table(),
+                ],
+            )
+            # AssetFetch starts empty so the next update downloads full
+            # histories, replacing the dividend adjusted valuations
+            snapshot.rebuild(s)
+            rollup.rebuild(s)
+            DataVersion.add_default()
+
+            search.create(s)
+            search.rebuild(s)
+
+            # Composite indexes for the hot queries
+            self.update_indexes(TransactionSplit)
+            self.update_indexes(AssetValuation)
+            s.execute(sqlalchemy.text("ANALYZE"))
+
+        return comments
@@ -6,9 +6,10 @@ from collections import defaultdict
 from decimal import Decimal
 from typing import NamedTuple, TYPE_CHECKING
 
+import numpy as np
 from sqlalchemy import func, orm, UniqueConstraint
 
-from nummus import sql, utils
+from nummus import sql, utils, vectorized
 from nummus.models.asset import Asset
 from nummus.models.base import (
     Base,
@@ -19,13 +20,17 @@ from nummus.models.base import (
     SQLEnum,
     string_column_args,
 )
+from nummus.models.cache import cached
 from nummus.models.currency import Currency
+from nummus.models.snapshot import AssetQtySnapshot, CashSnapshot
 from nummus.models.transaction import Transaction, TransactionSplit
 from nummus.models.transaction_category import TransactionCategory
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
+    from nummus.vectorized import IntArray
+
 
 class ValueResult(NamedTuple):
     """Type returned by get_value."""
@@ -43,6 +48,23 @@ class ValueResultAll(NamedTuple):
     values_by_asset: dict[int, list[Decimal]]
 
 
+class ValueArraysAll(NamedTuple):
+    """Type returned by get_value_arrays_all."""
+
+    values_by_account: dict[int, IntArray]
+    profits: dict[int, IntArray]
+    values_by_asset: dict[int, IntArray]
+
+
+class _ValueData(NamedTuple):
+    """Daily data of Accounts to merge into values."""
+
+    cash_flow_accounts: dict[int, list[Decimal | None]]
+    cost_basis_accounts: dict[int, list[Decimal | None]]
+    assets_day_zero: dict[int, dict[int, Decimal]]
+    forex: dict[int, list[Decimal]] | None
+
+
 class AccountCategory(BaseEnum):
     """Categories of Accounts."""
 
@@ -123,6 +145,7 @@ class Account(Base):
         return sql.scalar(query)
 
     @classmethod
+    @cached
     def get_value_all(
         cls,
         start_ord: int,
@@ -153,6 +176,101 @@ class Account(Base):
                 defaultdict(lambda: [Decimal()] * n),
             )
 
+        data = cls._get_value_data(start_ord, end_ord, ids, forex)
+
+        # Get assets for all Accounts
+        assets_accounts = cls.get_asset_qty_all(
+            start_ord,
+            end_ord,
+            list(data.cash_flow_accounts.keys()),
+        )
+
+        # Remove zeros
+        assets_accounts = {
+            acct_id: {
+                a_id: quantities
+                for a_id, quantities in assets.items()
+                if any(quantities)
+            }
+            for acct_id, assets in assets_accounts.items()
+        }
+
+        # Skip assets with zero quantity
+        a_ids: set[int] = utils.set_sub_keys(assets_accounts)
+        a_ids.update(utils.set_sub_keys(data.assets_day_zero))
+
+        asset_prices = Asset.get_value_all(start_ord, end_ord, a_ids)
+
+        return cls._merge_value_data(
+            n,
+            data.cash_flow_accounts,
+            data.cost_basis_accounts,
+            assets_accounts,
+            data.assets_day_zero,
+            asset_prices,
+            data.forex,
+        )
+
+    @classmethod
+    def get_value_arrays_all(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        ids: Iterable[int] | None = None,
+        forex: dict[Currency, list[Decimal]] | None = None,
+    ) -> ValueArraysAll:
+        """Get the value of all Accounts from start to end date as arrays.
+
+        Much faster than get_value_all for long periods, use vectorized.to_decimals
+        only once the results are reduced.
+
+        Args:
+            start_ord: First date ordinal to evaluate
+            end_ord: Last date ordinal to evaluate (inclusive)
+            ids: Limit results to specific Accounts by ID
+            forex: Currency exchange rates, None will not normalize
+
+        Returns:
+            ValueArraysAll of Decimal6 fixed point arrays
+            Accounts and assets with zero values omitted
+
+        """
+        if not ids and ids is not None:
+            return ValueArraysAll({}, {}, {})
+
+        data = cls._get_value_data(start_ord, end_ord, ids, forex)
+
+        # Get assets for all Accounts, already without zeros
+        assets_accounts = cls._get_asset_qty_arrays_all(
+            start_ord,
+            end_ord,
+            list(data.cash_flow_accounts.keys()),
+        )
+
+        a_ids: set[int] = utils.set_sub_keys(assets_accounts)
+        a_ids.update(utils.set_sub_keys(data.assets_day_zero))
+
+        asset_prices = Asset.get_value_arrays_all(start_ord, end_ord, a_ids)
+
+        return cls._merge_value_arrays(
+            data.cash_flow_accounts,
+            data.cost_basis_accounts,
+            assets_accounts,
+            data.assets_day_zero,
+            asset_prices,
+            data.forex,
+        )
+
+    @classmethod
+    def _get_value_data(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        ids: Iterable[int] | None,
+        forex: dict[Currency, list[Decimal]] | None,
+    ) -> _ValueData:
+        n = end_ord - start_ord + 1
+
         cash_flow_accounts: dict[int, list[Decimal | None]] = defaultdict(
             lambda: [None] * n,
         )
@@ -171,32 +289,33 @@ class Account(Base):
         cost_basis_skip_ids = set(sql.col0(query))
 
         # Get Account cash value on start date
+        # Sum of daily flows on or before start_ord is the balance
         query = (
-            TransactionSplit.query(
-                TransactionSplit.account_id,
-                func.sum(TransactionSplit.amount),
+            CashSnapshot.query(
+                CashSnapshot.account_id,
+                func.sum(CashSnapshot.flow),
             )
             .where(
-                TransactionSplit.date_ord <= start_ord,
-                TransactionSplit.account_id.in_(ids),
+                CashSnapshot.date_ord <= start_ord,
+                CashSnapshot.account_id.in_(ids),
             )
-            .group_by(TransactionSplit.account_id)
+            .group_by(CashSnapshot.account_id)
         )
-        for acct_id, iv in sql.yield_(query):
-            cash_flow_accounts[acct_id][0] = iv
+        for acct_id, balance in sql.yield_(query):
+            cash_flow_accounts[acct_id][0] = balance
 
         # Calculate cost basis on first day
         query = (
-            TransactionSplit.query(
-                TransactionSplit.account_id,
-                func.sum(TransactionSplit.amount),
+            CashSnapshot.query(
+                CashSnapshot.account_id,
+                func.sum(CashSnapshot.flow),
             )
             .where(
-                TransactionSplit.date_ord == start_ord,
-                TransactionSplit.category_id.in_(cost_basis_skip_ids),
-                TransactionSplit.account_id.in_(ids),
+                CashSnapshot.date_ord == start_ord,
+                CashSnapshot.category_id.in_(cost_basis_skip_ids),
+                CashSnapshot.account_id.in_(ids),
             )
-            .group_by(TransactionSplit.account_id)
+            .group_by(CashSnapshot.account_id)
         )
         for acct_id, iv in sql.yield_(query):
             cost_basis_accounts[acct_id][0] = -iv
@@ -205,15 +324,15 @@ class Account(Base):
             # Get cash_flow on each day between start and end
             # Not Account.get_cash_flow because being categorized doesn't matter and
             # slows it down
-            query = TransactionSplit.query(
-                TransactionSplit.account_id,
-                TransactionSplit.date_ord,
-                TransactionSplit.amount,
-                TransactionSplit.category_id,
+            query = CashSnapshot.query(
+                CashSnapshot.account_id,
+                CashSnapshot.date_ord,
+                CashSnapshot.flow,
+                CashSnapshot.category_id,
             ).where(
-                TransactionSplit.date_ord <= end_ord,
-                TransactionSplit.date_ord > start_ord,
-                TransactionSplit.account_id.in_(ids),
+                CashSnapshot.date_ord <= end_ord,
+                CashSnapshot.date_ord > start_ord,
+                CashSnapshot.account_id.in_(ids),
             )
             for acct_id, date_ord, amount, t_cat_id in sql.yield_(query):
                 i = date_ord - start_ord
@@ -227,53 +346,27 @@ class Account(Base):
                         amount if v is None else v + amount
                     )
 
-        # Get assets for all Accounts
-        assets_accounts = cls.get_asset_qty_all(
-            start_ord,
-            end_ord,
-            list(cash_flow_accounts.keys()),
-        )
-
         # Get day one asset transactions to add to profit & loss
-        query = TransactionSplit.query(
-            TransactionSplit.account_id,
-            TransactionSplit.asset_id,
-            TransactionSplit.asset_quantity,
+        query = AssetQtySnapshot.query(
+            AssetQtySnapshot.account_id,
+            AssetQtySnapshot.asset_id,
+            AssetQtySnapshot.flow,
         ).where(
-            TransactionSplit.asset_id.isnot(None),
-            TransactionSplit.date_ord == start_ord,
-            TransactionSplit.account_id.in_(ids),
+            AssetQtySnapshot.date_ord == start_ord,
+            AssetQtySnapshot.account_id.in_(ids),
         )
         assets_day_zero: dict[int, dict[int, Decimal]] = defaultdict(
             lambda: defaultdict(Decimal),
         )
         for acct_id, a_id, qty in sql.yield_(query):
-            if TYPE_CHECKING:
-                # Enforced by query and SQL constraints
-                assert a_id is not None
-                assert qty is not None
             assets_day_zero[acct_id][a_id] += qty
 
         # Remove zeros
-        assets_accounts = {
-            acct_id: {
-                a_id: quantities
-                for a_id, quantities in assets.items()
-                if any(quantities)
-            }
-            for acct_id, assets in assets_accounts.items()
-        }
         assets_day_zero = {
             acct_id: {a_id: qty for a_id, qty in assets.items() if qty != 0}
             for acct_id, assets in assets_day_zero.items()
         }
 
-        # Skip assets with zero quantity
-        a_ids: set[int] = utils.set_sub_keys(assets_accounts)
-        a_ids.update(utils.set_sub_keys(assets_day_zero))
-
-        asset_prices = Asset.get_value_all(start_ord, end_ord, a_ids)
-
         forex_by_account: dict[int, list[Decimal]] | None = None
         if forex is not None:
             query = Account.query(Account.id_, Account.currency).where(
@@ -283,13 +376,10 @@ class Account(Base):
                 acct_id: forex[currency] for acct_id, currency in sql.yield_(query)
             }
 
-        return cls._merge_value_data(
-            n,
+        return _ValueData(
             cash_flow_accounts,
             cost_basis_accounts,
-            assets_accounts,
             assets_day_zero,
-            asset_prices,
             forex_by_account,
         )
 
@@ -355,6 +445,67 @@ class Account(Base):
 
         return ValueResultAll(acct_values, acct_profit, asset_values)
 
+    @classmethod
+    def _merge_value_arrays(
+        cls,
+        cash_flow_accounts: dict[int, list[Decimal | None]],
+        cost_basis_accounts: dict[int, list[Decimal | None]],
+        assets_accounts: dict[int, dict[int, IntArray]],
+        assets_day_zero: dict[int, dict[int, Decimal]],
+        asset_prices: dict[int, IntArray],
+        forex: dict[int, list[Decimal]] | None,
+    ) -> ValueArraysAll:
+        forex_arrays = (
+            None
+            if forex is None
+            else {acct_id: vectorized.to_array(v) for acct_id, v in forex.items()}
+        )
+
+        def apply_forex(acct_id: int, values: IntArray) -> IntArray:
+            if forex_arrays is None:
+                return values
+            return vectorized.multiply(values, forex_arrays[acct_id])
+
+        acct_values: dict[int, IntArray] = {}
+        asset_values: dict[int, IntArray] = {}
+        for acct_id, cash_flow in cash_flow_accounts.items():
+            summed = apply_forex(
+                acct_id,
+                vectorized.integrate(vectorized.to_array(cash_flow)),
+            )
+            for a_id, quantities in assets_accounts.get(acct_id, {}).items():
+                price = apply_forex(acct_id, asset_prices[a_id])
+                v = vectorized.multiply(price, quantities, 9)
+                summed += v
+                if a_id in asset_values:
+                    v = asset_values[a_id] + v
+                asset_values[a_id] = v
+            acct_values[acct_id] = summed
+
+        acct_profit: dict[int, IntArray] = {}
+        for acct_id, values in acct_values.items():
+            cost_basis_flow = apply_forex(
+                acct_id,
+                vectorized.to_array(cost_basis_accounts[acct_id]),
+            )
+
+            cost_basis_flow[0] += values[0]
+
+            # Reduce the cost basis on day one to add the asset value to profit
+            if day_zero := assets_day_zero.get(acct_id):
+                price = np.array(
+                    [asset_prices[a_id][0] for a_id in day_zero],
+                    dtype=np.int64,
+                )
+                if forex_arrays is not None:
+                    price = vectorized.multiply(price, forex_arrays[acct_id][:1])
+                qty = vectorized.to_array(day_zero.values(), 9)
+                cost_basis_flow[0] -= vectorized.multiply(price, qty, 9).sum()
+
+            acct_profit[acct_id] = values - vectorized.integrate(cost_basis_flow)
+
+        return ValueArraysAll(acct_values, acct_profit, asset_values)
+
     def get_value(
         self,
         start_ord: int,
@@ -408,16 +559,16 @@ class Account(Base):
         categories: dict[int, list[Decimal]] = defaultdict(lambda: [Decimal()] * n)
 
         # Transactions between start and end
-        query = TransactionSplit.query(
-            TransactionSplit.date_ord,
-            TransactionSplit.amount,
-            TransactionSplit.category_id,
+        query = CashSnapshot.query(
+            CashSnapshot.date_ord,
+            CashSnapshot.flow,
+            CashSnapshot.category_id,
         ).where(
-            TransactionSplit.date_ord <= end_ord,
-            TransactionSplit.date_ord >= start_ord,
+            CashSnapshot.date_ord <= end_ord,
+            CashSnapshot.date_ord >= start_ord,
         )
         if ids is not None:
-            query = query.where(TransactionSplit.account_id.in_(ids))
+            query = query.where(CashSnapshot.account_id.in_(ids))
 
         for t_date_ord, amount, category_id in sql.yield_(query):
             categories[category_id][t_date_ord - start_ord] += amount
@@ -471,6 +622,40 @@ class Account(Base):
                 lambda: defaultdict(lambda: [Decimal()] * n),
             )
 
+        deltas_accounts = cls._get_asset_qty_deltas_all(start_ord, end_ord, ids)
+
+        # Integrate deltas
+        qty_accounts: dict[int, dict[int, list[Decimal]]] = defaultdict(
+            lambda: defaultdict(lambda: [Decimal()] * n),
+        )
+        for acct_id, deltas in deltas_accounts.items():
+            qty_assets = qty_accounts[acct_id]
+            for a_id, delta in deltas.items():
+                qty_assets[a_id] = utils.integrate(delta)
+
+        return qty_accounts
+
+    @classmethod
+    def _get_asset_qty_deltas_all(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        ids: Iterable[int] | None,
+    ) -> dict[int, dict[int, list[Decimal | None]]]:
+        """Get the daily change in quantity of Assets held from start to end date.
+
+        Args:
+            start_ord: First date ordinal to evaluate
+            end_ord: Last date ordinal to evaluate (inclusive)
+            ids: Limit results to specific Accounts by ID
+
+        Returns:
+            dict{Account.id_: dict{Asset.id_: list[deltas]}} with defaultdict
+            First delta includes the quantity held before start
+
+        """
+        n = end_ord - start_ord + 1
+
         # Daily delta in qty
         deltas_accounts: dict[int, dict[int, list[Decimal | None]]] = defaultdict(
             lambda: defaultdict(lambda: [None] * n),
@@ -478,55 +663,46 @@ class Account(Base):
         ids = ids or set(sql.col0(Account.query(Account.id_)))
 
         # Get Asset quantities on start date
+        # Sum of daily flows on or before start_ord is the quantity
         query = (
-            TransactionSplit.query(
-                TransactionSplit.account_id,
-                TransactionSplit.asset_id,
-                func.sum(TransactionSplit.asset_quantity),
+            AssetQtySnapshot.query(
+                AssetQtySnapshot.account_id,
+                AssetQtySnapshot.asset_id,
+                func.sum(AssetQtySnapshot.flow),
             )
             .where(
-                TransactionSplit.asset_id.is_not(None),
-                TransactionSplit.date_ord <= start_ord,
-                TransactionSplit.account_id.in_(ids),
+                AssetQtySnapshot.date_ord <= start_ord,
+                AssetQtySnapshot.account_id.in_(ids),
             )
             .group_by(
-                TransactionSplit.account_id,
-                TransactionSplit.asset_id,
+                AssetQtySnapshot.account_id,
+                AssetQtySnapshot.asset_id,
             )
         )
         for acct_id, a_id, qty in sql.yield_(query):
-            if TYPE_CHECKING:
-                # Enforced by query and SQL constraints
-                assert a_id is not None
-                assert qty is not None
             deltas_accounts[acct_id][a_id][0] = qty
 
         if start_ord != end_ord:
             # Transactions between start and end
             query = (
-                TransactionSplit.query(
-                    TransactionSplit.date_ord,
-                    TransactionSplit.account_id,
-                    TransactionSplit.asset_id,
-                    TransactionSplit.asset_quantity,
+                AssetQtySnapshot.query(
+                    AssetQtySnapshot.date_ord,
+                    AssetQtySnapshot.account_id,
+                    AssetQtySnapshot.asset_id,
+                    AssetQtySnapshot.flow,
                 )
                 .where(
-                    TransactionSplit.date_ord <= end_ord,
-                    TransactionSplit.date_ord > start_ord,
-                    TransactionSplit.asset_id.is_not(None),
-                    TransactionSplit.account_id.in_(ids),
+                    AssetQtySnapshot.date_ord <= end_ord,
+                    AssetQtySnapshot.date_ord > start_ord,
+                    AssetQtySnapshot.account_id.in_(ids),
                 )
-                .order_by(TransactionSplit.account_id)
+                .order_by(AssetQtySnapshot.account_id)
             )
 
             current_acct_id: int | None = None
             deltas = {}
 
             for date_ord, acct_id, a_id, qty in sql.yield_(query):
-                if TYPE_CHECKING:
-                    # Enforced by query and SQL constraints
-                    assert a_id is not None
-                    assert qty is not None
                 i = date_ord - start_ord
 
                 if acct_id != current_acct_id:
@@ -535,14 +711,40 @@ class Account(Base):
                 v = deltas[a_id][i]
                 deltas[a_id][i] = qty if v is None else v + qty
 
-        # Integrate deltas
-        qty_accounts: dict[int, dict[int, list[Decimal]]] = defaultdict(
-            lambda: defaultdict(lambda: [Decimal()] * n),
-        )
+        return deltas_accounts
+
+    @classmethod
+    def _get_asset_qty_arrays_all(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        ids: Iterable[int],
+    ) -> dict[int, dict[int, IntArray]]:
+        """Get the quantity of Assets held from start to end date as arrays.
+
+        Args:
+            start_ord: First date ordinal to evaluate
+            end_ord: Last date ordinal to evaluate (inclusive)
+            ids: Limit results to specific Accounts by ID
+
+        Returns:
+            dict{Account.id_: dict{Asset.id_: Decimal9 fixed point array}}
+            Assets with zero values omitted
+
+        """
+        if not ids:
+            return {}
+
+        deltas_accounts = cls._get_asset_qty_deltas_all(start_ord, end_ord, ids)
+
+        qty_accounts: dict[int, dict[int, IntArray]] = {}
         for acct_id, deltas in deltas_accounts.items():
-            qty_assets = qty_accounts[acct_id]
+            qty_assets: dict[int, IntArray] = {}
             for a_id, delta in deltas.items():
-                qty_assets[a_id] = utils.integrate(delta)
+                qty = vectorized.integrate(vectorized.to_array(delta, 9))
+                if qty.any():
+                    qty_assets[a_id] = qty
+            qty_accounts[acct_id] = qty_assets
 
         return qty_accounts
 
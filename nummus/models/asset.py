@@ -2,18 +2,29 @@
 
 from __future__ import annotations
 
+import bisect
 import datetime
+import itertools
 import operator
 from collections import defaultdict
 from decimal import Decimal
-from typing import override, TYPE_CHECKING
+from typing import NamedTuple, override, TYPE_CHECKING
 
+import numpy as np
 import yfinance
 import yfinance.exceptions
-from sqlalchemy import CheckConstraint, ForeignKey, func, Index, orm, UniqueConstraint
+from sqlalchemy import (
+    CheckConstraint,
+    ForeignKey,
+    func,
+    Index,
+    orm,
+    UniqueConstraint,
+    update,
+)
 
 from nummus import exceptions as exc
-from nummus import sql, utils
+from nummus import sql, utils, vectorized
 from nummus.models.base import (
     Base,
     BaseEnum,
@@ -26,6 +37,7 @@ from nummus.models.base import (
     SQLEnum,
     string_column_args,
 )
+from nummus.models.cache import cached, session_cache
 from nummus.models.currency import Currency, DEFAULT_CURRENCY
 from nummus.models.transaction import TransactionSplit
 from nummus.models.utils import update_rows
@@ -33,6 +45,12 @@ from nummus.models.utils import update_rows
 if TYPE_CHECKING:
     from collections.abc import Iterable, Mapping
 
+    from nummus.vectorized import IntArray
+
+
+# Bound parameters per DELETE, below SQLite's variable limit
+_DELETE_BATCH = 10000
+
 
 class USSector(BaseEnum):
     """US Sector enumeration."""
@@ -153,7 +171,8 @@ class AssetValuation(Base):
             "value >= 0",
             "asset_valuation.value must be zero or positive",
         ),
-        Index("asset_valuation_asset_id", "asset_id"),
+        # Covers value lookups, UNIQUE already indexes (asset_id, date_ord)
+        Index("asset_valuation_asset_id_date_ord", "asset_id", "date_ord", "value"),
         Index("asset_valuation_date_ord", "date_ord"),
     )
 
@@ -195,6 +214,81 @@ class AssetCategory(BaseEnum):
     ITEM = 10
 
 
+class AssetFetch(Base):
+    """Asset Fetch model for storing what was downloaded from web sources.
+
+    Attributes:
+        asset_id: Asset unique identifier
+        ticker: Ticker symbol downloaded
+        start_ord: Date ordinal of first downloaded date
+        end_ord: Date ordinal history was downloaded until (exclusive)
+
+    """
+
+    __tablename__ = "asset_fetch"
+    __table_id__ = None
+
+    asset_id: ORMInt = orm.mapped_column(ForeignKey("asset.id_"), unique=True)
+    ticker: ORMStr
+    start_ord: ORMInt
+    end_ord: ORMInt
+
+    __table_args__ = (*string_column_args("ticker", short_check=False),)
+
+    @orm.validates("ticker")
+    def validate_strings(self, key: str, field: str | None) -> str | None:
+        """Validate string fields satisfy constraints.
+
+        Args:
+            key: Field being updated
+            field: Updated value
+
+        Returns:
+            field
+
+        """
+        return self.clean_strings(key, field, short_check=False)
+
+
+class ValuationPoints(NamedTuple):
+    """All valuations of an Asset, sorted by date."""
+
+    date_ords: list[int]
+    values: list[Decimal]
+    interpolate: bool
+
+    def window(self, start_ord: int, end_ord: int) -> list[tuple[int, Decimal]]:
+        """Get the valuations needed to interpolate start to end date.
+
+        Same valuations as Asset._get_valuations_all would query.
+
+        Args:
+            start_ord: First date ordinal to evaluate
+            end_ord: Last date ordinal to evaluate (inclusive)
+
+        Returns:
+            list[(date offset, value)] sorted by date
+
+        """
+        # Latest valuation before or including start date
+        lo = max(bisect.bisect_right(self.date_ords, start_ord) - 1, 0)
+        hi = bisect.bisect_right(self.date_ords, end_ord)
+        if self.interpolate:
+            # Interpolation point after end date
+            hi = min(hi + 1, len(self.date_ords))
+        return [(self.date_ords[i] - start_ord, self.values[i]) for i in range(lo, hi)]
+
+
+class AssetHistory(NamedTuple):
+    """Price history downloaded from web sources."""
+
+    start_ord: int
+    end_ord: int
+    valuations: dict[int, float]
+    splits: dict[int, float]
+    currency: Currency
+
+
 class Asset(Base):
     """Asset model for storing an individual item with dynamic worth.
 
@@ -245,6 +339,7 @@ class Asset(Base):
         return self.clean_strings(key, field, short_check=key != "ticker")
 
     @classmethod
+    @cached
     def get_value_all(
         cls,
         start_ord: int,
@@ -264,7 +359,175 @@ class Asset(Base):
 
         """
         n = end_ord - start_ord + 1
+        assets_values: dict[int, list[Decimal]] = defaultdict(lambda: [Decimal()] * n)
+        valuations_assets, interpolated_assets = cls._get_windows_all(
+            start_ord,
+            end_ord,
+            ids,
+        )
+        for a_id, valuations in valuations_assets.items():
+            if a_id in interpolated_assets:
+                assets_values[a_id] = utils.interpolate_linear(valuations, n)
+            else:
+                assets_values[a_id] = utils.interpolate_step(valuations, n)
+
+        return assets_values
+
+    @classmethod
+    def get_value_arrays_all(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        ids: Iterable[int] | None = None,
+    ) -> dict[int, IntArray]:
+        """Get the value of all Assets from start to end date as arrays.
+
+        Args:
+            start_ord: First date ordinal to evaluate
+            end_ord: Last date ordinal to evaluate (inclusive)
+            ids: Limit results to specific Assets by ID
+
+        Returns:
+            dict{Asset.id_: Decimal6 fixed point array} with defaultdict
+            Assets with zero values omitted
+
+        """
+        n = end_ord - start_ord + 1
+        assets_values: dict[int, IntArray] = defaultdict(
+            lambda: np.zeros(n, dtype=np.int64),
+        )
+        valuations_assets, interpolated_assets = cls._get_windows_all(
+            start_ord,
+            end_ord,
+            ids,
+        )
+        for a_id, valuations in valuations_assets.items():
+            if a_id in interpolated_assets:
+                assets_values[a_id] = vectorized.interpolate_linear(valuations, n)
+            else:
+                assets_values[a_id] = vectorized.interpolate_step(valuations, n)
+
+        return assets_values
+
+    @classmethod
+    def _get_windows_all(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        ids: Iterable[int] | None,
+    ) -> tuple[dict[int, list[tuple[int, Decimal]]], set[int]]:
+        """Get the valuations of all Assets needed to interpolate start to end date.
 
+        Windows are cut from the session's ResultCache when usable.
+
+        Args:
+            start_ord: First date ordinal to evaluate
+            end_ord: Last date ordinal to evaluate (inclusive)
+            ids: Limit results to specific Assets by ID
+
+        Returns:
+            (
+                dict{Asset.id_: list[(date offset, value)] sorted by date},
+                set{Asset.id_ with interpolation},
+            )
+
+        """
+        points_all = cls._get_points_all(ids)
+        if points_all is None:
+            return cls._get_valuations_all(start_ord, end_ord, ids)
+
+        valuations_assets: dict[int, list[tuple[int, Decimal]]] = {}
+        interpolated_assets: set[int] = set()
+        for a_id, points in points_all.items():
+            if points.interpolate:
+                interpolated_assets.add(a_id)
+            if valuations := points.window(start_ord, end_ord):
+                valuations_assets[a_id] = valuations
+        return valuations_assets, interpolated_assets
+
+    @classmethod
+    def _get_points_all(
+        cls,
+        ids: Iterable[int] | None,
+    ) -> dict[int, ValuationPoints] | None:
+        """Get the valuations of all Assets from the session's ResultCache.
+
+        Valuations are kept exact, interpolation happens per request. Any not
+        in the cache are queried and added to it.
+
+        Args:
+            ids: Limit results to specific Assets by ID
+
+        Returns:
+            dict{Asset.id_: ValuationPoints}
+            None if the session has no usable ResultCache
+
+        """
+        usable = session_cache()
+        if usable is None:
+            return None
+        cache, versions = usable
+        generation = versions.valuations
+
+        points_all: dict[int, ValuationPoints] = {}
+        missing: dict[int, bool] = {}
+        query = Asset.query(Asset.id_, Asset.interpolate)
+        if ids is not None:
+            query = query.where(Asset.id_.in_(ids))
+        for a_id, interpolate in sql.yield_(query):
+            points = cache.get_series(generation, a_id)
+            if points is None:
+                missing[a_id] = interpolate
+            else:
+                points_all[a_id] = points
+
+        if missing:
+            points_all.update(
+                {
+                    a_id: ValuationPoints([], [], interpolate)
+                    for a_id, interpolate in missing.items()
+                },
+            )
+            query = (
+                AssetValuation.query(
+                    AssetValuation.asset_id,
+                    AssetValuation.date_ord,
+                    AssetValuation.value,
+                )
+                .where(AssetValuation.asset_id.in_(missing))
+                .order_by(AssetValuation.asset_id, AssetValuation.date_ord)
+            )
+            for a_id, date_ord, v in sql.yield_(query):
+                points = points_all[a_id]
+                points.date_ords.append(date_ord)
+                points.values.append(v)
+
+            for a_id in missing:
+                cache.set_series(generation, a_id, points_all[a_id])
+
+        return points_all
+
+    @classmethod
+    def _get_valuations_all(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        ids: Iterable[int] | None,
+    ) -> tuple[dict[int, list[tuple[int, Decimal]]], set[int]]:
+        """Get the valuations of all Assets needed to interpolate start to end date.
+
+        Args:
+            start_ord: First date ordinal to evaluate
+            end_ord: Last date ordinal to evaluate (inclusive)
+            ids: Limit results to specific Assets by ID
+
+        Returns:
+            (
+                dict{Asset.id_: list[(date offset, value)] sorted by date},
+                set{Asset.id_ with interpolation},
+            )
+
+        """
         # Get a list of valuations (date offset, value) for each Asset
         valuations_assets: dict[int, list[tuple[int, Decimal]]] = defaultdict(list)
         query = Asset.query(Asset.id_).where(Asset.interpolate)
@@ -322,15 +585,11 @@ class Asset(Base):
             i = date_ord - start_ord
             valuations_assets[a_id].append((i, v))
 
-        assets_values: dict[int, list[Decimal]] = defaultdict(lambda: [Decimal()] * n)
-        for a_id, valuations in valuations_assets.items():
-            valuations_sorted = sorted(valuations, key=operator.itemgetter(0))
-            if a_id in interpolated_assets:
-                assets_values[a_id] = utils.interpolate_linear(valuations_sorted, n)
-            else:
-                assets_values[a_id] = utils.interpolate_step(valuations_sorted, n)
-
-        return assets_values
+        valuations_sorted = {
+            a_id: sorted(valuations, key=operator.itemgetter(0))
+            for a_id, valuations in valuations_assets.items()
+        }
+        return valuations_sorted, interpolated_assets
 
     def get_value(self, start_ord: int, end_ord: int) -> list[Decimal]:
         """Get the value of Asset from start to end date.
@@ -375,32 +634,65 @@ class Asset(Base):
             multiplier = Decimal(1)
 
         query = (
-            TransactionSplit.query()
+            TransactionSplit.query(
+                TransactionSplit.id_,
+                TransactionSplit.date_ord,
+                TransactionSplit._asset_qty_unadjusted,  # noqa: SLF001
+                TransactionSplit.asset_quantity,
+            )
             .where(
                 TransactionSplit.asset_id == self.id_,
                 TransactionSplit._asset_qty_unadjusted.isnot(None),  # noqa: SLF001
             )
-            .order_by(TransactionSplit.date_ord)
+            .order_by(TransactionSplit.date_ord, TransactionSplit.id_)
         )
 
+        # Compute in python with the same Decimal math as adjust_asset_quantity
+        # Only write the rows that changed
+        adjusted: dict[int, Decimal] = {}
+        current: dict[int, Decimal | None] = {}
         sum_unadjusted = Decimal()
         sum_adjusted = Decimal()
-        for t_split in sql.yield_(query):
+        for t_split_id, date_ord, qty_raw, qty in sql.yield_(query):
             # If txn is on/after the split, update the multiplier
-            while len(splits) >= 1 and t_split.date_ord >= splits[0][0]:
+            while len(splits) >= 1 and date_ord >= splits[0][0]:
                 splits.pop(0)
                 try:
                     multiplier = splits[0][1]
                 except IndexError:
                     multiplier = Decimal(1)
-            t_split.adjust_asset_quantity(multiplier)
-            sum_unadjusted += t_split.asset_quantity_unadjusted or Decimal()
-            sum_adjusted += t_split.asset_quantity or Decimal()
+            qty_unadjusted = qty_raw or Decimal()
+            # Truncate like the validator does when setting asset_quantity
+            adjusted[t_split_id] = TransactionSplit.clean_decimals(
+                "asset_quantity",
+                qty_unadjusted * multiplier,
+            )
+            current[t_split_id] = qty
+            sum_unadjusted += qty_unadjusted
+            sum_adjusted += adjusted[t_split_id]
             if sum_unadjusted == 0:
                 # sum_adjusted is an error term, use to make sum of adjusted zero out
-                t_split.adjust_asset_quantity_residual(sum_adjusted)
+                adjusted[t_split_id] = TransactionSplit.clean_decimals(
+                    "asset_quantity",
+                    adjusted[t_split_id] - sum_adjusted,
+                )
                 # Zero out error term since it has been dealt with
-                sum_adjusted = 0
+                sum_adjusted = Decimal()
+
+        updates = [
+            {"id_": t_split_id, "asset_quantity": qty}
+            for t_split_id, qty in adjusted.items()
+            if qty != current[t_split_id]
+        ]
+        if not updates:
+            return
+        s = self.session()
+        s.execute(update(TransactionSplit), updates)
+
+        # Loaded instances don't see the bulk UPDATE
+        for key in list(s.identity_map.keys()):
+            if key[0] is TransactionSplit and key[1][0] in adjusted:
+                s.expire(s.identity_map[key])
 
     def prune_valuations(self) -> int:
         """Remove valuations that are not needed due to zero quantity being held.
@@ -414,31 +706,86 @@ class Asset(Base):
         if self.category == AssetCategory.INDEX:
             # If asset is an INDEX, do not prune
             return 0
+        return self.prune_valuations_all(ids=[self.id_])
 
-        # Date when quantity is zero
-        date_ord_zero: int | None = None
-        date_ord_non_zero: int | None = None
-        current_qty = Decimal()
+    @classmethod
+    def prune_valuations_all(cls, ids: Iterable[int] | None = None) -> int:
+        """Remove valuations of all Assets while zero quantity is held.
 
-        periods_zero: list[tuple[int | None, int | None]] = []
+        Periods of zero quantity come from a single ordered scan of
+        TransactionSplits. INDEX Assets are not pruned.
+
+        Does not commit changes, call s.commit() afterwards.
+
+        Args:
+            ids: Limit to specific Assets by ID
+
+        Returns:
+            Number of AssetValuations pruned
+
+        """
+        query = Asset.query(Asset.id_).where(Asset.category != AssetCategory.INDEX)
+        if ids is not None:
+            query = query.where(Asset.id_.in_(ids))
+        a_ids = set(sql.col0(query))
+        if not a_ids:
+            return 0
 
         query = (
             TransactionSplit.query(
+                TransactionSplit.asset_id,
                 TransactionSplit.date_ord,
                 TransactionSplit.asset_quantity,
             )
-            .where(TransactionSplit.asset_id == self.id_)
-            .order_by(TransactionSplit.date_ord)
+            .where(TransactionSplit.asset_id.in_(a_ids))
+            .order_by(
+                TransactionSplit.asset_id,
+                TransactionSplit.date_ord,
+                TransactionSplit.id_,
+            )
         )
-        if not sql.any_(query):
+        periods_zero: dict[int, list[tuple[int | None, int | None]]] = {}
+        for a_id, rows in itertools.groupby(
+            sql.yield_(query),
+            key=operator.itemgetter(0),
+        ):
+            if TYPE_CHECKING:
+                # Ensured by query
+                assert a_id is not None
+            periods_zero[a_id] = cls._periods_zero(
+                (date_ord, qty) for _, date_ord, qty in rows
+            )
+
+        n_deleted = 0
+        if no_txns := a_ids - periods_zero.keys():
             # No transactions, prune all
-            return (
+            n_deleted += (
                 AssetValuation.query()
-                .where(AssetValuation.asset_id == self.id_)
+                .where(AssetValuation.asset_id.in_(no_txns))
                 .delete()
             )
+        return n_deleted + cls._delete_valuations(periods_zero)
+
+    @staticmethod
+    def _periods_zero(
+        txns: Iterable[tuple[int, Decimal | None]],
+    ) -> list[tuple[int | None, int | None]]:
+        """Get the periods where zero quantity is held.
+
+        Args:
+            txns: Ordered (date_ord, asset_quantity) of an Asset's transactions
+
+        Returns:
+            list[(date_ord_sell, date_ord_buy)]
 
-        for date_ord, qty in sql.yield_(query):
+        """
+        # Date when quantity is zero
+        date_ord_zero: int | None = None
+        date_ord_non_zero: int | None = None
+        current_qty = Decimal()
+
+        periods_zero: list[tuple[int | None, int | None]] = []
+        for date_ord, qty in txns:
             if TYPE_CHECKING:
                 # Ensured by query and constraints
                 assert qty is not None
@@ -455,65 +802,93 @@ class Asset(Base):
         # Add last zero period if ended with zero
         if current_qty == 0 and date_ord_zero is not None:
             periods_zero.append((date_ord_zero, date_ord_non_zero))
+        return periods_zero
 
-        return self._delete_valuations(periods_zero)
-
+    @staticmethod
     def _delete_valuations(
-        self,
-        periods_zero: list[tuple[int | None, int | None]],
+        periods_zero: dict[int, list[tuple[int | None, int | None]]],
     ) -> int:
         """Delete valuations during periods where zero assets are held.
 
+        Keeps the valuations bordering each period so values before a sell and
+        after a buy are unchanged.
+
         Args:
-            periods_zero: list[(date_ord_sell, date_ord_buy)]
+            periods_zero: dict{Asset.id_: list[(date_ord_sell, date_ord_buy)]}
 
         Returns:
             Number of valuations deleted
 
         """
-        n_deleted = 0
-        for date_ord_sell, date_ord_buy in periods_zero:
-            trim_start: int | None = None
-            trim_end: int | None = None
-            if date_ord_sell is not None:
-                # Get date of oldest valuation after or on the sell
-                query = AssetValuation.query(func.min(AssetValuation.date_ord)).where(
-                    AssetValuation.asset_id == self.id_,
-                    AssetValuation.date_ord >= date_ord_sell,
+        query = (
+            AssetValuation.query(
+                AssetValuation.asset_id,
+                AssetValuation.id_,
+                AssetValuation.date_ord,
+            )
+            .where(AssetValuation.asset_id.in_(periods_zero))
+            .order_by(AssetValuation.asset_id, AssetValuation.date_ord)
+        )
+        valuations: dict[int, tuple[list[int], list[int]]] = defaultdict(
+            lambda: ([], []),
+        )
+        for a_id, v_id, date_ord in sql.yield_(query):
+            v_ids, date_ords = valuations[a_id]
+            v_ids.append(v_id)
+            date_ords.append(date_ord)
+
+        to_delete: dict[int, int] = {}
+        for a_id, (v_ids, date_ords) in valuations.items():
+            for date_ord_sell, date_ord_buy in periods_zero[a_id]:
+                # Later periods only see what earlier periods kept
+                n = len(date_ords)
+                # Oldest valuation after or on the sell
+                i_start = (
+                    n
+                    if date_ord_sell is None
+                    else bisect.bisect_left(date_ords, date_ord_sell)
                 )
-                trim_start = sql.scalar(query)
-
-            if date_ord_buy is not None:
-                # Get date of most recent valuation or on before the buy
-                query = AssetValuation.query(func.max(AssetValuation.date_ord)).where(
-                    AssetValuation.asset_id == self.id_,
-                    AssetValuation.date_ord <= date_ord_buy,
+                # Most recent valuation before or on the buy
+                i_end = (
+                    -1
+                    if date_ord_buy is None
+                    else bisect.bisect_right(date_ords, date_ord_buy) - 1
                 )
-                trim_end = sql.scalar(query)
-
-            if trim_start is None and trim_end is None:
-                # Can happen if no valuations exist before/after a transaction
-                continue
-
-            query = AssetValuation.query().where(AssetValuation.asset_id == self.id_)
-            if trim_start:
-                query = query.where(AssetValuation.date_ord > trim_start)
-            if trim_end:
-                query = query.where(AssetValuation.date_ord < trim_end)
-            n_deleted += query.delete()
+                if i_start == n and i_end == -1:
+                    # Can happen if no valuations exist before/after a transaction
+                    continue
+                # Exclusive of the trim dates themselves
+                lo = 0 if i_start == n else i_start + 1
+                hi = n if i_end == -1 else i_end
+                to_delete.update(dict.fromkeys(v_ids[lo:hi], a_id))
+                del v_ids[lo:hi]
+                del date_ords[lo:hi]
 
+        n_deleted = 0
+        for batch in itertools.batched(sorted(to_delete), _DELETE_BATCH):
+            n_deleted += (
+                AssetValuation.query()
+                .where(
+                    # Lets the ResultCache drop only these Assets' series
+                    AssetValuation.asset_id.in_({to_delete[v_id] for v_id in batch}),
+                    AssetValuation.id_.in_(batch),
+                )
+                .delete()
+            )
         return n_deleted
 
     def update_valuations(
         self,
         *,
         through_today: bool,
+        full: bool = False,
     ) -> tuple[datetime.date | None, datetime.date | None]:
         """Update valuations from web sources.
 
         Args:
             through_today: True will force end date to today (for when currently
                 holding any quantity)
+            full: True will download the full history instead of the missing tail
 
         Returns:
             Updated range (start date, end date)
@@ -521,12 +896,34 @@ class Asset(Base):
 
         Raises:
             NoAssetWebSourceError: If Asset has no ticker
-            AssetWebError: If failed to download data
 
         """
         if self.ticker is None:
             raise exc.NoAssetWebSourceError
 
+        date_range = self.valuation_range(through_today=through_today)
+        if date_range is None:
+            return None, None
+        start_ord, end_ord = date_range
+
+        history = self.fetch_history(
+            self.ticker,
+            datetime.date.fromordinal(self.history_start(start_ord, full=full)),
+        )
+        return self.apply_history(start_ord, end_ord, history)
+
+    def valuation_range(self, *, through_today: bool) -> tuple[int, int] | None:
+        """Get the range of valuations to update from web sources.
+
+        Args:
+            through_today: True will force end date to today (for when currently
+                holding any quantity)
+
+        Returns:
+            (start date ordinal, end date ordinal)
+            None if there are no Transactions for this Asset
+
+        """
         today = datetime.datetime.now(datetime.UTC).date()
         today_ord = today.toordinal()
 
@@ -544,60 +941,176 @@ class Asset(Base):
             query = query.where(TransactionSplit.asset_id == self.id_)
         start_ord, end_ord = sql.one(query)
         if not start_ord or not end_ord:
-            return None, None
+            return None
 
         start_ord -= utils.DAYS_IN_WEEK
         end_ord = today_ord if through_today else end_ord + utils.DAYS_IN_WEEK
+        return start_ord, end_ord
 
-        start = datetime.date.fromordinal(start_ord)
-        end = datetime.date.fromordinal(end_ord)
+    @staticmethod
+    def fetch_history(ticker: str, start: datetime.date) -> AssetHistory:
+        """Download price history from web sources.
+
+        Does not use the database so can run in any thread.
+
+        Args:
+            ticker: Ticker symbol of Asset
+            start: First date to download
+
+        Valuations are closing prices adjusted for splits but not dividends,
+        dividends are already accounted for by their reinvestment transactions.
+
+        Returns:
+            AssetHistory from start until today
+
+        Raises:
+            AssetWebError: If failed to download data
+
+        """
+        today = datetime.datetime.now(datetime.UTC).date()
 
-        yf_ticker = yfinance.Ticker(self.ticker)
+        yf_ticker = yfinance.Ticker(ticker)
         try:
             # Need to fetch all the way to today to get all splits
+            # Close is only split adjusted without auto_adjust, dividends
+            # would rescale previous bars and invalidate the downloaded history
             raw = yf_ticker.history(
                 start=start,
                 end=today,
                 actions=True,
+                auto_adjust=False,
                 raise_errors=True,
             )
-            self.currency = Currency(yf_ticker.info["currency"])
+            currency = Currency(yf_ticker.info["currency"])
         except Exception as e:
             # yfinance raises Exception if no data found
             raise exc.AssetWebError(e) from e
 
-        valuations: dict[int, float] = utils.pd_series_to_dict(raw["Close"])
+        return AssetHistory(
+            start.toordinal(),
+            today.toordinal(),
+            utils.pd_series_to_dict(raw["Close"]),
+            utils.pd_series_to_dict(
+                raw.loc[raw["Stock Splits"] != 0]["Stock Splits"],
+            ),
+            currency,
+        )
+
+    def history_start(self, start_ord: int, *, full: bool = False) -> int:
+        """Get the first date to download, skipping history already downloaded.
+
+        Bars are split adjusted but not dividend adjusted so only a new split
+        requires downloading the full history again, apply_history takes care of
+        that. The last week is downloaded again to pick up revised bars.
+
+        Args:
+            start_ord: First date ordinal of valuations needed
+            full: True will download the full history regardless
+
+        Returns:
+            Date ordinal to start download from
+
+        """
+        if full:
+            return start_ord
+        query = AssetFetch.query().where(AssetFetch.asset_id == self.id_)
+        fetch = query.one_or_none()
+        if fetch is None or fetch.ticker != self.ticker or fetch.start_ord > start_ord:
+            return start_ord
+        return max(start_ord, fetch.end_ord - utils.DAYS_IN_WEEK)
+
+    def apply_history(
+        self,
+        start_ord: int,
+        end_ord: int,
+        history: AssetHistory,
+    ) -> tuple[datetime.date, datetime.date]:
+        """Update valuations and splits from downloaded price history.
+
+        If history only covers the tail since the last download, only the
+        valuations in that tail are updated.
+
+        Args:
+            start_ord: First date ordinal to update valuations
+            end_ord: Last date ordinal to update valuations (inclusive)
+            history: AssetHistory from fetch_history
 
-        query = AssetValuation.query().where(AssetValuation.asset_id == self.id_)
+        Returns:
+            Updated range (start date, end date)
+
+        Raises:
+            NoAssetWebSourceError: If Asset has no ticker
+
+        """
+        if self.ticker is None:
+            raise exc.NoAssetWebSourceError
+
+        splits = {
+            k: AssetSplit.clean_decimals("multiplier", Decimal(v))
+            for k, v in history.splits.items()
+        }
+        query_v = AssetValuation.query().where(AssetValuation.asset_id == self.id_)
+        if history.start_ord > start_ord:
+            query_tail = AssetSplit.query(
+                AssetSplit.date_ord,
+                AssetSplit.multiplier,
+            ).where(
+                AssetSplit.asset_id == self.id_,
+                AssetSplit.date_ord >= history.start_ord,
+            )
+            if splits != sql.to_dict(query_tail):
+                # Split adjusted history changed, download it all
+                history = self.fetch_history(
+                    self.ticker,
+                    datetime.date.fromordinal(start_ord),
+                )
+                return self.apply_history(start_ord, end_ord, history)
+
+            # Only the tail changed, drop anything outside the range
+            query_v.where(AssetValuation.date_ord < start_ord).delete()
+            query_v = query_v.where(
+                AssetValuation.date_ord >= min(history.start_ord, end_ord + 1),
+            )
+        else:
+            query = AssetSplit.query().where(AssetSplit.asset_id == self.id_)
+            update_rows(
+                AssetSplit,
+                query,
+                "date_ord",
+                {k: {"multiplier": v, "asset_id": self.id_} for k, v in splits.items()},
+            )
+
+        self.currency = history.currency
         update_rows(
             AssetValuation,
-            query,
+            query_v,
             "date_ord",
             {
                 k: {"value": Decimal(v), "asset_id": self.id_}
-                for k, v in valuations.items()
+                for k, v in history.valuations.items()
                 if start_ord <= k <= end_ord
             },
         )
 
-        splits: dict[int, float] = utils.pd_series_to_dict(
-            raw.loc[raw["Stock Splits"] != 0]["Stock Splits"],
-        )
-
-        query = AssetSplit.query().where(AssetSplit.asset_id == self.id_)
+        query_fetch = AssetFetch.query().where(AssetFetch.asset_id == self.id_)
         update_rows(
-            AssetSplit,
-            query,
-            "date_ord",
+            AssetFetch,
+            query_fetch,
+            "asset_id",
             {
-                k: {"multiplier": Decimal(v), "asset_id": self.id_}
-                for k, v in splits.items()
+                self.id_: {
+                    "ticker": self.ticker,
+                    "start_ord": start_ord,
+                    "end_ord": history.end_ord,
+                },
             },
         )
 
         # Run update_splits to fix transactions
         self.update_splits()
 
+        start = datetime.date.fromordinal(start_ord)
+        end = datetime.date.fromordinal(end_ord)
         return start, end
 
     def update_sectors(self) -> None:
@@ -610,10 +1123,25 @@ class Asset(Base):
         if self.ticker is None:
             raise exc.NoAssetWebSourceError
 
-        yf_ticker = yfinance.Ticker(self.ticker)
+        self.apply_sectors(self.fetch_sectors(self.ticker))
+
+    @staticmethod
+    def fetch_sectors(ticker: str) -> dict[USSector, Decimal]:
+        """Download sector weights from web sources.
+
+        Does not use the database so can run in any thread.
+
+        Args:
+            ticker: Ticker symbol of Asset
+
+        Returns:
+            dict{USSector: weight}, empty if sector is unknown
+
+        """
+        yf_ticker = yfinance.Ticker(ticker)
         funds = yf_ticker.funds_data
         try:
-            weights = {
+            return {
                 USSector(sector): Decimal(weight)
                 for sector, weight in funds.sector_weightings.items()
                 if weight
@@ -622,10 +1150,16 @@ class Asset(Base):
             # Not a fund
             sector = yf_ticker.info.get("sector")
             if sector is None:
-                AssetSector.query().where(AssetSector.asset_id == self.id_).delete()
-                return
-            weights = {USSector(sector): Decimal(1)}
+                return {}
+            return {USSector(sector): Decimal(1)}
+
+    def apply_sectors(self, weights: dict[USSector, Decimal]) -> None:
+        """Update AssetSector from downloaded sector weights.
 
+        Args:
+            weights: dict{USSector: weight} from fetch_sectors
+
+        """
         query = AssetSector.query().where(AssetSector.asset_id == self.id_)
         update_rows(
             AssetSector,
@@ -663,9 +1197,66 @@ class Asset(Base):
         except exc.NoResultFound as e:
             msg = f"Could not find asset index {name}"
             raise exc.ProtectedObjectNotFoundError(msg) from e
-        values = cls.get_value_all(start_ord, end_ord, ids=[a_id])[a_id]
-        cost_basis = values[0]
-        return utils.twrr(values, [v - cost_basis for v in values])
+        return cls._index_twrr_ids(start_ord, end_ord, {a_id: name})[name]
+
+    @classmethod
+    def index_twrr_all(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        names: Iterable[str] | None = None,
+    ) -> dict[str, list[Decimal]]:
+        """Get the TWRR for multiple indices from start to end date.
+
+        Args:
+            start_ord: First date ordinal to evaluate
+            end_ord: Last date ordinal to evaluate (inclusive)
+            names: Names of indices, None for all INDEX Assets
+
+        Returns:
+            dict{name: list[price ratios]} ordered by name
+
+        Raises:
+            ProtectedObjectNotFoundError: If an index is not found
+
+        """
+        query = Asset.query(Asset.id_, Asset.name).order_by(Asset.name)
+        if names is None:
+            query = query.where(Asset.category == AssetCategory.INDEX)
+        else:
+            names = set(names)
+            query = query.where(Asset.name.in_(names))
+        ids: dict[int, str] = dict(sql.yield_(query))
+        if names is not None and (missing := names - set(ids.values())):
+            msg = f"Could not find asset index {min(missing)}"
+            raise exc.ProtectedObjectNotFoundError(msg)
+        return cls._index_twrr_ids(start_ord, end_ord, ids)
+
+    @classmethod
+    def _index_twrr_ids(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        ids: dict[int, str],
+    ) -> dict[str, list[Decimal]]:
+        """Get the TWRR for multiple indices from start to end date.
+
+        Args:
+            start_ord: First date ordinal to evaluate
+            end_ord: Last date ordinal to evaluate (inclusive)
+            ids: dict{Asset.id_: name} of indices
+
+        Returns:
+            dict{name: list[price ratios]} in the order of ids
+
+        """
+        assets_values = cls.get_value_all(start_ord, end_ord, ids=ids)
+        result: dict[str, list[Decimal]] = {}
+        for a_id, name in ids.items():
+            values = assets_values[a_id]
+            cost_basis = values[0]
+            result[name] = utils.twrr(values, [v - cost_basis for v in values])
+        return result
 
     @classmethod
     def add_indices(cls) -> None:
@@ -729,17 +1320,55 @@ class Asset(Base):
 
         Does not commit changes, call s.commit() afterwards.
         """
-        query = (
-            AssetValuation.query(AssetValuation.date_ord)
-            .where(AssetValuation.asset_id == self.id_)
-            .order_by(AssetValuation.date_ord)
-        )
-        date_ords = [r[0] for r in sql.yield_(query)]
-        has_dailys = any(
-            (date_ords[i] - date_ords[i - 1]) == 1 for i in range(1, len(date_ords))
+        self.autodetect_interpolate_all(ids=[self.id_])
+
+    @classmethod
+    def autodetect_interpolate_all(cls, ids: Iterable[int] | None = None) -> None:
+        """Autodetect if Assets need interpolation.
+
+        Daily valuations are found by one grouped window query.
+
+        Does not commit changes, call s.commit() afterwards.
+
+        Args:
+            ids: Limit to specific Assets by ID
+
+        """
+        gap = AssetValuation.date_ord - func.lag(AssetValuation.date_ord).over(
+            partition_by=AssetValuation.asset_id,
+            order_by=AssetValuation.date_ord,
         )
-        # Don't interpolate if there are dailys or if there is only one AssetValuation
-        self.interpolate = not has_dailys and len(date_ords) > 1
+        query = AssetValuation.query(AssetValuation.asset_id, gap.label("gap"))
+        if ids is not None:
+            ids = set(ids)
+            query = query.where(AssetValuation.asset_id.in_(ids))
+        gaps = query.subquery()
+        query = AssetValuation.query(
+            gaps.c.asset_id,
+            func.count(),
+            func.min(gaps.c.gap),
+        ).group_by(gaps.c.asset_id)
+        stats: dict[int, tuple[int, int | None]] = {
+            a_id: (n, min_gap) for a_id, n, min_gap in sql.yield_(query)
+        }
+
+        query = Asset.query(Asset.id_, Asset.interpolate)
+        if ids is not None:
+            query = query.where(Asset.id_.in_(ids))
+        changes: dict[bool, list[int]] = {True: [], False: []}
+        for a_id, interpolate in sql.yield_(query):
+            n, min_gap = stats.get(a_id, (0, None))
+            # Don't interpolate if there are dailys or if there is only one
+            # AssetValuation
+            target = min_gap != 1 and n > 1
+            if target != interpolate:
+                changes[target].append(a_id)
+
+        for interpolate, a_ids in changes.items():
+            if a_ids:
+                Asset.query().where(Asset.id_.in_(a_ids)).update(
+                    {"interpolate": interpolate},
+                )
 
     @classmethod
     def create_forex(
@@ -794,6 +1423,7 @@ class Asset(Base):
         Asset.query().where(Asset.id_.in_(to_delete)).delete()
 
     @classmethod
+    @cached
     def get_forex(
         cls,
         start_ord: int,
@@ -162,6 +162,19 @@ class QueryMixIn(SessionMixIn):
         c5: sql_roles.TypedColumnsClauseRole[T5],
     ) -> orm.query.RowReturningQuery[tuple[T0, T1, T2, T3, T4, T5]]: ...
 
+    @overload
+    @classmethod
+    def query[T0, T1, T2, T3, T4, T5, T6](
+        cls,
+        c0: sql_roles.TypedColumnsClauseRole[T0],
+        c1: sql_roles.TypedColumnsClauseRole[T1],
+        c2: sql_roles.TypedColumnsClauseRole[T2],
+        c3: sql_roles.TypedColumnsClauseRole[T3],
+        c4: sql_roles.TypedColumnsClauseRole[T4],
+        c5: sql_roles.TypedColumnsClauseRole[T5],
+        c6: sql_roles.TypedColumnsClauseRole[T6],
+    ) -> orm.query.RowReturningQuery[tuple[T0, T1, T2, T3, T4, T5, T6]]: ...
+
     @classmethod
     def query[T](
         cls,
@@ -401,6 +414,18 @@ class Base(orm.DeclarativeBase, QueryMixIn):
             raise exc.InvalidORMValueError(msg)
         return field
 
+    @overload
+    @classmethod
+    def clean_decimals(cls, key: str, field: Decimal) -> Decimal: ...
+
+    @overload
+    @classmethod
+    def clean_decimals(cls, key: str, field: None) -> None: ...
+
+    @overload
+    @classmethod
+    def clean_decimals(cls, key: str, field: Decimal | None) -> Decimal | None: ...
+
     @classmethod
     def clean_decimals(cls, key: str, field: Decimal | None) -> Decimal | None:
         """Validate decimals are truncated to their SQL precision.
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import bisect
 import datetime
+import threading
 from collections import defaultdict
 from decimal import Decimal
-from typing import NamedTuple
+from typing import NamedTuple, TYPE_CHECKING
 
 from sqlalchemy import CheckConstraint, ForeignKey, func, Index, orm, UniqueConstraint
 
@@ -22,12 +24,16 @@ from nummus.models.base import (
     SQLEnum,
     string_column_args,
 )
+from nummus.models.cache import session_cache
 from nummus.models.transaction import TransactionSplit
 from nummus.models.transaction_category import (
     TransactionCategory,
     TransactionCategoryGroup,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
 
 class BudgetAvailableCategory(NamedTuple):
     """Type returned from get_monthly_available."""
@@ -124,6 +130,29 @@ class BudgetAssignment(Base):
         """
         return self.clean_decimals(key, field)
 
+    @classmethod
+    def _ledger(cls, accounts: Iterable[int]) -> BudgetLedger:
+        """Get the BudgetLedger of a set of Accounts.
+
+        Args:
+            accounts: Account.id_ included in the budget
+
+        Returns:
+            BudgetLedger from the session's ResultCache or a new one
+
+        """
+        usable = session_cache()
+        if usable is None:
+            return BudgetLedger()
+        cache, versions = usable
+        generation = versions.budget
+        key = frozenset(accounts)
+        ledger = cache.get_ledger(generation, key)
+        if ledger is None:
+            ledger = BudgetLedger()
+            cache.set_ledger(generation, key, ledger)
+        return ledger
+
     @classmethod
     def get_monthly_available(
         cls,
@@ -131,6 +160,9 @@ class BudgetAssignment(Base):
     ) -> BudgetAvailable:
         """Get available budget for a month.
 
+        The months before are held in the session's BudgetLedger, only this
+        month's assignments and activity are queried.
+
         Args:
             month: Month to compute budget during
 
@@ -151,23 +183,20 @@ class BudgetAssignment(Base):
             if acct.do_include(month_ord)
         }
 
-        # Starting balance
-        query = TransactionSplit.query(
-            func.sum(TransactionSplit.amount),
-        ).where(
-            TransactionSplit.account_id.in_(accounts),
-            TransactionSplit.date_ord < month_ord,
-        )
-        starting_balance = sql.scalar(query) or Decimal()
-        ending_balance = starting_balance
-        total_available = Decimal()
-
         # Check all categories not INCOME
         query = TransactionCategory.query(TransactionCategory.id_).where(
             TransactionCategory.group != TransactionCategoryGroup.INCOME,
         )
         budget_categories = {t_cat_id for t_cat_id, in sql.yield_(query)}
 
+        starting_balance, categories_leftover = cls._ledger(accounts).get(
+            month_ord,
+            accounts,
+            budget_categories,
+        )
+        ending_balance = starting_balance
+        total_available = Decimal()
+
         # Current month's assignment
         query = BudgetAssignment.query(
             BudgetAssignment.category_id,
@@ -175,63 +204,6 @@ class BudgetAssignment(Base):
         ).where(BudgetAssignment.month_ord == month_ord)
         categories_assigned: dict[int, Decimal] = sql.to_dict(query)
 
-        # Prior months' assignment
-        min_month_ord = month_ord
-        prior_assigned: dict[int, dict[int, Decimal]] = {
-            t_cat_id: {} for t_cat_id in budget_categories
-        }
-        query = (
-            BudgetAssignment.query(
-                BudgetAssignment.category_id,
-                BudgetAssignment.amount,
-                BudgetAssignment.month_ord,
-            )
-            .where(BudgetAssignment.month_ord < month_ord)
-            .order_by(BudgetAssignment.month_ord)
-        )
-        for cat_id, amount, m_ord in sql.yield_(query):
-            prior_assigned[cat_id][m_ord] = amount
-            min_month_ord = min(min_month_ord, m_ord)
-
-        # Prior months' activity
-        prior_activity: dict[int, dict[int, Decimal]] = {
-            t_cat_id: {} for t_cat_id in budget_categories
-        }
-        query = (
-            TransactionSplit.query(
-                TransactionSplit.category_id,
-                func.sum(TransactionSplit.amount),
-                TransactionSplit.month_ord,
-            )
-            .where(
-                TransactionSplit.account_id.in_(accounts),
-                TransactionSplit.month_ord < month_ord,
-                TransactionSplit.month_ord >= min_month_ord,
-                TransactionSplit.category_id.in_(budget_categories),
-            )
-            .group_by(
-                TransactionSplit.category_id,
-                TransactionSplit.month_ord,
-            )
-        )
-        for cat_id, amount, m_ord in sql.yield_(query):
-            prior_activity[cat_id][m_ord] = amount
-
-        # Carry over leftover to next months to get current month's leftover amounts
-        categories_leftover: dict[int, Decimal] = defaultdict(Decimal)
-        date = datetime.date.fromordinal(min_month_ord)
-        while date < month:
-            date_ord = date.toordinal()
-            for t_cat_id in budget_categories:
-                assigned = categories_leftover[t_cat_id] + prior_assigned[t_cat_id].get(
-                    date_ord,
-                    Decimal(),
-                )
-                activity = prior_activity[t_cat_id].get(date_ord, Decimal())
-                leftover = assigned + activity
-                categories_leftover[t_cat_id] = max(Decimal(), leftover)
-            date = utils.date_add_months(date, 1)
-
         # Future months' assignment
         query = BudgetAssignment.query(func.sum(BudgetAssignment.amount)).where(
             BudgetAssignment.month_ord > month_ord,
@@ -381,14 +353,8 @@ class BudgetAssignment(Base):
             date_ord += 1
             daily = Decimal()
 
-        totals_lower: list[Decimal] = [
-            Decimal(-sum(dailys[i : i + n_lower]))
-            for i in range(len(dailys) - n_lower + 1)
-        ]
-        totals_upper: list[Decimal] = [
-            Decimal(-sum(dailys[i : i + n_upper]))
-            for i in range(len(dailys) - n_upper + 1)
-        ]
+        totals_lower = [-v for v in utils.rolling_sum(dailys, n_lower)]
+        totals_upper = [-v for v in utils.rolling_sum(dailys, n_upper)]
 
         totals_lower = utils.low_pass(totals_lower, n_smoothing)
         totals_upper = utils.low_pass(totals_upper, n_smoothing)
@@ -460,6 +426,193 @@ class BudgetAssignment(Base):
                 a.amount += to_move
 
 
+class BudgetLedger:
+    """Starting balance and category leftovers of each budget month.
+
+    Leftover rolls over month by month from the first assignment. Every month
+    replayed is kept, so later months resume from the last one instead of the
+    first assignment. Truncate from the first month with changes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize BudgetLedger."""
+        self._lock = threading.Lock()
+        # Consecutive month ordinals from the first assignment
+        self._months: list[int] = []
+        # Balance at the start of each month
+        self._balances: list[Decimal] = []
+        # Positive leftovers at the start of each month, {category: leftover}
+        self._leftovers: list[dict[int, Decimal]] = []
+
+    def __len__(self) -> int:
+        """Get number of months held.
+
+        Returns:
+            Number of months held
+
+        """
+        return len(self._months)
+
+    def truncate(self, month_ord: int) -> None:
+        """Drop the months after a change.
+
+        Args:
+            month_ord: First month with changed assignments or activity
+
+        """
+        with self._lock:
+            i = bisect.bisect_right(self._months, month_ord)
+            if i <= 1:
+                # First assignment may have moved, start over
+                i = 0
+            del self._months[i:]
+            del self._balances[i:]
+            del self._leftovers[i:]
+
+    def get(
+        self,
+        month_ord: int,
+        accounts: Iterable[int],
+        budget_categories: set[int],
+    ) -> tuple[Decimal, dict[int, Decimal]]:
+        """Get the starting balance and category leftovers of a month.
+
+        Args:
+            month_ord: First day of month
+            accounts: Account.id_ included in the budget, same for every call
+            budget_categories: TransactionCategory.id_ that roll over
+
+        Returns:
+            (starting balance, {TransactionCategory: positive leftover})
+
+        """
+        accounts = list(accounts)
+        with self._lock:
+            if not self._months and not self._start(accounts):
+                return self._balance(month_ord, accounts), {}
+            if month_ord <= self._months[0]:
+                return self._balance(month_ord, accounts), {}
+            if month_ord > self._months[-1]:
+                self._extend(month_ord, accounts, budget_categories)
+            i = bisect.bisect_left(self._months, month_ord)
+            return self._balances[i], self._leftovers[i].copy()
+
+    @staticmethod
+    def _balance(month_ord: int, accounts: list[int]) -> Decimal:
+        """Get the balance of Accounts at the start of a month.
+
+        Args:
+            month_ord: First day of month
+            accounts: Account.id_ to sum
+
+        Returns:
+            Sum of TransactionSplits before month
+
+        """
+        query = TransactionSplit.query(
+            func.sum(TransactionSplit.amount),
+        ).where(
+            TransactionSplit.account_id.in_(accounts),
+            TransactionSplit.date_ord < month_ord,
+        )
+        return sql.scalar(query) or Decimal()
+
+    def _start(self, accounts: list[int]) -> bool:
+        """Start ledger at the first assignment.
+
+        Args:
+            accounts: Account.id_ included in the budget
+
+        Returns:
+            False if there are no assignments
+
+        """
+        query = BudgetAssignment.query(func.min(BudgetAssignment.month_ord))
+        start_ord = sql.scalar(query)
+        if start_ord is None:
+            return False
+        self._months.append(start_ord)
+        self._balances.append(self._balance(start_ord, accounts))
+        self._leftovers.append({})
+        return True
+
+    def _extend(
+        self,
+        month_ord: int,
+        accounts: list[int],
+        budget_categories: set[int],
+    ) -> None:
+        """Replay months from the last held up to a month.
+
+        Args:
+            month_ord: First day of month to end on
+            accounts: Account.id_ included in the budget
+            budget_categories: TransactionCategory.id_ that roll over
+
+        """
+        last_ord = self._months[-1]
+
+        assigned: dict[int, dict[int, Decimal]] = defaultdict(dict)
+        query = BudgetAssignment.query(
+            BudgetAssignment.month_ord,
+            BudgetAssignment.category_id,
+            BudgetAssignment.amount,
+        ).where(
+            BudgetAssignment.month_ord >= last_ord,
+            BudgetAssignment.month_ord < month_ord,
+        )
+        for m_ord, t_cat_id, amount in sql.yield_(query):
+            assigned[m_ord][t_cat_id] = amount
+
+        activity: dict[int, dict[int, Decimal]] = defaultdict(dict)
+        query = (
+            TransactionSplit.query(
+                TransactionSplit.month_ord,
+                TransactionSplit.category_id,
+                func.sum(TransactionSplit.amount),
+            )
+            .where(
+                TransactionSplit.account_id.in_(accounts),
+                TransactionSplit.month_ord >= last_ord,
+                TransactionSplit.month_ord < month_ord,
+            )
+            .group_by(
+                TransactionSplit.category_id,
+                TransactionSplit.month_ord,
+            )
+        )
+        for m_ord, t_cat_id, amount in sql.yield_(query):
+            activity[m_ord][t_cat_id] = amount
+
+        # Carry over leftover to next months
+        date = datetime.date.fromordinal(last_ord)
+        while date.toordinal() < month_ord:
+            date_ord = date.toordinal()
+            month_assigned = assigned[date_ord]
+            month_activity = activity[date_ord]
+            leftovers: dict[int, Decimal] = {}
+            # Categories with nothing to roll over stay at zero
+            t_cat_ids = (
+                self._leftovers[-1].keys()
+                | month_assigned.keys()
+                | month_activity.keys()
+            )
+            for t_cat_id in t_cat_ids & budget_categories:
+                leftover = (
+                    self._leftovers[-1].get(t_cat_id, Decimal())
+                    + month_assigned.get(t_cat_id, Decimal())
+                    + month_activity.get(t_cat_id, Decimal())
+                )
+                if leftover > 0:
+                    leftovers[t_cat_id] = leftover
+            balance = self._balances[-1] + sum(month_activity.values(), Decimal())
+
+            date = utils.date_add_months(date, 1)
+            self._months.append(date.toordinal())
+            self._balances.append(balance)
+            self._leftovers.append(leftovers)
+
+
 class TargetType(BaseEnum):
     """Type of budget target."""
 
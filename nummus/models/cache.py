@@ -0,0 +1,357 @@
+"""Result cache for expensive model computations shared between sessions."""
+
+from __future__ import annotations
+
+import functools
+from collections import defaultdict, OrderedDict
+from collections.abc import KeysView
+from collections.abc import Set as AbstractSet
+from typing import TYPE_CHECKING
+
+import sqlalchemy.event
+
+from nummus.models.base import Base
+from nummus.models.data_version import (
+    DataDomain,
+    DataVersion,
+    has_changes,
+    INFO_COMMIT,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+    from sqlalchemy import orm
+
+    from nummus.models.asset import ValuationPoints
+    from nummus.models.budget import BudgetLedger
+    from nummus.models.data_version import DataCommit, DataVersions
+
+
+_MISSING = object()
+
+
+class ResultCache:
+    """Cache of model results, invalidated by the portfolio DataVersions.
+
+    DataVersions are stored in the portfolio, so writes from any process
+    invalidate the cache. Bind to a sessionmaker with listen; the results of
+    functions decorated with cached are then reused between its sessions.
+
+    Asset valuation series are held separately under the valuations version.
+    A commit from this process only drops the series of the Assets it touched,
+    a commit from another process drops all of them.
+
+    Budget ledgers are held the same way under the budget version. A commit
+    from this process only truncates them from the first month it touched.
+    """
+
+    INFO_KEY = "result_cache"
+
+    def __init__(self, max_entries: int = 64) -> None:
+        """Initialize ResultCache.
+
+        Args:
+            max_entries: Maximum number of results to hold
+
+        """
+        self._max_entries = max_entries
+        self._generation: DataVersions | None = None
+        self._results: OrderedDict[Hashable, object] = OrderedDict()
+        self._valuation_generation: int | None = None
+        self._series: dict[int, ValuationPoints] = {}
+        self._budget_generation: int | None = None
+        self._ledgers: dict[Hashable, BudgetLedger] = {}
+
+    def __len__(self) -> int:
+        """Get number of cached results.
+
+        Returns:
+            Number of cached results
+
+        """
+        return len(self._results)
+
+    def get(self, generation: DataVersions | None, key: Hashable) -> object:
+        """Get a cached result.
+
+        Args:
+            generation: Current DataVersions of the portfolio
+            key: Key of result
+
+        Returns:
+            Cached result or _MISSING
+
+        """
+        if generation != self._generation:
+            self._results.clear()
+            self._generation = generation
+            return _MISSING
+        result = self._results.get(key, _MISSING)
+        if result is not _MISSING:
+            self._results.move_to_end(key)
+        return result
+
+    def set_(
+        self,
+        generation: DataVersions | None,
+        key: Hashable,
+        result: object,
+    ) -> None:
+        """Set a cached result.
+
+        Args:
+            generation: DataVersions result was computed at
+            key: Key of result
+            result: Result to cache
+
+        """
+        if generation != self._generation:
+            return
+        self._results[key] = result
+        if len(self._results) > self._max_entries:
+            self._results.popitem(last=False)
+
+    def get_series(
+        self,
+        generation: int | None,
+        a_id: int,
+    ) -> ValuationPoints | None:
+        """Get a cached Asset valuation series.
+
+        Args:
+            generation: Current valuations version of the portfolio
+            a_id: Asset unique identifier
+
+        Returns:
+            ValuationPoints or None
+
+        """
+        if generation != self._valuation_generation:
+            self._series.clear()
+            self._valuation_generation = generation
+            return None
+        return self._series.get(a_id)
+
+    def set_series(
+        self,
+        generation: int | None,
+        a_id: int,
+        series: ValuationPoints,
+    ) -> None:
+        """Set a cached Asset valuation series.
+
+        Args:
+            generation: Valuations version series was computed at
+            a_id: Asset unique identifier
+            series: ValuationPoints
+
+        """
+        if generation != self._valuation_generation:
+            return
+        self._series[a_id] = series
+
+    def _commit_valuations(
+        self,
+        old_generation: int | None,
+        new_generation: int,
+        ids: set[int] | None,
+    ) -> None:
+        """Drop Asset valuation series after committing a new valuations version.
+
+        Args:
+            old_generation: Valuations version before the commit
+            new_generation: Valuations version after the commit
+            ids: Asset.id_ with changed valuations, None for all
+
+        """
+        if ids is None or old_generation != self._valuation_generation:
+            # Don't know what else changed
+            self._series.clear()
+        else:
+            for a_id in ids:
+                self._series.pop(a_id, None)
+        self._valuation_generation = new_generation
+
+    def get_ledger(
+        self,
+        generation: int | None,
+        key: Hashable,
+    ) -> BudgetLedger | None:
+        """Get a cached budget ledger.
+
+        Args:
+            generation: Current budget version of the portfolio
+            key: Key of ledger
+
+        Returns:
+            BudgetLedger or None
+
+        """
+        if generation != self._budget_generation:
+            self._ledgers.clear()
+            self._budget_generation = generation
+            return None
+        return self._ledgers.get(key)
+
+    def set_ledger(
+        self,
+        generation: int | None,
+        key: Hashable,
+        ledger: BudgetLedger,
+    ) -> None:
+        """Set a cached budget ledger.
+
+        Args:
+            generation: Budget version ledger was started at
+            key: Key of ledger
+            ledger: Ledger to cache
+
+        """
+        if generation != self._budget_generation:
+            return
+        self._ledgers[key] = ledger
+
+    def _commit_budget(
+        self,
+        old_generation: int | None,
+        new_generation: int,
+        month_ord: int | None,
+    ) -> None:
+        """Truncate budget ledgers after committing a new budget version.
+
+        Args:
+            old_generation: Budget version before the commit
+            new_generation: Budget version after the commit
+            month_ord: First month with changes, None for all
+
+        """
+        if month_ord is None or old_generation != self._budget_generation:
+            # Don't know what else changed
+            self._ledgers.clear()
+        else:
+            for ledger in self._ledgers.values():
+                ledger.truncate(month_ord)
+        self._budget_generation = new_generation
+
+    def listen(self, session_maker: orm.sessionmaker[orm.Session]) -> None:
+        """Attach cache to a sessionmaker and apply its commits.
+
+        The sessionmaker must also bump DataVersions, see data_version.listen.
+
+        Args:
+            session_maker: Sessionmaker to attach to
+
+        """
+        session_maker.configure(info={self.INFO_KEY: self})
+        sqlalchemy.event.listen(session_maker, "after_commit", _after_commit)
+
+
+def _after_commit(s: orm.Session) -> None:
+    commit: DataCommit | None = s.info.pop(INFO_COMMIT, None)
+    cache: ResultCache | None = s.info.get(ResultCache.INFO_KEY)
+    if commit is None or cache is None:
+        return
+    if (new := commit.versions.get(DataDomain.VALUATIONS)) is not None:
+        cache._commit_valuations(new - 1, new, commit.assets)  # noqa: SLF001
+    if (new := commit.versions.get(DataDomain.BUDGET)) is not None:
+        cache._commit_budget(new - 1, new, commit.month_ord)  # noqa: SLF001
+
+
+def _freeze(value: object) -> Hashable:
+    """Convert an argument to a hashable key.
+
+    Args:
+        value: Argument to convert
+
+    Returns:
+        Hashable equivalent
+
+    """
+    if isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, AbstractSet | KeysView):
+        return frozenset(value)
+    return value  # pyright: ignore[reportReturnType]
+
+
+def _copy[T](value: T) -> T:
+    """Copy a result so callers can modify it.
+
+    Leaves are expected to be immutable, such as Decimal.
+
+    Args:
+        value: Result to copy
+
+    Returns:
+        Copy of containers in value
+
+    """
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return type(value)(*(_copy(v) for v in value))
+    if isinstance(value, defaultdict):
+        return defaultdict(
+            value.default_factory,
+            {k: _copy(v) for k, v in value.items()},
+        )  # pyright: ignore[reportReturnType]
+    if isinstance(value, dict):
+        return {
+            k: _copy(v) for k, v in value.items()
+        }  # pyright: ignore[reportReturnType]
+    if isinstance(value, list):
+        return value.copy()  # pyright: ignore[reportReturnType]
+    return value
+
+
+def session_cache() -> tuple[ResultCache, DataVersions] | None:
+    """Get the ResultCache of the active session if its results are usable.
+
+    Returns:
+        (ResultCache, current DataVersions) or None if not attached, session has
+        uncommitted changes, or portfolio has no DataVersions
+
+    """
+    s = Base.session()
+    cache: ResultCache | None = s.info.get(ResultCache.INFO_KEY)
+    if cache is None:
+        return None
+    if has_changes(s):
+        # Uncommitted changes are not visible to other sessions
+        return None
+    versions = DataVersion.fetch()
+    if versions is None:
+        return None
+    return cache, versions
+
+
+def cached[**P, R](func: Callable[P, R]) -> Callable[P, R]:
+    """Cache results of a model function in the session's ResultCache.
+
+    Only caches when the active session has a ResultCache attached.
+    Place below classmethod.
+
+    Args:
+        func: Function to cache, arguments must be freezable
+
+    Returns:
+        Wrapped function
+
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        usable = session_cache()
+        if usable is None:
+            return func(*args, **kwargs)
+
+        cache, versions = usable
+        key = (func.__qualname__, _freeze(args), _freeze(kwargs))
+        result = cache.get(versions, key)
+        if result is _MISSING:
+            result = func(*args, **kwargs)
+            cache.set_(versions, key, result)
+        return _copy(result)  # pyright: ignore[reportReturnType]
+
+    return wrapper
@@ -0,0 +1,410 @@
+"""Data version model for stamping changes to the portfolio."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import NamedTuple, TYPE_CHECKING
+
+import sqlalchemy
+import sqlalchemy.event
+from sqlalchemy import orm
+from sqlalchemy.sql import elements, operators
+
+from nummus import sql
+from nummus.models.base import Base, BaseEnum, ORMInt, SQLEnum
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+
+class DataDomain(BaseEnum):
+    """Domains of portfolio data with their own version."""
+
+    TRANSACTIONS = 1
+    VALUATIONS = 2
+    BUDGET = 3
+    CONFIG = 4
+
+
+class DataVersions(NamedTuple):
+    """Version of every DataDomain at one point in time."""
+
+    transactions: int
+    valuations: int
+    budget: int
+    config: int
+
+
+class DataCommit(NamedTuple):
+    """Versions bumped by a commit and what changed in them.
+
+    Attributes:
+        versions: dict{DataDomain: version after the commit}
+        assets: Asset.id_ with changed valuations, None for all
+        month_ord: First month with changed budget data, None for all
+
+    """
+
+    versions: dict[DataDomain, int]
+    assets: set[int] | None
+    month_ord: int | None
+
+
+# Tables whose changes bump the version of domains
+_TABLE_DOMAINS: dict[str, set[DataDomain]] = {
+    "account": {DataDomain.TRANSACTIONS},
+    "asset": {DataDomain.VALUATIONS},
+    "asset_sector": {DataDomain.VALUATIONS},
+    "asset_split": {DataDomain.VALUATIONS},
+    "asset_valuation": {DataDomain.VALUATIONS},
+    "budget_assignment": {DataDomain.BUDGET},
+    "budget_group": {DataDomain.BUDGET},
+    "config": {DataDomain.CONFIG},
+    "label": {DataDomain.TRANSACTIONS},
+    "label_link": {DataDomain.TRANSACTIONS},
+    "target": {DataDomain.BUDGET},
+    "transaction": {DataDomain.TRANSACTIONS},
+    "transaction_category": {DataDomain.TRANSACTIONS, DataDomain.BUDGET},
+    "transaction_split": {DataDomain.TRANSACTIONS, DataDomain.BUDGET},
+}
+
+# set of DataDomain written in this session
+_INFO_DOMAINS = "data_version_domains"
+# set of Asset.id_ with changed valuations, None for all
+_INFO_ASSETS = "data_version_assets"
+# First month ordinal with changed budget assignments or activity, None for all
+_INFO_MONTH = "data_version_month"
+# DataCommit of the committing session, consumed by caches in after_commit
+INFO_COMMIT = "data_version_commit"
+
+# Connection info, (PRAGMA data_version, DataVersions) last read on it
+_CONN_VERSIONS = "data_version_versions"
+_CONN_HAS_TABLE = "data_version_has_table"
+
+
+class DataVersion(Base):
+    """Data version model for stamping changes to a DataDomain.
+
+    Versions increase by one on every commit that writes to the domain,
+    including commits from other processes, so an unchanged version means
+    unchanged data.
+
+    Attributes:
+        domain: DataDomain the version stamps
+        version: Number of commits that wrote to the domain
+
+    """
+
+    __tablename__ = "data_version"
+    __table_id__ = None
+
+    domain: orm.Mapped[DataDomain] = orm.mapped_column(
+        SQLEnum(DataDomain),
+        unique=True,
+    )
+    version: ORMInt
+
+    @classmethod
+    def add_default(cls) -> None:
+        """Create the version of every DataDomain, skips existing."""
+        existing = set(sql.col0(cls.query(cls.domain)))
+        for domain in DataDomain:
+            if domain not in existing:
+                cls.create(domain=domain, version=0)
+
+    @classmethod
+    def fetch(cls) -> DataVersions | None:
+        """Fetch the current version of every DataDomain.
+
+        PRAGMA data_version only changes when another connection commits, so
+        the versions last read on this connection are reused until then.
+
+        Returns:
+            DataVersions or None if the portfolio has no data_version table
+
+        """
+        conn = cls.session().connection()
+        data_version = conn.exec_driver_sql("PRAGMA data_version").scalar_one()
+        cached: tuple[int, DataVersions] | None = conn.info.get(_CONN_VERSIONS)
+        if cached is not None and cached[0] == data_version:
+            return cached[1]
+        if not _has_table(conn):
+            return None
+
+        versions = dict.fromkeys(DataVersions._fields, 0)
+        query = cls.query(cls.domain, cls.version)
+        for domain, version in sql.yield_(query):
+            versions[domain.name.lower()] = version
+        result = DataVersions(**versions)
+        conn.info[_CONN_VERSIONS] = (data_version, result)
+        return result
+
+    @classmethod
+    def bump(cls, domains: Iterable[DataDomain]) -> dict[DataDomain, int]:
+        """Increment the version of DataDomains.
+
+        Args:
+            domains: DataDomains to increment
+
+        Returns:
+            dict{DataDomain: new version}
+            empty if the portfolio has no data_version table
+
+        """
+        s = cls.session()
+        conn = s.connection()
+        # Own commits don't change PRAGMA data_version of this connection
+        conn.info.pop(_CONN_VERSIONS, None)
+        if not _has_table(conn):
+            return {}
+        domains = set(domains)
+        stmt = (
+            sqlalchemy.update(cls)
+            .where(cls.domain.in_(domains))
+            .values(version=cls.version + 1)
+            .returning(cls.domain, cls.version)
+        )
+        versions: dict[DataDomain, int] = {
+            row.domain: row.version for row in s.execute(stmt)
+        }
+        for domain in domains - versions.keys():
+            cls.create(domain=domain, version=1)
+            versions[domain] = 1
+        return versions
+
+
+def _has_table(conn: sqlalchemy.Connection) -> bool:
+    """Test if the data_version table exists, older portfolios lack it.
+
+    Args:
+        conn: Connection to test on
+
+    Returns:
+        True if table exists
+
+    """
+    # Only cache existence, a migration can create it on this connection
+    if conn.info.get(_CONN_HAS_TABLE):
+        return True
+    if not sqlalchemy.inspect(conn).has_table(DataVersion.__tablename__):
+        return False
+    conn.info[_CONN_HAS_TABLE] = True
+    return True
+
+
+def has_changes(s: orm.Session) -> bool:
+    """Test if a session has written data it has not committed yet.
+
+    Args:
+        s: Session to test
+
+    Returns:
+        True if session has uncommitted writes
+
+    """
+    return bool(s.info.get(_INFO_DOMAINS) or s.new or s.dirty or s.deleted)
+
+
+def _mark(
+    s: orm.Session,
+    table: str | None,
+    assets: set[int] | None,
+    month_ord: int | None,
+) -> None:
+    """Mark a table as written in this session.
+
+    Args:
+        s: Session with changes
+        table: Name of table written
+        assets: Asset.id_ with changed valuations, None for all
+        month_ord: First month with changed budget data, None for all
+
+    """
+    domains = _TABLE_DOMAINS.get(table or "")
+    if domains is None:
+        return
+    s.info.setdefault(_INFO_DOMAINS, set()).update(domains)
+
+    if DataDomain.VALUATIONS in domains:
+        if _INFO_ASSETS not in s.info:
+            s.info[_INFO_ASSETS] = assets
+        elif assets is None or s.info[_INFO_ASSETS] is None:
+            s.info[_INFO_ASSETS] = None
+        else:
+            s.info[_INFO_ASSETS].update(assets)
+
+    if DataDomain.BUDGET in domains:
+        if _INFO_MONTH not in s.info:
+            s.info[_INFO_MONTH] = month_ord
+        elif month_ord is None or s.info[_INFO_MONTH] is None:
+            s.info[_INFO_MONTH] = None
+        else:
+            s.info[_INFO_MONTH] = min(s.info[_INFO_MONTH], month_ord)
+
+
+def _after_flush(s: orm.Session, _: orm.UOWTransaction) -> None:
+    for obj in (*s.new, *s.dirty, *s.deleted):
+        table = getattr(obj, "__tablename__", None)
+        assets: set[int] | None = None
+        month_ord: int | None = None
+        if table == "asset":
+            assets = {obj.id_}
+        elif table == "asset_valuation":
+            # Include the previous Asset if asset_id was changed
+            history = sqlalchemy.inspect(obj).attrs.asset_id.history
+            assets = {obj.asset_id, *history.deleted}
+        elif table in {"budget_assignment", "transaction_split"}:
+            # Include the previous month if month_ord was changed
+            history = sqlalchemy.inspect(obj).attrs.month_ord.history
+            month_ord = min([obj.month_ord, *history.deleted])
+        _mark(s, table, assets, month_ord)
+
+
+def _statement_ids(state: orm.ORMExecuteState, column: str) -> set[int] | None:
+    """Get the values of a column an INSERT or DELETE statement is limited to.
+
+    Args:
+        state: State of statement
+        column: Name of column, such as id or month
+
+    Returns:
+        set of values or None if not limited to specific values
+
+    """
+    if state.is_insert:
+        return _insert_ids(state.parameters, column)
+    if isinstance(state.statement, sqlalchemy.Delete):
+        return _delete_ids(state.statement.whereclause, column)
+    return None
+
+
+def _insert_ids(
+    params: Mapping[str, object] | Sequence[Mapping[str, object]] | None,
+    column: str,
+) -> set[int] | None:
+    """Get the values of a column an INSERT statement sets.
+
+    Args:
+        params: Parameters of each inserted row
+        column: Name of column, such as id or month
+
+    Returns:
+        set of values or None if any row does not set column
+
+    """
+    if params is None:
+        return None
+    rows = [params] if isinstance(params, Mapping) else params
+    return _int_set(row.get(column) for row in rows)
+
+
+def _delete_ids(
+    where: sqlalchemy.ColumnElement[bool] | None,
+    column: str,
+) -> set[int] | None:
+    """Get the values of a column a DELETE statement is limited to.
+
+    Args:
+        where: WHERE clause of statement
+        column: Name of column, such as id or month
+
+    Returns:
+        set of values or None if not limited to specific values
+
+    """
+    if where is None:
+        return None
+    clauses = (
+        where.clauses
+        if isinstance(where, elements.BooleanClauseList)
+        and where.operator is operators.and_
+        else [where]
+    )
+    for clause in clauses:
+        if not isinstance(clause, elements.BinaryExpression):
+            continue
+        if getattr(clause.left, "name", None) != column:
+            continue
+        right = clause.right
+        if not isinstance(right, elements.BindParameter):
+            continue
+        value: object = right.value
+        if clause.operator is operators.eq:
+            return _int_set([value])
+        if clause.operator is operators.in_op and isinstance(value, list):
+            return _int_set(value)
+    return None
+
+
+def _int_set(values: Iterable[object]) -> set[int] | None:
+    """Get a set of ids, checking each is an int.
+
+    Args:
+        values: Values of a column
+
+    Returns:
+        set of values or None if any value is not an int, such as a SQL
+        expression
+
+    """
+    ids: set[int] = set()
+    for v in values:
+        if not isinstance(v, int):
+            return None
+        ids.add(v)
+    return ids
+
+
+def _do_orm_execute(state: orm.ORMExecuteState) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    for m in state.all_mappers:
+        table = getattr(m.class_, "__tablename__", None)
+        assets: set[int] | None = None
+        month_ord: int | None = None
+        if table == "asset":
+            assets = _statement_ids(state, "id_")
+        elif table == "asset_valuation":
+            assets = _statement_ids(state, "asset_id")
+        elif table in {"budget_assignment", "transaction_split"}:
+            months = _statement_ids(state, "month_ord")
+            month_ord = min(months) if months else None
+        _mark(state.session, table, assets, month_ord)
+
+
+def _before_commit(s: orm.Session) -> None:
+    # Commit flushes after this hook, flush now to see every change
+    s.flush()
+    domains: set[DataDomain] | None = s.info.pop(_INFO_DOMAINS, None)
+    assets: set[int] | None = s.info.pop(_INFO_ASSETS, None)
+    month_ord: int | None = s.info.pop(_INFO_MONTH, None)
+    s.info.pop(INFO_COMMIT, None)
+    if not domains:
+        return
+    # Bump in the same transaction so readers never see new data at old versions
+    with Base.set_session(s):
+        versions = DataVersion.bump(domains)
+    s.info[INFO_COMMIT] = DataCommit(versions, assets, month_ord)
+
+
+def _after_rollback(s: orm.Session) -> None:
+    s.info.pop(_INFO_DOMAINS, None)
+    s.info.pop(_INFO_ASSETS, None)
+    s.info.pop(_INFO_MONTH, None)
+    s.info.pop(INFO_COMMIT, None)
+
+
+def listen(session_maker: orm.sessionmaker[orm.Session]) -> None:
+    """Bump DataVersions on commits of a sessionmaker's sessions.
+
+    Each commit that writes leaves a DataCommit in the session info for caches
+    to consume in after_commit.
+
+    Args:
+        session_maker: Sessionmaker to attach to
+
+    """
+    sqlalchemy.event.listen(session_maker, "after_flush", _after_flush)
+    sqlalchemy.event.listen(session_maker, "do_orm_execute", _do_orm_execute)
+    sqlalchemy.event.listen(session_maker, "before_commit", _before_commit)
+    sqlalchemy.event.listen(session_maker, "after_rollback", _after_rollback)
@@ -0,0 +1,551 @@
+"""Rollup model for storing monthly totals of TransactionSplits."""
+
+from __future__ import annotations
+
+import itertools
+import textwrap
+from collections import defaultdict
+from decimal import Decimal
+from typing import NamedTuple, TYPE_CHECKING
+
+import sqlalchemy
+import sqlalchemy.event
+from sqlalchemy import ForeignKey, func, Index, orm
+
+from nummus import sql, utils
+from nummus.models.base import (
+    Base,
+    Decimal6,
+    ORMInt,
+    ORMIntOpt,
+    ORMReal,
+    ORMStrOpt,
+)
+from nummus.models.label import LabelLink
+from nummus.models.transaction import TransactionSplit
+
+if TYPE_CHECKING:
+    import datetime
+    from collections.abc import Iterable, Iterator
+
+    from sqlalchemy.engine import Connection
+
+
+class RollupTotal(NamedTuple):
+    """Total of TransactionSplits in a period, see MonthlyRollup."""
+
+    account_id: int
+    category_id: int
+    payee: str | None
+    label_id: int | None
+    n_splits: int
+    amount: Decimal
+    amount_unlabeled: Decimal
+
+
+# Account.id_, TransactionCategory.id_, payee, and Label.id_ of a total
+_Key = tuple[int, int, str | None, int | None]
+
+
+class MonthlyRollup(Base):
+    """Rollup model for storing monthly totals of TransactionSplits.
+
+    Rows without a label_id total every TransactionSplit in the month, rows with
+    a label_id total only those with that Label. Maintained by SQL triggers on
+    transaction_split and label_link, never written to by the ORM.
+
+    Attributes:
+        month_ord: Date ordinal of the first day of the month
+        account_id: Account unique identifier
+        category_id: TransactionCategory unique identifier
+        payee: Payee of TransactionSplits
+        label_id: Label unique identifier, None for all TransactionSplits
+        n_splits: Number of TransactionSplits
+        amount: Sum of TransactionSplit.amount
+        amount_unlabeled: Sum of TransactionSplit.amount without any Label,
+            zero for rows with a label_id
+
+    """
+
+    __tablename__ = "monthly_rollup"
+    __table_id__ = None
+
+    month_ord: ORMInt
+    account_id: ORMInt = orm.mapped_column(ForeignKey("account.id_"))
+    category_id: ORMInt = orm.mapped_column(ForeignKey("transaction_category.id_"))
+    payee: ORMStrOpt
+    label_id: ORMIntOpt = orm.mapped_column(ForeignKey("label.id_"))
+    n_splits: ORMInt
+    amount: ORMReal = orm.mapped_column(Decimal6)
+    amount_unlabeled: ORMReal = orm.mapped_column(Decimal6)
+
+    __table_args__ = (
+        Index("monthly_rollup_month_ord", "month_ord", "label_id"),
+        Index("monthly_rollup_label_id", "label_id"),
+    )
+
+    @classmethod
+    def get_totals(
+        cls,
+        start: datetime.date | None,
+        end: datetime.date | None,
+        skip_account_ids: Iterable[int],
+        skip_category_ids: Iterable[int],
+    ) -> list[RollupTotal]:
+        """Get the totals of TransactionSplits between dates.
+
+        Whole months are read from the rollup, only the partial months at
+        either end scan TransactionSplits.
+
+        Args:
+            start: First date to include, None for no limit
+            end: Last date to include, None for no limit
+            skip_account_ids: Account.id_ to exclude
+            skip_category_ids: TransactionCategory.id_ to exclude
+
+        Returns:
+            list[RollupTotal] of every (account, category, payee, label)
+
+        """
+        skip_account_ids = set(skip_account_ids)
+        skip_category_ids = set(skip_category_ids)
+
+        # Whole months within [start, end]
+        month_first = None
+        partial: list[tuple[int, int]] = []
+        if start is not None:
+            month_first = utils.start_of_month(start)
+            if month_first != start:
+                month_first = utils.date_add_months(month_first, 1)
+                partial.append((start.toordinal(), month_first.toordinal() - 1))
+        month_last = None
+        if end is not None:
+            month_last = utils.start_of_month(end)
+            if utils.end_of_month(end) != end:
+                partial.append((month_last.toordinal(), end.toordinal()))
+                month_last = utils.date_add_months(month_last, -1)
+
+        parts: list[Iterable[RollupTotal]] = []
+        if month_first is None or month_last is None or month_first <= month_last:
+            parts.append(
+                cls._sum_months(
+                    month_first,
+                    month_last,
+                    skip_account_ids,
+                    skip_category_ids,
+                ),
+            )
+        else:
+            # Range is within one month, join the partial start and end
+            partial = [(partial[0][0], partial[-1][1])]
+        parts.extend(
+            cls._scan_splits(start_ord, end_ord, skip_account_ids, skip_category_ids)
+            for start_ord, end_ord in partial
+        )
+
+        n_splits: dict[_Key, int] = defaultdict(int)
+        amounts: dict[_Key, Decimal] = defaultdict(Decimal)
+        amounts_unlabeled: dict[_Key, Decimal] = defaultdict(Decimal)
+        for total in itertools.chain.from_iterable(parts):
+            key: _Key = (
+                total.account_id,
+                total.category_id,
+                total.payee,
+                total.label_id,
+            )
+            n_splits[key] += total.n_splits
+            amounts[key] += total.amount
+            amounts_unlabeled[key] += total.amount_unlabeled
+
+        return [
+            RollupTotal(*key, n, amounts[key], amounts_unlabeled[key])
+            for key, n in n_splits.items()
+        ]
+
+    @classmethod
+    def _sum_months(
+        cls,
+        month_first: datetime.date | None,
+        month_last: datetime.date | None,
+        skip_account_ids: set[int],
+        skip_category_ids: set[int],
+    ) -> Iterator[RollupTotal]:
+        """Get the totals of whole months from the rollup.
+
+        Args:
+            month_first: First month to include, None for no limit
+            month_last: Last month to include, None for no limit
+            skip_account_ids: Account.id_ to exclude
+            skip_category_ids: TransactionCategory.id_ to exclude
+
+        Returns:
+            RollupTotal of every (account, category, payee, label)
+
+        """
+        query = cls.query(
+            cls.account_id,
+            cls.category_id,
+            cls.payee,
+            cls.label_id,
+            func.sum(cls.n_splits),
+            func.sum(cls.amount),
+            func.sum(cls.amount_unlabeled),
+        ).where(
+            cls.account_id.not_in(skip_account_ids),
+            cls.category_id.not_in(skip_category_ids),
+        )
+        if month_first is not None:
+            query = query.where(cls.month_ord >= month_first.toordinal())
+        if month_last is not None:
+            query = query.where(cls.month_ord <= month_last.toordinal())
+        query = query.group_by(
+            cls.account_id,
+            cls.category_id,
+            cls.payee,
+            cls.label_id,
+        )
+        return itertools.starmap(RollupTotal, sql.yield_(query))
+
+    @classmethod
+    def _scan_splits(
+        cls,
+        start_ord: int,
+        end_ord: int,
+        skip_account_ids: set[int],
+        skip_category_ids: set[int],
+    ) -> Iterator[RollupTotal]:
+        """Get the totals of a partial month from TransactionSplits.
+
+        Args:
+            start_ord: First date ordinal to include
+            end_ord: Last date ordinal to include
+            skip_account_ids: Account.id_ to exclude
+            skip_category_ids: TransactionCategory.id_ to exclude
+
+        Yields:
+            RollupTotal of each TransactionSplit and each of its Labels
+
+        """
+        query = TransactionSplit.query(
+            TransactionSplit.id_,
+            TransactionSplit.account_id,
+            TransactionSplit.category_id,
+            TransactionSplit.payee,
+            TransactionSplit.amount,
+        ).where(
+            TransactionSplit.account_id.not_in(skip_account_ids),
+            TransactionSplit.category_id.not_in(skip_category_ids),
+            TransactionSplit.date_ord >= start_ord,
+            TransactionSplit.date_ord <= end_ord,
+        )
+        splits = sql.to_dict_tuple(query)
+
+        query_labels = LabelLink.query(
+            LabelLink.t_split_id,
+            LabelLink.label_id,
+        ).where(LabelLink.t_split_id.in_(splits))
+        split_labels: dict[int, list[int]] = defaultdict(list)
+        for t_split_id, label_id in sql.yield_(query_labels):
+            split_labels[t_split_id].append(label_id)
+
+        for t_split_id, (acct_id, cat_id, payee, amount) in splits.items():
+            labels = split_labels.get(t_split_id, [])
+            amount_unlabeled = Decimal() if labels else amount
+            yield RollupTotal(acct_id, cat_id, payee, None, 1, amount, amount_unlabeled)
+            for label_id in labels:
+                yield RollupTotal(
+                    acct_id,
+                    cat_id,
+                    payee,
+                    label_id,
+                    1,
+                    amount,
+                    Decimal(),
+                )
+
+
+_COLUMNS = (
+    "month_ord, account_id, category_id, payee, label_id, "
+    "n_splits, amount, amount_unlabeled"
+)
+
+
+def _key(src: str, dst: str = "") -> str:
+    """Get condition that a rollup row matches a TransactionSplit.
+
+    Args:
+        src: Name of TransactionSplit row, such as NEW or an alias
+        dst: Prefix of rollup columns, such as an alias with a dot
+
+    Returns:
+        SQL condition, excluding label_id
+
+    """
+    return (
+        f"{dst}month_ord = {src}.month_ord"
+        f" AND {dst}account_id = {src}.account_id"
+        f" AND {dst}category_id = {src}.category_id"
+        f" AND {dst}payee IS {src}.payee"
+    )
+
+
+def _stmt_split(row: str, sign: str) -> str:
+    """Get statements that add or remove a TransactionSplit row.
+
+    Args:
+        row: NEW or OLD
+        sign: + to add or - to remove
+
+    Returns:
+        SQL statements
+
+    """
+    table = MonthlyRollup.__tablename__
+    key = _key(row)
+    has_labels = (
+        f"EXISTS (SELECT 1 FROM label_link WHERE t_split_id = {row}.id_)"  # noqa: S608
+    )
+    stmt_update = textwrap.dedent(
+        f"""\
+        UPDATE {table}
+        SET
+            n_splits = n_splits {sign} 1,
+            amount = amount {sign} {row}.amount,
+            amount_unlabeled = amount_unlabeled {sign} (
+                CASE WHEN label_id IS NULL AND NOT {has_labels}
+                THEN {row}.amount ELSE 0 END
+            )
+        WHERE {key} AND (
+            label_id IS NULL
+            OR label_id IN (
+                SELECT label_id FROM label_link WHERE t_split_id = {row}.id_
+            )
+        );""",  # noqa: S608
+    )
+    if sign == "-":
+        return f"{stmt_update}\nDELETE FROM {table} WHERE {key} AND n_splits = 0;"
+    return (
+        textwrap.dedent(
+            f"""\
+        INSERT INTO {table} ({_COLUMNS})
+        SELECT
+            {row}.month_ord, {row}.account_id, {row}.category_id, {row}.payee,
+            NULL, 0, 0, 0
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {table} WHERE {key} AND label_id IS NULL
+        );
+        INSERT INTO {table} ({_COLUMNS})
+        SELECT
+            {row}.month_ord, {row}.account_id, {row}.category_id, {row}.payee,
+            ll.label_id, 0, 0, 0
+        FROM label_link AS ll
+        WHERE ll.t_split_id = {row}.id_ AND NOT EXISTS (
+            SELECT 1 FROM {table} WHERE {key} AND label_id = ll.label_id
+        );
+        """,  # noqa: S608
+        )
+        + stmt_update
+    )
+
+
+def _stmt_link(row: str, sign: str, condition: str | None = None) -> str:
+    """Get statements that add or remove a LabelLink row.
+
+    Args:
+        row: NEW or OLD
+        sign: + to add or - to remove
+        condition: Extra condition to move the TransactionSplit in or out of
+            the unlabeled amount, None for always
+
+    Returns:
+        SQL statements
+
+    """
+    table = MonthlyRollup.__tablename__
+    # Triggers can't alias the UPDATE target, qualify with the table name
+    key = _key("ts", f"{table}.")
+    split = f"ts.id_ = {row}.t_split_id"
+    n_links = f"(SELECT count(*) FROM label_link WHERE t_split_id = {row}.t_split_id)"  # noqa: S608
+    # First Label moves TransactionSplit out of unlabeled, last moves it back
+    moved = f"{n_links} = 1" if sign == "+" else f"{n_links} = 0"
+    if condition:
+        moved = f"{moved} AND {condition}"
+    unsign = "-" if sign == "+" else "+"
+    stmts = textwrap.dedent(
+        f"""\
+        UPDATE {table}
+        SET
+            n_splits = {table}.n_splits {sign} 1,
+            amount = {table}.amount {sign} ts.amount
+        FROM transaction_split AS ts
+        WHERE {split} AND {key} AND {table}.label_id = {row}.label_id;
+        UPDATE {table}
+        SET amount_unlabeled = {table}.amount_unlabeled {unsign} ts.amount
+        FROM transaction_split AS ts
+        WHERE {split} AND {key} AND {table}.label_id IS NULL AND {moved};""",  # noqa: S608
+    )
+    if sign == "-":
+        return (
+            f"{stmts}\n"
+            f"DELETE FROM {table} WHERE label_id = {row}.label_id AND n_splits = 0;"
+        )
+    return (
+        textwrap.dedent(
+            f"""\
+            INSERT INTO {table} ({_COLUMNS})
+            SELECT
+                ts.month_ord, ts.account_id, ts.category_id, ts.payee,
+                {row}.label_id, 0, 0, 0
+            FROM transaction_split AS ts
+            WHERE {split} AND NOT EXISTS (
+                SELECT 1 FROM {table} AS r
+                WHERE {_key("ts", "r.")} AND r.label_id = {row}.label_id
+            );
+            """,  # noqa: S608
+        )
+        + stmts
+    )
+
+
+def _trigger(name: str, event: str, table: str, body: str) -> str:
+    """Get CREATE TRIGGER statement.
+
+    Args:
+        name: Name of trigger, prefixed by rollup table
+        event: Trigger event
+        table: Name of table to trigger on
+        body: Trigger statements
+
+    Returns:
+        SQL statement
+
+    """
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {MonthlyRollup.__tablename__}_{name}\n"
+        f"AFTER {event} ON {table}\n"
+        f"BEGIN\n{textwrap.indent(body, '    ')}\nEND"
+    )
+
+
+def _triggers() -> list[tuple[str, str, str, str]]:
+    """Get the triggers maintaining the rollup.
+
+    Returns:
+        list[(name, event, table, body)]
+
+    """
+    moved = "OLD.t_split_id != NEW.t_split_id"
+    return [
+        ("split_insert", "INSERT", "transaction_split", _stmt_split("NEW", "+")),
+        ("split_delete", "DELETE", "transaction_split", _stmt_split("OLD", "-")),
+        (
+            "split_update",
+            "UPDATE OF month_ord, account_id, category_id, payee, amount",
+            "transaction_split",
+            f"{_stmt_split('OLD', '-')}\n{_stmt_split('NEW', '+')}",
+        ),
+        ("link_insert", "INSERT", "label_link", _stmt_link("NEW", "+")),
+        ("link_delete", "DELETE", "label_link", _stmt_link("OLD", "-")),
+        (
+            "link_update",
+            "UPDATE",
+            "label_link",
+            f"{_stmt_link('OLD', '-', moved)}\n{_stmt_link('NEW', '+', moved)}",
+        ),
+    ]
+
+
+def trigger_statements() -> list[str]:
+    """Get statements that create the triggers maintaining the rollup.
+
+    Returns:
+        list[CREATE TRIGGER statement]
+
+    """
+    return list(itertools.starmap(_trigger, _triggers()))
+
+
+def create_triggers(conn: Connection | orm.Session) -> None:
+    """Create triggers that maintain the rollup, skips existing.
+
+    Args:
+        conn: Connection or Session to execute on
+
+    """
+    for stmt in trigger_statements():
+        conn.execute(sqlalchemy.text(stmt))
+
+
+def drop_triggers(conn: Connection | orm.Session) -> None:
+    """Drop triggers that maintain the rollup.
+
+    Triggers on label_link reference transaction_split and block renaming it.
+
+    Args:
+        conn: Connection or Session to execute on
+
+    """
+    for name, *_ in _triggers():
+        stmt = f"DROP TRIGGER IF EXISTS {MonthlyRollup.__tablename__}_{name}"
+        conn.execute(sqlalchemy.text(stmt))
+
+
+def rebuild(conn: Connection | orm.Session) -> None:
+    """Rebuild the rollup from transaction_split and label_link.
+
+    Args:
+        conn: Connection or Session to execute on
+
+    """
+    table = MonthlyRollup.__tablename__
+    conn.execute(sqlalchemy.text(f"DELETE FROM {table}"))  # noqa: S608
+    stmt = textwrap.dedent(
+        f"""\
+        INSERT INTO {table} ({_COLUMNS})
+        SELECT
+            month_ord, account_id, category_id, payee, NULL,
+            count(*),
+            sum(amount),
+            sum(
+                CASE WHEN EXISTS (
+                    SELECT 1 FROM label_link WHERE t_split_id = ts.id_
+                ) THEN 0 ELSE amount END
+            )
+        FROM transaction_split AS ts
+        GROUP BY month_ord, account_id, category_id, payee""",  # noqa: S608
+    )
+    conn.execute(sqlalchemy.text(stmt))
+    stmt = textwrap.dedent(
+        f"""\
+        INSERT INTO {table} ({_COLUMNS})
+        SELECT
+            ts.month_ord, ts.account_id, ts.category_id, ts.payee, ll.label_id,
+            count(*),
+            sum(ts.amount),
+            0
+        FROM transaction_split AS ts
+        JOIN label_link AS ll ON ll.t_split_id = ts.id_
+        GROUP BY
+            ts.month_ord, ts.account_id, ts.category_id, ts.payee,
+            ll.label_id""",  # noqa: S608
+    )
+    conn.execute(sqlalchemy.text(stmt))
+
+
+@sqlalchemy.event.listens_for(Base.metadata, "after_create")
+def create_triggers_after_create(
+    _: sqlalchemy.MetaData,
+    conn: Connection,
+    *,
+    tables: list[sqlalchemy.Table] | None = None,
+    **__: object,
+) -> None:
+    """Create triggers once the rollup table is created.
+
+    Args:
+        conn: Connection tables were created on
+        tables: Tables that were created
+
+    """
+    if tables is None or MonthlyRollup.sql_table() in tables:
+        create_triggers(conn)
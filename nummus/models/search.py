@@ -0,0 +1,359 @@
+"""Full text search index of TransactionSplits."""
+
+from __future__ import annotations
+
+import itertools
+import textwrap
+from typing import TYPE_CHECKING
+
+import sqlalchemy
+import sqlalchemy.event
+
+from nummus.models.base import Base
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import orm
+    from sqlalchemy.engine import Connection
+
+
+FTS_TABLE = "transaction_split_fts"
+
+# Trigram tokens match any substring, like ilike did, but need 3 characters
+_TRIGRAM_LEN = 3
+
+_COLUMNS = ("category", "payee", "memo", "statement", "labels")
+
+# FTS5 virtual table, not part of the ORM metadata
+fts = sqlalchemy.table(
+    FTS_TABLE,
+    sqlalchemy.column("rowid", sqlalchemy.Integer),
+    *(sqlalchemy.column(c, sqlalchemy.String) for c in _COLUMNS),
+)
+# Hidden column named after the table, target of MATCH and bm25
+_fts_all = sqlalchemy.literal_column(FTS_TABLE, sqlalchemy.String())
+
+_SELECT_DOCUMENTS = textwrap.dedent(
+    """\
+    SELECT
+        ts.id_,
+        (SELECT name FROM transaction_category WHERE id_ = ts.category_id),
+        ts.payee,
+        ts.memo,
+        (SELECT statement FROM "transaction" WHERE id_ = ts.parent_id),
+        (
+            SELECT group_concat(label.name, ' ')
+            FROM label_link JOIN label ON label.id_ = label_link.label_id
+            WHERE label_link.t_split_id = ts.id_
+        )
+    FROM transaction_split AS ts""",
+)
+
+
+def _stmt_insert(condition: str | None) -> str:
+    """Get statement that indexes TransactionSplits.
+
+    Args:
+        condition: WHERE condition on ts, None for all
+
+    Returns:
+        SQL statement
+
+    """
+    where = f"\nWHERE {condition}" if condition else ""
+    columns = ", ".join(_COLUMNS)
+    return f"INSERT INTO {FTS_TABLE} (rowid, {columns})\n{_SELECT_DOCUMENTS}{where};"
+
+
+def _stmt_refresh(condition: str) -> str:
+    """Get statements that reindex TransactionSplits.
+
+    Args:
+        condition: WHERE condition on ts
+
+    Returns:
+        SQL statements
+
+    """
+    return (
+        f"DELETE FROM {FTS_TABLE}\n"  # noqa: S608
+        f"WHERE rowid IN (SELECT ts.id_ FROM transaction_split AS ts "
+        f"WHERE {condition});\n{_stmt_insert(condition)}"
+    )
+
+
+def _trigger(name: str, event: str, table: str, body: str) -> str:
+    """Get CREATE TRIGGER statement.
+
+    Args:
+        name: Name of trigger, prefixed by FTS_TABLE
+        event: Trigger event
+        table: Name of table to trigger on
+        body: Trigger statements
+
+    Returns:
+        SQL statement
+
+    """
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_{name}\n"
+        f'AFTER {event} ON "{table}"\n'
+        f"BEGIN\n{textwrap.indent(body, '    ')}\nEND"
+    )
+
+
+# Name, event, table, and body of each trigger
+_TRIGGERS: list[tuple[str, str, str, str]] = [
+    (
+        "split_insert",
+        "INSERT",
+        "transaction_split",
+        _stmt_insert("ts.id_ = NEW.id_"),
+    ),
+    (
+        "split_update",
+        "UPDATE OF category_id, payee, memo, parent_id",
+        "transaction_split",
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id_;\n"  # noqa: S608
+        + _stmt_insert("ts.id_ = NEW.id_"),
+    ),
+    (
+        "split_delete",
+        "DELETE",
+        "transaction_split",
+        f"DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id_;",  # noqa: S608
+    ),
+    (
+        "transaction_update",
+        "UPDATE OF statement",
+        "transaction",
+        _stmt_refresh("ts.parent_id = NEW.id_"),
+    ),
+    (
+        "category_update",
+        "UPDATE OF name",
+        "transaction_category",
+        _stmt_refresh("ts.category_id = NEW.id_"),
+    ),
+    (
+        "label_update",
+        "UPDATE OF name",
+        "label",
+        _stmt_refresh(
+            "ts.id_ IN (SELECT t_split_id FROM label_link WHERE label_id = NEW.id_)",
+        ),
+    ),
+    (
+        "label_link_insert",
+        "INSERT",
+        "label_link",
+        _stmt_refresh("ts.id_ = NEW.t_split_id"),
+    ),
+    (
+        "label_link_update",
+        "UPDATE",
+        "label_link",
+        _stmt_refresh("ts.id_ IN (OLD.t_split_id, NEW.t_split_id)"),
+    ),
+    (
+        "label_link_delete",
+        "DELETE",
+        "label_link",
+        _stmt_refresh("ts.id_ = OLD.t_split_id"),
+    ),
+]
+
+
+def trigger_statements() -> list[str]:
+    """Get statements that create the triggers maintaining the index.
+
+    Returns:
+        list[CREATE TRIGGER statement]
+
+    """
+    return list(itertools.starmap(_trigger, _TRIGGERS))
+
+
+def create(conn: Connection | orm.Session) -> None:
+    """Create index table and the triggers that maintain it, skips existing.
+
+    Args:
+        conn: Connection or Session to execute on
+
+    """
+    columns = ", ".join(_COLUMNS)
+    stmt = (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+        f"USING fts5({columns}, tokenize='trigram')"
+    )
+    conn.execute(sqlalchemy.text(stmt))
+    create_triggers(conn)
+
+
+def create_triggers(conn: Connection | orm.Session) -> None:
+    """Create triggers that maintain the index, skips existing.
+
+    Args:
+        conn: Connection or Session to execute on
+
+    """
+    for stmt in trigger_statements():
+        conn.execute(sqlalchemy.text(stmt))
+
+
+def drop_triggers(conn: Connection | orm.Session) -> None:
+    """Drop triggers that maintain the index.
+
+    Triggers on other tables block renaming a recreated table.
+
+    Args:
+        conn: Connection or Session to execute on
+
+    """
+    for name, *_ in _TRIGGERS:
+        stmt = f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}"
+        conn.execute(sqlalchemy.text(stmt))
+
+
+def rebuild(conn: Connection | orm.Session) -> None:
+    """Rebuild index from transaction_split.
+
+    Args:
+        conn: Connection or Session to execute on
+
+    """
+    conn.execute(sqlalchemy.text(f"DELETE FROM {FTS_TABLE}"))  # noqa: S608
+    conn.execute(sqlalchemy.text(_stmt_insert(None)))
+
+
+def is_index_table(name: str) -> bool:
+    """Test if a table is the index or one of its shadow tables.
+
+    Args:
+        name: Name of table
+
+    Returns:
+        True if table belongs to the index
+
+    """
+    return name == FTS_TABLE or name.startswith(f"{FTS_TABLE}_")
+
+
+def _phrase(token: str) -> str:
+    """Quote a search token as an FTS5 phrase.
+
+    Args:
+        token: Search token
+
+    Returns:
+        FTS5 string
+
+    """
+    return '"' + token.replace('"', '""') + '"'
+
+
+def _like(token: str) -> sqlalchemy.ColumnElement[bool]:
+    """Get a condition that any column contains a token.
+
+    Args:
+        token: Search token, too short for trigrams
+
+    Returns:
+        OR of LIKE conditions
+
+    """
+    return sqlalchemy.or_(
+        *(fts.c[c].icontains(token, autoescape=True) for c in _COLUMNS),
+    )
+
+
+def matches(
+    tokens: Iterable[str],
+    *,
+    match_all: bool,
+) -> sqlalchemy.Select[tuple[int]] | sqlalchemy.CompoundSelect[tuple[int]]:
+    """Get the TransactionSplits whose text contains tokens.
+
+    Args:
+        tokens: Search tokens to find, matching is case insensitive
+        match_all: True requires every token, False requires any token
+
+    Returns:
+        Query of TransactionSplit.id_
+
+    """
+    tokens = set(tokens)
+    long = [_phrase(t) for t in tokens if len(t) >= _TRIGRAM_LEN]
+    short = [_like(t) for t in tokens if len(t) < _TRIGRAM_LEN]
+    join = sqlalchemy.and_ if match_all else sqlalchemy.or_
+    query = sqlalchemy.select(fts.c.rowid)
+    if not long:
+        return query.where(join(*short))
+    fts_query = (" AND " if match_all else " OR ").join(long)
+    query = query.where(_fts_all.match(fts_query))
+    if not short:
+        return query
+    if match_all:
+        return query.where(*short)
+    # MATCH cannot be OR'd with other conditions
+    return sqlalchemy.union(query, sqlalchemy.select(fts.c.rowid).where(*short))
+
+
+def ranks(tokens: Iterable[str]) -> sqlalchemy.Subquery:
+    """Get the TransactionSplits whose text contains any token, ranked by bm25.
+
+    Args:
+        tokens: Search tokens to find, matching is case insensitive
+
+    Returns:
+        Subquery of (rowid, rank), lower rank is a better match
+
+    """
+    tokens = set(tokens)
+    long = [_phrase(t) for t in tokens if len(t) >= _TRIGRAM_LEN]
+    short = [t for t in tokens if len(t) < _TRIGRAM_LEN]
+    queries: list[sqlalchemy.Select[tuple[int, float]]] = []
+    if long:
+        query = sqlalchemy.select(
+            fts.c.rowid,
+            sqlalchemy.func.bm25(_fts_all, type_=sqlalchemy.Float()).label("rank"),
+        ).where(_fts_all.match(" OR ".join(long)))
+        queries.append(query)
+    if short:
+        # No term statistics without MATCH, rank after all bm25 matches
+        query = sqlalchemy.select(
+            fts.c.rowid,
+            sqlalchemy.literal(0.0, sqlalchemy.Float()).label("rank"),
+        ).where(sqlalchemy.or_(*(_like(t) for t in short)))
+        queries.append(query)
+    if len(queries) == 1:
+        return queries[0].subquery()
+    union = sqlalchemy.union_all(*queries).subquery()
+    return (
+        sqlalchemy.select(
+            union.c.rowid,
+            sqlalchemy.func.min(union.c.rank).label("rank"),
+        )
+        .group_by(union.c.rowid)
+        .subquery()
+    )
+
+
+@sqlalchemy.event.listens_for(Base.metadata, "after_create")
+def create_index_after_create(
+    _: sqlalchemy.MetaData,
+    conn: Connection,
+    *,
+    tables: list[sqlalchemy.Table] | None = None,
+    **__: object,
+) -> None:
+    """Create index once the transaction_split table is created.
+
+    Args:
+        conn: Connection tables were created on
+        tables: Tables that were created
+
+    """
+    if tables is None or any(t.name == "transaction_split" for t in tables):
+        create(conn)
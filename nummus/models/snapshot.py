@@ -0,0 +1,257 @@
+"""Snapshot models for storing materialized daily flows."""
+
+from __future__ import annotations
+
+import textwrap
+from typing import TYPE_CHECKING
+
+import sqlalchemy
+import sqlalchemy.event
+from sqlalchemy import ForeignKey, Index, orm, UniqueConstraint
+
+from nummus.models.base import (
+    Base,
+    Decimal6,
+    Decimal9,
+    ORMInt,
+    ORMReal,
+)
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection
+
+
+class CashSnapshot(Base):
+    """Cash snapshot model for storing daily cash flow of an Account by category.
+
+    Rows only exist for days with at least one TransactionSplit. Maintained by
+    SQL triggers on transaction_split, never written to by the ORM. Balance on a
+    day is the sum of flow on or before it, only flow is stored so each split
+    touches a single row.
+
+    Attributes:
+        account_id: Account unique identifier
+        category_id: TransactionCategory unique identifier
+        date_ord: Date ordinal of snapshot
+        n_splits: Number of TransactionSplits on this day
+        flow: Sum of TransactionSplit.amount on this day
+
+    """
+
+    __tablename__ = "cash_snapshot"
+    __table_id__ = None
+
+    account_id: ORMInt = orm.mapped_column(ForeignKey("account.id_"))
+    category_id: ORMInt = orm.mapped_column(ForeignKey("transaction_category.id_"))
+    date_ord: ORMInt
+    n_splits: ORMInt
+    flow: ORMReal = orm.mapped_column(Decimal6)
+
+    __table_args__ = (
+        UniqueConstraint("account_id", "category_id", "date_ord"),
+        Index("cash_snapshot_date_ord", "date_ord"),
+    )
+
+
+class AssetQtySnapshot(Base):
+    """Asset quantity snapshot model for storing daily Asset flow of an Account.
+
+    Rows only exist for days with at least one TransactionSplit. Maintained by
+    SQL triggers on transaction_split, never written to by the ORM. Quantity on a
+    day is the sum of flow on or before it.
+
+    Attributes:
+        account_id: Account unique identifier
+        asset_id: Asset unique identifier
+        date_ord: Date ordinal of snapshot
+        n_splits: Number of TransactionSplits on this day
+        flow: Sum of TransactionSplit.asset_quantity on this day
+
+    """
+
+    __tablename__ = "asset_qty_snapshot"
+    __table_id__ = None
+
+    account_id: ORMInt = orm.mapped_column(ForeignKey("account.id_"))
+    asset_id: ORMInt = orm.mapped_column(ForeignKey("asset.id_"))
+    date_ord: ORMInt
+    n_splits: ORMInt
+    flow: ORMReal = orm.mapped_column(Decimal9)
+
+    __table_args__ = (
+        UniqueConstraint("account_id", "asset_id", "date_ord"),
+        Index("asset_qty_snapshot_date_ord", "date_ord"),
+    )
+
+
+# (table, key column, value column, update columns, where condition)
+_SNAPSHOTS: list[tuple[str, str, str, str, str | None]] = [
+    (
+        CashSnapshot.__tablename__,
+        "category_id",
+        "amount",
+        "amount, account_id, category_id, date_ord",
+        None,
+    ),
+    (
+        AssetQtySnapshot.__tablename__,
+        "asset_id",
+        "asset_quantity",
+        "asset_quantity, account_id, asset_id, date_ord",
+        "{row}.asset_id IS NOT NULL",
+    ),
+]
+
+
+def _stmt_add(table: str, key: str, value: str, row: str) -> str:
+    """Get statement that adds a TransactionSplit row to a snapshot.
+
+    Args:
+        table: Name of snapshot table
+        key: Name of column grouping snapshot alongside account_id
+        value: Name of TransactionSplit column to sum
+        row: NEW or OLD
+
+    Returns:
+        SQL statement
+
+    """
+    return textwrap.dedent(
+        f"""\
+        INSERT INTO {table} (account_id, {key}, date_ord, n_splits, flow)
+        VALUES ({row}.account_id, {row}.{key}, {row}.date_ord, 1, {row}.{value})
+        ON CONFLICT (account_id, {key}, date_ord) DO UPDATE
+        SET n_splits = n_splits + 1, flow = flow + excluded.flow;""",  # noqa: S608
+    )
+
+
+def _stmt_remove(table: str, key: str, value: str, row: str) -> str:
+    """Get statements that remove a TransactionSplit row from a snapshot.
+
+    Args:
+        table: Name of snapshot table
+        key: Name of column grouping snapshot alongside account_id
+        value: Name of TransactionSplit column to sum
+        row: NEW or OLD
+
+    Returns:
+        SQL statements
+
+    """
+    match = f"account_id = {row}.account_id AND {key} = {row}.{key}"
+    return textwrap.dedent(
+        f"""\
+        UPDATE {table}
+        SET n_splits = n_splits - 1, flow = flow - {row}.{value}
+        WHERE {match} AND date_ord = {row}.date_ord;
+        DELETE FROM {table}
+        WHERE {match} AND date_ord = {row}.date_ord AND n_splits = 0;""",  # noqa: S608
+    )
+
+
+def _trigger(name: str, event: str, condition: str | None, body: str) -> str:
+    """Get CREATE TRIGGER statement on transaction_split.
+
+    Args:
+        name: Name of trigger
+        event: Trigger event
+        condition: WHEN condition, None for always
+        body: Trigger statements
+
+    Returns:
+        SQL statement
+
+    """
+    when = f"\nWHEN {condition}" if condition else ""
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {name}\n"
+        f"AFTER {event} ON transaction_split{when}\n"
+        f"BEGIN\n{textwrap.indent(body, '    ')}\nEND"
+    )
+
+
+def trigger_statements() -> list[str]:
+    """Get statements that create the triggers maintaining snapshots.
+
+    Returns:
+        list[CREATE TRIGGER statement]
+
+    """
+    stmts: list[str] = []
+    for table, key, value, columns, condition in _SNAPSHOTS:
+        cond_new = condition and condition.format(row="NEW")
+        cond_old = condition and condition.format(row="OLD")
+        add_new = _stmt_add(table, key, value, "NEW")
+        remove_old = _stmt_remove(table, key, value, "OLD")
+        event = f"UPDATE OF {columns}"
+        stmts.extend(
+            (
+                _trigger(f"{table}_insert", "INSERT", cond_new, add_new),
+                _trigger(f"{table}_delete", "DELETE", cond_old, remove_old),
+            ),
+        )
+        if condition is None:
+            stmts.append(
+                _trigger(f"{table}_update", event, None, f"{remove_old}\n{add_new}"),
+            )
+        else:
+            # Each side of the update might not be an asset transaction
+            stmts.extend(
+                (
+                    _trigger(f"{table}_update_old", event, cond_old, remove_old),
+                    _trigger(f"{table}_update_new", event, cond_new, add_new),
+                ),
+            )
+    return stmts
+
+
+def create_triggers(conn: Connection | orm.Session) -> None:
+    """Create triggers that maintain snapshots, skips existing.
+
+    Args:
+        conn: Connection or Session to execute on
+
+    """
+    for stmt in trigger_statements():
+        conn.execute(sqlalchemy.text(stmt))
+
+
+def rebuild(conn: Connection | orm.Session) -> None:
+    """Rebuild all snapshots from transaction_split.
+
+    Args:
+        conn: Connection or Session to execute on
+
+    """
+    for table, key, value, _, condition in _SNAPSHOTS:
+        where = (
+            f"\nWHERE {condition.format(row='transaction_split')}" if condition else ""
+        )
+        conn.execute(sqlalchemy.text(f"DELETE FROM {table}"))  # noqa: S608
+        stmt = textwrap.dedent(
+            f"""\
+            INSERT INTO {table} (account_id, {key}, date_ord, n_splits, flow)
+            SELECT account_id, {key}, date_ord, count(*), sum({value})
+            FROM transaction_split{where}
+            GROUP BY account_id, {key}, date_ord""",  # noqa: S608
+        )
+        conn.execute(sqlalchemy.text(stmt))
+
+
+@sqlalchemy.event.listens_for(Base.metadata, "after_create")
+def create_triggers_after_create(
+    _: sqlalchemy.MetaData,
+    conn: Connection,
+    *,
+    tables: list[sqlalchemy.Table] | None = None,
+    **__: object,
+) -> None:
+    """Create triggers once the snapshot tables are created.
+
+    Args:
+        conn: Connection tables were created on
+        tables: Tables that were created
+
+    """
+    if tables is None or CashSnapshot.sql_table() in tables:
+        create_triggers(conn)
@@ -2,10 +2,9 @@
 
 from __future__ import annotations
 
+import bisect
 import datetime
-import operator
 import re
-import string
 from collections import defaultdict
 from typing import override, TYPE_CHECKING
 
@@ -15,6 +14,7 @@ from sqlalchemy import CheckConstraint, ForeignKey, Index, orm
 
 from nummus import exceptions as exc
 from nummus import sql, utils
+from nummus.models import search
 from nummus.models.base import (
     Base,
     Decimal6,
@@ -34,8 +34,6 @@ from nummus.models.transaction_category import TransactionCategory
 if TYPE_CHECKING:
     from decimal import Decimal
 
-    from sqlalchemy import Row
-
 
 class TransactionSplit(Base):
     """TransactionSplit model for storing an exchange of cash for an asset (or none).
@@ -98,11 +96,30 @@ class TransactionSplit(Base):
             "amount != 0",
             "transaction_split.amount must be non-zero",
         ),
-        Index("transaction_split_category_id", "category_id"),
         Index("transaction_split_parent_id", "parent_id"),
-        Index("transaction_split_account_id", "account_id"),
-        Index("transaction_split_asset_id", "asset_id"),
         Index("transaction_split_date_ord", "date_ord"),
+        # Composite indexes also serve lookups on their first column
+        # Trailing columns cover the hot queries so they never read the table
+        Index(
+            "transaction_split_account_id_date_ord",
+            "account_id",
+            "date_ord",
+            "amount",
+        ),
+        Index(
+            "transaction_split_category_id_month_ord",
+            "category_id",
+            "month_ord",
+            "account_id",
+            "amount",
+        ),
+        # Most splits have no Asset, leave them out
+        Index(
+            "transaction_split_asset_id_date_ord",
+            "asset_id",
+            "date_ord",
+            sqlite_where=sqlalchemy.text("asset_id IS NOT NULL"),
+        ),
     )
 
     @orm.validates("payee", "memo", "text_fields")
@@ -254,6 +271,9 @@ class TransactionSplit(Base):
     ) -> list[int]:
         """Search TransactionSplit text fields.
 
+        Matches category name, payee, memo, statement, and label names using the
+        full text search index.
+
         Args:
             query: Original query, could be partially filtered
             search_str: String to search
@@ -264,7 +284,6 @@ class TransactionSplit(Base):
             Ordered list of matches, from best to worst
 
         """
-        query = query.join(LabelLink, full=True)
         tokens_must, tokens_can, tokens_not = utils.tokenize_search_str(search_str)
 
         category_names = category_names or TransactionCategory.map_name()
@@ -280,53 +299,50 @@ class TransactionSplit(Base):
         )
         query = cls._search_not(query, tokens_not, category_names_rev, label_names_rev)
 
-        sub_query = query.with_entities(  # nummus: ignore
+        query_ids = query.with_entities(  # nummus: ignore
             TransactionSplit.id_,
-        ).scalar_subquery()
-        query_modified = LabelLink.query(
-            LabelLink.t_split_id,
-            LabelLink.label_id,
-        ).where(LabelLink.t_split_id.in_(sub_query))
-        split_labels: dict[int, set[int]] = defaultdict(set)
-        for t_split_id, label_id in sql.yield_(query_modified):
-            split_labels[t_split_id].add(label_id)
-
-        query_modified = query.with_entities(  # nummus: ignore
-            TransactionSplit.id_,
-            TransactionSplit.date_ord,
-            TransactionSplit.category_id,
-            TransactionSplit.text_fields,
         ).order_by(None)
+        if tokens_can:
+            # Only tokens_can are ranked, bm25 is lower for better matches
+            ranks = search.ranks(tokens_can)
+            query_ids = query_ids.join(ranks, ranks.c.rowid == TransactionSplit.id_)
+            query_ids = query_ids.order_by(ranks.c.rank)
+        # Same rank so sort by newest first
+        query_ids = query_ids.order_by(
+            TransactionSplit.date_ord.desc(),
+            TransactionSplit.id_.desc(),
+        )
+        return [t_split_id for t_split_id, in sql.yield_(query_ids)]
 
-        full_texts: dict[str, list[tuple[int, int]]] = defaultdict(list)
-        for (
-            t_id,
-            date_ord,
-            cat_id,
-            text_fields,
-        ) in sql.yield_(query_modified):
-            full_text = f"{category_names[cat_id]} {text_fields or ''} " + " ".join(
-                label_names[label_id] for label_id in split_labels[t_id]
-            )
-
-            # Clean a bit
-            for s in string.punctuation:
-                full_text = full_text.replace(s, "")
+    @classmethod
+    def _split_key_token(
+        cls,
+        token: str,
+        category_names: dict[str, int],
+        label_names: dict[str, int],
+    ) -> sql.ColumnClause | None:
+        """Get the condition a key:value token matches.
 
-            full_texts[full_text].append((t_id, date_ord))
+        Args:
+            token: Search token with a key
+            category_names: dict{category name: id}
+            label_names: dict{lowercase label name: id}
 
-        # Flatten into list[id, n token matches, date_ord]
-        matches: list[tuple[int, int, int]] = []
-        for full_text, ids in full_texts.items():
-            # No tokens_can should return all so set n to non-zero
-            n = sum(full_text.count(token) for token in tokens_can) if tokens_can else 1
-            if n != 0:
-                for t_id, date_ord in ids:
-                    matches.append((t_id, n, date_ord))
+        Returns:
+            Condition on TransactionSplit or None if key or value is unknown
 
-        # Sort by n token matches then date
-        matches = sorted(matches, key=operator.itemgetter(1, 2), reverse=True)
-        return [item[0] for item in matches]
+        """
+        key, value = token.split(":", maxsplit=1)
+        label_id = label_names.get(value)
+        cat_id = category_names.get(value)
+        if key == "label" and label_id:
+            query = LabelLink.query(LabelLink.t_split_id).where(
+                LabelLink.label_id == label_id,
+            )
+            return TransactionSplit.id_.in_(query.scalar_subquery())
+        if key == "category" and cat_id:
+            return TransactionSplit.category_id == cat_id
+        return None
 
     @classmethod
     def _search_must(
@@ -336,36 +352,18 @@ class TransactionSplit(Base):
         category_names: dict[str, int],
         label_names: dict[str, int],
     ) -> orm.Query[TransactionSplit]:
-        # Add tokens_must as an OR for each category and text_fields
+        # Add tokens_must as an AND
+        tokens_text: set[str] = set()
         for token in tokens_must:
-            if ":" in token:
-                key, value = token.split(":", maxsplit=1)
-                label_id = label_names.get(value)
-                cat_id = category_names.get(value)
-                if key == "label" and label_id:
-                    query = query.where(LabelLink.label_id == label_id)
-                elif key == "category" and cat_id:
-                    query = query.where(TransactionSplit.category_id == cat_id)
-
-                continue
-
-            clauses_or: list[sql.ColumnClause] = []
-            categories = {
-                cat_id
-                for cat_name, cat_id in category_names.items()
-                if token in cat_name
-            }
-            if categories:
-                clauses_or.append(TransactionSplit.category_id.in_(categories))
-            labels = {
-                label_id
-                for label_name, label_id in label_names.items()
-                if token in label_name
-            }
-            if labels:
-                clauses_or.append(LabelLink.label_id.in_(labels))
-            clauses_or.append(TransactionSplit.text_fields.ilike(f"%{token}%"))
-            query = query.where(sqlalchemy.or_(*clauses_or))
+            if ":" not in token:
+                tokens_text.add(token)
+            elif (
+                clause := cls._split_key_token(token, category_names, label_names)
+            ) is not None:
+                query = query.where(clause)
+        if tokens_text:
+            matches = search.matches(tokens_text, match_all=True)
+            query = query.where(TransactionSplit.id_.in_(matches))
         return query
 
     @classmethod
@@ -376,38 +374,18 @@ class TransactionSplit(Base):
         category_names: dict[str, int],
         label_names: dict[str, int],
     ) -> orm.Query[TransactionSplit]:
-        # Add tokens_not as an NAND for each category and text_fields
+        # Add tokens_not as a NOR
+        tokens_text: set[str] = set()
         for token in tokens_not:
-            if ":" in token:
-                key, value = token.split(":", maxsplit=1)
-                label_id = label_names.get(value)
-                cat_id = category_names.get(value)
-                if key == "label" and label_id:
-                    query = query.where(
-                        LabelLink.label_id.is_(None) | (LabelLink.label_id != label_id),
-                    )
-                elif key == "category" and cat_id:
-                    query = query.where(TransactionSplit.category_id != cat_id)
-
-                continue
-
-            categories = {
-                cat_id
-                for cat_name, cat_id in category_names.items()
-                if token in cat_name
-            }
-            if categories:
-                query = query.where(TransactionSplit.category_id.not_in(categories))
-            labels = {
-                label_id
-                for label_name, label_id in label_names.items()
-                if token in label_name
-            }
-            if labels:
-                query = query.where(
-                    LabelLink.label_id.not_in(labels) | LabelLink.label_id.is_(None),
-                )
-            query = query.where(TransactionSplit.text_fields.not_ilike(f"%{token}%"))
+            if ":" not in token:
+                tokens_text.add(token)
+            elif (
+                clause := cls._split_key_token(token, category_names, label_names)
+            ) is not None:
+                query = query.where(sqlalchemy.not_(clause))
+        if tokens_text:
+            matches = search.matches(tokens_text, match_all=False)
+            query = query.where(TransactionSplit.id_.not_in(matches))
         return query
 
 
@@ -498,12 +476,15 @@ class Transaction(Base):
         *,
         cache_ok: bool = True,
         set_property: bool = True,
+        index: SimilarityIndex | None = None,
     ) -> int | None:
         """Find the most similar Transaction.
 
         Args:
             cache_ok: If available, use Transaction.similar_txn_id
             set_property: If match found, set similar_txn_id
+            index: SimilarityIndex to search, None will index only the
+                candidates of this Transaction
 
         Returns:
             Most similar Transaction.id_
@@ -512,143 +493,206 @@ class Transaction(Base):
         if cache_ok and self.similar_txn_id is not None:
             return self.similar_txn_id
 
-        # Similar transaction must be within this range
-        amount_min = min(
-            self.amount * (1 - utils.MATCH_PERCENT),
-            self.amount - utils.MATCH_ABSOLUTE,
-        )
-        amount_max = max(
-            self.amount * (1 + utils.MATCH_PERCENT),
-            self.amount + utils.MATCH_ABSOLUTE,
-        )
+        # An empty index is falsy so compare to None
+        if index is None:
+            index = SimilarityIndex(near=self)
+        id_ = index.find(self)
+        if id_ is not None and set_property:
+            self.similar_txn_id = id_
+        return id_
+
+
+def _amount_band(amount: Decimal) -> tuple[Decimal, Decimal]:
+    """Get the range of amounts a similar Transaction must be within.
+
+    Args:
+        amount: Amount of Transaction
+
+    Returns:
+        (minimum amount, maximum amount)
+
+    """
+    amount_min = min(
+        amount * (1 - utils.MATCH_PERCENT),
+        amount - utils.MATCH_ABSOLUTE,
+    )
+    amount_max = max(
+        amount * (1 + utils.MATCH_PERCENT),
+        amount + utils.MATCH_ABSOLUTE,
+    )
+    return amount_min, amount_max
+
 
-        def set_match(matching_row: int | Row[tuple[int]]) -> int:
-            id_ = matching_row if isinstance(matching_row, int) else matching_row[0]
-            if set_property:
-                self.similar_txn_id = id_
-            return id_
+class SimilarityIndex:
+    """Index of Transactions for finding similar ones without queries.
+
+    Candidates are held sorted by amount so the amount range is a bisect, and
+    grouped by statement so exact matches are a lookup. Transactions added
+    after building are not indexed.
+    """
+
+    def __init__(self, *, near: Transaction | None = None) -> None:
+        """Initialize SimilarityIndex.
+
+        Args:
+            near: Only index the candidates of this Transaction, None for all
+
+        """
+        query = Transaction.query(
+            Transaction.id_,
+            Transaction.account_id,
+            Transaction.amount,
+            Transaction.statement,
+        ).order_by(Transaction.amount, Transaction.id_)
+        if near is not None:
+            amount_min, amount_max = _amount_band(near.amount)
+            query = query.where(
+                sqlalchemy.or_(
+                    Transaction.statement == near.statement,
+                    Transaction.amount.between(amount_min, amount_max),
+                ),
+            )
 
-        # Convert txn.amount to the raw SQL value to make a raw query
-        amount_raw = Transaction.amount.type.process_bind_param(self.amount, None)
-        sort_closest_amount = sqlalchemy.text(f"abs({amount_raw} - amount)")
+        # Parallel lists, sorted by amount
+        self._ids: list[int] = []
+        self._accounts: list[int] = []
+        self._amounts: list[Decimal] = []
+        self._statements: list[str] = []
+        # Positions of each statement
+        self._by_statement: dict[str, list[int]] = defaultdict(list)
+        for i, (t_id, acct_id, amount, statement) in enumerate(sql.yield_(query)):
+            self._ids.append(t_id)
+            self._accounts.append(acct_id)
+            self._amounts.append(amount)
+            self._statements.append(statement)
+            self._by_statement[statement].append(i)
+
+        # {statement: normalized statement}, filled on use
+        self._normalized: dict[str, str] = {}
 
+        # Don't match a Transaction if it has a Securities Traded split
         query = TransactionCategory.query(TransactionCategory.id_).where(
             TransactionCategory.asset_linked.is_(True),
         )
-        cat_asset_linked = {t_cat_id for t_cat_id, in sql.yield_(query)}
-
-        # Check within Account first, exact matches
-        # If this matches, great, no post filtering needed
+        cat_asset_linked = set(sql.col0(query))
         query = (
-            Transaction.query(Transaction.id_)
-            .where(
-                Transaction.account_id == self.account_id,
-                Transaction.id_ != self.id_,
-                Transaction.amount >= amount_min,
-                Transaction.amount <= amount_max,
-                Transaction.statement == self.statement,
-            )
-            .order_by(sort_closest_amount)
+            TransactionSplit.query(TransactionSplit.parent_id)
+            .where(TransactionSplit.category_id.in_(cat_asset_linked))
+            .distinct()
         )
-        row = query.first()
-        if row is not None:
-            return set_match(row)
+        self._asset_linked: set[int] = set(sql.col0(query))
 
-        # Maybe exact statement but different account
-        query = (
-            Transaction.query(Transaction.id_)
-            .where(
-                Transaction.id_ != self.id_,
-                Transaction.amount >= amount_min,
-                Transaction.amount <= amount_max,
-                Transaction.statement == self.statement,
-            )
-            .order_by(sort_closest_amount)
-        )
-        row = query.first()
-        if row is not None:
-            return set_match(row)
+    def __len__(self) -> int:
+        """Get number of indexed Transactions.
 
-        # Maybe exact statement but different amount
-        query = (
-            Transaction.query(Transaction.id_)
-            .where(
-                Transaction.id_ != self.id_,
-                Transaction.statement == self.statement,
-            )
-            .order_by(sort_closest_amount)
+        Returns:
+            Number of indexed Transactions
+
+        """
+        return len(self._ids)
+
+    def _normalize(self, statement: str) -> str:
+        """Normalize a statement for fuzzy matching.
+
+        Args:
+            statement: Statement to normalize
+
+        Returns:
+            statement without digits in lowercase
+
+        """
+        normalized = self._normalized.get(statement)
+        if normalized is None:
+            normalized = re.sub(r"[0-9]+", "", statement).lower()
+            self._normalized[statement] = normalized
+        return normalized
+
+    def _closest(self, positions: list[int], amount: Decimal) -> int:
+        """Get the Transaction closest in amount.
+
+        Args:
+            positions: Positions of candidates
+            amount: Amount to be close to
+
+        Returns:
+            Transaction.id_, lowest on ties
+
+        """
+        i = min(
+            positions,
+            key=lambda i: (abs(self._amounts[i] - amount), self._ids[i]),
         )
-        row = query.first()
-        if row is not None:
-            return set_match(row)
+        return self._ids[i]
+
+    def find(self, txn: Transaction) -> int | None:
+        """Find the most similar Transaction.
+
+        Args:
+            txn: Transaction to find similar one of
+
+        Returns:
+            Most similar Transaction.id_
+
+        """
+        amount_min, amount_max = _amount_band(txn.amount)
+
+        same_statement = [
+            i
+            for i in self._by_statement.get(txn.statement, [])
+            if self._ids[i] != txn.id_
+        ]
+        same_amount = [
+            i for i in same_statement if amount_min <= self._amounts[i] <= amount_max
+        ]
+        for positions in (
+            # Check within Account first, exact matches
+            [i for i in same_amount if self._accounts[i] == txn.account_id],
+            # Maybe exact statement but different account
+            same_amount,
+            # Maybe exact statement but different amount
+            same_statement,
+        ):
+            if positions:
+                return self._closest(positions, txn.amount)
 
         # No statements match, choose highest fuzzy matching statement
-        query = (
-            Transaction.query(
-                Transaction.id_,
-                Transaction.statement,
-            )
-            .where(
-                Transaction.id_ != self.id_,
-                Transaction.amount >= amount_min,
-                Transaction.amount <= amount_max,
-            )
-            .order_by(sort_closest_amount)
-        )
-        statements: dict[int, str] = {
-            t_id: re.sub(r"[0-9]+", "", statement).lower()
-            for t_id, statement in sql.yield_(query)
-        }
-        if len(statements) == 0:
-            return None
-        # Don't match a Transaction if it has a Securities Traded split
-        query = (
-            Transaction.query(TransactionSplit.parent_id)
-            .where(
-                TransactionSplit.parent_id.in_(statements),
-                TransactionSplit.category_id.in_(cat_asset_linked),
-            )
-            .distinct()
-        )
-        has_asset_linked = {id_ for id_, in sql.yield_(query)}
-        statements = {
-            t_id: statement
-            for t_id, statement in statements.items()
-            if t_id not in has_asset_linked
-        }
+        # {normalized statement: [position]}
+        statements: dict[str, list[int]] = defaultdict(list)
+        for i in range(
+            bisect.bisect_left(self._amounts, amount_min),
+            bisect.bisect_right(self._amounts, amount_max),
+        ):
+            t_id = self._ids[i]
+            if t_id == txn.id_ or t_id in self._asset_linked:
+                continue
+            statements[self._normalize(self._statements[i])].append(i)
         if len(statements) == 0:
             return None
+        # Each distinct statement only needs to be scored once
         extracted = process.extract(
-            re.sub(r"[0-9]+", "", self.statement).lower(),
-            statements,
+            self._normalize(txn.statement),
+            list(statements),
             limit=None,
             score_cutoff=utils.SEARCH_THRESHOLD,
         )
         # There are transactions with similar amounts but not close statement
         # Return the closest in amount and account
         # Aka proceed with all matches
-        matches = (
-            dict.fromkeys(statements, 50)
+        matches: dict[int, float] = (
+            {i: 50 for positions in statements.values() for i in positions}
             if len(extracted) == 0
-            else {t_id: score for _, score, t_id in extracted}
+            else {i: score for s, score, _ in extracted for i in statements[s]}
         )
 
         # Add a bonuse points for closeness in price and same account
-        query = Transaction.query(
-            Transaction.id_,
-            Transaction.account_id,
-            Transaction.amount,
-        ).where(Transaction.id_.in_(matches))
-        matches_bonus: dict[int, float] = {}
-        for t_id, acct_id, amount in sql.yield_(query):
+        def score(i: int) -> float:
             # 5% off will reduce score by 5%
-            amount_diff_percent = abs(amount - self.amount) / self.amount
+            amount_diff_percent = abs(self._amounts[i] - txn.amount) / txn.amount
             # Extra 10 points for same account
-            score = matches[t_id] * float(1 - amount_diff_percent) + (
-                10 if acct_id == self.account_id else 0
+            return matches[i] * float(1 - amount_diff_percent) + (
+                10 if self._accounts[i] == txn.account_id else 0
             )
-            matches_bonus[t_id] = score
 
-        # Sort by best score and return best id
-        best_id = min(matches_bonus.items(), key=lambda item: -item[1])[0]
-        return set_match(best_id)
+        # Best score, lowest id on ties
+        best = max(sorted(matches, key=self._ids.__getitem__), key=score)
+        return self._ids[best]
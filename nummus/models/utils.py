@@ -9,16 +9,15 @@ import sqlalchemy
 from sqlalchemy import (
     CheckConstraint,
     ForeignKeyConstraint,
+    orm,
     UniqueConstraint,
 )
+from sqlalchemy.dialects import sqlite
 
 from nummus import sql
 
 if TYPE_CHECKING:
-    from sqlalchemy import (
-        Constraint,
-        orm,
-    )
+    from sqlalchemy import Constraint
 
     from nummus.models.base import Base
 
@@ -120,7 +119,10 @@ def update_rows[T: Base](
     id_key: str,
     updates: dict[object, dict[str, object]],
 ) -> None:
-    """Update many rows, reusing leftovers when possible.
+    """Update many rows with set based statements.
+
+    Rows of query not in updates are deleted, the rest are upserted. Instances
+    of cls already in the session are expired instead of updated one by one.
 
     Args:
         cls: Type of model to update
@@ -129,33 +131,78 @@ def update_rows[T: Base](
         updates: dict{id_value: {parameter: value}}
 
     """
-    updates = updates.copy()
-    leftovers: list[Base] = []
+    s = cls.session()
+    rows = [{id_key: id_, **update} for id_, update in updates.items()]
+    stmt = None
+    if rows:
+        names = set(rows[0])
+        _validate_rows(cls, rows, names)
+        conflict = _unique_columns(cls, id_key, names)
+        stmt = sqlite.insert(cls)
+        set_ = {k: stmt.excluded[k] for k in names.difference(conflict)}
+        stmt = (
+            stmt.on_conflict_do_update(index_elements=conflict, set_=set_)
+            if set_
+            else stmt.on_conflict_do_nothing(index_elements=conflict)
+        )
+
+    query.where(getattr(cls, id_key).not_in([row[id_key] for row in rows])).delete()
+    if stmt is not None:
+        s.execute(stmt, rows)
+
+    # Loaded instances don't see the upsert
+    for obj in list(s.identity_map.values()):
+        if isinstance(obj, cls):
+            s.expire(obj)
+
+
+def _validate_rows(
+    cls: type[Base],
+    rows: list[dict[str, object]],
+    names: set[str],
+) -> None:
+    """Run rows through the model's validators, bulk statements skip them.
 
-    for m in sql.yield_(query):
-        update = updates.pop(getattr(m, id_key), None)
-        if update is None:
-            # No longer needed
-            leftovers.append(m)
-        else:
-            for k, v in update.items():
-                setattr(m, k, v)
+    Args:
+        cls: Type of model
+        rows: Column values of each row, updated in place
+        names: Names of columns being set
 
-    s = cls.session()
+    """
+    validated = names.intersection(orm.class_mapper(cls).validators)
+    if not validated:
+        return
+    # Transient instance is never added to a session
+    obj = cls()
+    for row in rows:
+        for k in validated:
+            setattr(obj, k, row[k])
+            row[k] = getattr(obj, k)
 
-    # Add any missing ones
-    for id_, update in updates.items():
-        if leftovers:
-            m = leftovers.pop(0)
-            setattr(m, id_key, id_)
-            for k, v in update.items():
-                setattr(m, k, v)
-        else:
-            cls.create(**{id_key: id_, **update})
 
-    # Delete any leftovers
-    for m in leftovers:
-        s.delete(m)
+def _unique_columns(cls: type[Base], id_key: str, names: set[str]) -> list[str]:
+    """Get the columns of a unique constraint to upsert on.
+
+    Args:
+        cls: Type of model
+        id_key: Name of property used for identification
+        names: Names of columns being set
+
+    Returns:
+        Column names of the unique constraint that includes id_key
+
+    Raises:
+        ValueError: If there is no unique constraint made of set columns
+
+    """
+    for constraint in cls.sql_table().constraints:
+        if not isinstance(constraint, UniqueConstraint):
+            continue
+        columns = [c.name for c in constraint.columns]
+        if id_key in columns and names.issuperset(columns):
+            return columns
+    msg = f"{cls.__name__} has no unique constraint on {id_key} to upsert on"
+    raise ValueError(msg)
 
 
 def update_rows_list[T: Base](
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import base64
+import concurrent.futures
 import contextlib
 import datetime
 import hashlib
@@ -13,8 +14,11 @@ import secrets
 import shutil
 import sys
 import tarfile
+import time
+from collections import defaultdict
+from decimal import Decimal
 from pathlib import Path
-from typing import NamedTuple, TYPE_CHECKING
+from typing import NamedTuple, TYPE_CHECKING, TypedDict
 
 import sqlalchemy
 import tqdm
@@ -24,23 +28,27 @@ from sqlalchemy import func, orm
 from nummus import exceptions as exc
 from nummus import sql, utils
 from nummus.encryption.top import Encryption, ENCRYPTION_AVAILABLE
-from nummus.importers.top import get_importer, get_importers
+from nummus.importers.top import get_importers, parse_file, parse_files
 from nummus.migrations.top import MIGRATORS
+from nummus.models import data_version, rollup, search, snapshot
 from nummus.models.account import Account
 from nummus.models.asset import Asset
 from nummus.models.base import Base
 from nummus.models.base_uri import Cipher, load_cipher
+from nummus.models.cache import ResultCache
 from nummus.models.config import Config, ConfigKey
 from nummus.models.currency import DEFAULT_CURRENCY
+from nummus.models.data_version import DataVersion
 from nummus.models.imported_file import ImportedFile
 from nummus.models.transaction import Transaction, TransactionSplit
 from nummus.models.transaction_category import TransactionCategory
 from nummus.version import __version__
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Generator, Iterator
 
-    from nummus.importers.base import TxnDict
+    from nummus.importers.base import TxnDict, TxnDicts
+    from nummus.importers.top import ParsedFile
     from nummus.models.base import NamePair
 
 
@@ -54,6 +62,28 @@ class AssetUpdate(NamedTuple):
     error: str | None
 
 
+class _ImportTxn(TypedDict):
+    """Transaction row of an imported transaction."""
+
+    account_id: int
+    amount: Decimal | None
+    date_ord: int
+    month_ord: int
+    statement: str | None
+    payee: str | None
+    cleared: bool
+
+
+class _ImportSplit(TypedDict):
+    """Split specific values of an imported transaction."""
+
+    amount: Decimal
+    memo: str | None
+    category_id: int
+    asset_id: int | None
+    asset_quantity_unadjusted: Decimal | None
+
+
 class Portfolio:
     """A collection of financial records.
 
@@ -62,12 +92,20 @@ class Portfolio:
 
     _ENCRYPTION_TEST_VALUE = "nummus encryption test string"
 
+    # Imported transactions match uncleared ones within this many days
+    _MATCH_DAYS = 5
+
+    # Concurrent web downloads and seconds to wait for each Asset's downloads
+    _UPDATE_WORKERS = 8
+    _UPDATE_TIMEOUT = 60.0
+
     def __init__(
         self,
         path: str | Path,
         key: str | None,
         *,
         check_migration: bool = True,
+        engine_profile: sql.EngineProfile | None = None,
     ) -> None:
         """Initialize Portfolio.
 
@@ -75,6 +113,7 @@ class Portfolio:
             path: Path to database file
             key: String password to unlock database encryption
             check_migration: True will check if migration is required
+            engine_profile: Connection settings, None for defaults
 
         Raises:
             FileNotFoundError: If database does not exist
@@ -97,7 +136,12 @@ class Portfolio:
         else:
             msg = f"Portfolio at {self._path_db} does not have salt file"
             raise FileNotFoundError(msg)
-        self._session_maker = orm.sessionmaker(self.get_engine())
+        self._engine_profile = engine_profile
+        self._result_cache = ResultCache()
+        self._engine = self.get_engine()
+        self._session_maker = orm.sessionmaker(self._engine)
+        data_version.listen(self._session_maker)
+        self._result_cache.listen(self._session_maker)
         configs = self._unlock()
 
         self._importers = get_importers(self._path_importers)
@@ -199,6 +243,8 @@ class Portfolio:
                 Base.metadata_create_all()
 
             with s.begin():
+                DataVersion.add_default()
+
                 # If developing a migration, current version will be less
                 # Set new portfolio to max of nummus version and Migrator.all()
                 v = max(
@@ -220,6 +266,12 @@ class Portfolio:
         with p.begin_session():
             TransactionCategory.add_default()
             Asset.add_indices()
+        with p.begin_session() as s:
+            # Empty tables get no statistics so the planner keeps its defaults
+            s.execute(sqlalchemy.text("ANALYZE"))
+        with p.begin_session() as s:
+            # Pack the schema like clean would so a new portfolio is compact
+            s.execute(sqlalchemy.text("VACUUM"))
         return p
 
     def _unlock(self) -> dict[ConfigKey, str]:
@@ -272,7 +324,7 @@ class Portfolio:
             Engine
 
         """
-        return sql.get_engine(self._path_db, self._enc)
+        return sql.get_engine(self._path_db, self._enc, self._engine_profile)
 
     @contextlib.contextmanager
     def begin_session(self) -> Iterator[orm.Session]:
@@ -353,19 +405,37 @@ class Portfolio:
                 return v_m
         return None
 
-    def import_file(self, path: Path, path_debug: Path, *, force: bool = False) -> None:
+    def parse_files(self, paths: list[Path]) -> Generator[ParsedFile]:
+        """Parse files to import in parallel worker processes.
+
+        Args:
+            paths: Paths to files to import
+
+        Returns:
+            ParsedFile for each path, in order, to pass to import_file
+
+        """
+        return parse_files(paths, self._path_importers)
+
+    def import_file(
+        self,
+        path: Path,
+        path_debug: Path,
+        *,
+        force: bool = False,
+        parsed: ParsedFile | None = None,
+    ) -> None:
         """Import a file into the Portfolio.
 
         Args:
             path: Path to file to import
             path_debug: Path to temporary debug file
             force: True will not check for already imported files
+            parsed: Result of parse_files for path, None will parse now
 
         Raises:
             FileAlreadyImportedError: If file has already been imported
             FutureTransactionError: If transaction date is in the future
-            FailedImportError: If importer encounters an error
-            EmptyImportError: If importer returns no transactions
 
         """
         # Compute hash of file contents to check if already imported
@@ -384,7 +454,7 @@ class Portfolio:
                 date = datetime.date.fromordinal(existing_date_ord)
                 raise exc.FileAlreadyImportedError(date, path)
 
-            i = get_importer(path, path_debug, self._importers)
+            txns_raw = self._parse_import(path, path_debug, parsed)
             today = datetime.datetime.now(datetime.UTC).date()
 
             categories = TransactionCategory.map_name()
@@ -393,12 +463,7 @@ class Portfolio:
             # Cache a mapping from account/asset name to the ID
             acct_mapping: dict[str, NamePair] = {}
             asset_mapping: dict[str, NamePair] = {}
-            try:
-                txns_raw = i.run()
-            except Exception as e:
-                raise exc.FailedImportError(path, i) from e
-            if not txns_raw:
-                raise exc.EmptyImportError(path, i)
+            txns: list[tuple[TxnDict, int, int | None]] = []
             for d in txns_raw:
                 if d["date"] > today:
                     raise exc.FutureTransactionError
@@ -414,7 +479,9 @@ class Portfolio:
                     if not d["statement"]:
                         d["statement"] = f"Asset Transaction {asset_name}"
 
-                self._import_transaction(d, acct_id, asset_id, categories)
+                txns.append((d, acct_id, asset_id))
+
+            self._import_transactions(txns, categories)
 
             # Add file hash to prevent importing again
             ImportedFile.create(hash_=h)
@@ -429,71 +496,255 @@ class Portfolio:
         # If successful, delete the temp file
         path_debug.unlink()
 
-    def _import_transaction(
+    def _parse_import(
         self,
-        d: TxnDict,
-        acct_id: int,
-        asset_id: int | None,
+        path: Path,
+        path_debug: Path,
+        parsed: ParsedFile | None,
+    ) -> TxnDicts:
+        """Parse a file to import and check the importer's result.
+
+        Args:
+            path: Path to file to import
+            path_debug: Path to temporary debug file
+            parsed: Result of parse_files for path, None will parse now
+
+        Returns:
+            Transactions parsed from the file
+
+        Raises:
+            UnknownImporterError: If an importer cannot be found
+            EmptyImportError: If importer returns no transactions
+
+        """
+        if parsed is None:
+            parsed = parse_file(path, self._importers)
+        path_debug.write_bytes(parsed.debug)
+        if parsed.importer is None:
+            raise exc.UnknownImporterError(path)
+        if parsed.error is not None:
+            e = exc.FailedImportError(path, parsed.importer)
+            # Keep importer traceback from worker for logs
+            e.add_note(parsed.error)
+            raise e
+        if not parsed.txns:
+            raise exc.EmptyImportError(path, parsed.importer)
+        return parsed.txns
+
+    @classmethod
+    def _import_transactions(
+        cls,
+        txns: list[tuple[TxnDict, int, int | None]],
         categories: dict[str, int],
     ) -> None:
-        if asset_id is not None:
-            self._import_asset_transaction(d, acct_id, asset_id, categories)
-            return
+        """Import transactions in bulk.
 
-        # See if anything matches
-        date_ord = d["date"].toordinal()
-        query = Transaction.query(Transaction.id_, Transaction.date_ord).where(
-            Transaction.account_id == acct_id,
-            Transaction.amount == d["amount"],
-            Transaction.date_ord >= date_ord - 5,
-            Transaction.date_ord <= date_ord + 5,
-            Transaction.cleared.is_(False),
-        )
-        matches = sorted(sql.yield_(query), key=lambda x: abs(x[1] - date_ord))
-        # If only one match on closest day, link transaction
-        if len(matches) == 1 or (len(matches) > 1 and matches[0][1] != matches[1][1]):
-            match_id = matches[0][0]
-            statement_clean = Transaction.clean_strings("statement", d["statement"])
-            Transaction.query().where(Transaction.id_ == match_id).update(
-                {
-                    "cleared": True,
-                    "statement": statement_clean,
-                },
+        Uncleared transactions that could match are fetched in one query and
+        matched in memory. New transactions are inserted with executemany.
+
+        Args:
+            txns: list[(imported transaction, Account.id_, Asset.id_ or None)]
+            categories: dict{category name: TransactionCategory.id_}
+
+        """
+        s = Base.session()
+        candidates = cls._import_candidates(txns)
+
+        # {Transaction.id_: cleaned statement}
+        matched: dict[int, str | None] = {}
+        new_txns: list[_ImportTxn] = []
+        new_splits: list[list[dict[str, object]]] = []
+        for d, acct_id, asset_id in txns:
+            if asset_id is None:
+                date_ord = d["date"].toordinal()
+                amount = Transaction.clean_decimals("amount", d["amount"])
+                options = candidates[acct_id, amount]
+                matches = sorted(
+                    (c for c in options if abs(c[1] - date_ord) <= cls._MATCH_DAYS),
+                    key=lambda x: abs(x[1] - date_ord),
+                )
+                # If only one match on closest day, link transaction
+                if len(matches) == 1 or (
+                    len(matches) > 1 and matches[0][1] != matches[1][1]
+                ):
+                    # Linked transactions are cleared so can't match again
+                    options.remove(matches[0])
+                    matched[matches[0][0]] = Transaction.clean_strings(
+                        "statement",
+                        d["statement"],
+                    )
+                    continue
+
+                category_name = (d["category"] or "uncategorized").lower()
+                category_id = categories.get(category_name, categories["uncategorized"])
+                txn_amount = d["amount"]
+                splits: list[_ImportSplit] = [
+                    {
+                        "amount": d["amount"],
+                        "memo": d["memo"],
+                        "category_id": category_id,
+                        "asset_id": None,
+                        "asset_quantity_unadjusted": None,
+                    },
+                ]
+            else:
+                txn_amount, splits = cls._import_asset_splits(d, asset_id, categories)
+
+            txn = cls._import_txn_row(d, acct_id, txn_amount)
+            new_txns.append(txn)
+            new_splits.append([cls._import_split_row(txn, split) for split in splits])
+
+        if matched:
+            s.execute(
+                sqlalchemy.update(Transaction),
+                [
+                    {"id_": t_id, "cleared": True, "statement": statement}
+                    for t_id, statement in matched.items()
+                ],
             )
             TransactionSplit.query().where(
-                TransactionSplit.parent_id == match_id,
+                TransactionSplit.parent_id.in_(matched),
             ).update({"cleared": True})
+
+        if not new_txns:
             return
+        stmt = sqlalchemy.insert(Transaction).returning(
+            Transaction.id_,
+            sort_by_parameter_order=True,
+        )
+        t_ids = s.execute(stmt, new_txns).scalars()
+        split_rows: list[dict[str, object]] = []
+        for t_id, rows in zip(t_ids, new_splits, strict=True):
+            for row in rows:
+                row["parent_id"] = t_id
+                split_rows.append(row)
+        s.execute(sqlalchemy.insert(TransactionSplit), split_rows)
 
-        category_name = (d["category"] or "uncategorized").lower()
-        try:
-            category_id = categories[category_name]
-        except KeyError:
-            category_id = categories["uncategorized"]
-
-        txn = Transaction.create(
-            account_id=acct_id,
-            amount=d["amount"],
-            date=d["date"],
-            statement=d["statement"],
-            payee=d["payee"],
-            cleared=True,
+    @classmethod
+    def _import_candidates(
+        cls,
+        txns: list[tuple[TxnDict, int, int | None]],
+    ) -> dict[tuple[int, Decimal], list[tuple[int, int]]]:
+        """Get uncleared transactions that could match imported transactions.
+
+        Args:
+            txns: list[(imported transaction, Account.id_, Asset.id_ or None)]
+
+        Returns:
+            dict{(Account.id_, amount): list[(Transaction.id_, date ordinal)]}
+
+        """
+        candidates: dict[tuple[int, Decimal], list[tuple[int, int]]] = defaultdict(
+            list,
         )
-        TransactionSplit.create(
-            parent=txn,
-            amount=d["amount"],
-            memo=d["memo"],
-            category_id=category_id,
+        cash_txns = [(d, acct_id) for d, acct_id, asset_id in txns if asset_id is None]
+        if not cash_txns:
+            return candidates
+        date_ords = [d["date"].toordinal() for d, _ in cash_txns]
+        query = Transaction.query(
+            Transaction.id_,
+            Transaction.account_id,
+            Transaction.amount,
+            Transaction.date_ord,
+        ).where(
+            Transaction.account_id.in_({acct_id for _, acct_id in cash_txns}),
+            Transaction.date_ord >= min(date_ords) - cls._MATCH_DAYS,
+            Transaction.date_ord <= max(date_ords) + cls._MATCH_DAYS,
+            Transaction.cleared.is_(False),
         )
+        for t_id, acct_id, amount, date_ord in sql.yield_(query):
+            candidates[acct_id, amount].append((t_id, date_ord))
+        return candidates
 
     @classmethod
-    def _import_asset_transaction(
+    def _import_txn_row(
         cls,
         d: TxnDict,
         acct_id: int,
-        asset_id: int | None,
+        amount: Decimal,
+    ) -> _ImportTxn:
+        """Build a Transaction row for bulk insert.
+
+        Args:
+            d: Imported transaction
+            acct_id: Account.id_ of transaction
+            amount: Amount of transaction
+
+        Returns:
+            Row of column values, validated like Transaction.create
+
+        """
+        return {
+            "account_id": acct_id,
+            "amount": Transaction.clean_decimals("amount", amount),
+            "date_ord": d["date"].toordinal(),
+            "month_ord": utils.start_of_month(d["date"]).toordinal(),
+            "statement": Transaction.clean_strings("statement", d["statement"]),
+            "payee": Transaction.clean_strings("payee", d["payee"]),
+            "cleared": True,
+        }
+
+    @classmethod
+    def _import_split_row(
+        cls,
+        txn: _ImportTxn,
+        split: _ImportSplit,
+    ) -> dict[str, object]:
+        """Build a TransactionSplit row for bulk insert.
+
+        Args:
+            txn: Row of parent Transaction
+            split: Split specific values
+
+        Returns:
+            Row of column values, validated like TransactionSplit.create
+            parent_id to be filled in after parent is inserted
+
+        """
+        memo = TransactionSplit.clean_strings("memo", split["memo"])
+        qty = TransactionSplit.clean_decimals(
+            "_asset_qty_unadjusted",
+            split["asset_quantity_unadjusted"],
+        )
+        text_fields = " ".join(f for f in [txn["payee"], memo] if f).lower()
+        return {
+            "amount": TransactionSplit.clean_decimals("amount", split["amount"]),
+            "memo": memo,
+            "text_fields": TransactionSplit.clean_strings("text_fields", text_fields),
+            "category_id": split["category_id"],
+            "date_ord": txn["date_ord"],
+            "month_ord": txn["month_ord"],
+            "payee": txn["payee"],
+            "cleared": txn["cleared"],
+            "account_id": txn["account_id"],
+            "asset_id": split["asset_id"],
+            "asset_quantity": qty,
+            "_asset_qty_unadjusted": qty,
+        }
+
+    @classmethod
+    def _import_asset_splits(
+        cls,
+        d: TxnDict,
+        asset_id: int,
         categories: dict[str, int],
-    ) -> None:
+    ) -> tuple[Decimal, list[_ImportSplit]]:
+        """Build the splits of an imported asset transaction.
+
+        Args:
+            d: Imported transaction
+            asset_id: Asset.id_ of transaction
+            categories: dict{category name: TransactionCategory.id_}
+
+        Returns:
+            (Transaction amount, list[split specific values])
+
+        Raises:
+            MissingAssetError: If transaction is missing asset quantity
+            InvalidAssetTransactionCategoryError: If category is not valid for
+                an asset transaction
+
+        """
         category_name = (d["category"] or "uncategorized").lower()
         if category_name == "investment fees":
             # Associate fees with asset
@@ -504,85 +755,62 @@ class Portfolio:
                 raise exc.MissingAssetError(msg)
             qty = abs(qty)
 
-            txn = Transaction.create(
-                account_id=acct_id,
-                amount=0,
-                date=d["date"],
-                statement=d["statement"],
-                payee=d["payee"],
-                cleared=True,
-            )
-            TransactionSplit.create(
-                parent=txn,
-                amount=amount,
-                memo=d["memo"],
-                category_id=categories["securities traded"],
-                asset_id=asset_id,
-                asset_quantity_unadjusted=-qty,
-            )
-            TransactionSplit.create(
-                parent=txn,
-                amount=-amount,
-                memo=d["memo"],
-                category_id=categories["investment fees"],
-                asset_id=asset_id,
-                asset_quantity_unadjusted=0,
-            )
-            return
+            return Decimal(), [
+                {
+                    "amount": amount,
+                    "memo": d["memo"],
+                    "category_id": categories["securities traded"],
+                    "asset_id": asset_id,
+                    "asset_quantity_unadjusted": -qty,
+                },
+                {
+                    "amount": -amount,
+                    "memo": d["memo"],
+                    "category_id": categories["investment fees"],
+                    "asset_id": asset_id,
+                    "asset_quantity_unadjusted": Decimal(),
+                },
+            ]
         if category_name == "dividends received":
             # Associate dividends with asset
             amount = abs(d["amount"])
             qty = d["asset_quantity"]
-            if qty is None or asset_id is None:
+            if qty is None:
                 msg = "Dividends Received needs Asset and quantity"
                 raise exc.MissingAssetError(msg)
             qty = abs(qty)
 
-            txn = Transaction.create(
-                account_id=acct_id,
-                amount=0,
-                date=d["date"],
-                statement=d["statement"],
-                payee=d["payee"],
-                cleared=True,
-            )
-            TransactionSplit.create(
-                parent=txn,
-                amount=amount,
-                memo=d["memo"],
-                category_id=categories["dividends received"],
-                asset_id=asset_id,
-                asset_quantity_unadjusted=0,
-            )
+            splits: list[_ImportSplit] = [
+                {
+                    "amount": amount,
+                    "memo": d["memo"],
+                    "category_id": categories["dividends received"],
+                    "asset_id": asset_id,
+                    "asset_quantity_unadjusted": Decimal(),
+                },
+            ]
             if qty != 0:
                 # Zero quantity means cash dividends, not reinvested
-                TransactionSplit.create(
-                    parent=txn,
-                    amount=-amount,
-                    memo=d["memo"],
-                    category_id=categories["securities traded"],
-                    asset_id=asset_id,
-                    asset_quantity_unadjusted=qty,
+                splits.append(
+                    {
+                        "amount": -amount,
+                        "memo": d["memo"],
+                        "category_id": categories["securities traded"],
+                        "asset_id": asset_id,
+                        "asset_quantity_unadjusted": qty,
+                    },
                 )
-            return
+            return Decimal(), splits
         if category_name == "securities traded":
-            txn = Transaction.create(
-                account_id=acct_id,
-                amount=d["amount"],
-                date=d["date"],
-                statement=d["statement"],
-                payee=d["payee"],
-                cleared=True,
-            )
-            TransactionSplit.create(
-                parent=txn,
-                amount=d["amount"],
-                memo=d["memo"],
-                category_id=categories[category_name],
-                asset_id=asset_id,
-                asset_quantity_unadjusted=d["asset_quantity"],
-            )
-            return
+            return d["amount"], [
+                {
+                    "amount": d["amount"],
+                    "memo": d["memo"],
+                    "category_id": categories[category_name],
+                    "asset_id": asset_id,
+                    "asset_quantity_unadjusted": d["asset_quantity"],
+                },
+            ]
 
         msg = f"'{category_name}' is not a valid category for asset transaction"
         raise exc.InvalidAssetTransactionCategoryError(msg)
@@ -607,6 +835,10 @@ class Portfolio:
 
         path_backup = self._path_db.with_suffix(f".backup{tar_ver}.tar")
 
+        # Move any committed changes out of the write-ahead log
+        with self.begin_session() as s:
+            s.execute(sqlalchemy.text("PRAGMA wal_checkpoint(TRUNCATE)"))
+
         with tarfile.open(path_backup, "w") as tar:
             files: list[Path] = [self._path_db]
 
@@ -686,12 +918,13 @@ class Portfolio:
 
         # Prune unused AssetValuations
         with self.begin_session() as s:
-            for asset in Asset.all():
-                asset.prune_valuations()
-                asset.autodetect_interpolate()
+            Asset.prune_valuations_all()
+            Asset.autodetect_interpolate_all()
 
         # Optimize database
         with self.begin_session() as s:
+            # Refresh statistics the query planner picks indexes with
+            s.execute(sqlalchemy.text("ANALYZE"))
             s.execute(sqlalchemy.text("VACUUM"))
 
         path_backup_optimized, _ = self.backup()
@@ -763,6 +996,9 @@ class Portfolio:
                 msg = f"Backup is missing required files: {missing}"
                 raise exc.InvalidBackupTarError(msg)
 
+            if isinstance(p, Portfolio):
+                # Pooled connections would still point to the deleted file
+                p._engine.dispose()  # noqa: SLF001
             cls.delete_files(path_db)
             for member in members:
                 if member.path == "_timestamp":
@@ -825,22 +1061,40 @@ class Portfolio:
         """
         path_db.unlink(missing_ok=True)
         path_db.with_suffix(".nacl").unlink(missing_ok=True)
+        # Write-ahead log files
+        path_db.with_name(f"{path_db.name}-wal").unlink(missing_ok=True)
+        path_db.with_name(f"{path_db.name}-shm").unlink(missing_ok=True)
 
         path = path_db.with_suffix(".importers")
         if path.exists() and not path.is_symlink():
             shutil.rmtree(path)
 
-    def update_assets(self, *, no_bars: bool = False) -> list[AssetUpdate]:
+    def update_assets(
+        self,
+        *,
+        no_bars: bool = False,
+        max_workers: int | None = None,
+        timeout: float | None = None,
+        full: bool = False,
+    ) -> list[AssetUpdate]:
         """Update asset valuations using web sources.
 
+        Downloads run concurrently in threads, the database is only written from
+        the calling thread.
+
         Args:
             no_bars: True disables progress bars
+            max_workers: Maximum number of concurrent downloads, None for default
+            timeout: Seconds to wait for all downloads, None for default
+            full: True will download full histories instead of the missing tails
 
         Returns:
             Assets that were updated
             [AssetUpdate for each]
 
         """
+        max_workers = max_workers or self._UPDATE_WORKERS
+        timeout = timeout or self._UPDATE_TIMEOUT
         today = datetime.datetime.now(datetime.UTC).date()
         today_ord = today.toordinal()
         updated: list[AssetUpdate] = []
@@ -863,25 +1117,77 @@ class Portfolio:
                     if acct_assets[a_id][0] != 0:
                         currently_held_assets.add(a_id)
 
-            bar = tqdm.tqdm(assets, desc="Updating Assets", disable=no_bars)
-            for asset in bar:
-                name = asset.name
-                ticker = asset.ticker or ""
-                asset.update_sectors()
-                try:
-                    start, end = asset.update_valuations(
-                        through_today=asset.id_ in currently_held_assets,
+            ranges = [
+                asset.valuation_range(
+                    through_today=asset.id_ in currently_held_assets,
+                )
+                for asset in assets
+            ]
+
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+            try:
+                futures = [
+                    (
+                        executor.submit(Asset.fetch_sectors, asset.ticker or ""),
+                        (
+                            None
+                            if date_range is None
+                            else executor.submit(
+                                Asset.fetch_history,
+                                asset.ticker or "",
+                                datetime.date.fromordinal(
+                                    asset.history_start(date_range[0], full=full),
+                                ),
+                            )
+                        ),
                     )
-                except exc.AssetWebError as e:
-                    updated.append(AssetUpdate(name, ticker, None, None, str(e)))
-                else:
-                    if start is not None:
+                    for asset, date_range in zip(assets, ranges, strict=True)
+                ]
+
+                # A single deadline for all downloads, not one per Asset
+                deadline = time.monotonic() + timeout
+                not_done_sectors = concurrent.futures.wait(
+                    [f for f, _ in futures],
+                    timeout=timeout,
+                ).not_done
+                not_done_history = concurrent.futures.wait(
+                    [f for _, f in futures if f is not None],
+                    timeout=max(0, deadline - time.monotonic()),
+                ).not_done
+
+                bar = tqdm.tqdm(
+                    zip(assets, ranges, futures, strict=True),
+                    total=len(assets),
+                    desc="Updating Assets",
+                    disable=no_bars,
+                )
+                for asset, date_range, (f_sectors, f_history) in bar:
+                    name = asset.name
+                    ticker = asset.ticker or ""
+                    if f_sectors in not_done_sectors or f_history in not_done_history:
+                        msg = f"Timed out after {timeout}s"
+                        updated.append(AssetUpdate(name, ticker, None, None, msg))
+                        continue
+                    try:
+                        asset.apply_sectors(f_sectors.result())
+                        if date_range is None or f_history is None:
+                            # No transactions for the Asset
+                            continue
+                        start, end = asset.apply_history(
+                            *date_range,
+                            f_history.result(),
+                        )
+                    except exc.AssetWebError as e:
+                        updated.append(AssetUpdate(name, ticker, None, None, str(e)))
+                    else:
                         updated.append(AssetUpdate(name, ticker, start, end, None))
-                    # start & end are None if there are no transactions for the Asset
+            finally:
+                # Threads can't be killed, downloads still running end on the
+                # request timeout of yfinance and their results are dropped
+                executor.shutdown(wait=False, cancel_futures=True)
 
             # Auto update if asset needs interpolation
-            for asset in Asset.all():
-                asset.autodetect_interpolate()
+            Asset.autodetect_interpolate_all()
 
         return updated
 
@@ -911,7 +1217,13 @@ class Portfolio:
         exclude_tables = {"config"}
 
         def filter_(tables: list[sqlalchemy.Table]) -> list[sqlalchemy.Table]:
-            return [table for table in tables if table.name not in exclude_tables]
+            # Virtual tables can't be recreated from reflection, rebuilt afterwards
+            return [
+                table
+                for table in tables
+                if table.name not in exclude_tables
+                and not search.is_index_table(table.name)
+            ]
 
         with engine_src.connect() as conn_src, engine_dst.connect() as conn_dst:
             metadata_src = sqlalchemy.MetaData()
@@ -949,6 +1261,12 @@ class Portfolio:
                         conn_dst.execute(statement.values(row))
                         bar.update()
 
+            # Reflection does not copy triggers, create after rows are copied
+            snapshot.create_triggers(conn_dst)
+            rollup.create_triggers(conn_dst)
+            search.create_triggers(conn_dst)
+            search.rebuild(conn_dst)
+
             conn_dst.commit()
 
         # Use new encryption key
@@ -958,12 +1276,16 @@ class Portfolio:
         dst.change_web_key(value)
 
         # Move new database into existing
+        self._engine.dispose()
         shutil.copyfile(dst.path, self.path)
         shutil.copyfile(dst.path_salt, self.path_salt)
 
         # Test unlock
         self._enc = dst._enc  # noqa: SLF001
-        self._session_maker = orm.sessionmaker(self.get_engine())
+        self._engine = self.get_engine()
+        self._session_maker = orm.sessionmaker(self._engine)
+        data_version.listen(self._session_maker)
+        self._result_cache.listen(self._session_maker)
         self._unlock()
 
         # And delete temporary
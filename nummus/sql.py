@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 import base64
+import functools
+import os
 import sys
+import weakref
 from collections.abc import Sequence
-from typing import overload, TYPE_CHECKING
+from typing import NamedTuple, overload, TYPE_CHECKING
 
 import sqlalchemy
 import sqlalchemy.event
@@ -27,6 +30,13 @@ except ImportError:
 
 _ENGINE_ARGS: dict[str, object] = {}
 
+# Engines with pooled connections, a forked child can't reuse these
+_ENGINES: weakref.WeakSet[sqlalchemy.engine.Engine] = weakref.WeakSet()
+
+JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
 Column = (
     orm.InstrumentedAttribute[str]
     | orm.InstrumentedAttribute[str | None]
@@ -53,33 +63,141 @@ def set_sqlite_pragma(db_connection: sqlite3.Connection, *_) -> None:
     cursor.close()
 
 
+class EngineProfile(NamedTuple):
+    """Connection settings of an Engine, None keeps the SQLite default."""
+
+    journal_mode: str | None = None
+    synchronous: str | None = None
+    mmap_size: int | None = None
+    cache_size: int | None = None
+    temp_store: str | None = None
+    # Number of connections to keep open, each skips the key derivation
+    pool_size: int | None = None
+
+    def validate(self) -> None:
+        """Validate settings.
+
+        Raises:
+            ValueError: If a setting is not valid
+
+        """
+        checks: list[tuple[str, str | None, set[str]]] = [
+            ("journal_mode", self.journal_mode, JOURNAL_MODES),
+            ("synchronous", self.synchronous, SYNCHRONOUS_MODES),
+            ("temp_store", self.temp_store, TEMP_STORES),
+        ]
+        for name, value, options in checks:
+            if value is not None and value.upper() not in options:
+                msg = f"Invalid {name} '{value}', expected one of {sorted(options)}"
+                raise ValueError(msg)
+        if self.pool_size is not None and self.pool_size < 1:
+            msg = f"Invalid pool_size {self.pool_size}, must be positive"
+            raise ValueError(msg)
+
+    def pragmas(self) -> list[str]:
+        """Get PRAGMA statements to apply to each connection.
+
+        Returns:
+            list of PRAGMA statements
+
+        """
+        pragmas: list[str] = []
+        if self.journal_mode is not None:
+            pragmas.append(f"PRAGMA journal_mode={self.journal_mode.upper()}")
+        if self.synchronous is not None:
+            pragmas.append(f"PRAGMA synchronous={self.synchronous.upper()}")
+        if self.mmap_size is not None:
+            pragmas.append(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        if self.cache_size is not None:
+            pragmas.append(f"PRAGMA cache_size={int(self.cache_size)}")
+        if self.temp_store is not None:
+            pragmas.append(f"PRAGMA temp_store={self.temp_store.upper()}")
+        return pragmas
+
+
+# Read heavy web serving with many workers
+WEB_ENGINE_PROFILE = EngineProfile(
+    journal_mode="WAL",
+    synchronous="NORMAL",
+    mmap_size=2**28,
+    cache_size=-(2**14),  # negative is in KiB
+    temp_store="MEMORY",
+    pool_size=4,
+)
+
+
+def _set_profile_pragma(
+    pragmas: list[str],
+    db_connection: sqlite3.Connection,
+    *_,
+) -> None:
+    """Set PRAGMA of an EngineProfile upon opening SQLite connection.
+
+    Args:
+        pragmas: PRAGMA statements to execute
+        db_connection: Connection to SQLite DB
+
+    """
+    cursor = db_connection.cursor()
+    for pragma in pragmas:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def _dispose_engines() -> None:
+    """Drop pooled connections inherited from the parent process."""
+    for engine in list(_ENGINES):
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):  # pragma: no branch
+    os.register_at_fork(after_in_child=_dispose_engines)
+
+
 def get_engine(
     path: Path,
     enc: EncryptionInterface | None = None,
+    profile: EngineProfile | None = None,
 ) -> sqlalchemy.engine.Engine:
     """Get sqlalchemy Engine to the database.
 
     Args:
         path: Path to database file
         enc: Encryption object storing the key
+        profile: Connection settings, None for defaults
 
     Returns:
         sqlalchemy.Engine
 
     """
+    profile = profile or EngineProfile()
+    profile.validate()
+    engine_args = dict(_ENGINE_ARGS)
+    if profile.pool_size is not None and "poolclass" not in engine_args:
+        # File databases use a QueuePool by default
+        engine_args["pool_size"] = profile.pool_size
+
     # Cannot support in-memory DB cause every transaction closes it
     if enc is not None:
         db_key = base64.urlsafe_b64encode(enc.hashed_key).decode()
         sep = "//" if path.is_absolute() else "/"
         db_path = f"sqlite+pysqlcipher://:{db_key}@{sep}{path}"
-        engine = sqlalchemy.create_engine(db_path, module=sqlcipher3, **_ENGINE_ARGS)
+        engine = sqlalchemy.create_engine(db_path, module=sqlcipher3, **engine_args)
     else:
         db_path = (
             f"sqlite:///{path}"
             if sys.platform == "win32" or not path.is_absolute()
             else f"sqlite:////{path}"
         )
-        engine = sqlalchemy.create_engine(db_path, **_ENGINE_ARGS)
+        engine = sqlalchemy.create_engine(db_path, **engine_args)
+
+    if pragmas := profile.pragmas():
+        sqlalchemy.event.listen(
+            engine,
+            "connect",
+            functools.partial(_set_profile_pragma, pragmas),
+        )
+    _ENGINES.add(engine)
     return engine
 
 
@@ -0,0 +1,3592 @@
+"use strict";
+
+"use strict";
+const accounts = {
+  chart: null,
+  /**
+   * Create Account Chart
+   *
+   * @param {Object} raw Raw data from accounts controller
+   */
+  update: function (raw) {
+    const cf = newCurrencyFormat(raw.currency_format);
+    const labels = raw.labels;
+    const dateMode = raw.mode;
+    const avg = raw.avg.map((v) => Number(v));
+    const costBasis = raw.cost_basis.map((v) => Number(v));
+    const minLine = avg.map((v, i) => Math.min(v, costBasis[i]));
+
+    const canvas = htmx.find("#account-chart-canvas");
+    const ctx = canvas.getContext("2d");
+    const datasets = [
+      {
+        label: "Balance",
+        type: "line",
+        data: avg,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+        fill: {
+          target: 1, // cost basis
+          aboveRaw: ["primary-container", "80"],
+          belowRaw: ["error-container", "80"],
+        },
+      },
+      {
+        label: "Cost Basis",
+        type: "line",
+        data: costBasis,
+        borderColorRaw: "outline",
+        backgroundColorRaw: ["tertiary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+      },
+      {
+        type: "line",
+        data: minLine,
+        borderWidth: 0,
+        pointRadius: 0,
+        hoverRadius: 0,
+        fill: {
+          target: "origin",
+          aboveRaw: ["tertiary-container", "80"],
+          belowRaw: ["error-container", "80"],
+        },
+      },
+    ];
+    if (this.chart && ctx == this.chart.ctx) {
+      nummusChart.update(this.chart, cf, labels, dateMode, datasets);
+    } else {
+      this.ctx = ctx;
+      this.chart = nummusChart.create(
+        ctx,
+        cf,
+        labels,
+        dateMode,
+        datasets,
+        null,
+        {
+          plugins: {
+            tooltip: {
+              callbacks: {
+                footer: function (context) {
+                  let profit = context[0].raw - context[1].raw;
+                  return (
+                    "Return: " +
+                    context[0].chart.config.options.currencyFormat(profit)
+                  );
+                },
+              },
+            },
+          },
+        },
+      );
+    }
+  },
+  /**
+   * Show remaining assets
+   *
+   * @param {Element} btn Triggering button
+   */
+  showAllAssets: function (btn) {
+    htmx.addClass(btn, "hidden");
+    htmx.removeClass(htmx.find("#account-assets-all"), "hidden");
+  },
+  /**
+   * On click of delete account, confirm action
+   *
+   * @param {Event} evt Triggering event
+   */
+  confirmDelete: function (evt) {
+    dialog.confirm(
+      "Delete account",
+      "Delete",
+      () => {
+        htmx.trigger(evt.target, "delete");
+      },
+      "Empty account will be deleted.",
+    );
+  },
+};
+
+"use strict";
+const allocation = {
+  chartCategory: null,
+  chartSector: null,
+  /**
+   * Create Allocation Chart
+   *
+   * @param {Object} raw Raw data from allocation controller
+   */
+  update: function (raw) {
+    const cf = newCurrencyFormat(raw.currency_format);
+    const categories = raw.categories;
+    const sectors = raw.sectors;
+
+    const categoryTree = {};
+    const categoryEntries = Object.entries(categories);
+    categoryEntries.forEach(([category, assets], i) => {
+      categoryTree[category] = {};
+      assets.forEach((asset) => {
+        categoryTree[category][asset.name] = {
+          category: category,
+          name: asset.name,
+          ticker: asset.ticker,
+          value: Number(asset.value),
+        };
+      });
+    });
+
+    const sectorTree = {};
+    const sectorEntries = Object.entries(sectors);
+    sectorEntries.forEach(([sector, assets], i) => {
+      sectorTree[sector] = {};
+      assets.forEach((asset) => {
+        sectorTree[sector][asset.name] = {
+          sector: sector,
+          name: asset.name,
+          ticker: asset.ticker,
+          weight: Number(asset.weight) * 100,
+          value: Number(asset.value),
+        };
+      });
+    });
+
+    {
+      const canvas = htmx.find("#category-chart-canvas");
+      const ctx = canvas.getContext("2d");
+      const datasets = [
+        {
+          key: "value",
+          groups: [0, "name"],
+          tree: categoryTree,
+          treeLeafKey: "name",
+          borderWidth: 2,
+          spacing: 2,
+          borderRadius: function (context) {
+            if (!context.raw) {
+              return 0;
+            }
+            const zoom = context.chart.getZoomLevel();
+            const size = Math.min(context.raw.w, context.raw.h) * zoom;
+            return Math.min(8, size * 0.2);
+          },
+        },
+      ];
+      if (this.chartCategory) {
+        this.chartCategory.destroy();
+      }
+      this.chartCategory = nummusChart.createTree(ctx, cf, datasets);
+    }
+
+    {
+      const canvas = htmx.find("#sector-chart-canvas");
+      const ctx = canvas.getContext("2d");
+      const datasets = [
+        {
+          key: "value",
+          groups: [0, "name"],
+          tree: sectorTree,
+          treeLeafKey: "name",
+          borderWidth: 2,
+          spacing: 2,
+          borderRadius: function (context) {
+            if (!context.raw) {
+              return 0;
+            }
+            const zoom = context.chart.getZoomLevel();
+            const size = Math.min(context.raw.w, context.raw.h) * zoom;
+            return Math.min(8, size * 0.2);
+          },
+        },
+      ];
+      if (this.chartSector) {
+        this.chartSector.destroy();
+      }
+      const callbacks = {
+        label: function (context) {
+          const obj = context.raw._data;
+          const sector = obj[0];
+          const label = obj.name || sector;
+          const value = cf(obj.value);
+          if (obj.name) {
+            const weight = sectorTree[sector][obj.name].weight;
+            return `${label} (${weight.toFixed(2)}%): ${value}`;
+          }
+          return `${label}: ${value}`;
+        },
+      };
+      this.chartSector = nummusChart.createTree(ctx, cf, datasets, null, {
+        plugins: { tooltip: { callbacks: callbacks } },
+      });
+    }
+  },
+};
+
+"use strict";
+const assets = {
+  chart: null,
+  /**
+   * Create Asset Chart
+   *
+   * @param {Object} raw Raw data from assets controller
+   */
+  update: function (raw) {
+    const cf = newCurrencyFormat(raw.currency_format);
+    const labels = raw.labels;
+    const dateMode = raw.mode;
+    const avg = raw.avg.map((v) => Number(v));
+    const min = raw.min && raw.min.map((v) => Number(v));
+    const max = raw.max && raw.max.map((v) => Number(v));
+
+    const canvas = htmx.find("#asset-chart-canvas");
+    const ctx = canvas.getContext("2d");
+    const datasets = [];
+    if (min == null) {
+      datasets.push({
+        label: "Value",
+        type: "line",
+        data: avg,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+        fill: {
+          target: "origin",
+          aboveRaw: ["primary-container", "80"],
+          belowRaw: ["error-container", "80"],
+        },
+      });
+    } else {
+      // Plot average as a line and fill between min/max
+      datasets.push({
+        label: "Average",
+        type: "line",
+        data: avg,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+      });
+      datasets.push({
+        label: "Max",
+        type: "line",
+        data: max,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        borderWidth: 0,
+        pointRadius: 0,
+        hoverRadius: 0,
+        fill: 2,
+      });
+      datasets.push({
+        label: "Min",
+        type: "line",
+        data: min,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        borderWidth: 0,
+        pointRadius: 0,
+        hoverRadius: 0,
+      });
+    }
+    if (this.chart && ctx == this.chart.ctx) {
+      nummusChart.update(this.chart, cf, labels, dateMode, datasets);
+    } else {
+      this.ctx = ctx;
+      this.chart = nummusChart.create(ctx, cf, labels, dateMode, datasets);
+    }
+  },
+  /**
+   * On change of period select, hide or show date input
+   */
+  changeTablePeriod: function () {
+    const select = htmx.find("#valuation-filters [name='period']");
+    const notCustom = select.value != "custom";
+    htmx.findAll("#valuation-filters [type='date']").forEach((e) => {
+      e.disabled = notCustom;
+    });
+  },
+  /**
+   * On click of delete asset, confirm action
+   *
+   * @param {Event} evt Triggering event
+   */
+  confirmDelete: function (evt) {
+    dialog.confirm(
+      "Delete asset",
+      "Delete",
+      () => {
+        htmx.trigger(evt.target, "delete");
+      },
+      "Empty asset will be deleted.",
+    );
+  },
+  /**
+   * On click of delete valuation, confirm action
+   *
+   * @param {Event} evt Triggering event
+   */
+  confirmDeleteValuation: function (evt) {
+    dialog.confirm(
+      "Delete valuation",
+      "Delete",
+      () => {
+        htmx.trigger(evt.target, "delete");
+      },
+      "Valuation will be deleted.",
+    );
+  },
+};
+
+"use strict";
+const budgeting = {
+  editing: false,
+  sidebarChart: null,
+  table: null,
+  isGroup: false,
+  dragItem: null,
+  dragItemHeight: null,
+  staticItems: [],
+  staticItemsY: [],
+  initialScroll: null,
+  doScroll: 0,
+  initialMouseX: null,
+  initialMouseY: null,
+  mouseOffsetX: null,
+  mouseOffsetY: null,
+  isDragging: false,
+  currentURI: null,
+  barOn: true,
+  barHeight: null,
+  barTranslate: 0,
+  bar: null,
+  isTouch: false,
+  /**
+   * Set up budgeting drag listeners
+   */
+  setupDrag() {
+    this.table = htmx.find("#budget-table");
+
+    this.dragStartBound = this.dragStart.bind(this);
+    this.dragEndBound = this.dragEnd.bind(this);
+    htmx.on(this.table, "mousedown", this.dragStartBound);
+    htmx.on(this.table, "touchstart", this.dragStartBound);
+    htmx.on("mouseup", this.dragEndBound);
+    htmx.on("touchend", this.dragEndBound);
+  },
+  /**
+   * On click, record initial positions and such
+   *
+   * @param {Event} evt Triggering event
+   */
+  dragStart(evt) {
+    const target = evt.target;
+    if (!target.matches(".budget-drag")) {
+      // Not a handle, ignore mouse up
+      return;
+    }
+    // Don't scroll on mobile
+    if (evt.type == "touchstart") {
+      this.isTouch = true;
+      evt.preventDefault();
+    }
+    if (target.matches(".budget-category, .budget-category *")) {
+      this.isGroup = false;
+      this.dragItem = target.closest(".budget-category");
+      this.staticItems = Array.from(
+        htmx.findAll(".budget-group>label, .budget-category"),
+      );
+    } else {
+      this.isGroup = true;
+      this.dragItem = target.closest(".budget-group");
+      this.staticItems = Array.from(
+        htmx.findAll(".budget-group:not(#group-ungrouped)"),
+      );
+    }
+
+    let firstGroup = true;
+    this.staticItems = this.staticItems.filter((e) => {
+      if (e == this.dragItem) return false;
+      if (this.isGroup || !firstGroup) return true;
+      if (e.matches("label")) {
+        firstGroup = false;
+        return false;
+      }
+      return true;
+    });
+
+    // Set position attribute
+    htmx.findAll(".budget-category").forEach((e, i) => {
+      e.setAttribute("position", i);
+    });
+    htmx.findAll(".budget-group").forEach((e, i) => {
+      e.setAttribute("position", i);
+    });
+
+    // Record initial position
+    const evtX = evt.clientX ?? evt.targetTouches[0].clientX;
+    const evtY = evt.clientY ?? evt.targetTouches[0].clientY;
+    const rect = this.dragItem.getBoundingClientRect();
+    this.mouseOffsetX = evtX - rect.x;
+    this.mouseOffsetY = evtY - rect.y;
+    this.initialMouseX = evtX;
+    this.initialMouseY = evtY;
+    this.initialScroll = window.scrollY;
+    this.dragItemHeight = rect.height;
+
+    // Make nothing selectable
+    htmx.addClass(this.table, "select-none");
+
+    this.dragStartTestBound = this.dragStartTest.bind(this);
+    htmx.on(this.isTouch ? "touchmove" : "mousemove", this.dragStartTestBound, {
+      passive: false,
+    });
+  },
+  /**
+   * Once mouse moves enough, actually start dragging
+   *
+   * @param {Event} evt Triggering event
+   */
+  dragStartTest(evt) {
+    const evtX = evt.clientX ?? evt.targetTouches[0].clientX;
+    const evtY = evt.clientY ?? evt.targetTouches[0].clientY;
+    const dx = evtX - this.initialMouseX;
+    const dy =
+      evtY - this.initialMouseY + (window.scrollY - this.initialScroll);
+    const delta = Math.sqrt(dx * dx + dy * dy);
+
+    if (delta < 10) {
+      return;
+    }
+    htmx.off("mousemove", this.dragStartTestBound);
+    htmx.off("touchmove", this.dragStartTestBound);
+    this.dragStartTestBound = null;
+
+    htmx.addClass(this.dragItem, "budget-dragging");
+
+    this.isDragging = true;
+
+    const scrollY = window.scrollY;
+    if (this.isGroup) {
+      htmx.findAll(".budget-group-items").forEach((e) => {
+        htmx.addClass(e, "hidden");
+      });
+    }
+    const dyScroll = window.scrollY - scrollY;
+    this.initialScroll += dyScroll;
+
+    // After toggling open, compute initial location
+    const rect = this.dragItem.getBoundingClientRect();
+    this.initialMouseX = rect.x + this.mouseOffsetX;
+    this.initialMouseY = rect.y + this.mouseOffsetY;
+    this.dragItemHeight = rect.height;
+
+    this.staticItems.forEach((e, i) => {
+      const rect = e.getBoundingClientRect();
+      // Center of dragItem
+      this.staticItemsY[i] = rect.y + rect.height / 2;
+    });
+
+    this.drag(evt);
+
+    // Add move listener
+    this.dragBound = this.drag.bind(this);
+    htmx.on(this.isTouch ? "touchmove" : "mousemove", this.dragBound, {
+      passive: false,
+    });
+  },
+  doScrollFrame() {
+    if (!this.doScroll) return;
+    window.scrollBy(0, this.doScroll);
+    requestAnimationFrame(this.doScrollFrame.bind(this));
+  },
+  /**
+   * On mouse move, translate rows
+   *
+   * @param {Event} evt Triggering event
+   */
+  drag(evt) {
+    const evtX = evt.clientX ?? evt.targetTouches[0].clientX;
+    const evtY = evt.clientY ?? evt.targetTouches[0].clientY;
+    if (evt.type == "touchmove") {
+      evt.preventDefault();
+      const prevDoScroll = this.doScroll;
+      const th = 150;
+      if (evtY < th) this.doScroll = (evtY - th) * 2;
+      else if (evtY > window.innerHeight - th)
+        this.doScroll = evtY - window.innerHeight + th;
+      else this.doScroll = 0;
+
+      if (this.doScroll && !prevDoScroll)
+        requestAnimationFrame(this.doScrollFrame.bind(this));
+    }
+    const offsetX = evtX - this.initialMouseX;
+    const scrollY = window.scrollY - this.initialScroll;
+    const offsetY = evtY - this.initialMouseY + scrollY;
+    this.dragItem.style.transform = `translate(${offsetX}px, ${offsetY}px)`;
+
+    const dragItemYTop = evtY - this.mouseOffsetY + scrollY;
+    const dragItemYBot = dragItemYTop + this.dragItemHeight;
+
+    this.staticItems.forEach((e, i) => {
+      const initialY = this.staticItemsY[i];
+      let offset = 0;
+      if (offsetY > 0) {
+        if (initialY < dragItemYBot && initialY > this.initialMouseY) {
+          // dragItem is going down
+          // and e is between initial and new positions
+          // so move e up
+          offset = -this.dragItemHeight;
+          e.setAttribute("reorder", "up");
+        } else {
+          e.setAttribute("reorder", "");
+        }
+      } else {
+        if (initialY > dragItemYTop && initialY < this.initialMouseY) {
+          // dragItem is going up
+          // and e is between initial and new positions
+          // so move e down
+          offset = this.dragItemHeight;
+          e.setAttribute("reorder", "down");
+        } else {
+          e.setAttribute("reorder", "");
+        }
+      }
+      e.style.transform = `translateY(${offset}px)`;
+    });
+  },
+  /**
+   * On mouse release, move rows and submit PUT
+   *
+   * @param {Event} evt Triggering event
+   */
+  dragEnd(evt) {
+    if (!this.isDragging) {
+      this.cleanUpDrag();
+      return;
+    }
+    let anyMoved = false;
+    // Get the final state and submit
+    let lastChange = null;
+    let invalid = false;
+    const movedUp = Array.from(
+      htmx.findAll(
+        `.budget-${this.isGroup ? "group" : "category"}:not(.budget-dragging)[reorder="up"]`,
+      ),
+    );
+    const movedDown = Array.from(
+      htmx.findAll(
+        `.budget-${this.isGroup ? "group" : "category"}:not(.budget-dragging)[reorder="down"]`,
+      ),
+    );
+    const groupLabelsMovedUp = Array.from(
+      htmx.findAll('.budget-group>label:not(.budget-dragging)[reorder="up"]'),
+    );
+    const groupLabelsMovedDown = Array.from(
+      htmx.findAll('.budget-group>label:not(.budget-dragging)[reorder="down"]'),
+    );
+
+    let items = null;
+    let before = null;
+    if (movedUp.length) {
+      // Insert dragItem after last one
+      let last = movedUp[movedUp.length - 1];
+      items = last.parentNode;
+      before = last.nextElementSibling;
+      if (groupLabelsMovedUp.length) {
+        // Groups also moved see if the last one to move is different from last's group
+        const group =
+          groupLabelsMovedUp[groupLabelsMovedUp.length - 1].parentNode;
+        if (group != last.closest(".budget-group")) {
+          items = htmx.find(group, ".budget-group-items");
+          before = items.firstChild;
+        }
+      }
+    } else if (movedDown.length) {
+      // Insert dragItem before first one
+      const first = movedDown[0];
+      items = first.parentNode;
+      before = first;
+      if (groupLabelsMovedDown.length) {
+        const group = groupLabelsMovedDown[0].parentNode;
+        const prevGroup = group.previousElementSibling;
+        if (
+          prevGroup &&
+          !htmx.find(prevGroup, '.budget-category:not([reorder=""])')
+        ) {
+          // previous to first moved group had no changes
+          // move dragItem to end of prevGroup
+          items = htmx.find(prevGroup, ".budget-group-items");
+          before = null;
+        }
+      }
+    } else if (groupLabelsMovedUp.length) {
+      // Insert dragItem at top of last one's items
+      items =
+        groupLabelsMovedUp[groupLabelsMovedUp.length - 1].nextElementSibling;
+      before = items.firstChild;
+    } else if (groupLabelsMovedDown.length) {
+      // Insert dragItem at bottom of previous one's items
+      const prevGroup =
+        groupLabelsMovedDown[0].parentNode.previousElementSibling;
+      if (prevGroup) {
+        items = htmx.find(prevGroup, ".budget-group-items");
+        before = null;
+      }
+    }
+
+    if (!items) {
+      // Nothing moved
+      this.cleanUpDrag();
+      return;
+    }
+    try {
+      items.insertBefore(this.dragItem, before);
+    } catch (error) {
+      // There's a bug with self-ancestor
+      // Hard to catch so add context to error next time it shows up
+      console.error(this.dragItem, items, before);
+      console.error(error);
+    }
+
+    // Add group input on each row
+    htmx.findAll(".budget-category").forEach((e, i) => {
+      const group = e.closest(".budget-group");
+      const groupURI = group.id.slice(6);
+
+      const inputGroup = document.createElement("input");
+      inputGroup.name = "group";
+      inputGroup.type = "text";
+      inputGroup.value = groupURI;
+      inputGroup.hidden = true;
+      e.append(inputGroup);
+    });
+    htmx.trigger("#budget-table", "reorder");
+    this.cleanUpDrag();
+  },
+  /**
+   * Clean up dragging listeners
+   */
+  cleanUpDrag() {
+    // Remove styles and listeners
+    this.staticItems.forEach((e) => {
+      e.style.transform = "";
+    });
+    this.staticItems.length = 0;
+    this.isTouch = false;
+    this.doScroll = 0;
+
+    if (this.dragBound) {
+      htmx.off("mousemove", this.dragBound);
+      htmx.off("touchmove", this.dragBound);
+      this.dragBound = null;
+    }
+    if (this.dragStartTestBound) {
+      htmx.off("mousemove", this.dragStartTestBound);
+      htmx.off("touchmove", this.dragStartTestBound);
+      this.dragStartTestBound = null;
+    }
+
+    htmx.findAll(".budget-group-items").forEach((e) => {
+      htmx.removeClass(e, "hidden");
+    });
+
+    if (this.dragItem) {
+      this.dragItem.style.transform = "";
+      htmx.removeClass(this.dragItem, "budget-dragging");
+      // Scroll drag item back into view if uncollapsing groups
+      if (this.isGroup) this.dragItem.scrollIntoView({ block: "center" });
+      this.dragItem = null;
+    }
+
+    htmx.removeClass(this.table, "select-none");
+
+    htmx.findAll('.budget-category>input[name="group"]').forEach((e) => {
+      htmx.remove(e);
+    });
+
+    this.isDragging = false;
+  },
+  /**
+   * Create budgeting sidebar Chart
+   *
+   * @param {Number} assigned Amount of money assigned to target
+   * @param {Number} targetAmount Full target amount
+   * @param {Boolean} onTrack True if target is on track
+   * @param {Object} currencyFormat See Python side: Currency
+   */
+  update(assigned, targetAmount, onTrack, currencyFormat) {
+    const cf = newCurrencyFormat(currencyFormat);
+    const remaining = targetAmount - assigned;
+    const percent = Math.min(100, (assigned / targetAmount) * 100);
+
+    const canvas = htmx.find("#budget-sidebar-canvas");
+    const ctx = canvas.getContext("2d");
+    const datasets = [
+      {
+        name: "Assigned",
+        amount: assigned,
+        borderColorRaw: "primary",
+        backgroundColorRaw: "primary-container",
+      },
+    ];
+    if (remaining > 0) {
+      datasets.push({
+        name: "Remaining",
+        amount: remaining,
+        borderColorRaw: "tertiary",
+        backgroundColorRaw: "tertiary-container",
+      });
+    }
+    if (this.sidebarChart && ctx == this.sidebarChart.ctx) {
+      nummusChart.updatePie(
+        this.sidebarChart,
+        cf,
+        datasets,
+        `${percent.toFixed(0)}%`,
+      );
+    } else {
+      this.sidebarChart = nummusChart.createPie(ctx, cf, datasets, null, {
+        plugins: { doughnutText: { text: `${percent.toFixed(0)}%` } },
+        animations: false,
+      });
+    }
+  },
+  /**
+   * Update group open state from checkbox
+   *
+   * @param {Element} e Checkbox input element
+   * @param {String} uri URI of group to update
+   */
+  openGroup(e, uri) {
+    // do nothing during edit
+    if (this.editing) return;
+
+    htmx.trigger(e, "send-state");
+    const isOpen = e.checked;
+    if (isOpen) {
+      htmx.addClass(htmx.find(`#group-${uri}`), "open");
+    } else {
+      htmx.removeClass(htmx.find(`#group-${uri}`), "open");
+    }
+  },
+  /**
+   * On click of category, activate assigned input
+   *
+   * @param {Element} e Category element
+   * @param {Event} evt Triggering event
+   */
+  onClickCategory(e, evt) {
+    // do nothing during edit
+    if (this.editing) return;
+
+    if (!e) {
+      if (
+        this.currentURI &&
+        (!evt || !evt.target.matches(".budget-category, .budget-category * "))
+      ) {
+        // Click was not on a category, deactivate
+        htmx.removeClass(
+          htmx.find(`#category-${this.currentURI}`),
+          "budget-category-active",
+        );
+        this.currentURI = null;
+        this.updateBar(false);
+        nav.setOverrideBarOff(true);
+      }
+
+      return;
+    }
+
+    if (window.screen.width < 768) {
+      // for small, activate budget-bar
+      const uri = e.id.slice(9);
+      if (this.currentURI == uri) {
+        this.currentURI = null;
+        this.updateBar(false);
+        nav.setOverrideBarOff(true);
+        htmx.removeClass(e, "budget-category-active");
+      } else {
+        if (this.currentURI) {
+          htmx.removeClass(
+            htmx.find(`#category-${this.currentURI}`),
+            "budget-category-active",
+          );
+        }
+        htmx.find("#budget-button-bar input").value = uri;
+        this.currentURI = uri;
+        this.updateBar(true);
+        nav.setOverrideBarOff();
+        htmx.addClass(e, "budget-category-active");
+      }
+
+      return;
+    }
+    // for larger, activate sidebar
+    htmx.trigger(e, "sidebar");
+  },
+  /**
+   * Update bar translate
+   *
+   * @param {Boolean} on true show the bar
+   */
+  updateBar(on) {
+    this.barOn = on;
+
+    if (this.bar == null) this.bar = htmx.find("#budget-button-bar");
+    if (this.barHeight == null) {
+      const rect = this.bar.getBoundingClientRect();
+      this.barHeight = rect.height;
+    }
+
+    this.barTranslate = on ? 0 : this.barHeight * 1.1;
+    this.bar.style.translate = `0 ${this.barTranslate}px`;
+  },
+  /**
+   * On click of delete target, confirm action
+   *
+   * @param {Event} evt Triggering event
+   */
+  confirmDelete(evt) {
+    dialog.confirm(
+      "Delete target",
+      "Delete",
+      () => {
+        htmx.trigger(evt.target, "delete");
+      },
+      "Target will be deleted.",
+    );
+  },
+  /**
+   * On click of move bar button, trigger the category
+   */
+  onBarMove() {
+    const e = htmx.find(`#category-${this.currentURI} .hx-assign`);
+    htmx.trigger(e, "button");
+  },
+  /**
+   * On click of target bar button, trigger the category
+   */
+  onBarTarget() {
+    const e = htmx.find(`#category-${this.currentURI} .hx-target`);
+    htmx.trigger(e, "button");
+  },
+  /**
+   * Reset budgeting JS states
+   */
+  reset() {
+    this.bar = null;
+    if (this.currentURI) {
+      this.currentURI = null;
+      this.updateBar(false);
+      nav.setOverrideBarOff(true);
+    }
+  },
+  /**
+   * On click of edit switch, change edit mode
+   *
+   * @param {Element} e Toggle element
+   */
+  toggleEdit(e) {
+    this.editing = e.checked;
+    htmx
+      .findAll(
+        ".budget-category button, .budget-sidebar-target select, .budget-sidebar-target button",
+      )
+      .forEach((button) => {
+        button.setAttribute("disabled", "");
+      });
+    if (this.editing) {
+      htmx.addClass(htmx.find("#budget-table"), "edit");
+      this.setupDrag();
+    } else {
+      this.cleanUpDrag();
+      // On exit of editing, refresh budget page
+      // This sets new group names and resets buttons
+      htmx.trigger(document.body, "budget");
+    }
+  },
+  /**
+   * Delete group, move items to neighbor
+   *
+   * @param {Element} btn - Triggering button
+   */
+  deleteGroup(btn) {
+    const group = btn.closest(".budget-group");
+    const items = htmx.find(group, ".budget-group-items");
+    const prevGroup = group.previousElementSibling;
+    if (prevGroup && prevGroup.matches(".budget-group")) {
+      const newItems = htmx.find(prevGroup, ".budget-group-items");
+      htmx.findAll(items, ".budget-category").forEach((e) => {
+        newItems.insertBefore(e, null);
+      });
+      htmx.remove(group);
+    } else {
+      const nextGroup = group.nextElementSibling;
+      const newItems = htmx.find(nextGroup, ".budget-group-items");
+      const first = newItems.firstChild;
+      htmx.findAll(items, ".budget-category").forEach((e) => {
+        newItems.insertBefore(e, first);
+      });
+      htmx.remove(group);
+    }
+
+    htmx.findAll(".budget-category").forEach((e, i) => {
+      const group = e.closest(".budget-group");
+      const groupURI = group.id.slice(6);
+
+      const inputGroup = document.createElement("input");
+      inputGroup.name = "group";
+      inputGroup.type = "text";
+      inputGroup.value = groupURI;
+      inputGroup.hidden = true;
+      e.append(inputGroup);
+    });
+    htmx.trigger("#budget-table", "reorder");
+    this.cleanUpDrag();
+  },
+};
+
+htmx.on("click", (evt) => {
+  budgeting.onClickCategory(null, evt);
+});
+
+"use strict";
+
+const chips = {
+  /**
+   *
+   * On input, add a chip
+   *
+   * @param {Event} evt - Triggering event
+   * @param {String} name - Name of chip input
+   */
+  append(evt, name) {
+    // If validation response, ignore event
+    if (evt.detail.xhr.response) return;
+    // If not enter key event, ignore event
+    if (evt.detail.requestConfig.triggeringEvent.type !== "keydown") return;
+
+    const tgt = evt.target;
+    if (!tgt.value) {
+      dialog.focusNext(tgt);
+      return;
+    }
+
+    // Create a chip
+    const chip = document.createElement("div");
+    chip.innerHTML = `
+      <input type="hidden" name="${name}" value="${tgt.value}" />
+      ${tgt.value}
+      <icon onclick="this.parentNode.remove()">clear</icon>
+    `;
+
+    tgt.parentNode.insertBefore(chip, tgt);
+    tgt.value = "";
+    tgt.scrollIntoView({
+      block: "nearest",
+      inline: "end",
+      container: "nearest",
+    });
+  },
+};
+
+"use strict";
+const dialog = {
+  pending: false,
+  /**
+   * Close dialog if no pending changes
+   *
+   * @param {boolean} force true will ignore pending changes
+   */
+  close(force) {
+    if (!force && this.pending) {
+      this.confirm("Discard draft?", "Discard", () => {
+        this.pending = false;
+        htmx.find("#dialog").innerHTML = "";
+      });
+      return;
+    }
+    htmx.find("#dialog").innerHTML = "";
+    this.reset();
+  },
+  /**
+   * On dialog changes, set pending flag
+   */
+  changes() {
+    this.pending = true;
+  },
+  /**
+   * On dialog reset, reset pending flag
+   */
+  reset() {
+    this.pending = false;
+    if (location.hash == "#dialog") history.back();
+  },
+  /**
+   * Check if all required element are populated
+   *
+   * @return boolean true if all required elements are filled
+   */
+  checkRequired() {
+    let allFilled = true;
+    htmx.findAll("#dialog [required]").forEach((e) => {
+      if (!allFilled) return;
+      if (!e.value) {
+        allFilled = false;
+        return;
+      }
+    });
+    return allFilled;
+  },
+  /**
+   * Update dialog save button
+   */
+  updateSave() {
+    const saveBtn = htmx.find("#dialog-save");
+    if (!saveBtn) return;
+    const allFilled = this.checkRequired();
+    const anyInvalid = htmx.find("#dialog error:not(:empty)") != null;
+    saveBtn.disabled = !allFilled || anyInvalid;
+  },
+  /**
+   * Add event listeners to the dialog
+   */
+  addListeners() {
+    const d = htmx.find("#dialog");
+    htmx.findAll(d, "[required]").forEach((e) => {
+      htmx.on(e, "input", this.updateSave.bind(this));
+    });
+    htmx.findAll(d, "input, textarea, select").forEach((e) => {
+      htmx.on(e, "input", this.changes.bind(this));
+      if (e.getAttribute("name") != "label") {
+        htmx.on(e, "keydown", (evt) => {
+          if (evt.key == "Enter") {
+            evt.preventDefault();
+            this.focusNext(e);
+          }
+        });
+      }
+      htmx.on(e, "focus", (evt) => {
+        // Smooth scroll nearest
+        evt.preventDefault();
+        e.scrollIntoView({ block: "nearest" });
+      });
+    });
+  },
+  /**
+   * Focus the next dialog input
+   *
+   * @param {Element} start - Starting element to search from
+   */
+  focusNext(start) {
+    const d = htmx.find("#dialog");
+    const results = htmx.findAll(
+      d,
+      "input:not(:disabled), textarea:not(:disabled), select:not(:disabled)",
+    );
+    for (const next of results) {
+      if (
+        next.compareDocumentPosition(start) === Node.DOCUMENT_POSITION_PRECEDING
+      ) {
+        next.focus({ preventScroll: true });
+        if (next.getAttribute("type") != "date") {
+          next.selectionStart = 0;
+          next.selectionEnd = next.value.length;
+        }
+        return;
+      }
+    }
+  },
+  /**
+   * On load of a dialog, addListeners and autofocus
+   */
+  onLoad() {
+    this.addListeners();
+    // Only autofocus for not mobile
+    if (window.screen.width >= 768) {
+      const d = htmx.find("#dialog");
+      const firstInput = htmx.find(d, "input, textarea, select");
+      firstInput.focus();
+      if (firstInput.type == "text") {
+        const n = firstInput.value.length;
+        firstInput.setSelectionRange(n, n);
+      }
+    }
+  },
+  /**
+   * Create confirm dialog
+   *
+   * @param {String} headline Headline text
+   * @param {String} actionLabel Label for the action button
+   * @param {Function} action Event handler for the action button
+   * @param {String} details Explanation text
+   */
+  confirm(headline, actionLabel, action, details) {
+    const e = htmx.find("#confirm-dialog");
+    e.innerHTML = `
+            <div><h1>${headline}</h1></div>
+            <p>${details ?? ""}</p>
+            <div class="flex justify-end">
+                <button class="btn-text" onclick="dialog.closeConfirm()">Cancel</button>
+                <button class="btn-text" onclick="dialog.closeConfirm()">
+                    ${actionLabel}
+                </button>
+            </div>
+            `;
+    htmx.on(htmx.find(e, "button:last-child"), "click", action);
+  },
+  /**
+   * Close confirm dialog
+   */
+  closeConfirm() {
+    htmx.find("#confirm-dialog").innerHTML = "";
+  },
+  /**
+   * @param {Event} event - Triggering event
+   */
+  onHashChange(event) {
+    if (location.hash) return;
+    if (!this.pending) {
+      this.close();
+      return;
+    }
+    window.location.hash = "dialog";
+    this.confirm("Discard draft?", "Discard", () => {
+      this.close(true);
+      history.back();
+    });
+  },
+};
+
+htmx.on(window, "hashchange", dialog.onHashChange.bind(dialog));
+htmx.on("reset-dialog", dialog.reset.bind(dialog));
+
+"use strict";
+const emergencyFund = {
+  chart: null,
+  /**
+   * Create Emergency Fund Chart
+   *
+   * @param {Object} raw Raw data from emergency fund controller
+   */
+  update: function (raw) {
+    const cf = newCurrencyFormat(raw.currency_format);
+    const labels = raw.labels;
+    const dateMode = raw.date_mode;
+    const values = raw.balances;
+    const spendingLower = raw.spending_lower;
+    const spendingUpper = raw.spending_upper;
+
+    const canvas = htmx.find("#e-fund-chart-canvas");
+    const ctx = canvas.getContext("2d");
+    const datasets = [
+      {
+        label: "Balance",
+        type: "line",
+        data: values,
+        borderColorRaw: "outline",
+        backgroundColorRaw: ["tertiary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+        fill: {
+          target: "origin",
+          aboveRaw: ["tertiary-container", "80"],
+          belowRaw: ["error-container", "80"],
+        },
+      },
+      {
+        label: "3-Month Spending",
+        type: "line",
+        data: spendingLower,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+        fill: {
+          target: "+1",
+        },
+      },
+      {
+        label: "6-Month Spending",
+        type: "line",
+        data: spendingUpper,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+      },
+    ];
+    if (this.chart && ctx == this.chart.ctx) {
+      nummusChart.update(this.chart, cf, labels, dateMode, datasets);
+    } else {
+      this.ctx = ctx;
+      this.chart = nummusChart.create(ctx, cf, labels, dateMode, datasets);
+    }
+  },
+  /**
+   * Create Emergency Fund Dashboard Chart
+   *
+   * @param {Object} raw Raw data from emergency fund controller
+   */
+  updateDashboard: function (raw) {
+    const cf = newCurrencyFormat(raw.currency_format);
+    const labels = raw.labels;
+    const dateMode = raw.date_mode;
+    const values = raw.balances;
+    const spendingLower = raw.spending_lower;
+    const spendingUpper = raw.spending_upper;
+
+    const canvas = htmx.find("#e-fund-chart-canvas-dashboard");
+    const ctx = canvas.getContext("2d");
+    const datasets = [
+      {
+        label: "Balance",
+        type: "line",
+        data: values,
+        borderColorRaw: "outline",
+        backgroundColorRaw: ["tertiary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+        fill: {
+          target: "origin",
+          aboveRaw: ["tertiary-container", "80"],
+          belowRaw: ["error-container", "80"],
+        },
+      },
+      {
+        label: "3-Month Spending",
+        type: "line",
+        data: spendingLower,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+        fill: {
+          target: "+1",
+        },
+      },
+      {
+        label: "6-Month Spending",
+        type: "line",
+        data: spendingUpper,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        borderWidth: 2,
+        pointRadius: 0,
+        hoverRadius: 0,
+      },
+    ];
+    if (this.chart && ctx == this.chart.ctx) {
+      nummusChart.update(this.chart, cf, labels, dateMode, datasets);
+    } else {
+      this.ctx = ctx;
+      this.chart = nummusChart.create(
+        ctx,
+        cf,
+        labels,
+        dateMode,
+        datasets,
+        null,
+        {
+          scales: {
+            y: { ticks: { display: false }, grid: { drawTicks: false } },
+          },
+        },
+      );
+    }
+  },
+};
+
+"use strict";
+const importFile = {
+  /** Before sending file, hide the previous success */
+  beforeSend() {
+    const success = htmx.find("#import-success");
+    if (success) {
+      success.remove();
+    }
+  },
+  /**
+   * When file upload starts, display progress bar
+   *
+   * @param {Event} evt - Triggering event
+   */
+  xhrLoadStart(evt) {
+    const file = htmx.find("#dialog>form input[type=file]").value;
+    if (file) {
+      htmx.removeClass(htmx.find("#import-upload-progress"), "hidden");
+    }
+  },
+  /**
+   * On file upload progress, update progress bar
+   *
+   * @param {Event} evt - Triggering event
+   */
+  xhrProgress(evt) {
+    htmx
+      .find("#import-upload-progress>progress")
+      .setAttribute("value", (evt.detail.loaded / evt.detail.total) * 100);
+  },
+  /** After sending file, hide progress bar */
+  xhrLoadEnd() {
+    htmx.addClass(htmx.find("#import-upload-progress"), "hidden");
+  },
+};
+
+"use strict";
+const nummusLabels = {
+  /**
+   * On click of delete label, confirm action
+   *
+   * @param {Event} evt Triggering event
+   */
+  confirmDelete: function (evt) {
+    dialog.confirm(
+      "Delete label",
+      "Delete",
+      () => {
+        htmx.trigger(evt.target, "delete");
+      },
+      "This label will be removed from all transactions.",
+    );
+  },
+};
+
+"use strict";
+const nav = {
+  barOn: true,
+  overrideBarOff: false,
+  lastToggleY: null,
+  barHeight: null,
+  barTranslate: 0,
+  fabRatio: null,
+  bar: null,
+  fab: null,
+  /**
+   * On click, open nav-drawer
+   */
+  openDrawer: function () {
+    htmx.addClass(htmx.find("#nav-drawer"), "open");
+  },
+  /**
+   * On click of scrim, close nav-drawer
+   *
+   * @param {Event} evt Triggering event
+   */
+  closeDrawer: function (evt) {
+    // if no event or clicking a label, close drawer
+    if (!evt || evt.target.matches("a, a *, button, button *")) {
+      htmx.removeClass(htmx.find("#nav-drawer"), "open");
+    }
+  },
+  /**
+   * On new page, update nav buttons to indicate active page
+   */
+  update: function () {
+    const query = "nav button, nav a";
+    const currentPath = window.location.pathname;
+    htmx.findAll(query).forEach((e) => {
+      const url = e && (e.getAttribute("hx-get") || e.getAttribute("hx-post"));
+      const path = url && url.split("?")[0];
+      if (path && path == currentPath) htmx.addClass(e, "nav-current");
+      else htmx.removeClass(e, "nav-current");
+    });
+  },
+  /**
+   * On scroll down, hide nav elements. On up, show
+   */
+  onScroll: function () {
+    // Only do stuff for mobile
+    if (window.screen.width >= 768) {
+      return;
+    }
+    const scrollY = window.scrollY;
+
+    const hyst = 20;
+    if (nav.lastToggleY == null) {
+      nav.lastToggleY = scrollY;
+    }
+
+    if (nav.barOn) {
+      nav.lastToggleY = Math.min(scrollY, nav.lastToggleY ?? scrollY);
+      if (scrollY > nav.lastToggleY + hyst) {
+        nav.updateBar(false);
+      }
+    } else {
+      nav.lastToggleY = Math.max(scrollY, nav.lastToggleY ?? scrollY);
+      if (scrollY < nav.lastToggleY - hyst) {
+        nav.updateBar(true);
+      }
+    }
+  },
+  /**
+   * Update bar translate
+   *
+   * @param {Boolean} on true show the bar
+   */
+  updateBar: function (on) {
+    on = on ?? nav.barOn;
+    nav.barOn = on;
+
+    if (nav.overrideBarOff) on = false;
+
+    if (nav.bar == null) nav.bar = htmx.find("#nav-bar");
+    if (nav.barHeight == null) {
+      const rect = nav.bar.getBoundingClientRect();
+      nav.barHeight = rect.height;
+    }
+
+    if (nav.fab == null) nav.fab = htmx.find("#nav-fab");
+    if (nav.fabRatio == null) {
+      const rect = nav.fab.getBoundingClientRect();
+      nav.fabRatio =
+        (rect.width + window.screen.width - rect.right) / nav.barHeight;
+    }
+
+    nav.barTranslate = on ? 0 : nav.barHeight * 1.1;
+    const fabTranslate = nav.barTranslate * nav.fabRatio;
+
+    nav.bar.style.translate = `0 ${nav.barTranslate}px`;
+    nav.fab.style.translate = `${fabTranslate}px ${-nav.barTranslate}px`;
+  },
+  /**
+   * Set override to force close the bar
+   *
+   * @param {Boolean} on true will unset the override
+   */
+  setOverrideBarOff: function (on) {
+    nav.overrideBarOff = !(on ?? false);
+    nav.updateBar();
+  },
+};
+
+htmx.on(window, "scroll", nav.onScroll);
+htmx.onLoad(nav.update);
+
+"use strict";
+const netWorth = {
+  chart: null,
+  chartAssets: null,
+  chartLiabilities: null,
+  chartPieAssets: null,
+  chartPieLiabilities: null,
+  /**
+   * Fetch compact data and create Net Worth Chart
+   *
+   * @param {String} url URL of net worth chart data
+   */
+  load: async function (url) {
+    const response = await fetch(url);
+    const payload = await response.json();
+    this.update(payload.chart, payload.accounts, payload.currency_format);
+  },
+  /**
+   * Create Net Worth Chart
+   *
+   * @param {Object} raw Compact data from net worth controller
+   * @param {Object} rawAccounts Compact account data from net worth controller
+   * @param {Object} currencyFormat See Python side: Currency
+   */
+  update: function (raw, rawAccounts, currencyFormat) {
+    const cf = newCurrencyFormat(currencyFormat);
+    const { labels, mode: dateMode, min, avg, max } = nummusChart.unpack(raw);
+    const scale = 10 ** raw.scale;
+    const accounts = rawAccounts.map((a) => {
+      a.avg = a.avg.map((v) => v / scale);
+      return a;
+    });
+
+    {
+      const canvas = document.getElementById("net-worth-chart-canvas");
+      const ctx = canvas.getContext("2d");
+      const datasets = [];
+      if (min == null) {
+        datasets.push({
+          label: "Portfolio",
+          type: "line",
+          data: avg,
+          borderColorRaw: "primary",
+          backgroundColorRaw: ["primary-container", "80"],
+          borderWidth: 2,
+          pointRadius: 0,
+          hoverRadius: 0,
+          fill: {
+            target: "origin",
+            aboveRaw: ["primary-container", "80"],
+            belowRaw: ["error-container", "80"],
+          },
+        });
+      } else {
+        // Plot average as a line and fill between min/max
+        datasets.push({
+          label: "Max",
+          type: "line",
+          data: max,
+          borderColorRaw: "primary",
+          backgroundColorRaw: ["primary-container", "80"],
+          borderWidth: 0,
+          pointRadius: 0,
+          hoverRadius: 0,
+          fill: 2,
+          order: 1,
+        });
+        datasets.push({
+          label: "Average",
+          type: "line",
+          data: avg,
+          borderColorRaw: "primary",
+          backgroundColorRaw: ["primary-container", "80"],
+          borderWidth: 2,
+          pointRadius: 0,
+          hoverRadius: 0,
+          order: 0,
+        });
+        datasets.push({
+          label: "Min",
+          type: "line",
+          data: min,
+          borderColorRaw: "primary",
+          backgroundColorRaw: ["primary-container", "80"],
+          borderWidth: 0,
+          pointRadius: 0,
+          hoverRadius: 0,
+          order: 2,
+        });
+      }
+
+      if (this.chart && ctx == this.chart.ctx) {
+        nummusChart.update(this.chart, cf, labels, dateMode, datasets);
+      } else {
+        this.chart = nummusChart.create(ctx, cf, labels, dateMode, datasets);
+      }
+    }
+
+    const assets = [];
+    const liabilities = [];
+    for (let i = 0; i < accounts.length; ++i) {
+      const a = accounts[i];
+      const spin = (i * 300) / accounts.length;
+
+      assets.push({
+        name: a.name,
+        values: [...a.avg].map((v) => Math.max(0, v)),
+        colorSpin: spin,
+      });
+      liabilities.push({
+        name: a.name,
+        values: [...a.avg].map((v) => Math.min(0, v)),
+        colorSpin: spin,
+      });
+    }
+    liabilities.reverse();
+
+    const options = {
+      plugins: {
+        tooltip: {
+          filter: function (context) {
+            return (
+              context.dataset.label != null &&
+              context.dataset.dataRaw[context.dataIndex]
+            );
+          },
+          callbacks: {
+            label: function (context) {
+              let label = context.dataset.label || "";
+              if (label) label += ": ";
+              const y = context.dataset.dataRaw[context.dataIndex];
+              if (y != null)
+                label += context.chart.config.options.currencyFormat(y);
+              return label;
+            },
+          },
+        },
+      },
+    };
+
+    {
+      const canvas = document.getElementById("assets-chart-canvas");
+      const ctx = canvas.getContext("2d");
+      const datasets = nummusChart.datasetsStacked(assets);
+      if (this.chartAssets && ctx == this.chartAssets.ctx) {
+        nummusChart.update(this.chartAssets, cf, labels, dateMode, datasets);
+      } else {
+        this.chartAssets = nummusChart.create(
+          ctx,
+          cf,
+          labels,
+          dateMode,
+          datasets,
+          null,
+          options,
+        );
+      }
+    }
+
+    {
+      const canvas = document.getElementById("liabilities-chart-canvas");
+      const ctx = canvas.getContext("2d");
+      const datasets = nummusChart.datasetsStacked(liabilities);
+      if (this.chartLiabilities && ctx == this.chartLiabilities.ctx) {
+        nummusChart.update(
+          this.chartLiabilities,
+          cf,
+          labels,
+          dateMode,
+          datasets,
+        );
+      } else {
+        this.chartLiabilities = nummusChart.create(
+          ctx,
+          cf,
+          labels,
+          dateMode,
+          datasets,
+          null,
+          options,
+        );
+      }
+    }
+  },
+  /**
+   * Create Net Worth Dashboard Chart
+   *
+   * @param {Object} raw Compact data from net worth controller
+   * @param {Object} currencyFormat See Python side: Currency
+   */
+  updateDashboard: function (raw, currencyFormat) {
+    const cf = newCurrencyFormat(currencyFormat);
+    const { labels, mode: dateMode, avg: total } = nummusChart.unpack(raw);
+
+    const canvas = document.getElementById("net-worth-chart-canvas-dashboard");
+    const ctx = canvas.getContext("2d");
+    const dataset = {
+      label: "Total",
+      type: "line",
+      data: total,
+      borderColorRaw: "primary",
+      backgroundColorRaw: ["primary-container", "80"],
+      borderWidth: 2,
+      pointRadius: 0,
+      hoverRadius: 0,
+      fill: true,
+    };
+    if (this.chart && ctx == this.chart.ctx) {
+      nummusChart.update(this.chart, cf, labels, dateMode, [dataset]);
+    } else {
+      this.chart = nummusChart.create(
+        ctx,
+        cf,
+        labels,
+        dateMode,
+        [dataset],
+        null,
+        {
+          scales: {
+            y: { ticks: { display: false }, grid: { drawTicks: false } },
+          },
+        },
+      );
+    }
+  },
+};
+
+"use strict";
+/**
+ * Charts creator and updater for nummus
+ *
+ */
+const nummusChart = {
+  /**
+   * Create a new chart
+   *
+   * @param {Object} ctx Canvas context to use
+   * @param {function} currencyFormat Function to format number, see newCurrencyFormat
+   * @param {Array} labels Array of labels
+   * @param {String} dateMode Mode of date tick formatter
+   * @param {Array} datasets Array of datasets
+   * @param {Array} plugins Array of plugins
+   * @param {Object} options override
+   * @return {Object} Chart object
+   */
+  create: function (
+    ctx,
+    currencyFormat,
+    labels,
+    dateMode,
+    datasets,
+    plugins,
+    options,
+  ) {
+    setChartDefaults();
+
+    // If only single day data, duplicate for prettier charts
+    if (labels.length == 1) {
+      labels.push(labels[0]);
+      datasets.forEach((d) => {
+        d.data.push(d.data[0]);
+      });
+    }
+
+    const pluginObjects = [pluginColor];
+    const pluginOptions = {
+      legend: {
+        display: false,
+      },
+      tooltip: {
+        intersect: false,
+        mode: "index",
+        enabled: window.screen.width >= 768,
+        filter: function (context) {
+          return context.dataset.label != null;
+        },
+        callbacks: {
+          label: function (context) {
+            let label = context.dataset.label || "";
+            if (label) label += ": ";
+            if (context.parsed.y != null)
+              label += context.chart.config.options.currencyFormat(
+                context.parsed.y,
+              );
+            return label;
+          },
+          labelColor: function (context) {
+            const dataset = context.dataset;
+            let color = {
+              borderColor: dataset.borderColor,
+              // Remove opacity
+              backgroundColor: dataset.backgroundColor.slice(0, 7),
+              borderWidth: 1,
+            };
+            // Only do this if only one dataset, if multiple,
+            // default is fine
+            if (context.chart.data.datasets.length != 1) return color;
+            if (dataset.fill && dataset.fill.above && dataset.fill.below) {
+              color.backgroundColor =
+                context.raw >= 0 ? dataset.fill.above : dataset.fill.below;
+            }
+            return color;
+          },
+        },
+      },
+    };
+    if (plugins) {
+      for (const item of plugins) {
+        const plugin = item[0];
+        pluginObjects.push(plugin);
+        pluginOptions[plugin.id] = item[1];
+      }
+    }
+
+    options = merge(
+      {
+        responsive: true,
+        maintainAspectRatio: false,
+        scales: {
+          x: {
+            grid: {
+              display: true,
+            },
+            ticks: {
+              callback: formatDateTicks,
+              dateMode: dateMode,
+            },
+          },
+          y: {
+            ticks: {
+              callback: formatMoneyTicks,
+              precision: 0,
+            },
+          },
+        },
+        plugins: pluginOptions,
+        currencyFormat: currencyFormat,
+      },
+      options ?? {},
+    );
+
+    return new Chart(ctx, {
+      data: { labels: labels, datasets: datasets },
+      options: options,
+      plugins: pluginObjects,
+    });
+  },
+  /**
+   * Update existing chart
+   *
+   * @param {Object} chart Chart object
+   * @param {function} currencyFormat Function to format number, see newCurrencyFormat
+   * @param {Array} labels Array of labels
+   * @param {String} dateMode Mode of date tick formatter
+   * @param {Array} values Array of values
+   */
+  update: function (chart, currencyFormat, labels, dateMode, datasets) {
+    chart.data.labels = labels;
+    if (chart.data.datasets.length == datasets.length) {
+      for (let i = 0; i < datasets.length; ++i) {
+        chart.data.datasets[i].data = datasets[i].data;
+      }
+    } else {
+      chart.data.datasets = datasets;
+    }
+    chart.config.options.currencyFormat = currencyFormat;
+    chart.config.options.scales.x.ticks.dateMode = dateMode;
+    pluginColor.updateChartColor(chart);
+    chart.update();
+  },
+  /**
+   * Prepare stacked chart datasets
+   *
+   * @param {Array} sources Array of sources [{values:, color:}, ...]
+   * @return {Array} datasets
+   */
+  datasetsStacked: function (sources) {
+    const datasets = [];
+    const n = sources[0].values.length;
+    let values = new Array(n).fill(0);
+    let first = true;
+    for (const source of sources) {
+      // Skip if every value is zero
+      if (source.values.every((v) => v == 0)) continue;
+      for (let i = 0; i < n; ++i) values[i] += source.values[i];
+      datasets.push({
+        label: source.name,
+        type: "line",
+        data: [...values],
+        dataRaw: source.values,
+        borderColorRaw: "primary",
+        backgroundColorRaw: ["primary-container", "80"],
+        colorSpin: source.colorSpin,
+        borderWidth: 1,
+        pointRadius: 0,
+        hoverRadius: 0,
+        fill: first ? "origin" : "-1",
+      });
+      first = false;
+    }
+    return datasets;
+  },
+  /**
+   * Expand compact chart data
+   *
+   * @param {Object} raw Compact chart data, see Python side: base.ChartArrays
+   * @return {Object} Object with the following keys
+   * @return {Array} labels ISO dates or months
+   * @return {String} mode Mode of date tick formatter
+   * @return {Array} min values or null
+   * @return {Array} avg values
+   * @return {Array} max values or null
+   */
+  unpack: function (raw) {
+    const scale = 10 ** raw.scale;
+    const toNumbers = (values) => values && values.map((v) => v / scale);
+    const indices = [...Array(raw.n).keys()];
+    let labels;
+    if (raw.unit == "months") {
+      const [year, month] = raw.start.split("-").map(Number);
+      labels = indices.map((i) => {
+        const m = month - 1 + i;
+        const y = year + Math.floor(m / 12);
+        return `${y}-${String((m % 12) + 1).padStart(2, "0")}`;
+      });
+    } else {
+      // Date only ISO strings are parsed as UTC
+      const start = Date.parse(raw.start);
+      labels = indices.map((i) =>
+        new Date(start + i * 86400000).toISOString().slice(0, 10),
+      );
+    }
+    return {
+      labels: labels,
+      mode: raw.mode,
+      min: toNumbers(raw.min),
+      avg: toNumbers(raw.avg),
+      max: toNumbers(raw.max),
+    };
+  },
+  /**
+   * Prepare pie datasets
+   *
+   * @param {Array} sources Array of sources [{values:, color:}, ...]
+   * @return {Object} Object with the following keys
+   * @return {Array} datasets
+   * @return {Number} total of all sources
+   */
+  datasetsPie: function (sources) {
+    const labels = [];
+    const datasets = [];
+
+    const data = [];
+    const colors = [];
+    const backgroundColors = [];
+    const spins = [];
+
+    let total = 0;
+    let nCollapse = sources.filter((item) => item.collapse).length;
+
+    let totalOther = 0;
+
+    for (const source of sources) {
+      const value = source.amount ?? source.values[source.values.length - 1];
+      total += value;
+      if (nCollapse > 1 && source.collapse) {
+        totalOther += value;
+      } else {
+        data.push(value);
+        labels.push(source.name);
+        colors.push(source.borderColorRaw);
+        backgroundColors.push(source.backgroundColorRaw);
+        spins.push(source.colorSpin);
+      }
+    }
+    if (totalOther) {
+      data.push(totalOther);
+      labels.push("Other");
+      colors.push("outline");
+      backgroundColors.push("surface-container-high");
+      spins.push(null);
+    }
+    datasets.push({
+      data: data,
+      borderWidth: 1,
+      borderColorRaw: colors,
+      backgroundColorRaw: backgroundColors,
+      colorSpin: spins,
+      total: total,
+    });
+    return {
+      labels: labels,
+      datasets: datasets,
+      total: total,
+    };
+  },
+  /**
+   * Create a new pie chart
+   *
+   * @param {Object} ctx Canvas context to use
+   * @param {function} currencyFormat Function to format number, see newCurrencyFormat
+   * @param {Array} sources Array of sources [values0, values1, ...]
+   * @param {Array} plugins Array of plugins
+   * @param {Object} options override
+   * @return {Object} Chart object
+   */
+  createPie: function (ctx, currencyFormat, sources, plugins, options) {
+    setChartDefaults();
+
+    const { labels, datasets, total } = this.datasetsPie(sources);
+
+    const pluginObjects = [pluginColor, pluginDoughnutText];
+    const pluginOptions = {
+      legend: {
+        display: false,
+      },
+      tooltip: {
+        enabled: true,
+        callbacks: {
+          label: function (context) {
+            let label = context.dataset.label || "";
+            if (label) label += ": ";
+            if (context.parsed != null) {
+              label += context.chart.config.options.currencyFormat(
+                context.parsed,
+              );
+              const percent = (context.parsed / context.dataset.total) * 100;
+              label += ` (${percent.toFixed(1)}%)`;
+            }
+            return label;
+          },
+        },
+      },
+      doughnutText: {
+        text: currencyFormat(total, true),
+        font: "'liberation-sans', 'sans-serif'",
+      },
+    };
+    if (plugins) {
+      for (const plugin of plugins) {
+        pluginObjects.push(plugin);
+      }
+    }
+
+    options = merge(
+      {
+        responsive: true,
+        maintainAspectRatio: true,
+        plugins: pluginOptions,
+        currencyFormat: currencyFormat,
+      },
+      options ?? {},
+    );
+
+    return new Chart(ctx, {
+      type: "doughnut",
+      data: { labels: labels, datasets: datasets },
+      options: options,
+      plugins: pluginObjects,
+    });
+  },
+  /**
+   * Update existing pie chart with a single data source
+   *
+   * @param {Object} chart Chart object
+   * @param {function} currencyFormat Function to format number, see newCurrencyFormat
+   * @param {Array} sources Array of sources [values0, values1, ...]
+   * @param {String} doughnutText Text to update doughnutText
+   */
+  updatePie: function (chart, currencyFormat, sources, doughnutText) {
+    const { labels, datasets, total } = this.datasetsPie(sources);
+
+    if (chart.data.datasets.length == datasets.length) {
+      for (let i = 0; i < datasets.length; ++i) {
+        chart.data.datasets[i].data = datasets[i].data;
+        chart.data.datasets[i].borderColorRaw = datasets[i].borderColorRaw;
+        chart.data.datasets[i].backgroundColorRaw =
+          datasets[i].backgroundColorRaw;
+        chart.data.datasets[i].colorSpin = datasets[i].colorSpin;
+        chart.data.datasets[i].total = datasets[i].total;
+      }
+    } else {
+      chart.data.datasets = datasets;
+    }
+    chart.data.labels = labels;
+    chart.config.options.currencyFormat = currencyFormat;
+    chart.config.options.plugins.doughnutText.text =
+      doughnutText ?? currencyFormat(total, true);
+    pluginColor.updateChartColor(chart);
+    pluginHoverHighlight.addListeners(chart);
+    chart.update();
+  },
+  /**
+   * Create a new tree chart
+   *
+   * @param {Object} ctx Canvas context to use
+   * @param {function} currencyFormat Function to format number, see newCurrencyFormat
+   * @param {Array} datasets Array of datasets
+   * @param {Array} plugins Array of plugins
+   * @param {Object} options override
+   * @return {Object} Chart object
+   */
+  createTree: function (ctx, currencyFormat, datasets, plugins, options) {
+    setChartDefaults();
+
+    const pluginObjects = [pluginColor, pluginTreeColor, pluginTreeLabel];
+    const pluginOptions = {
+      legend: {
+        display: false,
+      },
+      tooltip: {
+        callbacks: {
+          title: function () {
+            return "Asset Value";
+          },
+          label: function (context) {
+            const obj = context.raw._data;
+            let label = obj.name || obj[0];
+            return (
+              label +
+              ": " +
+              context.chart.config.options.currencyFormat(obj.value)
+            );
+          },
+        },
+      },
+      zoom: {
+        pan: {
+          enabled: true,
+          mode: "xy",
+        },
+        limits: {
+          x: { min: "original", max: "original" },
+          y: { min: "original", max: "original" },
+        },
+        zoom: {
+          wheel: { enabled: true },
+          pinch: { enabled: true },
+          mode: "xy",
+        },
+      },
+    };
+    if (plugins) {
+      for (const item of plugins) {
+        const plugin = item[0];
+        pluginObjects.push(plugin);
+        pluginOptions[plugin.id] = item[1];
+      }
+    }
+
+    options = merge(
+      {
+        responsive: true,
+        maintainAspectRatio: false,
+        animations: false,
+        plugins: pluginOptions,
+        currencyFormat: currencyFormat,
+      },
+      options ?? {},
+    );
+
+    return new Chart(ctx, {
+      type: "treemap",
+      data: { datasets: datasets },
+      options: options,
+      plugins: pluginObjects,
+    });
+  },
+};
+
+"use strict";
+const performance = {
+  chart: null,
+  /**
+   * Create Performance Chart
+   *
+   * @param {Object} raw Raw data from performance controller
+   */
+  update: function (raw) {
+    const cf = newCurrencyFormat(raw.currency_format);
+    const labels = raw.labels;
+    const dateMode = raw.mode;
+    const avg = raw.avg.map((v) => Number(v) * 100);
+    const min = raw.min && raw.min.map((v) => Number(v) * 100);
+    const max = raw.max && raw.max.map((v) => Number(v) * 100);
+    const index = raw.index.map((v) => Number(v) * 100);
+    const indexName = raw.index_name;
+    const indexMin = raw.index_min && raw.index_min.map((v) => Number(v) * 100);
+    const indexMax = raw.index_max && raw.index_max.map((v) => Number(v) * 100);
+    const mwrr = raw.mwrr && raw.mwrr.map((v) => Number(v) * 100);
+
+    {
+      const canvas = htmx.find("#performance-chart-canvas");
+      const ctx = canvas.getContext("2d");
+      const datasets = [];
+      if (min == null) {
+        datasets.push({
+          label: "Portfolio",
+          type: "line",
+          data: avg,
+          borderColorRaw: "primary",
+          backgroundColorRaw: ["primary-container", "80"],
+          borderWidth: 2,
+          pointRadius: 0,
+          hoverRadius: 0,
+          fill: true,
+        });
+        datasets.push({
+          label: indexName,
+          type: "line",
+          data: index,
+          borderColorRaw: "tertiary",
+          backgroundColorRaw: ["tertiary-container", "80"],
+          borderWidth: 2,
+          pointRadius: 0,
+          hoverRadius: 0,
+        });
+        datasets.push({
+          label: "MWRR Interpolation",
+          type: "line",
+          data: mwrr,
+          borderColorRaw: "secondary",
+          backgroundColorRaw: ["secondary-container", "80"],
+          borderWidth: 2,
+          pointRadius: 0,
+          hoverRadius: 0,
+        });
+      } else {
+        // Plot average as a line and fill between min/max
+        datasets.push({
+          label: "Max",
+          type: "line",
+          data: max,
+          borderColorRaw: "primary",
+          backgroundColorRaw: ["primary-container", "80"],
+          borderWidth: 0,
+          pointRadius: 0,
+          hoverRadius: 0,
+          fill: 2,
+        });
+        datasets.push({
+          label: "Average",
+          type: "line",
+          data: avg,
+          borderColorRaw: "primary",
+          backgroundColorRaw: ["primary-container", "80"],
+          borderWidth: 2,
+          pointRadius: 0,
+          hoverRadius: 0,
+        });
+        datasets.push({
+          label: "Min",
+          type: "line",
+          data: min,
+          borderColorRaw: "primary",
+          backgroundColorRaw: ["primary-container", "80"],
+          borderWidth: 0,
+          pointRadius: 0,
+          hoverRadius: 0,
+        });
+        // Plot average as a line and fill between min/max
+        datasets.push({
+          label: `${indexName} Max`,
+          type: "line",
+          data: indexMax,
+          borderColorRaw: "tertiary",
+          backgroundColorRaw: ["tertiary-container", "80"],
+          borderWidth: 0,
+          pointRadius: 0,
+          hoverRadius: 0,
+          fill: 5,
+        });
+        datasets.push({
+          label: `${indexName} Average`,
+          type: "line",
+          data: index,
+          borderColorRaw: "tertiary",
+          backgroundColorRaw: ["tertiary-container", "80"],
+          borderWidth: 2,
+          pointRadius: 0,
+          hoverRadius: 0,
+        });
+        datasets.push({
+          label: `${indexName} Min`,
+          type: "line",
+          data: indexMin,
+          borderColorRaw: "tertiary",
+          backgroundColorRaw: ["tertiary-container", "80"],
+          borderWidth: 0,
+          pointRadius: 0,
+          hoverRadius: 0,
+        });
+        datasets.push({
+          label: "MWRR Interpolation",
+          type: "line",
+          data: mwrr,
+          borderColorRaw: "secondary",
+          backgroundColorRaw: ["secondary-container", "80"],
+          borderWidth: 2,
+          pointRadius: 0,
+          hoverRadius: 0,
+        });
+      }
+
+      const options = {
+        scales: {
+          y: { ticks: { callback: formatPercentTicks } },
+        },
+        plugins: {
+          tooltip: {
+            callbacks: {
+              label: function (context) {
+                let label = context.dataset.label || "";
+                if (label) label += ": ";
+                if (context.parsed.y != null)
+                  label += `${context.parsed.y.toFixed(1)}%`;
+                return label;
+              },
+            },
+          },
+        },
+      };
+
+      if (this.chart && ctx == this.chart.ctx) {
+        nummusChart.update(this.chart, cf, labels, dateMode, datasets);
+      } else {
+        this.chart = nummusChart.create(
+          ctx,
+          cf,
+          labels,
+          dateMode,
+          datasets,
+          null,
+          options,
+        );
+      }
+    }
+  },
+};
+
+"use strict";
+const progress = {
+  bar: null,
+  /**
+   * Update global progress bar
+   *
+   * @param {Event} evt Triggering event
+   * @param {Number} v Progress value
+   */
+  update: function (evt, v) {
+    // Only do progress bar for whole page
+    if (evt && (evt.detail.target ?? evt.detail.elt).id != "main") return;
+    if (this.bar == null) this.bar = htmx.find("#page-progress");
+
+    if (v == 0) {
+      htmx.addClass(this.bar, "open");
+      this.bar.innerHTML = "<div style='width:0'></div>";
+    } else if (v == 1) {
+      htmx.removeClass(this.bar, "open");
+      this.bar.firstElementChild.style.width = "100%";
+    } else {
+      htmx.addClass(this.bar, "open");
+      this.bar.firstElementChild.style.width = `${v * 100}%`;
+    }
+  },
+};
+
+"use strict";
+const snackbar = {
+  duration: 2500,
+  timeout: null,
+  /**
+   * Show snackbar with a message
+   *
+   * @param {String} msg Message to display
+   */
+  show: function (msg) {
+    const e = htmx.find("#snackbar");
+    e.innerHTML = msg;
+    htmx.addClass(e, "open");
+
+    if (self.timeout) clearTimeout(self.timeout);
+    self.timeout = setTimeout(this.hide, this.duration);
+  },
+  /**
+   * Hide the snackbar
+   */
+  hide: function () {
+    const e = htmx.find("#snackbar");
+    htmx.removeClass(e, "open");
+  },
+};
+
+"use strict";
+const spending = {
+  charts: {},
+  /**
+   * On change of period select, hide or show date input
+   */
+  changePeriod() {
+    const select = htmx.find("#spending-filters [name='period']");
+    const notCustom = select.value != "custom";
+    htmx.findAll("#spending-filters [type='date']").forEach((e) => {
+      e.disabled = notCustom;
+    });
+  },
+  /**
+   * Create spending Chart
+   *
+   * @param {Object} byAccount Spending by account from spending controller
+   * @param {Object} byPayee Spending by payee from spending controller
+   * @param {Object} byCategory Spending by category from spending controller
+   * @param {Object} byLabel Spending by label from spending controller
+   * @param {Object} currencyFormat See Python side: Currency
+   */
+  update(byAccount, byPayee, byCategory, byLabel, currencyFormat) {
+    const cf = newCurrencyFormat(currencyFormat);
+    this.updateOne("spending-by-account", byAccount, cf);
+    this.updateOne("spending-by-payee", byPayee, cf);
+    this.updateOne("spending-by-category", byCategory, cf);
+    this.updateOne("spending-by-label", byLabel, cf);
+
+    updateColorSwatches();
+  },
+  /**
+   * Update one chart
+   *
+   * @param {String} id - Top div id
+   * @param {Array} raw - Array [[name, value], ...]
+   * @param {function} currencyFormat Function to format number, see newCurrencyFormat
+   */
+  updateOne(id, raw, currencyFormat) {
+    const canvas = htmx.find(`#${id} canvas`);
+    const breakdown = htmx.find(`#${id}>div:last-of-type`);
+    const ctx = canvas.getContext("2d");
+
+    const total = raw.reduce((cum, item) => cum + item[1], 0);
+    const collapseThreshold = total * 0.005;
+
+    const spin = Math.max(20, 300 / raw.length);
+    const data = raw.map((item, i) => ({
+      name: item[0] ?? "[none]",
+      amount: item[1],
+      colorSpin: item[0] ? i * spin : 0,
+      borderColorRaw: item[0] ? "primary" : "outline",
+      backgroundColorRaw: [
+        item[0] ? "primary-container" : "surface-container-low",
+        "80",
+      ],
+      collapse: item[1] < collapseThreshold,
+    }));
+
+    breakdown.innerHTML = "";
+    let totalOther = 0;
+    data.forEach((category, i) => {
+      const v = category.amount;
+      if (i >= 200) {
+        totalOther += v;
+        return;
+      }
+
+      const row = document.createElement("div");
+      htmx.addClass(row, "flex");
+      htmx.addClass(row, "gap-1");
+      htmx.addClass(row, "not-last:mb-0.5");
+
+      const square = document.createElement("div");
+      square.setAttribute("color-spin", category.colorSpin);
+      square.setAttribute("border", category.borderColorRaw);
+      square.setAttribute("bg", category.backgroundColorRaw[0]);
+      htmx.addClass(square, "w-6");
+      htmx.addClass(square, "h-6");
+      htmx.addClass(square, "shrink-0");
+      htmx.addClass(square, "border");
+      htmx.addClass(square, "rounded");
+      row.appendChild(square);
+
+      const name = document.createElement("div");
+      name.innerHTML = category.name;
+      htmx.addClass(name, "grow");
+      htmx.addClass(name, "truncate");
+      row.appendChild(name);
+
+      const value = document.createElement("div");
+      value.innerHTML = currencyFormat(v);
+      row.appendChild(value);
+
+      breakdown.appendChild(row);
+    });
+
+    if (totalOther) {
+      const row = document.createElement("div");
+      htmx.addClass(row, "flex");
+      htmx.addClass(row, "gap-1");
+      htmx.addClass(row, "not-last:mb-0.5");
+
+      const square = document.createElement("div");
+      htmx.addClass(square, "w-6");
+      htmx.addClass(square, "h-6");
+      htmx.addClass(square, "shrink-0");
+      htmx.addClass(square, "border");
+      htmx.addClass(square, "border-outline");
+      htmx.addClass(square, "bg-surface-container-high");
+      htmx.addClass(square, "rounded");
+      row.appendChild(square);
+
+      const name = document.createElement("div");
+      name.innerHTML = `Other (${data.length - 200} more)`;
+      htmx.addClass(name, "grow");
+      htmx.addClass(name, "truncate");
+      row.appendChild(name);
+
+      const value = document.createElement("div");
+      value.innerHTML = currencyFormat(totalOther);
+      row.appendChild(value);
+
+      breakdown.appendChild(row);
+    }
+
+    if (this.charts[id] && ctx == this.charts[id].ctx) {
+      nummusChart.updatePie(this.charts[id], currencyFormat, data);
+    } else {
+      this.charts[id] = nummusChart.createPie(
+        ctx,
+        currencyFormat,
+        data,
+        [pluginHoverHighlight],
+        { plugins: { hoverHighlight: { parent: `${id}>div:last-of-type` } } },
+      );
+    }
+  },
+};
+
+"use strict";
+const txnCat = {
+  /**
+   * Update is essential spending toggle when group changes
+   *
+   * INCOME cannot be essential spending
+   */
+  updateEssential: function () {
+    const isIncome = htmx.find("#dialog [name='group']").value == "INCOME";
+    const essential = htmx.find("#dialog [name='essential-spending']");
+    essential.disabled = isIncome;
+    essential.checked = !isIncome && essential.checked;
+  },
+  /**
+   * On click of delete category, confirm action
+   *
+   * @param {Event} evt Triggering event
+   */
+  confirmDelete: function (evt) {
+    dialog.confirm(
+      "Delete category",
+      "Delete",
+      () => {
+        htmx.trigger(evt.target, "delete");
+      },
+      "Any transactions assigned to this category will revert to uncategorized.",
+    );
+  },
+};
+
+"use strict";
+const txn = {
+  /**
+   * On change of period select, hide or show date input
+   */
+  changePeriod: function () {
+    const select = htmx.find("#txn-filters [name='period']");
+    const notCustom = select.value != "custom";
+    htmx.findAll("#txn-filters [type='date']").forEach((e) => {
+      e.disabled = notCustom;
+    });
+  },
+  /**
+   * On click of clear transaction, confirm action
+   *
+   * @param {Event} evt Triggering event
+   */
+  confirmClear: function (evt) {
+    dialog.confirm(
+      "Clear transaction",
+      "Clear",
+      () => {
+        htmx.trigger(evt.target, "clear");
+      },
+      "Transaction will be marked as cleared. Only use on manually updated accounts. Cannot undo.",
+    );
+  },
+  /**
+   * On click of delete transaction, confirm action
+   *
+   * @param {Event} evt Triggering event
+   */
+  confirmDelete: function (evt) {
+    dialog.confirm(
+      "Delete transaction",
+      "Delete",
+      () => {
+        htmx.trigger(evt.target, "delete");
+      },
+      "Uncleared transaction will be deleted.",
+    );
+  },
+};
+
+"use strict";
+/**
+ * Get theme colors
+ *
+ * @param {String} name Name of color to get
+ * @return {String} Hex string of color
+ */
+function getThemeColor(name) {
+  const style = getComputedStyle(document.body);
+  return style.getPropertyValue(`--color-${name}`);
+}
+
+/**
+ * Downsample data to monthly min/max/avg values
+ *
+ * @param {Array} dates Array of sample dates
+ * @param {Array} values Array of sample values
+ * @return {Object} Object with the following keys
+ * @return {Array} labels
+ * @return {Array} min
+ * @return {Array} max
+ * @return {Array} avg
+ */
+function downsampleMonths(dates, values) {
+  let labels = [];
+  let min = [];
+  let max = [];
+  let avg = [];
+
+  let currentMonth = dates[0].slice(0, 7);
+  let currentMin = values[0];
+  let currentMax = values[0];
+  let currentSum = 0;
+  let currentN = 0;
+  for (let i = 0; i < dates.length; ++i) {
+    let month = dates[i].slice(0, 7);
+    let v = values[i];
+
+    if (month != currentMonth) {
+      labels.push(currentMonth);
+      min.push(currentMin);
+      max.push(currentMax);
+      avg.push(currentSum / currentN);
+
+      currentMonth = month;
+      currentMin = v;
+      currentMax = v;
+      currentSum = 0;
+      currentN = 0;
+    }
+
+    currentMin = Math.min(currentMin, v);
+    currentMax = Math.max(currentMax, v);
+    currentSum += v;
+    ++currentN;
+  }
+  labels.push(currentMonth);
+  min.push(currentMin);
+  max.push(currentMax);
+  avg.push(currentSum / currentN);
+
+  return {
+    labels: labels,
+    min: min,
+    max: max,
+    avg: avg,
+  };
+}
+
+/**
+ * Create currency formatter from spec
+ *
+ * @param {Object} spec See Python side: Currency
+ * @returns function(x: Number, coarse: Boolean = false): String
+ */
+function newCurrencyFormat(spec) {
+  const formatter = new Intl.NumberFormat("nu", {
+    useGrouping: "always",
+    minimumFractionDigits: Math.max(0, spec.precision),
+    maximumFractionDigits: Math.max(0, spec.precision),
+  });
+  const formatterCoarse = new Intl.NumberFormat("nu", {
+    useGrouping: "always",
+    minimumFractionDigits: Math.max(0, spec.precision_coarse),
+    maximumFractionDigits: Math.max(0, spec.precision_coarse),
+  });
+  function format(x, coarse, formattedNumber) {
+    coarse = coarse ?? false;
+
+    let s = "";
+    if (!spec.plus_is_prefix && !spec.symbol_is_suffix) s += spec.symbol;
+
+    if (x < 0) {
+      s += "-";
+      x = -x;
+    } else if (spec.plus) {
+      s += "+";
+    }
+
+    if (spec.plus_is_prefix && !spec.symbol_is_suffix) s += spec.symbol;
+
+    if (!formattedNumber) {
+      let p = coarse ? spec.precision_coarse : spec.precision;
+      let exp = Math.pow(10, p);
+
+      x = Math.round(x * exp) / exp;
+
+      formattedNumber = coarse
+        ? formatterCoarse.format(x)
+        : formatter.format(x);
+    }
+    s += formattedNumber.replaceAll(/[.,]/g, (g) => {
+      return g == "." ? spec.sep_dec : spec.sep_1k;
+    });
+
+    if (spec.symbol_is_suffix) s += spec.symbol;
+
+    return s;
+  }
+
+  return format;
+}
+
+/**
+ * Format ticks as money
+ *
+ * @param {Number} value Value of current tick
+ * @param {Number} index Index of current tick
+ * @param {Object} ticks Array of all ticks
+ * @return {String} Label for current tick
+ */
+function formatMoneyTicks(value, index, ticks) {
+  if (index == 0) {
+    const formatter0 = new Intl.NumberFormat("nu", {
+      useGrouping: "always",
+      minimumFractionDigits: 0,
+      maximumFractionDigits: 0,
+    });
+    const formatter1 = new Intl.NumberFormat("nu", {
+      useGrouping: "always",
+      minimumFractionDigits: 1,
+      maximumFractionDigits: 1,
+    });
+
+    const cf = this.chart.config.options.currencyFormat;
+    const step = Math.abs(ticks[0].value - ticks[1].value);
+    const smallest = Math.min(...ticks.map((t) => Math.abs(t.value)));
+    ticks.forEach((t) => {
+      let v = null;
+      if (step >= 1_000_000) {
+        v = formatter0.format(Math.abs(t.value / 1_000_000)) + "M";
+      } else if (step >= 100_000 && smallest >= 1_000_000) {
+        v = formatter1.format(Math.abs(t.value / 1_000_000)) + "M";
+      } else if (step >= 1_000) {
+        v = formatter0.format(Math.abs(t.value / 1_000)) + "k";
+      } else if (step >= 100 && smallest >= 1_000) {
+        v = formatter1.format(Math.abs(t.value / 1_000)) + "k";
+      }
+      t.label = cf(t.value, false, v);
+    });
+  }
+  return ticks[index].label;
+}
+
+/**
+ * Format ticks as percent
+ *
+ * @param {Number} value Value of current tick
+ * @param {Number} index Index of current tick
+ * @param {Object} ticks Array of all ticks
+ * @return {String} Label for current tick
+ */
+function formatPercentTicks(value, index, ticks) {
+  if (index == 0) {
+    const step = Math.abs(ticks[0].value - ticks[1].value);
+    const smallest = Math.min(...ticks.map((t) => Math.abs(t.value)));
+    ticks.forEach((t) => {
+      t.label = `${t.value.toFixed(0)}%`;
+    });
+  }
+  return ticks[index].label;
+}
+
+/**
+ * Format ticks as date
+ *
+ * @param {Number} value Value of current tick
+ * @param {Number} index Index of current tick
+ * @param {Object} ticks Array of all ticks
+ * @return {String} Label for current tick
+ */
+function formatDateTicks(value, index, ticks) {
+  if (index == 0) {
+    const chart = this.chart;
+    const labels = chart.data.labels;
+    const dateMode = chart.config.options.scales.x.ticks.dateMode;
+    switch (dateMode) {
+      case "years":
+        ticks.forEach((t, i) => {
+          let l = labels[i];
+          if (l.slice(-2) == "01") t.label = l.slice(0, 4);
+        });
+        break;
+      case "months":
+        formatDateTicksMonths.bind(this)(value, index, ticks);
+        break;
+      case "weeks":
+        ticks.forEach((t, i) => {
+          let l = labels[i];
+          let date = new Date(l);
+          // Mark each Sunday
+          if (date.getUTCDay() == 0) t.label = l.slice(5, 10);
+        });
+        break;
+      case "days":
+        ticks.forEach((t, i) => (t.label = labels[i].slice(5, 10)));
+        break;
+      default:
+        ticks.forEach((t, i) => (t.label = labels[i]));
+        break;
+    }
+  }
+  return ticks[index].label;
+}
+
+/**
+ * Format ticks as month string
+ *
+ * @param {Number} value Value of current tick
+ * @param {Number} index Index of current tick
+ * @param {Object} ticks Array of all ticks
+ * @return {String} Label for current tick
+ */
+function formatDateTicksMonths(value, index, ticks) {
+  if (index == 0) {
+    const chart = this.chart;
+    const labels = chart.data.labels;
+    const months = {
+      "01": "Jan",
+      "02": "Feb",
+      "03": "Mar",
+      "04": "Apr",
+      "05": "May",
+      "06": "Jun",
+      "07": "Jul",
+      "08": "Aug",
+      "09": "Sep",
+      10: "Oct",
+      11: "Nov",
+      12: "Dec",
+    };
+    ticks.forEach((t, i) => {
+      let l = labels[i];
+      if (l.length == 7 || l.slice(-2) == "01") {
+        t.label = months[l.slice(5, 7)];
+      }
+    });
+  }
+  return ticks[index].label;
+}
+
+/**
+ * Compute the average of an array
+ *
+ * @param {Array} array Array to compute over
+ * @return {Number} Average value
+ */
+const average = (array) => array.reduce((a, b) => a + b) / array.length;
+
+/**
+ * Configures chart defaults
+ */
+function setChartDefaults() {
+  Chart.defaults.font.family = "'liberation-sans', 'sans-serif'";
+}
+
+/**
+ * Expand a range about the center
+ *
+ * @param {Number} min Minimum of range
+ * @param {Number} max Maximum of range
+ * @param {Number} number Expansion ratio 0.0 will not expand, 1.0 will double
+ * @return {Object} Object with the following keys
+ * @return {Number} min New range minimum
+ * @return {Number} max New range maximum
+ */
+function widenRange(min, max, amount) {
+  const center = (min + max) / 2;
+  const range = (max - min) * (1 + amount);
+  return { min: center - range / 2, max: center + range / 2 };
+}
+
+/**
+ * Check if item is object
+ *
+ * @param {Object} item to check
+ * @return {Boolean} true if item is an object
+ */
+function isObject(item) {
+  return item && typeof item === "object" && !Array.isArray(item);
+}
+
+/**
+ * Merge nested objects
+ *
+ * @param {Object} target Target object to merge into
+ * @param {Object} sources Object keys to override
+ * @return {Object} Merged objects
+ */
+function merge(target, ...sources) {
+  if (!sources.length) return target;
+  const source = sources.shift();
+
+  if (isObject(target) && isObject(source)) {
+    for (const key in source) {
+      if (isObject(source[key])) {
+        if (!target[key]) Object.assign(target, { [key]: {} });
+        merge(target[key], source[key]);
+      } else {
+        Object.assign(target, { [key]: source[key] });
+      }
+    }
+  }
+  return merge(target, ...sources);
+}
+
+/**
+ * Wrap words over multiple lines
+ *
+ * @param {Array} rawLines Array of original lines, will keep separate
+ * @param {Number} maxWidth Maximum width of a lines
+ * @param {Number} maxLines Maximum number of lines
+ * @param {2DContext} ctx Canvas drawing context
+ * @return {Array} Array of wrapped lines
+ */
+function word_wrap(rawLines, maxWidth, maxLines, ctx) {
+  if (maxLines < 1) {
+    return [];
+  }
+  const lines = [];
+  for (const rawLine of rawLines) {
+    if (!rawLine) {
+      continue;
+    }
+    const words = rawLine.split(" ");
+    let currentLine = null;
+    for (const word of words) {
+      const newLine = currentLine ? currentLine + " " + word : word;
+      const width = ctx.measureText(newLine).width;
+      if (width < maxWidth) {
+        currentLine = newLine;
+      } else if (currentLine) {
+        const wordWidth = ctx.measureText(word).width;
+        if (wordWidth >= maxWidth) {
+          return lines;
+        }
+        lines.push(currentLine);
+        if (lines.length == maxLines) {
+          return lines;
+        }
+        currentLine = word;
+      } else {
+        // word alone doesn't fit
+        return lines;
+      }
+    }
+    if (currentLine) {
+      lines.push(currentLine);
+      if (lines.length == maxLines) {
+        return lines;
+      }
+    }
+  }
+  return lines;
+}
+
+/**
+ * On htmx send error, show error bar
+ *
+ * @param {Event} event Triggering event
+ */
+function nummusSendError(evt) {
+  const url = evt.detail.pathInfo.finalRequestPath;
+  const e = htmx.find("#hx-error");
+  htmx.removeClass(e, "hidden");
+  htmx.find(e, "span").innerHTML = `Failed to send request for '${url}'`;
+}
+
+/**
+ * On htmx response error, show error bar
+ *
+ * @param {Event} event Triggering event
+ */
+function nummusResponseError(evt) {
+  const e = htmx.find("#hx-error");
+  htmx.removeClass(e, "hidden");
+  htmx.find(e, "span").innerHTML = evt.detail.error;
+}
+
+/**
+ * On changes, clear all page history and force a cache miss
+ */
+function nummusClearHistory() {
+  setTimeout(() => {
+    sessionStorage.removeItem("htmx-history-cache");
+  }, 100);
+}
+htmx.on("clear-history", nummusClearHistory);
+
+/**
+ * On key press of a select label, go to the matching element, ignoring emojis
+ *
+ * @param {Event} evt - Triggering event
+ */
+function onSelectKey(evt) {
+  const k = evt.key.toLowerCase();
+  if (k.length != 1 || !k.match(/[a-z]/)) return;
+  const e = evt.target;
+
+  const values = [];
+  for (const option of e.options) {
+    if (option.disabled) continue;
+    const cat = option.innerText.toLowerCase().trim();
+    if (cat[0] == k) values[values.length] = option.value;
+  }
+  const i = values.indexOf(e.value) + 1;
+  e.value = values[i % values.length];
+}
+
+/**
+ * Add current timezone to HTMX requests
+ *
+ * @param {Event} evt - Triggering event
+ */
+function addTimezone(evt) {
+  const d = new Date();
+  evt.detail.headers["Timezone-Offset"] = d.getTimezoneOffset();
+}
+
+/** Update the colors of color swatches */
+function updateColorSwatches() {
+  htmx.findAll("div[color-spin]").forEach((e) => {
+    const border = e.getAttribute("border");
+    const bg = e.getAttribute("bg");
+    const spin = Number(e.getAttribute("color-spin"));
+    e.style.borderColor = tinycolor(getThemeColor(border))
+      .spin(spin)
+      .toHexString();
+    e.style.backgroundColor =
+      tinycolor(getThemeColor(bg)).spin(spin).toHexString() + "80";
+  });
+}
+
+/*
+ * DELETE is supposed to use request parameters but form is way better
+ * htmx 2.x followed the spec properly, revert
+ */
+htmx.config.methodsThatUseUrlParams = ["get"];
+
+"use strict";
+/**
+ * Chart.js plugin to draw a box annotation
+ *
+ */
+const pluginBoxAnnotation = {
+  id: "boxAnnotation",
+  beforeInit: function (chart) {
+    const {
+      config: {
+        options: {
+          plugins: { boxAnnotation },
+          scales: { y },
+        },
+      },
+    } = chart;
+
+    // Add suggested min/max so box is visible
+    let { yMin, yMax } = boxAnnotation;
+    let { min, max } = widenRange(yMin, yMax, 0.05);
+    min = Math.min(min, y.suggestedMin ?? min);
+    max = Math.max(max, y.suggestedMax ?? max);
+    y.suggestedMin = min;
+    y.suggestedMax = max;
+
+    chart.boxAnnotation = boxAnnotation;
+  },
+  beforeDatasetsDraw: function (chart) {
+    let {
+      ctx,
+      chartArea: { top, bottom, left, right, width, height },
+      scales,
+      boxAnnotation: { yMin, yMax, borderColor, borderWidth, backgroundColor },
+    } = chart;
+
+    borderWidth = borderWidth ?? 1;
+    borderColor = borderColor ?? "#000";
+
+    const yMinPx = scales.y.getPixelForValue(yMin);
+    const yMaxPx = scales.y.getPixelForValue(yMax);
+
+    const x = left;
+    const y = yMinPx;
+    const w = right - left;
+    const h = yMaxPx - yMinPx;
+
+    ctx.save();
+
+    if (backgroundColor != null) {
+      ctx.fillStyle = backgroundColor;
+      ctx.fillRect(x, y, w, h);
+    }
+    if (borderWidth > 0) {
+      // Only stroke top and bottom lines
+      ctx.beginPath();
+      ctx.moveTo(left, yMinPx);
+      ctx.lineTo(right, yMinPx);
+      ctx.moveTo(left, yMaxPx);
+      ctx.lineTo(right, yMaxPx);
+
+      ctx.lineWidth = borderWidth;
+      ctx.strokeStyle = borderColor;
+      ctx.stroke();
+    }
+
+    ctx.restore();
+  },
+};
+
+"use strict";
+/**
+ * Chart.js plugin to compute color from semantic name
+ *
+ */
+const pluginColor = {
+  id: "color",
+  charts: {},
+  afterInit: function (chart) {
+    this.charts[chart.id] = chart;
+    this.updateChartColor(chart);
+  },
+  updateChartColor: function (chart) {
+    const getColor = function (src, spin) {
+      let opacity = "";
+      if (Array.isArray(src)) {
+        opacity = src[1];
+        src = src[0];
+      }
+      const c = getThemeColor(src);
+      if (spin) return tinycolor(c).spin(spin).toHexString() + opacity;
+      return c + opacity;
+    };
+
+    const fields = ["borderColor", "backgroundColor"];
+    const {
+      config: {
+        type,
+        options,
+        data: { datasets },
+      },
+    } = chart;
+    for (const dataset of datasets) {
+      const {
+        borderColorRaw,
+        backgroundColorRaw,
+        colorSpin,
+        fill: { aboveRaw, belowRaw } = {},
+      } = dataset;
+      if (type == "doughnut") {
+        if (borderColorRaw)
+          dataset.borderColor = borderColorRaw.map((raw, i) =>
+            getColor(raw, colorSpin[i]),
+          );
+        if (backgroundColorRaw)
+          dataset.backgroundColor = backgroundColorRaw.map((raw, i) =>
+            getColor(raw, colorSpin[i]),
+          );
+      } else {
+        if (borderColorRaw)
+          dataset.borderColor = getColor(borderColorRaw, colorSpin);
+        if (backgroundColorRaw)
+          dataset.backgroundColor = getColor(backgroundColorRaw, colorSpin);
+        if (aboveRaw) dataset.fill.above = getColor(aboveRaw, colorSpin);
+        if (belowRaw) dataset.fill.below = getColor(belowRaw, colorSpin);
+      }
+    }
+
+    const text = getThemeColor("on-surface");
+    const surface = getThemeColor("inverse-surface");
+    const textInv = getThemeColor("inverse-on-surface");
+    const outline = getThemeColor("outline-variant");
+
+    if (options.scales.x) {
+      options.scales.x.ticks.color = text;
+      options.scales.x.grid.color = outline;
+      options.scales.x.border.color = outline;
+    }
+
+    if (options.scales.y) {
+      options.scales.y.ticks.color = text;
+      options.scales.y.grid.color = (ctx) =>
+        ctx.tick.value == 0 ? text : outline;
+      options.scales.y.border.color = outline;
+    }
+
+    options.plugins.tooltip.backgroundColor = surface;
+    options.plugins.tooltip.titleColor = textInv;
+    options.plugins.tooltip.bodyColor = textInv;
+
+    if (options.plugins.doughnutText) {
+      options.plugins.doughnutText.color = text;
+    }
+  },
+  update: function () {
+    for (const chart of Object.values(this.charts)) {
+      this.updateChartColor(chart);
+      chart.update();
+    }
+  },
+  afterDestroy: function (chart) {
+    delete this.charts[chart.id];
+  },
+};
+
+"use strict";
+/**
+ * Chart.js plugin to draw text at the center of a doughnut chart
+ *
+ */
+const pluginDoughnutText = {
+  id: "doughnutText",
+  beforeInit: function (chart) {
+    const {
+      config: {
+        options: {
+          plugins: { doughnutText },
+        },
+      },
+    } = chart;
+    chart.doughnutText = doughnutText;
+  },
+  afterDatasetsDraw: function (chart) {
+    const {
+      ctx,
+      chartArea: { top, bottom, left, right, width, height },
+      doughnutText: { text, font, color },
+    } = chart;
+
+    const px = Math.floor(height / 10);
+
+    ctx.save();
+    ctx.textBaseline = "middle";
+    ctx.textAlign = "center";
+    ctx.font = `${px}px ${font}`;
+    ctx.fillStyle = color;
+    ctx.fillText(text, (left + right) / 2, (top + bottom) / 2);
+
+    ctx.restore();
+  },
+};
+
+"use strict";
+/**
+ * Chart.js plugin to set a fixed axis width
+ *
+ */
+const pluginFixedAxisWidth = {
+  id: "fixedAxisWidth",
+  beforeInit: function (chart) {
+    const {
+      config: {
+        options: {
+          scales: { y },
+          plugins: {
+            fixedAxisWidth: { width },
+          },
+        },
+      },
+    } = chart;
+    y.afterFit = function (scale) {
+      if (scale.width > width)
+        console.error(
+          `Scale width ${scale.width} already ` + `over desired ${width}`,
+        );
+      scale.width = width;
+    };
+  },
+};
+
+"use strict";
+/**
+ * Chart.js plugin to highlight another element on hover
+ *
+ */
+const pluginHoverHighlight = {
+  id: "hoverHighlight",
+  beforeInit: function (chart) {
+    const {
+      config: {
+        options: {
+          plugins: { hoverHighlight },
+        },
+      },
+    } = chart;
+    hoverHighlight.scroll = hoverHighlight.scroll ?? true;
+    hoverHighlight.listenersEnter = [];
+    hoverHighlight.listenersExit = [];
+    chart.hoverHighlight = hoverHighlight;
+
+    this.addListeners(chart);
+  },
+  addListeners(chart) {
+    const hoverHighlight = chart.hoverHighlight;
+    if (!hoverHighlight) return;
+    this.removeListeners(chart);
+    document
+      .querySelectorAll(`#${hoverHighlight.parent}>*`)
+      .forEach((child, i) => {
+        const enter = function () {
+          child.style.fontWeight = "bold";
+          this.setHover(chart, i, true);
+        }.bind(this);
+        const exit = function () {
+          child.style.fontWeight = "";
+          this.setHover(chart, i, false);
+        }.bind(this);
+        child.addEventListener("mouseenter", enter);
+        child.addEventListener("mouseleave", exit);
+        hoverHighlight.listenersEnter[i] = enter;
+        hoverHighlight.listenersExit[i] = exit;
+      });
+  },
+  removeListeners(chart) {
+    const hoverHighlight = chart.hoverHighlight;
+    document
+      .querySelectorAll(`#${hoverHighlight.parent}>*`)
+      .forEach((child, i) => {
+        child.removeEventListener(
+          "mouseenter",
+          hoverHighlight.listenersEnter[i],
+        );
+        child.removeEventListener("mouseexit", hoverHighlight.listenersExit[i]);
+      });
+    hoverHighlight.listenersEnter.length = 0;
+    hoverHighlight.listenersExit.length = 0;
+  },
+  getChild(chart, i) {
+    const hoverHighlight = chart.hoverHighlight;
+    return document.querySelector(
+      `#${hoverHighlight.parent}>:nth-child(${i + 1})`,
+    );
+  },
+  setActive(chart, i, active) {
+    const hoverHighlight = chart.hoverHighlight;
+    const child = this.getChild(chart, i);
+    if (active && (chart.data.labels[i] ?? "Other") != "Other") {
+      if (hoverHighlight.scroll)
+        child.scrollIntoView({ block: "nearest", inline: "nearest" });
+      child.style.fontWeight = "bold";
+    } else {
+      child.style.fontWeight = "";
+    }
+  },
+  setHover(chart, i, active) {
+    const tooltip = chart.tooltip;
+    if (active && (chart.data.labels[i] ?? "Other") != "Other") {
+      tooltip.setActiveElements([{ datasetIndex: 0, index: i }]);
+    } else {
+      tooltip.setActiveElements([]);
+    }
+    chart.update();
+  },
+  beforeEvent(chart, args, pluginOptions) {
+    const hoverHighlight = chart.hoverHighlight;
+    const event = args.event;
+    if (event.type == "mouseout") {
+      if (hoverHighlight.previous != null) {
+        this.setActive(chart, hoverHighlight.previous, false);
+      }
+      hoverHighlight.previous = null;
+    } else if (
+      event.type == "mousemove" &&
+      chart.tooltip.dataPoints != null &&
+      chart.tooltip.dataPoints.length > 0
+    ) {
+      const dataPoint = chart.tooltip.dataPoints[0];
+      if (dataPoint.element.active) {
+        const i = dataPoint.dataIndex;
+        if (hoverHighlight.previous == i) return;
+
+        this.setActive(chart, i, true);
+
+        if (hoverHighlight.previous != null) {
+          this.setActive(chart, hoverHighlight.previous, false);
+        }
+        hoverHighlight.previous = i;
+      } else if (hoverHighlight.previous != null) {
+        this.setActive(chart, hoverHighlight.previous, false);
+        hoverHighlight.previous = null;
+      }
+    }
+  },
+};
+
+"use strict";
+/**
+ * Chart.js plugin to nicely set colors for tree charts
+ *
+ */
+const pluginTreeColor = {
+  id: "treeColor",
+  charts: {},
+  beforeInit: function (chart) {
+    const {
+      config: {
+        data: { datasets },
+      },
+    } = chart;
+
+    for (const dataset of datasets) {
+      let treeValues = Object.values(dataset.tree);
+      treeValues.forEach((group) => {
+        let sum = 0;
+        Object.values(group).forEach((item) => {
+          sum += item.value ?? 0;
+        });
+        group.sum = sum;
+      });
+      treeValues.sort((a, b) => {
+        return b.sum - a.sum;
+      });
+      treeValues.forEach((group, i) => {
+        group.i = i;
+      });
+    }
+  },
+  afterInit: function (chart) {
+    this.charts[chart.id] = chart;
+    this.updateChartColor(chart);
+  },
+  updateChartColor: function (chart) {
+    const base = getThemeColor("primary");
+    const baseContainer = getThemeColor("primary-container");
+    const onBase = getThemeColor("on-primary");
+    const onContainer = getThemeColor("on-surface");
+
+    const {
+      config: {
+        options,
+        data: { datasets },
+      },
+    } = chart;
+    options.elements.treemap.captions.color = onContainer;
+    options.elements.treemap.captions.hoverColor = onContainer;
+
+    for (const dataset of datasets) {
+      const treeValues = Object.values(dataset.tree);
+      treeValues.forEach((group) => {
+        const spin = (group.i * 360) / treeValues.length;
+        const color = tinycolor(baseContainer).spin(spin).toHexString();
+        const hoverColor = tinycolor(base).spin(spin).toHexString();
+
+        group.color = color;
+        group.hoverColor = hoverColor;
+      });
+      dataset.labels.color = onContainer;
+      dataset.labels.hoverColor = onBase;
+      dataset.backgroundColor = this.backgroundColor;
+      dataset.borderColor = this.backgroundColor;
+      dataset.hoverBackgroundColor = this.hoverBackgroundColor;
+      dataset.hoverBorderColor = this.hoverBorderColor;
+    }
+  },
+  update: function () {
+    for (const chart of Object.values(this.charts)) {
+      this.updateChartColor(chart);
+      chart.update();
+    }
+  },
+  afterDestroy: function (chart) {
+    delete this.charts[chart.id];
+  },
+  backgroundColor: function (context) {
+    if (context.type != "data") {
+      return "transparent";
+    }
+    const treeData = context.dataset.tree;
+    const obj = context.raw._data;
+    const group = obj[0];
+    if (obj.name) {
+      return treeData[group].color;
+    }
+    return treeData[group].color + "80";
+  },
+  hoverBackgroundColor: function (context) {
+    if (context.type != "data") {
+      return "transparent";
+    }
+    const treeData = context.dataset.tree;
+    const obj = context.raw._data;
+    const group = obj[0];
+    if (obj.name) {
+      return treeData[group].hoverColor;
+    }
+    return treeData[group].color + "80";
+  },
+  hoverBorderColor: function (context) {
+    if (context.type != "data") {
+      return "transparent";
+    }
+    const treeData = context.dataset.tree;
+    const obj = context.raw._data;
+    const group = obj[0];
+    return treeData[group].hoverColor;
+  },
+};
+
+"use strict";
+/**
+ * Chart.js plugin to nicely set labels for tree charts
+ *
+ */
+const pluginTreeLabel = {
+  id: "treeLabel",
+  defaults: {
+    padding: 2,
+  },
+  beforeInit: function (chart) {
+    const {
+      config: {
+        options,
+        data: { datasets },
+      },
+    } = chart;
+    const {
+      plugins: { treeLabels: { padding } = this.defaults },
+    } = options;
+
+    const elements = merge(
+      {
+        treemap: {
+          captions: {
+            align: "center",
+            formatter: this.formatGroup,
+          },
+        },
+      },
+      options.elements ?? {},
+    );
+    options.elements = elements;
+
+    datasets.forEach((dataset) => {
+      const labels = merge(
+        {
+          display: true,
+          padding: padding,
+          formatter: this.formatItem,
+        },
+        dataset.labels ?? {},
+      );
+      dataset.labels = labels;
+    });
+  },
+  formatGroup: function (context) {
+    const padding =
+      context.dataset.labels.padding + context.dataset.borderWidth;
+    const rawObj = context.raw._data;
+    if (rawObj.name) {
+      return null;
+    }
+    let group = rawObj[0];
+    let label = group;
+    const ctx = context.chart.ctx;
+    const zoom = context.chart.getZoomLevel();
+
+    const maxWidth = context.raw.w * zoom - padding * 2;
+    let width = ctx.measureText(label).width;
+    while (group && width >= maxWidth) {
+      group = group.slice(0, -1);
+      label = group + "...";
+      width = ctx.measureText(label).width;
+    }
+    return label;
+  },
+  formatItem: function (context) {
+    const padding =
+      context.dataset.labels.padding + context.dataset.borderWidth;
+    const treeData = context.dataset.tree;
+    const rawObj = context.raw._data;
+
+    let group = rawObj[0];
+    const obj = treeData[group][rawObj.name];
+    const ctx = context.chart.ctx;
+    const zoom = context.chart.getZoomLevel();
+
+    const maxWidth = context.raw.w * zoom - padding * 2;
+    const font = Chart.helpers.toFont(ctx.font);
+    const maxLines = Math.floor(
+      (context.raw.h * zoom - padding * 2) / font.lineHeight,
+    );
+
+    let lines = [
+      obj.ticker,
+      obj.name,
+      context.chart.config.options.currencyFormat(obj.value),
+    ];
+    return word_wrap(lines, maxWidth, maxLines, ctx);
+  },
+};
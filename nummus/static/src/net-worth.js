@@ -5,22 +5,29 @@ const netWorth = {
   chartLiabilities: null,
   chartPieAssets: null,
   chartPieLiabilities: null,
+  /**
+   * Fetch compact data and create Net Worth Chart
+   *
+   * @param {String} url URL of net worth chart data
+   */
+  load: async function (url) {
+    const response = await fetch(url);
+    const payload = await response.json();
+    this.update(payload.chart, payload.accounts, payload.currency_format);
+  },
   /**
    * Create Net Worth Chart
    *
-   * @param {Object} raw Raw data from net worth controller
-   * @param {Object} rawAccounts Raw account data from net worth controller
+   * @param {Object} raw Compact data from net worth controller
+   * @param {Object} rawAccounts Compact account data from net worth controller
    * @param {Object} currencyFormat See Python side: Currency
    */
   update: function (raw, rawAccounts, currencyFormat) {
     const cf = newCurrencyFormat(currencyFormat);
-    const labels = raw.labels;
-    const dateMode = raw.mode;
-    const avg = raw.avg.map((v) => Number(v));
-    const min = raw.min && raw.min.map((v) => Number(v));
-    const max = raw.max && raw.max.map((v) => Number(v));
+    const { labels, mode: dateMode, min, avg, max } = nummusChart.unpack(raw);
+    const scale = 10 ** raw.scale;
     const accounts = rawAccounts.map((a) => {
-      a.avg = a.avg.map((v) => Number(v));
+      a.avg = a.avg.map((v) => v / scale);
       return a;
     });
 
@@ -178,14 +185,12 @@ const netWorth = {
   /**
    * Create Net Worth Dashboard Chart
    *
-   * @param {Object} raw Raw data from net worth controller
+   * @param {Object} raw Compact data from net worth controller
    * @param {Object} currencyFormat See Python side: Currency
    */
   updateDashboard: function (raw, currencyFormat) {
     const cf = newCurrencyFormat(currencyFormat);
-    const labels = raw.labels;
-    const dateMode = raw.mode;
-    const total = raw.avg.map((v) => Number(v));
+    const { labels, mode: dateMode, avg: total } = nummusChart.unpack(raw);
 
     const canvas = document.getElementById("net-worth-chart-canvas-dashboard");
     const ctx = canvas.getContext("2d");
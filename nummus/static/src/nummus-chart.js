@@ -173,6 +173,44 @@ const nummusChart = {
     }
     return datasets;
   },
+  /**
+   * Expand compact chart data
+   *
+   * @param {Object} raw Compact chart data, see Python side: base.ChartArrays
+   * @return {Object} Object with the following keys
+   * @return {Array} labels ISO dates or months
+   * @return {String} mode Mode of date tick formatter
+   * @return {Array} min values or null
+   * @return {Array} avg values
+   * @return {Array} max values or null
+   */
+  unpack: function (raw) {
+    const scale = 10 ** raw.scale;
+    const toNumbers = (values) => values && values.map((v) => v / scale);
+    const indices = [...Array(raw.n).keys()];
+    let labels;
+    if (raw.unit == "months") {
+      const [year, month] = raw.start.split("-").map(Number);
+      labels = indices.map((i) => {
+        const m = month - 1 + i;
+        const y = year + Math.floor(m / 12);
+        return `${y}-${String((m % 12) + 1).padStart(2, "0")}`;
+      });
+    } else {
+      // Date only ISO strings are parsed as UTC
+      const start = Date.parse(raw.start);
+      labels = indices.map((i) =>
+        new Date(start + i * 86400000).toISOString().slice(0, 10),
+      );
+    }
+    return {
+      labels: labels,
+      mode: raw.mode,
+      min: toNumbers(raw.min),
+      avg: toNumbers(raw.avg),
+      max: toNumbers(raw.max),
+    };
+  },
   /**
    * Prepare pie datasets
    *
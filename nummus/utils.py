@@ -1006,6 +1006,25 @@ def tokenize_search_str(search_str: str) -> Tokens:
     return Tokens(tokens_must, tokens_can, tokens_not)
 
 
+def rolling_sum(data: list[Decimal], n: int) -> list[Decimal]:
+    """Sum every window of consecutive values using prefix sums.
+
+    Args:
+        data: Data to sum
+        n: Number of samples in window
+
+    Returns:
+        list(sums) where
+        sums[0] = sum(data[0:n])
+        sums[1] = sum(data[1:n + 1])
+        ...
+        sums[-1] = sum(data[-n:])
+
+    """
+    prefix = [Decimal(), *integrate(data)]
+    return [prefix[i + n] - prefix[i] for i in range(len(data) - n + 1)]
+
+
 def low_pass(data: list[Decimal], rc: int) -> list[Decimal]:
     """Apply a low pass filter to Decimal data.
 
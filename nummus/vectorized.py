@@ -0,0 +1,213 @@
+"""Vectorized time series operations on fixed point integer arrays.
+
+Daily series are stored as int64 arrays of 10**-precision units, matching the
+Decimal6 and Decimal9 storage scale. Conversion to and from Decimal should only
+happen at the edges.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from numpy.typing import NDArray
+
+    IntArray = NDArray[np.int64]
+
+
+def to_array(values: Iterable[Decimal | None], precision: int = 6) -> IntArray:
+    """Convert Decimals to fixed point array.
+
+    Rounds half to even like np.rint, without going through float64 so values
+    beyond 15 significant digits stay exact.
+
+    Args:
+        values: Decimals to convert, None is treated as zero
+        precision: Number of decimal places to keep
+
+    Returns:
+        Array of int64 in 10**-precision units
+
+    """
+    values = list(values)
+    array = np.zeros(len(values), dtype=np.int64)
+    # Daily series are mostly empty, only convert the non-zero days
+    nonzero = [(i, round(v.scaleb(precision))) for i, v in enumerate(values) if v]
+    if nonzero:
+        indices, converted = zip(*nonzero, strict=True)
+        array[list(indices)] = converted
+    return array
+
+
+def to_decimals(array: IntArray, precision: int = 6) -> list[Decimal]:
+    """Convert fixed point array to Decimals.
+
+    Args:
+        array: Array of int64 in 10**-precision units
+        precision: Number of decimal places in array
+
+    Returns:
+        list[Decimal]
+
+    """
+    values: list[int] = array.tolist()
+    # Daily series repeat values often, only construct each Decimal once
+    lut = {v: Decimal(v).scaleb(-precision) for v in set(values)}
+    return [lut[v] for v in values]
+
+
+def integrate(deltas: IntArray) -> IntArray:
+    """Integrate an array.
+
+    Args:
+        deltas: Change in values
+
+    Returns:
+        Array where values[i] = sum(deltas[:i + 1])
+
+    """
+    return np.cumsum(deltas, dtype=np.int64)
+
+
+def multiply(a: IntArray, b: IntArray, precision: int = 6) -> IntArray:
+    """Multiply two fixed point arrays element-wise.
+
+    The product of two int64 fixed point values overflows easily, multiply as
+    float64 and round back to the precision of a.
+
+    Args:
+        a: First array
+        b: Second array
+        precision: Number of decimal places in b
+
+    Returns:
+        Array of a * b in the units of a
+
+    """
+    product = a.astype(np.float64) * b.astype(np.float64)
+    return np.rint(product / 10**precision).astype(np.int64)
+
+
+def rescale(array: IntArray, precision: int, from_precision: int = 6) -> IntArray:
+    """Reduce the precision of a fixed point array.
+
+    Rounds half to even like to_array, with integer math so large values stay
+    exact.
+
+    Args:
+        array: Array of int64 in 10**-from_precision units
+        precision: Number of decimal places to keep
+        from_precision: Number of decimal places in array
+
+    Returns:
+        Array of int64 in 10**-precision units
+
+    """
+    factor = 10 ** (from_precision - precision)
+    quotient, remainder = np.divmod(array, factor)
+    round_up = (2 * remainder > factor) | (
+        (2 * remainder == factor) & (quotient % 2 == 1)
+    )
+    return quotient + round_up
+
+
+def _split_values(
+    values: list[tuple[int, Decimal]],
+    precision: int,
+) -> tuple[IntArray, IntArray]:
+    """Split a list of (index, value)s into arrays.
+
+    Args:
+        values: List of (index, value)
+        precision: Number of decimal places to keep
+
+    Returns:
+        (indices, values)
+
+    """
+    indices = np.fromiter((i for i, _ in values), dtype=np.int64, count=len(values))
+    return indices, to_array((v for _, v in values), precision)
+
+
+def interpolate_step(
+    values: list[tuple[int, Decimal]],
+    n: int,
+    precision: int = 6,
+) -> IntArray:
+    """Interpolate a list of (index, value)s using a step function.
+
+    Indices can be outside of [0, n)
+
+    Args:
+        values: List of (index, value) sorted by index
+        n: Length of output array
+        precision: Number of decimal places to keep
+
+    Returns:
+        Array of interpolated values where result[i] = most recent values <= i
+
+    """
+    if len(values) == 0:
+        return np.zeros(n, dtype=np.int64)
+    xp, fp = _split_values(values, precision)
+    i = np.searchsorted(xp, np.arange(n), side="right") - 1
+    return np.where(i >= 0, fp[np.maximum(i, 0)], 0)
+
+
+def interpolate_linear(
+    values: list[tuple[int, Decimal]],
+    n: int,
+    precision: int = 6,
+) -> IntArray:
+    """Interpolate a list of (index, value)s using a linear function.
+
+    Indices can be outside of [0, n) to interpolate on the boundary
+
+    Args:
+        values: List of (index, value) sorted by index
+        n: Length of output array
+        precision: Number of decimal places to keep
+
+    Returns:
+        Array of interpolated values
+
+    """
+    if len(values) == 0:
+        return np.zeros(n, dtype=np.int64)
+    xp, fp = _split_values(values, precision)
+    result = np.interp(np.arange(n), xp, fp, left=0)
+    return np.rint(result).astype(np.int64)
+
+
+def downsample(
+    arrays: Sequence[IntArray],
+    starts: Sequence[int],
+) -> tuple[IntArray, IntArray, IntArray]:
+    """Reduce arrays to the min, average, and max of each bucket.
+
+    Every array is reduced together, without slicing out each bucket.
+
+    Args:
+        arrays: Arrays of equal length to reduce
+        starts: Index of the first value of each bucket, ascending from 0,
+            each bucket ends before the next starts
+
+    Returns:
+        (min, avg, max) arrays of shape (len(arrays), len(starts))
+        avg is rounded to the nearest unit
+
+    """
+    stacked = np.stack(arrays)
+    i = np.asarray(starts, dtype=np.int64)
+    v_min = np.minimum.reduceat(stacked, i, axis=1)
+    v_max = np.maximum.reduceat(stacked, i, axis=1)
+    # Sum each bucket directly, prefix sums of long series can overflow int64
+    sums = np.add.reduceat(stacked, i, axis=1)
+    counts = np.diff(i, append=stacked.shape[1])
+    v_avg = np.rint(sums / counts).astype(np.int64)
+    return v_min, v_avg, v_max
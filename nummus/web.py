@@ -17,7 +17,7 @@ import prometheus_flask_exporter.multiprocess
 
 from nummus import controllers
 from nummus import exceptions as exc
-from nummus import utils, web_assets
+from nummus import sql, utils, web_assets
 from nummus.controllers import (
     accounts,
     allocation,
@@ -95,7 +95,19 @@ class FlaskExtension:
         elif not isinstance(key, str):
             raise TypeError
 
-        return Portfolio(path, key)
+        # Settings such as NUMMUS_DB_JOURNAL_MODE override the web defaults
+        profile = sql.WEB_ENGINE_PROFILE
+        overrides: dict[str, object] = {}
+        for field in profile._fields:
+            value = config.get(f"DB_{field.upper()}")
+            if value is None:
+                continue
+            if not isinstance(value, type(getattr(profile, field))):
+                raise TypeError
+            overrides[field] = value
+        profile = profile._replace(**overrides)
+
+        return Portfolio(path, key, engine_profile=profile)
 
     @classmethod
     def _add_routes(cls, app: flask.Flask) -> None:
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+import gzip
+import json
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+import pytest
+
+from nummus.commands import export
 from nummus.commands.export import Export
 from nummus.models.currency import CURRENCY_FORMATS, DEFAULT_CURRENCY
 
 if TYPE_CHECKING:
-    from pathlib import Path
-
-    import pytest
-
     from nummus.models.account import Account
     from nummus.models.transaction import Transaction
     from nummus.portfolio import Portfolio
@@ -66,3 +68,174 @@ def test_export(
         ),
     ]
     assert buf == target
+
+
+def test_export_gzip_jsonl(
+    empty_portfolio: Portfolio,
+    account: Account,
+    transactions: list[Transaction],
+    tmp_path: Path,
+) -> None:
+    path_out = tmp_path / "out.jsonl.gz"
+
+    c = Export(
+        empty_portfolio.path,
+        None,
+        path_out,
+        None,
+        None,
+        no_bars=True,
+        output_format="jsonl",
+        compression="gzip",
+    )
+    assert c.run() == 0
+
+    with gzip.open(path_out, "rt", encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file]
+    # Asset transactions are not exported
+    assert len(rows) == 1
+    assert rows[0]["Date"] == transactions[0].date.isoformat()
+    assert rows[0]["Account"] == account.name
+
+
+def test_export_stdout(
+    capsysbinary: pytest.CaptureFixture[bytes],
+    empty_portfolio: Portfolio,
+) -> None:
+    c = Export(empty_portfolio.path, None, Path("-"), None, None, no_bars=True)
+    assert c.run() == 0
+
+    captured = capsysbinary.readouterr()
+    assert captured.out == b"Date,Account,Payee,Memo,Category,Amount\r\n"
+    target = b"Portfolio is unlocked\n0 transactions exported to stdout\n"
+    assert captured.err.endswith(target)
+
+
+def test_export_missing_dependency(
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+    empty_portfolio: Portfolio,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(export, "_available", lambda _: False)
+    path_out = tmp_path / "out.parquet"
+
+    c = Export(
+        empty_portfolio.path,
+        None,
+        path_out,
+        None,
+        None,
+        no_bars=True,
+        output_format="parquet",
+    )
+    assert c.run() != 0
+
+    captured = capsys.readouterr()
+    assert "requires pyarrow" in captured.err
+    assert not path_out.exists()
+
+
+def test_export_missing_zstandard(
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+    empty_portfolio: Portfolio,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(export, "_available", lambda m: m != "zstandard")
+    path_out = tmp_path / "out.jsonl.zst"
+
+    c = Export(
+        empty_portfolio.path,
+        None,
+        path_out,
+        None,
+        None,
+        no_bars=True,
+        output_format="jsonl",
+        compression="zstd",
+    )
+    assert c.run() != 0
+
+    captured = capsys.readouterr()
+    assert "requires zstandard" in captured.err
+    assert not path_out.exists()
+
+
+@pytest.mark.skipif(
+    not export._available("zstandard"),
+    reason="No zstandard available",
+)
+def test_export_zstd_jsonl(
+    empty_portfolio: Portfolio,
+    account: Account,
+    transactions: list[Transaction],
+    tmp_path: Path,
+) -> None:
+    import zstandard  # noqa: PLC0415
+
+    path_out = tmp_path / "out.jsonl.zst"
+
+    c = Export(
+        empty_portfolio.path,
+        None,
+        path_out,
+        None,
+        None,
+        no_bars=True,
+        output_format="jsonl",
+        compression="zstd",
+    )
+    assert c.run() == 0
+
+    with path_out.open("rb") as raw:
+        reader = zstandard.ZstdDecompressor().stream_reader(raw)
+        lines = reader.read().decode("utf-8").splitlines()
+    rows = [json.loads(line) for line in lines]
+    # Asset transactions are not exported
+    assert len(rows) == 1
+    assert rows[0]["Date"] == transactions[0].date.isoformat()
+    assert rows[0]["Account"] == account.name
+
+
+@pytest.mark.skipif(
+    not export._available("pyarrow"),
+    reason="No pyarrow available",
+)
+def test_export_parquet(
+    empty_portfolio: Portfolio,
+    account: Account,
+    transactions: list[Transaction],
+    tmp_path: Path,
+) -> None:
+    import pyarrow.parquet  # noqa: PLC0415
+
+    txn = transactions[0]
+    t_split = txn.splits[0]
+
+    path_out = tmp_path / "out.parquet"
+
+    c = Export(
+        empty_portfolio.path,
+        None,
+        path_out,
+        None,
+        None,
+        no_bars=True,
+        output_format="parquet",
+        compression="zstd",
+    )
+    assert c.run() == 0
+
+    table = pyarrow.parquet.read_table(path_out)
+    assert table.column_names == [*export.HEADER, "Currency"]
+    target = {
+        "Date": txn.date,
+        "Account": account.name,
+        "Payee": txn.payee,
+        "Memo": t_split.memo,
+        "Category": "Other Income",
+        "Amount": txn.amount,
+        "Currency": DEFAULT_CURRENCY.name,
+    }
+    assert table.to_pylist() == [target]
@@ -50,6 +50,7 @@ def test_v0_1_migration(
         "Portfolio migrated to v0.15.0\n"
         "Portfolio currency set to USD (US Dollar), use web to edit\n"
         "Portfolio migrated to v0.16.0\n"
+        "Portfolio migrated to v0.17.0\n"
         "Portfolio model schemas updated\n"
     )
     assert captured.out == target
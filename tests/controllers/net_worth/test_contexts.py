@@ -22,21 +22,11 @@ def test_ctx_chart_empty(
 ) -> None:
     ctx = net_worth.ctx_chart(today, "max")
 
-    chart: base.ChartData = {
-        "labels": [today.isoformat()],
-        "mode": "days",
-        "avg": [Decimal()],
-        "min": None,
-        "max": None,
-    }
-
     target: net_worth.Context = {
         "start": today,
         "end": today,
         "period": "max",
         "period_options": base.PERIOD_OPTIONS,
-        "chart": chart,
-        "accounts": [],
         "net_worth": Decimal(),
         "assets": Decimal(),
         "liabilities": Decimal(),
@@ -86,67 +76,100 @@ def test_ctx_chart(
     end = today + datetime.timedelta(days=3)
     ctx = net_worth.ctx_chart(end, "max")
 
-    chart: base.ChartData = {
-        "labels": base.date_labels(start.toordinal(), end.toordinal())[0],
+    target: net_worth.Context = {
+        "start": start,
+        "end": end,
+        "period": "max",
+        "period_options": base.PERIOD_OPTIONS,
+        "net_worth": Decimal(50),
+        "assets": Decimal(150),
+        "liabilities": Decimal(-100),
+        "assets_w": Decimal(60),
+        "liabilities_w": Decimal(40),
+        "currency_format": CURRENCY_FORMATS[DEFAULT_CURRENCY],
+    }
+    assert ctx == target
+
+
+def test_ctx_payload_empty(
+    today: datetime.date,
+    account: Account,
+) -> None:
+    result = net_worth.ctx_payload(today, "max")
+
+    chart: base.ChartArrays = {
+        "start": today.isoformat(),
+        "n": 1,
+        "unit": "days",
         "mode": "days",
-        "avg": [
-            Decimal(100),
-            Decimal(90),
-            Decimal(90),
-            Decimal(10),
-            Decimal(50),
-            Decimal(50),
-            Decimal(50),
-        ],
+        "scale": 2,
         "min": None,
+        "avg": [0],
         "max": None,
     }
+    target: net_worth.ChartPayload = {
+        "chart": chart,
+        "accounts": [],
+        "currency_format": CURRENCY_FORMATS[DEFAULT_CURRENCY]._asdict(),
+    }
+    assert result == target
 
-    accounts: list[net_worth.AccountContext] = [
+
+def test_ctx_payload(
+    today: datetime.date,
+    rand_str_generator: RandomStringGenerator,
+    account: Account,
+    account_investments: Account,
+    asset_valuation: AssetValuation,
+    transactions: list[Transaction],
+    session: orm.Session,
+    categories: dict[str, int],
+) -> None:
+    with session.begin_nested():
+        # Make account_investments negative
+        txn = Transaction.create(
+            account_id=account_investments.id_,
+            date=today,
+            amount=-100,
+            statement=rand_str_generator(),
+            payee="Monkey Bank",
+            cleared=True,
+        )
+        TransactionSplit.create(
+            parent=txn,
+            amount=txn.amount,
+            category_id=categories["groceries"],
+        )
+
+    start = today - datetime.timedelta(days=3)
+    end = today + datetime.timedelta(days=3)
+    result = net_worth.ctx_payload(end, "max")
+
+    chart: base.ChartArrays = {
+        "start": start.isoformat(),
+        "n": 7,
+        "unit": "days",
+        "mode": "days",
+        "scale": 2,
+        "min": None,
+        "avg": [10000, 9000, 9000, 1000, 5000, 5000, 5000],
+        "max": None,
+    }
+    accounts: list[net_worth.AccountArrays] = [
         {
             "name": account.name,
             "uri": account.uri,
-            "avg": [
-                Decimal(100),
-                Decimal(90),
-                Decimal(90),
-                Decimal(110),
-                Decimal(150),
-                Decimal(150),
-                Decimal(150),
-            ],
-            "min": None,
-            "max": None,
+            "avg": [10000, 9000, 9000, 11000, 15000, 15000, 15000],
         },
         {
             "name": account_investments.name,
             "uri": account_investments.uri,
-            "avg": [
-                Decimal(),
-                Decimal(),
-                Decimal(),
-                Decimal(-100),
-                Decimal(-100),
-                Decimal(-100),
-                Decimal(-100),
-            ],
-            "min": None,
-            "max": None,
+            "avg": [0, 0, 0, -10000, -10000, -10000, -10000],
         },
     ]
-
-    target: net_worth.Context = {
-        "start": start,
-        "end": end,
-        "period": "max",
-        "period_options": base.PERIOD_OPTIONS,
+    target: net_worth.ChartPayload = {
         "chart": chart,
         "accounts": accounts,
-        "net_worth": Decimal(50),
-        "assets": Decimal(150),
-        "liabilities": Decimal(-100),
-        "assets_w": Decimal(60),
-        "liabilities_w": Decimal(40),
-        "currency_format": CURRENCY_FORMATS[DEFAULT_CURRENCY],
+        "currency_format": CURRENCY_FORMATS[DEFAULT_CURRENCY]._asdict(),
     }
-    assert ctx == target
+    assert result == target
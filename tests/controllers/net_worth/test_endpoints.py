@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -27,7 +28,9 @@ def test_page(
     assert "Net worth" in result
     assert "Assets" in result
     assert "Liabilities" in result
-    assert account.name in result
+    # Chart data is fetched separately
+    assert account.name not in result
+    assert web_client.url_for("net_worth.chart_json", period="6m") in result
 
 
 def test_chart(
@@ -41,7 +44,25 @@ def test_chart(
         "net_worth.page",
         period="6m",
     )
-    assert "JSON.parse" in result
+    assert "netWorth.load" in result
+    assert web_client.url_for("net_worth.chart_json", period="6m") in result
+
+
+def test_chart_json(
+    web_client: WebClient,
+    account: Account,
+    asset_valuation: AssetValuation,
+    transactions: list[Transaction],
+) -> None:
+    result, headers = web_client.GET(
+        ("net_worth.chart_json", {"period": "max"}),
+        content_type="application/json",
+    )
+    assert "ETag" in headers
+    payload = json.loads(result)
+    assert payload["chart"]["mode"] == "days"
+    assert payload["chart"]["n"] == len(payload["chart"]["avg"])
+    assert payload["accounts"][0]["name"] == account.name
 
 
 def test_dashboard(
@@ -1,24 +1,24 @@
 from __future__ import annotations
 
+import datetime
+from decimal import Decimal
 from typing import TYPE_CHECKING
 
 import pytest
 
-from nummus import sql
+from nummus import sql, utils
 from nummus.controllers import base, spending
 from nummus.models.account import Account
 from nummus.models.currency import DEFAULT_CURRENCY
-from nummus.models.label import Label
-from nummus.models.transaction import TransactionSplit
+from nummus.models.label import Label, LabelLink
+from nummus.models.transaction import Transaction, TransactionSplit
 from nummus.models.transaction_category import (
     TransactionCategory,
     TransactionCategoryGroup,
 )
 
 if TYPE_CHECKING:
-    import datetime
-
-    from nummus.models.transaction import Transaction
+    from sqlalchemy import orm
 
 
 @pytest.mark.parametrize(
@@ -162,9 +162,11 @@ def test_ctx_options_selected(
     ]
 
 
+@pytest.mark.parametrize("filter_year", [False, True])
 def test_ctx_chart_empty(
     today: datetime.date,
     account: Account,
+    filter_year: bool,
 ) -> None:
     ctx, title = spending.ctx_chart(
         today,
@@ -172,7 +174,7 @@ def test_ctx_chart_empty(
         selected_category=None,
         selected_label=None,
         # No results should force period to "all"
-        selected_period=str(today.year),
+        selected_period=str(today.year) if filter_year else None,
         selected_start=None,
         selected_end=None,
         is_income=False,
@@ -218,3 +220,147 @@ def test_ctx_chart(
     assert len(ctx["by_payee"]) == 1
     assert len(ctx["by_category"]) == 2
     assert len(ctx["by_label"]) == 2
+
+
+def test_ctx_chart_label(
+    today: datetime.date,
+    transactions_spending: list[Transaction],
+    labels: dict[str, int],
+) -> None:
+    label = Label.id_to_uri(labels["apartments 4 U"])
+    ctx, title = spending.ctx_chart(
+        today,
+        None,
+        None,
+        label,
+        None,
+        None,
+        None,
+        is_income=False,
+    )
+
+    assert title == "Spending"
+    # Label filter uses TransactionSplits instead of the rollup
+    target = spending.ctx_splits(
+        today,
+        None,
+        None,
+        label,
+        None,
+        None,
+        None,
+        is_income=False,
+    )
+    assert {k: ctx[k] for k in target} == target
+    assert ctx["selected_label"] == label
+    assert ctx["by_category"] == [("Rent", Decimal(50))]
+    assert ctx["by_label"] == [("apartments 4 U", Decimal(50))]
+
+
+@pytest.mark.parametrize(
+    ("include_account", "period", "start", "end", "category", "is_income"),
+    [
+        (False, None, None, None, None, False),
+        (False, None, None, None, None, True),
+        (True, None, None, None, None, False),
+        (False, "2000", None, None, None, False),
+        (False, "custom", "2000-01-01", None, None, False),
+        (False, None, None, None, "groceries", False),
+    ],
+)
+def test_ctx_rollup(
+    today: datetime.date,
+    account: Account,
+    transactions_spending: list[Transaction],
+    categories: dict[str, int],
+    include_account: bool,
+    period: str | None,
+    start: str | None,
+    end: str | None,
+    category: str | None,
+    is_income: bool,
+) -> None:
+    args = (
+        account.uri if include_account else None,
+        category and TransactionCategory.id_to_uri(categories[category]),
+    )
+    dates = (period, start, end)
+    result = spending.ctx_rollup(today, *args, *dates, is_income=is_income)
+    target = spending.ctx_splits(today, *args, None, *dates, is_income=is_income)
+    # Ties can be in a different order
+    totals = {"by_account", "by_payee", "by_category", "by_label"}
+    for key in totals:
+        assert set(result[key]) == set(target[key])
+    others = {k: v for k, v in result.items() if k not in totals}
+    assert others == {k: v for k, v in target.items() if k not in totals}
+
+
+@pytest.mark.parametrize(
+    ("start_months", "start_day", "end_months", "end_day"),
+    [
+        (-3, 15, -1, 10),
+        (-3, 1, -1, 10),
+        (-3, 15, -2, 31),
+        (-3, 5, -3, 20),
+    ],
+)
+def test_ctx_rollup_partial_months(
+    today: datetime.date,
+    month: datetime.date,
+    session: orm.Session,
+    account: Account,
+    categories: dict[str, int],
+    labels: dict[str, int],
+    start_months: int,
+    start_day: int,
+    end_months: int,
+    end_day: int,
+) -> None:
+    start = utils.date_add_months(month, start_months).replace(day=start_day)
+    end = utils.date_add_months(month, end_months)
+    end = min(end.replace(day=end_day), utils.end_of_month(end))
+    dates = {
+        start - datetime.timedelta(days=1),
+        start,
+        end,
+        end + datetime.timedelta(days=1),
+    }
+    date = utils.date_add_months(month, -4)
+    while date < month:
+        dates.add(date)
+        date += datetime.timedelta(days=3)
+    with session.begin_nested():
+        # Distinct payees so any split in or out of range by mistake shows up
+        for i, date in enumerate(sorted(dates)):
+            txn = Transaction.create(
+                account_id=account.id_,
+                date=date,
+                amount=-(i + 1),
+                statement=f"statement {i}",
+                payee=f"payee {i}",
+            )
+            t_split = TransactionSplit.create(
+                parent=txn,
+                amount=txn.amount,
+                category_id=categories["groceries" if i % 2 else "rent"],
+            )
+            if i % 4 == 0:
+                LabelLink.create(label_id=labels["engineer"], t_split_id=t_split.id_)
+
+    dates_args = ("custom", start.isoformat(), end.isoformat())
+    result = spending.ctx_rollup(today, None, None, *dates_args, is_income=False)
+    target = spending.ctx_splits(
+        today,
+        None,
+        None,
+        None,
+        *dates_args,
+        is_income=False,
+    )
+    assert not result["no_matches"]
+    # Ties can be in a different order
+    totals = {"by_account", "by_payee", "by_category", "by_label"}
+    for key in totals:
+        assert set(result[key]) == set(target[key])
+    others = {k: v for k, v in result.items() if k not in totals}
+    assert others == {k: v for k, v in target.items() if k not in totals}
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import datetime
+import gzip
 import re
 from decimal import Decimal
 from pathlib import Path
@@ -11,11 +12,12 @@ import pytest
 
 import nummus
 from nummus import exceptions as exc
-from nummus import utils
+from nummus import utils, vectorized
 from nummus.controllers import base
 from nummus.models.account import Account
 from nummus.models.asset import AssetValuation
 from nummus.models.currency import DEFAULT_CURRENCY
+from nummus.models.data_version import DataDomain, DataVersion
 from nummus.models.transaction_category import TransactionCategoryGroup
 from nummus.version import __version__
 from tests import conftest
@@ -26,6 +28,7 @@ if TYPE_CHECKING:
     import werkzeug.test
 
     from nummus.models.asset import Asset
+    from nummus.portfolio import Portfolio
     from tests.conftest import RandomStringGenerator
     from tests.controllers.conftest import HTMLValidator, WebClient
 
@@ -465,6 +468,175 @@ def test_update_client_timezone(web_client: WebClient) -> None:
         assert session["tz_minutes"] == 8 * 60
 
 
+def test_fragment_cache(
+    empty_portfolio: Portfolio,
+    flask_app: flask.Flask,
+    web_client: WebClient,
+) -> None:
+    result, headers = web_client.GET("net_worth.chart")
+    etag = headers["ETag"]
+    assert headers["Cache-Control"] == "no-cache"
+    assert "HX-Request" in headers["Vary"]
+    assert headers["HX-Push-Url"]
+
+    # Served from the cache
+    result_cached, headers = web_client.GET("net_worth.chart")
+    assert result_cached == result
+    assert headers["ETag"] == etag
+    assert headers["HX-Push-Url"]
+
+    # Query args have their own entry
+    _, headers = web_client.GET(("net_worth.chart", {"period": "max"}))
+    assert headers["ETag"] != etag
+
+    url = web_client.url_for("net_worth.chart")
+    request_headers = {"HX-Request": "true", "If-None-Match": etag}
+    with flask_app.test_client() as client:
+        response = client.get(url, headers=request_headers)
+        assert response.status_code == base.HTTP_CODE_NOT_MODIFIED
+        assert not response.data
+
+        # Such as another web worker writing
+        with empty_portfolio.begin_session():
+            DataVersion.bump([DataDomain.TRANSACTIONS])
+
+        response = client.get(url, headers=request_headers)
+        assert response.status_code == base.HTTP_CODE_OK
+        assert response.headers["ETag"] != etag
+
+
+def test_fragment_cache_no_versions(
+    empty_portfolio: Portfolio,
+    flask_app: flask.Flask,
+    web_client: WebClient,
+) -> None:
+    # Such as a portfolio not yet migrated, nothing is cached
+    with empty_portfolio.begin_session() as s:
+        DataVersion.sql_table().drop(s.connection())
+
+    result, headers = web_client.GET("net_worth.chart")
+    etag = headers["ETag"]
+
+    result_again, headers = web_client.GET("net_worth.chart")
+    assert result_again == result
+    assert headers["ETag"] == etag
+
+    url = web_client.url_for("net_worth.chart")
+    request_headers = {"HX-Request": "true", "If-None-Match": etag}
+    with flask_app.test_client() as client:
+        response = client.get(url, headers=request_headers)
+        assert response.status_code == base.HTTP_CODE_NOT_MODIFIED
+
+
+def test_fragment_cache_compress(
+    flask_app: flask.Flask,
+    web_client: WebClient,
+) -> None:
+    headers = {"Accept-Encoding": "gzip"}
+    with flask_app.test_client() as client:
+        url = web_client.url_for("net_worth.chart")
+        response = client.get(url, headers=headers)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.data)
+
+        # Full pages are not compressed
+        url = web_client.url_for("common.page_dashboard")
+        response = client.get(url, headers=headers)
+        assert response.status_code == base.HTTP_CODE_OK
+        assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.parametrize(
+    ("accept", "n", "target"),
+    [
+        ("gzip, deflate", base.LIMIT_COMPRESS + 1, True),
+        ("gzip, deflate", base.LIMIT_COMPRESS, False),
+        ("deflate", base.LIMIT_COMPRESS + 1, False),
+    ],
+)
+def test_compress_response(
+    flask_app: flask.Flask,
+    accept: str,
+    n: int,
+    target: bool,
+) -> None:
+    data = b"a" * n
+    headers = {"Accept-Encoding": accept}
+    with flask_app.test_request_context(headers=headers):
+        response = flask.Response(data, mimetype="text/html")
+        response.set_etag("abc")
+        result = base.compress_response(response)
+    assert "Accept-Encoding" in result.vary
+    if target:
+        assert result.headers["Content-Encoding"] == "gzip"
+        assert result.get_etag() == ("abc", True)
+        assert gzip.decompress(result.get_data()) == data
+    else:
+        assert "Content-Encoding" not in result.headers
+        assert result.get_etag() == ("abc", False)
+        assert result.get_data() == data
+
+
+def test_compress_response_mimetype(flask_app: flask.Flask) -> None:
+    data = b"a" * (base.LIMIT_COMPRESS + 1)
+    headers = {"Accept-Encoding": "gzip"}
+    with flask_app.test_request_context(headers=headers):
+        response = flask.Response(data, mimetype="image/png")
+        result = base.compress_response(response)
+    assert "Content-Encoding" not in result.headers
+    assert result.get_data() == data
+
+
+def test_compress_response_no_etag(flask_app: flask.Flask) -> None:
+    data = b"a" * (base.LIMIT_COMPRESS + 1)
+    headers = {"Accept-Encoding": "gzip"}
+    with flask_app.test_request_context(headers=headers):
+        response = flask.Response(data, mimetype="text/html")
+        result = base.compress_response(response)
+    assert result.headers["Content-Encoding"] == "gzip"
+    assert result.get_etag() == (None, None)
+
+
+@pytest.mark.parametrize(
+    ("status", "streamed", "encoding", "target"),
+    [
+        (base.HTTP_CODE_OK, False, None, True),
+        (base.HTTP_CODE_BAD_REQUEST, False, None, False),
+        (base.HTTP_CODE_OK, True, None, False),
+        (base.HTTP_CODE_OK, False, "br", False),
+    ],
+)
+def test_should_compress(
+    flask_app: flask.Flask,
+    status: int,
+    streamed: bool,
+    encoding: str | None,
+    target: bool,
+) -> None:
+    headers = {"Accept-Encoding": "gzip"}
+    with flask_app.test_request_context(headers=headers):
+        data = iter([b"a"]) if streamed else b"a"
+        response = flask.Response(data, status, mimetype="text/html")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        assert base._should_compress(response) == target
+
+
+def test_json_response(flask_app: flask.Flask) -> None:
+    with flask_app.test_request_context():
+        result = base.json_response({"a": [Decimal("1.5"), 2], "b": None})
+    assert result.mimetype == "application/json"
+    assert result.get_data() == b'{"a":[1.5,2],"b":null}'
+
+
+def test_json_response_unknown(flask_app: flask.Flask) -> None:
+    with (
+        flask_app.test_request_context(),
+        pytest.raises(TypeError, match="Unknown type"),
+    ):
+        base.json_response({"a": datetime.date(2024, 1, 1)})
+
+
 def test_change_redirect_no_changes() -> None:
     resp = flask.Response()
     result = base.change_redirect_to_htmx(resp)
@@ -567,6 +739,72 @@ def test_chart_data_downsampled() -> None:
         assert r_min <= r_avg <= r_max
 
 
+def test_chart_data_downsampled_values(monkeypatch: pytest.MonkeyPatch) -> None:
+    start = datetime.date(2023, 1, 1)
+    start_ord = start.toordinal()
+    end = datetime.date(2023, 2, 28)
+    end_ord = end.toordinal()
+    n = end_ord - start_ord + 1
+
+    values = [Decimal(i) / 3 for i in range(n)]
+
+    monkeypatch.setattr(base, "LIMIT_DOWNSAMPLE", 30)
+    result = base.chart_data(start_ord, end_ord, values)
+    assert result["labels"] == ["2023-01", "2023-02"]
+    assert result["min"] == [Decimal(), Decimal("10.333333")]
+    assert result["avg"] == [Decimal(5), Decimal("14.833333")]
+    assert result["max"] == [Decimal(10), Decimal("19.333333")]
+
+
+def test_chart_arrays() -> None:
+    start = datetime.date(2024, 2, 28)
+    start_ord = start.toordinal()
+    end_ord = start_ord + 2
+    values = [Decimal("1.005"), Decimal(-2), Decimal("0.1")]
+    arrays = [vectorized.to_array(values), vectorized.to_array(values[::-1])]
+
+    results = base.chart_arrays(start_ord, end_ord, arrays)
+    target: base.ChartArrays = {
+        "start": "2024-02-28",
+        "n": 3,
+        "unit": "days",
+        "mode": "days",
+        "scale": 2,
+        "min": None,
+        "avg": [100, -200, 10],
+        "max": None,
+    }
+    assert results == [target, {**target, "avg": [10, -200, 100]}]
+
+
+def test_chart_arrays_months(monkeypatch: pytest.MonkeyPatch) -> None:
+    start = datetime.date(2023, 1, 1)
+    start_ord = start.toordinal()
+    end = datetime.date(2023, 2, 28)
+    end_ord = end.toordinal()
+    n = end_ord - start_ord + 1
+
+    values = [Decimal(i) / 3 for i in range(n)]
+
+    monkeypatch.setattr(base, "LIMIT_DOWNSAMPLE", 30)
+    results = base.chart_arrays(start_ord, end_ord, [vectorized.to_array(values)], 4)
+    target: base.ChartArrays = {
+        "start": "2023-01",
+        "n": 2,
+        "unit": "months",
+        "mode": "years",
+        "scale": 4,
+        "min": [0, 103333],
+        "avg": [50000, 148333],
+        "max": [100000, 193333],
+    }
+    assert results == [target]
+
+    # Same values as chart_data
+    chart = base.chart_data(start_ord, end_ord, values)
+    assert chart["avg"] == [Decimal(5), Decimal("14.833333")]
+
+
 def test_chart_data_downsampled_tuple() -> None:
     start = datetime.date(2023, 1, 1)
     start_ord = start.toordinal()
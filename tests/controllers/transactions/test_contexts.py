@@ -23,6 +23,7 @@ if TYPE_CHECKING:
     from sqlalchemy import orm
 
     from nummus.models.transaction import Transaction
+    from nummus.portfolio import Portfolio
 
 
 @pytest.mark.parametrize(
@@ -457,7 +458,71 @@ def test_ctx_table_paging(
     )
 
     assert len(ctx["transactions"]) == 2
-    assert ctx["next_page"] == transactions[0].date.isoformat()
+    t_split = transactions[1].splits[0]
+    assert ctx["next_page"] == f"{transactions[1].date}_{t_split.uri}"
+    assert not ctx["continues_date"]
+
+    ctx, _ = txn_controller.ctx_table(
+        today,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        ctx["next_page"],
+        uncleared=False,
+    )
+
+    assert len(ctx["transactions"]) == 1
+    assert ctx["transactions"][0][0] == transactions[0].date
+    assert ctx["next_page"] is None
+    assert not ctx["continues_date"]
+
+
+def test_ctx_table_paging_same_date(
+    today: datetime.date,
+    monkeypatch: pytest.MonkeyPatch,
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    txn = transactions[2]
+    with session.begin_nested():
+        txn.date_ord = transactions[3].date_ord
+        for t_split in txn.splits:
+            t_split.parent = txn
+
+    monkeypatch.setattr(txn_controller, "PAGE_LEN", 1)
+    ctx, _ = txn_controller.ctx_table(
+        today,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        uncleared=False,
+    )
+    # Newest split first on the same date
+    t_split = transactions[3].splits[0]
+    assert ctx["transactions"][0][1][0]["parent_uri"] == transactions[3].uri
+    assert ctx["next_page"] == f"{transactions[3].date}_{t_split.uri}"
+    assert not ctx["continues_date"]
+
+    ctx, _ = txn_controller.ctx_table(
+        today,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        ctx["next_page"],
+        uncleared=False,
+    )
+    assert ctx["transactions"][0][1][0]["parent_uri"] == txn.uri
+    assert ctx["continues_date"]
 
 
 def test_ctx_table_search(
@@ -498,3 +563,78 @@ def test_ctx_table_search_paging(
 
     assert len(ctx["transactions"]) == 1
     assert ctx["search"] == "rent"
+
+
+def test_ctx_table_paging_last(
+    today: datetime.date,
+    monkeypatch: pytest.MonkeyPatch,
+    transactions: list[Transaction],
+) -> None:
+    monkeypatch.setattr(txn_controller, "PAGE_LEN", 2)
+    ctx, _ = txn_controller.ctx_table(
+        today,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        transactions[1].date.isoformat(),
+        uncleared=False,
+    )
+
+    # Exactly a full page left, no empty page after it
+    assert len(ctx["transactions"]) == 2
+    assert ctx["next_page"] is None
+
+
+def test_ctx_table_search_summary_cached(
+    today: datetime.date,
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    monkeypatch: pytest.MonkeyPatch,
+    transactions: list[Transaction],
+) -> None:
+    session.commit()
+    searches: list[str] = []
+    search = TransactionSplit.search
+
+    def mock_search(*args: object) -> list[int]:
+        searches.append(str(args[1]))
+        return search(*args)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(TransactionSplit, "search", mock_search)
+    monkeypatch.setattr(txn_controller, "PAGE_LEN", 1)
+
+    with empty_portfolio.begin_session():
+        ctx, _ = txn_controller.ctx_table(
+            today,
+            "rent",
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            uncleared=False,
+        )
+        assert ctx["next_page"] == "1"
+        total = ctx["query_total"]
+
+        ctx, _ = txn_controller.ctx_table(
+            today,
+            "rent",
+            None,
+            None,
+            None,
+            None,
+            None,
+            "1",
+            uncleared=False,
+        )
+        assert ctx["next_page"] is None
+        assert ctx["query_total"] == total
+        assert len(ctx["transactions"]) == 1
+
+    # Later pages reuse the search
+    assert searches == ["rent"]
@@ -7,7 +7,12 @@ import pytest
 from nummus import exceptions as exc
 from nummus.importers.base import TransactionImporter
 from nummus.importers.raw_csv import CSVTransactionImporter
-from nummus.importers.top import get_importer, get_importers
+from nummus.importers.top import (
+    get_importer,
+    get_importers,
+    parse_file,
+    parse_files,
+)
 from tests import data
 from tests.data.custom_importer import BananaBankImporter
 
@@ -82,6 +87,44 @@ def test_get_importer(
     assert path_debug.exists()
 
 
+@pytest.mark.parametrize(
+    ("file", "target", "error"),
+    [
+        ("transactions_required.csv", "CSVTransactionImporter", False),
+        ("transactions_corrupt.csv", "CSVTransactionImporter", True),
+        ("transactions_lacking.csv", None, False),
+    ],
+)
+def test_parse_file(
+    data_path: Path,
+    file: str,
+    target: str | None,
+    error: bool,
+) -> None:
+    path = data_path / file
+    result = parse_file(path, get_importers(None))
+    assert result.importer == target
+    assert result.debug == path.read_bytes()
+    assert (result.error is not None) == error
+    assert bool(result.txns) == (target is not None and not error)
+
+
+def test_parse_files(data_path: Path) -> None:
+    paths = [
+        data_path / "banana_bank_statement.pdf",
+        data_path / "transactions_required.csv",
+        data_path / "transactions_lacking.csv",
+    ]
+    available = get_importers(data_path)
+    target = [parse_file(path, available) for path in paths]
+    # Custom importers are loaded by each worker
+    assert list(parse_files(paths, data_path, max_workers=2)) == target
+    assert target[0].importer == "BananaBankImporter"
+
+    # Single file is parsed in process
+    assert list(parse_files(paths[1:2], data_path)) == target[1:2]
+
+
 def test_get_importers() -> None:
     target = (CSVTransactionImporter,)
     assert get_importers(None) == target
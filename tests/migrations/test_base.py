@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import override, TYPE_CHECKING
 
 import pytest
+import sqlalchemy
 from packaging.version import Version
 
 from nummus import exceptions as exc
@@ -21,6 +22,13 @@ if TYPE_CHECKING:
     from nummus.portfolio import Portfolio
 
 
+def index_names(session: orm.Session, table: str) -> set[str]:
+    stmt = sqlalchemy.text(
+        "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name=:table",
+    )
+    return set(session.execute(stmt, {"table": table}).scalars())
+
+
 class MockMigrator(Migrator):
 
     _VERSION = "999.0.0"
@@ -119,3 +127,26 @@ def test_migrate_schemas_value_set(empty_portfolio: Portfolio, asset: Asset) ->
         m.add_column(Asset, Asset.category, AssetCategory.STOCKS)
 
     assert m.migrate(empty_portfolio) == []
+
+
+def test_migrate_schemas_keeps_indexes(empty_portfolio: Portfolio) -> None:
+    with empty_portfolio.begin_session() as s:
+        target = index_names(s, "asset_valuation")
+
+    m = SchemaMigrator({AssetValuation})
+    assert m.migrate(empty_portfolio) == []
+
+    with empty_portfolio.begin_session() as s:
+        assert index_names(s, "asset_valuation") == target
+
+
+def test_update_indexes(session: orm.Session) -> None:
+    target = index_names(session, "asset_valuation")
+    with session.begin_nested():
+        session.execute(sqlalchemy.text("DROP INDEX asset_valuation_date_ord"))
+        stmt = "CREATE INDEX asset_valuation_old ON asset_valuation(value)"
+        session.execute(sqlalchemy.text(stmt))
+
+    with session.begin_nested():
+        Migrator.update_indexes(AssetValuation)
+    assert index_names(session, "asset_valuation") == target
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import shutil
+from typing import TYPE_CHECKING
+
+import sqlalchemy
+from sqlalchemy import func
+
+from nummus import sql
+from nummus.migrations.v0_15 import MigratorV0_15
+from nummus.migrations.v0_17 import MigratorV0_17
+from nummus.models import search
+from nummus.models.asset import AssetFetch
+from nummus.models.data_version import DataDomain, DataVersion
+from nummus.models.rollup import MonthlyRollup
+from nummus.models.snapshot import AssetQtySnapshot, CashSnapshot
+from nummus.models.transaction import TransactionSplit
+from nummus.models.utils import dump_table_configs
+from nummus.portfolio import Portfolio
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_migrate(tmp_path: Path, data_path: Path) -> None:
+    path_original = data_path / "old_versions" / "v0.14.0.db"
+    path_db = tmp_path / "portfolio.v0.17.db"
+    shutil.copyfile(path_original, path_db)
+
+    p = Portfolio(path_db, None, check_migration=False)
+    # Search index needs labels
+    MigratorV0_15().migrate(p)
+    m = MigratorV0_17()
+    result = m.migrate(p)
+    target = []
+    assert result == target
+
+    with p.begin_session() as s:
+        result = "\n".join(dump_table_configs(CashSnapshot))
+        assert "flow" in result
+
+        result = "\n".join(dump_table_configs(AssetQtySnapshot))
+        assert "flow" in result
+
+        result = "\n".join(dump_table_configs(AssetFetch))
+        assert "end_ord" in result
+
+        query = TransactionSplit.query(func.sum(TransactionSplit.amount))
+        total = sql.scalar(query)
+        query = CashSnapshot.query(func.sum(CashSnapshot.flow))
+        assert sql.scalar(query) == total
+
+        n = sql.count(TransactionSplit.query())
+        query = MonthlyRollup.query(func.sum(MonthlyRollup.n_splits)).where(
+            MonthlyRollup.label_id.is_(None),
+        )
+        assert sql.scalar(query) == n
+        query = MonthlyRollup.query(func.sum(MonthlyRollup.amount)).where(
+            MonthlyRollup.label_id.is_(None),
+        )
+        assert sql.scalar(query) == total
+
+        query = CashSnapshot.query(func.sum(CashSnapshot.n_splits))
+        assert sql.scalar(query) == n
+
+        # Every split is indexed for search
+        query = sqlalchemy.select(func.count()).select_from(search.fts)
+        assert s.execute(query).scalar_one() == n
+
+        # Composite indexes replaced the single column ones
+        stmt = sqlalchemy.text("SELECT name FROM sqlite_master WHERE type='index'")
+        indexes = set(s.execute(stmt).scalars())
+        assert "transaction_split_account_id_date_ord" in indexes
+        assert "transaction_split_account_id" not in indexes
+        assert "asset_valuation_asset_id_date_ord" in indexes
+
+        # Every domain starts versioned
+        query = DataVersion.query(DataVersion.domain)
+        assert set(sql.col0(query)) == set(DataDomain)
@@ -48,9 +48,11 @@ class MockTicker:
         end: datetime.date,
         *,
         actions: bool,
+        auto_adjust: bool,
         raise_errors: bool,
     ) -> pd.DataFrame:
         assert actions
+        assert not auto_adjust
         assert raise_errors
         if self._symbol not in {"BANANA", "^BANANA", "BANANA=X"}:
             msg = f"{self._symbol}: No timezone found, symbol may be delisted"
@@ -85,5 +87,10 @@ class MockTicker:
 
         return pd.DataFrame(
             index=pd.to_datetime(dates),
-            data={"Close": close, "Stock Splits": split},
+            data={
+                "Close": close,
+                # Dividend adjusted, should not be used
+                "Adj Close": [c * 0.9 for c in close],
+                "Stock Splits": split,
+            },
         )
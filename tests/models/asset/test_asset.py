@@ -5,25 +5,31 @@ from decimal import Decimal
 from typing import TYPE_CHECKING
 
 import pytest
+import sqlalchemy.event
 
 from nummus import exceptions as exc
-from nummus import sql
+from nummus import sql, vectorized
 from nummus.models.asset import (
     Asset,
     AssetCategory,
+    AssetFetch,
     AssetSector,
+    AssetSplit,
     AssetValuation,
     USSector,
 )
 from nummus.models.currency import Currency, DEFAULT_CURRENCY
 from nummus.models.label import LabelLink
+from nummus.models.transaction import Transaction, TransactionSplit
 from nummus.models.utils import update_rows
 from tests import conftest
+from tests.mock_yfinance import MockTicker
 
 if TYPE_CHECKING:
+    import pandas as pd
+    from sqlalchemy import orm
+
     from nummus.models.account import Account
-    from nummus.models.asset import AssetSplit
-    from nummus.models.transaction import Transaction
     from tests.conftest import RandomStringGenerator
 
 
@@ -158,6 +164,24 @@ def test_get_value_tomorrow_interpolate(
     assert result == [Decimal(70)]
 
 
+@pytest.mark.parametrize("interpolate", [False, True])
+@pytest.mark.parametrize(("start", "end"), [(-3, 3), (0, 0), (1, 1), (-10, 10)])
+def test_get_value_arrays(
+    today_ord: int,
+    asset: Asset,
+    valuations: list[AssetValuation],
+    interpolate: bool,
+    start: int,
+    end: int,
+) -> None:
+    asset.interpolate = interpolate
+    start_ord = today_ord + start
+    end_ord = today_ord + end
+    target = Asset.get_value_all(start_ord, end_ord)
+    result = Asset.get_value_arrays_all(start_ord, end_ord)
+    assert {k: vectorized.to_decimals(v) for k, v in result.items()} == target
+
+
 def test_update_splits_empty(
     today_ord: int,
     account: Account,
@@ -183,6 +207,77 @@ def test_update_splits(
     assert assets == {asset.id_: [Decimal(0)]}
 
 
+def test_update_splits_changed_only(
+    session: orm.Session,
+    asset: Asset,
+    asset_split: AssetSplit,
+    transactions: list[Transaction],
+) -> None:
+    t_split = transactions[1].splits[0]
+    assert t_split.asset_quantity == Decimal(10)
+
+    asset.update_splits()
+    # Loaded instances are refreshed
+    assert t_split.asset_quantity == Decimal(100)
+    query = TransactionSplit.query(TransactionSplit.asset_quantity).where(
+        TransactionSplit.asset_id == asset.id_,
+    )
+    target = list(sql.col0(query))
+    assert sum(q or Decimal() for q in target) == 0
+
+    statements: list[str] = []
+
+    def before_cursor_execute(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    engine = session.get_bind()
+    sqlalchemy.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        asset.update_splits()
+    finally:
+        sqlalchemy.event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert not any(stmt.startswith("UPDATE") for stmt in statements)
+    assert list(sql.col0(query)) == target
+
+
+def test_update_splits_residual_truncated(
+    today: datetime.date,
+    session: orm.Session,
+    account: Account,
+    asset: Asset,
+    categories: dict[str, int],
+    rand_str_generator: RandomStringGenerator,
+) -> None:
+    with session.begin_nested():
+        AssetSplit.create(
+            asset_id=asset.id_,
+            date_ord=today.toordinal() + 1,
+            multiplier=Decimal("1.5"),
+        )
+        for qty in ["0.333333333", "0.333333333", "-0.666666666"]:
+            txn = Transaction.create(
+                account_id=account.id_,
+                date=today,
+                amount=-1,
+                statement=rand_str_generator(),
+            )
+            TransactionSplit.create(
+                parent=txn,
+                amount=txn.amount,
+                asset_id=asset.id_,
+                asset_quantity_unadjusted=Decimal(qty),
+                category_id=categories["securities traded"],
+            )
+
+    asset.update_splits()
+    query = TransactionSplit.query(TransactionSplit.asset_quantity).where(
+        TransactionSplit.asset_id == asset.id_,
+    )
+    target = [Decimal("0.499999999"), Decimal("0.499999999"), Decimal("-0.999999998")]
+    assert list(sql.col0(query)) == target
+    assert sum(target) == 0
+
+
 def test_prune_valuations_all(asset: Asset, valuations: list[AssetValuation]) -> None:
     assert asset.prune_valuations() == len(valuations)
 
@@ -230,6 +325,25 @@ def test_prune_valuations_index(asset: Asset, valuations: list[AssetValuation])
     assert asset.prune_valuations() == 0
 
 
+def test_prune_valuations_all_assets(
+    today_ord: int,
+    asset: Asset,
+    asset_etf: Asset,
+    valuations_five: list[AssetValuation],
+    transactions: list[Transaction],
+) -> None:
+    for i in range(3):
+        AssetValuation.create(
+            asset_id=asset_etf.id_,
+            date_ord=today_ord + i,
+            value=Decimal(1),
+        )
+    # asset_etf has no transactions so all are pruned
+    assert Asset.prune_valuations_all() == 1 + 3
+    query = AssetValuation.query().where(AssetValuation.asset_id == asset.id_)
+    assert sql.count(query) == len(valuations_five) - 1
+
+
 def test_update_valuations_none(asset: Asset) -> None:
     asset.ticker = None
     with pytest.raises(exc.NoAssetWebSourceError):
@@ -276,6 +390,94 @@ def test_update_valuations(
     assert sql.count(AssetValuation.query()) == n
 
 
+def test_fetch_history_raw_close(today: datetime.date) -> None:
+    start = today - datetime.timedelta(days=7)
+    history = Asset.fetch_history("BANANA", start)
+    assert history.start_ord == start.toordinal()
+    assert history.end_ord == today.toordinal()
+    assert history.valuations
+    # Mock closes are the date ordinal, adjusted closes would be lower
+    for date_ord, v in history.valuations.items():
+        assert v == date_ord
+
+
+def test_apply_history_none(asset: Asset, today: datetime.date) -> None:
+    history = Asset.fetch_history("BANANA", today)
+    asset.ticker = None
+    with pytest.raises(exc.NoAssetWebSourceError):
+        asset.apply_history(today.toordinal(), today.toordinal(), history)
+
+
+@pytest.fixture
+def history_starts(monkeypatch: pytest.MonkeyPatch) -> list[datetime.date]:
+    """Record the start of each price history download.
+
+    Returns:
+        list of start dates, appended to on each download
+
+    """
+    starts: list[datetime.date] = []
+    history = MockTicker.history
+
+    def mock_history(
+        self: MockTicker,
+        start: datetime.date,
+        end: datetime.date,
+        **kwargs: bool,
+    ) -> pd.DataFrame:
+        starts.append(start)
+        return history(self, start, end, **kwargs)
+
+    monkeypatch.setattr(MockTicker, "history", mock_history)
+    return starts
+
+
+def test_update_valuations_delta(
+    history_starts: list[datetime.date],
+    today: datetime.date,
+    transactions: list[Transaction],
+    asset: Asset,
+) -> None:
+    asset.update_valuations(through_today=True)
+    target = sql.to_dict(
+        AssetValuation.query(AssetValuation.date_ord, AssetValuation.value),
+    )
+    fetch = sql.one(AssetFetch.query())
+    assert fetch.asset_id == asset.id_
+    assert fetch.ticker == asset.ticker
+    assert fetch.end_ord == today.toordinal()
+
+    # Only the last week is downloaded again
+    start, end = asset.update_valuations(through_today=True)
+    assert start == transactions[1].date - datetime.timedelta(days=7)
+    assert end == today
+    assert history_starts == [start, today - datetime.timedelta(days=7)]
+    query = AssetValuation.query(AssetValuation.date_ord, AssetValuation.value)
+    assert sql.to_dict(query) == target
+
+    # Unless asked to
+    asset.update_valuations(through_today=True, full=True)
+    assert history_starts[-1] == start
+
+
+def test_update_valuations_new_split(
+    history_starts: list[datetime.date],
+    today: datetime.date,
+    transactions: list[Transaction],
+    asset: Asset,
+) -> None:
+    start, _ = asset.update_valuations(through_today=True)
+    n_splits = sql.count(AssetSplit.query())
+    assert n_splits > 0
+    # Pretend the latest split is new
+    date_ord = max(sql.col0(AssetSplit.query(AssetSplit.date_ord)))
+    AssetSplit.query().where(AssetSplit.date_ord == date_ord).delete()
+
+    asset.update_valuations(through_today=True)
+    assert history_starts == [start, today - datetime.timedelta(days=7), start]
+    assert sql.count(AssetSplit.query()) == n_splits
+
+
 def test_update_valuations_delisted(
     asset: Asset,
     transactions: list[Transaction],
@@ -345,6 +547,29 @@ def test_index_twrr_today(today_ord: int, asset: Asset) -> None:
     assert result == [Decimal(0)]
 
 
+def test_index_twrr_all(
+    today_ord: int,
+    asset: Asset,
+    asset_etf: Asset,
+    asset_valuation: AssetValuation,
+) -> None:
+    asset.category = AssetCategory.INDEX
+    asset_etf.category = AssetCategory.INDEX
+    AssetValuation.create(asset_id=asset.id_, date_ord=today_ord + 1, value=3)
+    result = Asset.index_twrr_all(today_ord - 1, today_ord + 1)
+    assert list(result) == sorted(result)
+    assert result[asset.name] == [Decimal(0), Decimal(0), Decimal("0.5")]
+    assert result[asset_etf.name] == [Decimal(0)] * 3
+
+    result = Asset.index_twrr_all(today_ord, today_ord, names=[asset.name])
+    assert result == {asset.name: [Decimal(0)]}
+
+
+def test_index_twrr_all_none(today_ord: int, asset: Asset) -> None:
+    with pytest.raises(exc.ProtectedObjectNotFoundError):
+        Asset.index_twrr_all(today_ord, today_ord, names=[asset.name, "Fake Index"])
+
+
 def test_add_indices() -> None:
     for asset in Asset.all():
         assert asset.name is not None
@@ -376,6 +601,19 @@ def test_autodetect_interpolate_daily(
     assert not asset.interpolate
 
 
+def test_autodetect_interpolate_all(
+    today_ord: int,
+    asset: Asset,
+    asset_etf: Asset,
+    valuations: list[AssetValuation],
+) -> None:
+    AssetValuation.create(asset_id=asset_etf.id_, date_ord=today_ord, value=1)
+    asset_etf.interpolate = True
+    Asset.autodetect_interpolate_all()
+    assert asset.interpolate
+    assert not asset_etf.interpolate
+
+
 def test_create_forex(asset: Asset) -> None:
     asset.ticker = "EURUSD=X"
     asset.category = AssetCategory.FOREX
@@ -11,6 +11,7 @@ from nummus import utils
 from nummus.models.budget import (
     BudgetAssignment,
     BudgetAvailableCategory,
+    BudgetLedger,
 )
 from nummus.models.transaction import Transaction, TransactionSplit
 from nummus.models.transaction_category import TransactionCategory
@@ -152,6 +153,43 @@ def test_get_monthly_available_next_month(
     assert future_assigned == 0
 
 
+def test_ledger(
+    month: datetime.date,
+    categories: dict[str, int],
+    transactions_spending: list[Transaction],
+    budget_assignments: list[BudgetAssignment],
+) -> None:
+    accounts = {t.account_id for t in transactions_spending}
+    budget_categories = {categories["groceries"], categories["emergency fund"]}
+    ledger = BudgetLedger()
+    month_ord = month.toordinal()
+    next_month_ord = utils.date_add_months(month, 1).toordinal()
+
+    _, leftovers = ledger.get(month_ord, accounts, budget_categories)
+    assert leftovers == {}
+    assert len(ledger) == 1
+
+    end_ord = utils.date_add_months(month, 3).toordinal()
+    result = ledger.get(end_ord, accounts, budget_categories)
+    target_leftovers = {
+        categories["groceries"]: Decimal(30),
+        categories["emergency fund"]: Decimal(100),
+    }
+    assert result[1] == target_leftovers
+    assert len(ledger) == 4
+
+    # Earlier months are held
+    _, leftovers = ledger.get(next_month_ord, accounts, budget_categories)
+    assert leftovers == target_leftovers
+
+    ledger.truncate(next_month_ord)
+    assert len(ledger) == 2
+
+    # Change in first month starts over
+    ledger.truncate(month_ord)
+    assert len(ledger) == 0
+
+
 def test_get_emergency_fund_empty(
     today_ord: int,
 ) -> None:
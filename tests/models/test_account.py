@@ -1,17 +1,21 @@
 from __future__ import annotations
 
+import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
 import pytest
 
 from nummus import exceptions as exc
+from nummus import vectorized
 from nummus.models.account import Account, AccountCategory
 from nummus.models.currency import Currency, DEFAULT_CURRENCY
+from nummus.models.transaction import Transaction, TransactionSplit
 
 if TYPE_CHECKING:
+    from sqlalchemy import orm
+
     from nummus.models.asset import Asset, AssetValuation
-    from nummus.models.transaction import Transaction
     from tests.conftest import RandomStringGenerator
 
 
@@ -253,6 +257,87 @@ def test_get_value_forex(
     assert assets == target
 
 
+@pytest.mark.parametrize("f", [None, Decimal("1.5")])
+@pytest.mark.parametrize(
+    ("start", "end"),
+    [
+        (-4, 3),
+        (-3, -3),
+        (-2, -2),
+        (0, 0),
+        (-10, 10),
+    ],
+)
+def test_get_value_arrays(
+    today_ord: int,
+    asset_valuation: AssetValuation,
+    transactions: list[Transaction],
+    f: Decimal | None,
+    start: int,
+    end: int,
+) -> None:
+    start_ord = today_ord + start
+    end_ord = today_ord + end
+    n = end_ord - start_ord + 1
+    forex = None if f is None else {Currency.USD: [f] * n}
+    target = Account.get_value_all(start_ord, end_ord, forex=forex)
+    result = Account.get_value_arrays_all(start_ord, end_ord, forex=forex)
+    for r, t in zip(result, target, strict=True):
+        assert {k: vectorized.to_decimals(v) for k, v in r.items()} == t
+
+
+def test_get_value_arrays_shared_asset(
+    today: datetime.date,
+    today_ord: int,
+    session: orm.Session,
+    account: Account,
+    account_investments: Account,
+    asset: Asset,
+    asset_valuation: AssetValuation,
+    categories: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    with session.begin_nested():
+        txn = Transaction.create(
+            account_id=account_investments.id_,
+            date=today - datetime.timedelta(days=1),
+            amount=-8,
+            statement="Buy",
+            payee="Monkey Bank",
+            cleared=True,
+        )
+        TransactionSplit.create(
+            parent=txn,
+            amount=txn.amount,
+            asset_id=asset.id_,
+            asset_quantity_unadjusted=4,
+            category_id=categories["securities traded"],
+        )
+
+    start_ord = today_ord - 4
+    end_ord = today_ord + 3
+    values, profits, assets = Account.get_value_arrays_all(start_ord, end_ord)
+
+    target_assets = [Decimal()] * (end_ord - start_ord + 1)
+    for acct in (account, account_investments):
+        target = acct.get_value(start_ord, end_ord)
+        assert vectorized.to_decimals(values[acct.id_]) == target.values
+        assert vectorized.to_decimals(profits[acct.id_]) == target.profits
+        target_assets = [
+            a + b
+            for a, b in zip(
+                target_assets,
+                target.values_by_asset[asset.id_],
+                strict=True,
+            )
+        ]
+    assert vectorized.to_decimals(assets[asset.id_]) == target_assets
+
+
+def test_get_value_arrays_none() -> None:
+    assert Account.get_value_arrays_all(0, 10, set()) == ({}, {}, {})
+
+
 def test_get_value_today(
     today_ord: int,
     account: Account,
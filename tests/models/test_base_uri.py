@@ -8,14 +8,23 @@ import pytest
 from nummus import exceptions as exc
 from nummus.models import base_uri
 from nummus.models.account import Account
-from nummus.models.asset import Asset, AssetSector, AssetSplit, AssetValuation
+from nummus.models.asset import (
+    Asset,
+    AssetFetch,
+    AssetSector,
+    AssetSplit,
+    AssetValuation,
+)
 from nummus.models.base import Base
 from nummus.models.base_uri import Cipher
 from nummus.models.budget import BudgetAssignment, BudgetGroup, Target
 from nummus.models.config import Config
+from nummus.models.data_version import DataVersion
 from nummus.models.health_checks import HealthCheckIssue
 from nummus.models.imported_file import ImportedFile
 from nummus.models.label import Label, LabelLink
+from nummus.models.rollup import MonthlyRollup
+from nummus.models.snapshot import AssetQtySnapshot, CashSnapshot
 from nummus.models.transaction import Transaction, TransactionSplit
 from nummus.models.transaction_category import TransactionCategory
 
@@ -33,12 +42,17 @@ MODELS_URI = [
 ]
 # Models without a URI not made for front end access
 MODELS_NONE = [
+    AssetFetch,
+    AssetQtySnapshot,
     AssetSector,
     AssetSplit,
     BudgetAssignment,
+    CashSnapshot,
     Config,
+    DataVersion,
     ImportedFile,
     LabelLink,
+    MonthlyRollup,
 ]
 
 
@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from nummus import sql, utils
+from nummus.models import cache as result_cache
+from nummus.models.account import Account
+from nummus.models.asset import Asset, AssetValuation, ValuationPoints
+from nummus.models.budget import BudgetAssignment, BudgetLedger
+from nummus.models.cache import ResultCache
+from nummus.models.config import Config
+from nummus.models.data_version import DataVersion, DataVersions
+from nummus.models.transaction import TransactionSplit
+from nummus.portfolio import Portfolio
+
+if TYPE_CHECKING:
+    import datetime
+
+    from sqlalchemy import orm
+
+    from nummus.models.transaction import Transaction
+
+
+def versions() -> DataVersions:
+    result = DataVersion.fetch()
+    assert result is not None
+    return result
+
+
+def test_get_set() -> None:
+    cache = ResultCache(max_entries=2)
+    assert cache.get(None, "a") is not None
+    cache.set_(None, "a", 1)
+    cache.set_(None, "b", 2)
+    assert cache.get(None, "a") == 1
+
+    # b is least recently used
+    cache.set_(None, "c", 3)
+    assert len(cache) == 2
+    assert cache.get(None, "a") == 1
+    assert cache.get(None, "c") == 3
+
+    # New versions clear results
+    assert cache.get(DataVersions(1, 0, 0, 0), "a") != 1
+    assert len(cache) == 0
+
+    # Result from an old generation is not stored
+    cache.set_(None, "a", 1)
+    assert len(cache) == 0
+
+
+def test_freeze() -> None:
+    value = {"a": [1, {2}], "b": {"c": 3}.keys()}
+    result = result_cache._freeze(value)
+    assert result == frozenset({("a", (1, frozenset({2}))), ("b", frozenset({"c"}))})
+    assert hash(result) == hash(result_cache._freeze(value))
+
+
+def test_copy() -> None:
+    values: defaultdict[int, list[Decimal]] = defaultdict(list, {1: [Decimal(1)]})
+    value = ValuationPoints([0], [Decimal(1)], interpolate=False)
+    result = result_cache._copy({"values": values, "points": value})
+
+    result_values = result["values"]
+    assert isinstance(result_values, defaultdict)
+    result_values[1].append(Decimal(2))
+    result_values[2].append(Decimal(3))
+    assert values == {1: [Decimal(1)]}
+
+    result_points = result["points"]
+    assert result_points == value
+    assert result_points is not value
+
+
+def test_no_versions(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+) -> None:
+    # Such as a portfolio not yet migrated
+    DataVersion.sql_table().drop(session.connection())
+    session.commit()
+
+    with empty_portfolio.begin_session():
+        assert result_cache.session_cache() is None
+
+
+def test_no_cache(
+    today_ord: int,
+    transactions: list[Transaction],
+) -> None:
+    # Plain session has no cache so always recomputes
+    result = Account.get_value_all(today_ord, today_ord)
+    assert Account.get_value_all(today_ord, today_ord) is not result
+
+
+def test_cached(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    today_ord: int,
+    asset_valuation: AssetValuation,
+    transactions: list[Transaction],
+) -> None:
+    session.commit()
+    cache: ResultCache = empty_portfolio._result_cache
+
+    with empty_portfolio.begin_session():
+        result = Account.get_value_all(today_ord - 3, today_ord)
+        # get_value_all and Asset.get_value_all
+        assert len(cache) == 2
+
+        # Results are copies
+        values = next(iter(result.values_by_account.values()))
+        values[0] = Decimal(-1)
+        assert Account.get_value_all(today_ord - 3, today_ord) == (
+            Account.get_value_all(today_ord - 3, today_ord)
+        )
+        assert len(cache) == 2
+
+        Asset.get_forex(today_ord - 3, today_ord, Config.base_currency())
+        assert len(cache) == 4
+
+
+def test_invalidated_by_write(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    today_ord: int,
+    account: Account,
+    transactions: list[Transaction],
+) -> None:
+    session.commit()
+    cache: ResultCache = empty_portfolio._result_cache
+
+    with empty_portfolio.begin_session():
+        versions = DataVersion.fetch()
+        values, _, _ = Account.get_value_all(today_ord, today_ord)
+        assert values[account.id_] == [Decimal(90)]
+
+    with empty_portfolio.begin_session():
+        TransactionSplit.query().where(
+            TransactionSplit.id_ == transactions[0].splits[0].id_,
+        ).update({"amount": Decimal(120)})
+
+        # Uncommitted changes skip the cache
+        values, _, _ = Account.get_value_all(today_ord, today_ord)
+        assert values[account.id_] == [Decimal(110)]
+
+    with empty_portfolio.begin_session():
+        assert DataVersion.fetch() != versions
+        values, _, _ = Account.get_value_all(today_ord, today_ord)
+        assert values[account.id_] == [Decimal(110)]
+        assert len(cache) == 2
+
+
+def test_invalidated_by_other_portfolio(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    today_ord: int,
+    account: Account,
+    transactions: list[Transaction],
+) -> None:
+    session.commit()
+
+    with empty_portfolio.begin_session():
+        values, _, _ = Account.get_value_all(today_ord, today_ord)
+        assert values[account.id_] == [Decimal(90)]
+
+    # Such as another web worker
+    p = Portfolio(empty_portfolio.path, None)
+    with p.begin_session():
+        query = TransactionSplit.query().where(
+            TransactionSplit.id_ == transactions[0].splits[0].id_,
+        )
+        sql.one(query).amount = Decimal(120)
+
+    with empty_portfolio.begin_session():
+        values, _, _ = Account.get_value_all(today_ord, today_ord)
+        assert values[account.id_] == [Decimal(110)]
+
+
+def test_not_invalidated_by_read(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    session.commit()
+
+    with empty_portfolio.begin_session():
+        versions = DataVersion.fetch()
+        Account.one()
+
+    with empty_portfolio.begin_session():
+        assert DataVersion.fetch() == versions
+
+
+def test_get_set_series() -> None:
+    cache = ResultCache()
+    assert cache.get_series(None, 1) is None
+    series = ValuationPoints([0], [Decimal(1)], interpolate=False)
+    cache.set_series(None, 1, series)
+    cache.set_series(None, 2, series)
+    assert cache.get_series(None, 1) is series
+
+    # Own commit only drops changed Assets
+    cache._commit_valuations(None, 1, {1})
+    assert cache.get_series(1, 1) is None
+    assert cache.get_series(1, 2) is series
+
+    # Unknown changes drop everything
+    cache._commit_valuations(1, 2, None)
+    assert cache.get_series(2, 2) is None
+
+    # Other process committed in between
+    cache.set_series(2, 2, series)
+    cache._commit_valuations(3, 4, {1})
+    assert cache.get_series(4, 2) is None
+
+    # Series from an old generation is not stored
+    cache.set_series(3, 2, series)
+    assert cache.get_series(4, 2) is None
+
+
+@pytest.mark.parametrize("interpolate", [False, True])
+def test_series_sliced(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    today_ord: int,
+    asset: Asset,
+    asset_valuation: AssetValuation,
+    interpolate: bool,
+) -> None:
+    with session.begin_nested():
+        asset.interpolate = interpolate
+        AssetValuation.create(
+            asset_id=asset.id_,
+            date_ord=today_ord - 3,
+            value=Decimal(5),
+        )
+    target = Asset.get_value_all(today_ord - 5, today_ord + 2)
+    target_arrays = Asset.get_value_arrays_all(today_ord - 5, today_ord + 2)
+    session.commit()
+    cache: ResultCache = empty_portfolio._result_cache
+
+    with empty_portfolio.begin_session():
+        assert Asset.get_value_all(today_ord - 5, today_ord + 2) == target
+        arrays = Asset.get_value_arrays_all(today_ord - 5, today_ord + 2)
+        np.testing.assert_array_equal(arrays[asset.id_], target_arrays[asset.id_])
+
+        generation = versions().valuations
+        series = cache.get_series(generation, asset.id_)
+        assert series is not None
+        assert series.date_ords[0] == today_ord - 3
+
+        # Other ranges slice the same series
+        result = Asset.get_value_all(today_ord - 1, today_ord - 1)
+        assert result[asset.id_] == [Decimal(3) if interpolate else Decimal(5)]
+
+
+def test_series_exact(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    today_ord: int,
+    asset: Asset,
+    asset_valuation: AssetValuation,
+) -> None:
+    with session.begin_nested():
+        asset.interpolate = True
+        AssetValuation.create(
+            asset_id=asset.id_,
+            date_ord=today_ord - 3,
+            value=Decimal(1),
+        )
+    target = Asset.get_value_all(today_ord - 3, today_ord)
+    assert target[asset.id_][1].quantize(Decimal("1e-9")) == Decimal("1.333333333")
+    session.commit()
+
+    with empty_portfolio.begin_session():
+        # Interpolated from the cached valuations, not rounded to Decimal6
+        assert Asset.get_value_all(today_ord - 3, today_ord) == target
+        assert Asset.get_value_all(today_ord - 3, today_ord) == target
+
+
+def test_series_invalidated_per_asset(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    today_ord: int,
+    asset: Asset,
+    asset_etf: Asset,
+    asset_valuation: AssetValuation,
+) -> None:
+    with session.begin_nested():
+        AssetValuation.create(
+            asset_id=asset_etf.id_,
+            date_ord=today_ord,
+            value=Decimal(3),
+        )
+    session.commit()
+    cache: ResultCache = empty_portfolio._result_cache
+
+    with empty_portfolio.begin_session():
+        Asset.get_value_all(today_ord, today_ord)
+        generation = versions().valuations
+        series = cache.get_series(generation, asset_etf.id_)
+        assert series is not None
+
+    with empty_portfolio.begin_session():
+        query = AssetValuation.query().where(AssetValuation.asset_id == asset.id_)
+        sql.one(query).value = Decimal(4)
+
+    with empty_portfolio.begin_session():
+        generation = versions().valuations
+        assert cache.get_series(generation, asset.id_) is None
+        assert cache.get_series(generation, asset_etf.id_) is series
+
+        values = Asset.get_value_all(today_ord, today_ord)
+        assert values[asset.id_] == [Decimal(4)]
+
+    with empty_portfolio.begin_session():
+        AssetValuation.query().where(AssetValuation.asset_id == asset.id_).delete()
+
+    with empty_portfolio.begin_session():
+        generation = versions().valuations
+        assert cache.get_series(generation, asset_etf.id_) is series
+
+        values = Asset.get_value_all(today_ord, today_ord)
+        assert values[asset.id_] == [Decimal()]
+
+
+def test_series_invalidated_by_other_portfolio(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    today_ord: int,
+    asset: Asset,
+    asset_valuation: AssetValuation,
+) -> None:
+    session.commit()
+
+    with empty_portfolio.begin_session():
+        values = Asset.get_value_all(today_ord, today_ord)
+        assert values[asset.id_] == [Decimal(2)]
+
+    p = Portfolio(empty_portfolio.path, None)
+    with p.begin_session():
+        query = AssetValuation.query().where(AssetValuation.asset_id == asset.id_)
+        sql.one(query).value = Decimal(4)
+
+    with empty_portfolio.begin_session():
+        values = Asset.get_value_all(today_ord, today_ord)
+        assert values[asset.id_] == [Decimal(4)]
+
+
+def test_get_set_ledger() -> None:
+    cache = ResultCache()
+    assert cache.get_ledger(None, "a") is None
+    ledger = BudgetLedger()
+
+    # Ledger from an old generation is not stored
+    cache.set_ledger(1, "a", ledger)
+    assert cache.get_ledger(None, "a") is None
+
+    cache.set_ledger(None, "a", ledger)
+    assert cache.get_ledger(None, "a") is ledger
+
+    # Own commit only truncates
+    cache._commit_budget(None, 1, 0)
+    assert cache.get_ledger(1, "a") is ledger
+
+    # Unknown changes drop everything
+    cache._commit_budget(1, 2, None)
+    assert cache.get_ledger(2, "a") is None
+
+    # Other process committed in between
+    cache.set_ledger(2, "a", ledger)
+    cache._commit_budget(3, 4, 0)
+    assert cache.get_ledger(4, "a") is None
+
+
+def test_ledger_truncated_by_write(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    month: datetime.date,
+    categories: dict[str, int],
+    transactions_spending: list[Transaction],
+    budget_assignments: list[BudgetAssignment],
+) -> None:
+    session.commit()
+    cache: ResultCache = empty_portfolio._result_cache
+    end = utils.date_add_months(month, 3)
+
+    with empty_portfolio.begin_session():
+        result = BudgetAssignment.get_monthly_available(end)
+        assert result.categories[categories["rent"]].leftover == Decimal(2000)
+
+        generation = versions().budget
+        key = frozenset({transactions_spending[0].account_id})
+        ledger = cache.get_ledger(generation, key)
+        assert ledger is not None
+        assert len(ledger) == 4
+
+    with empty_portfolio.begin_session():
+        query = BudgetAssignment.query().where(
+            BudgetAssignment.category_id == categories["rent"],
+        )
+        sql.one(query).amount = Decimal(1000)
+
+    with empty_portfolio.begin_session():
+        generation = versions().budget
+        key = frozenset({transactions_spending[0].account_id})
+        assert cache.get_ledger(generation, key) is ledger
+        # Months up to the changed one are kept
+        assert len(ledger) == 2
+
+        result = BudgetAssignment.get_monthly_available(end)
+        assert result.categories[categories["rent"]].leftover == Decimal(1000)
+        assert len(ledger) == 4
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+import pytest
+import sqlalchemy
+
+from nummus import sql
+from nummus.models import data_version
+from nummus.models.asset import Asset, AssetValuation
+from nummus.models.config import Config, ConfigKey
+from nummus.models.data_version import DataDomain, DataVersion
+from nummus.models.transaction import TransactionSplit
+from nummus.portfolio import Portfolio
+
+if TYPE_CHECKING:
+    from sqlalchemy import orm
+
+    from nummus.models.data_version import DataVersions
+    from nummus.models.transaction import Transaction
+
+
+def fetch() -> DataVersions:
+    result = DataVersion.fetch()
+    assert result is not None
+    return result
+
+
+def test_add_default(session: orm.Session) -> None:
+    query = DataVersion.query(DataVersion.domain)
+    assert set(sql.col0(query)) == set(DataDomain)
+
+    # Skips existing
+    DataVersion.add_default()
+    assert sql.count(DataVersion.query()) == len(DataDomain)
+
+
+def test_bump(session: orm.Session) -> None:
+    versions = fetch()
+
+    result = DataVersion.bump([DataDomain.BUDGET])
+    assert result == {DataDomain.BUDGET: versions.budget + 1}
+    assert fetch() == versions._replace(budget=versions.budget + 1)
+
+
+def test_bump_missing_row(session: orm.Session) -> None:
+    DataVersion.query().where(DataVersion.domain == DataDomain.CONFIG).delete()
+    assert fetch().config == 0
+
+    assert DataVersion.bump([DataDomain.CONFIG]) == {DataDomain.CONFIG: 1}
+    assert fetch().config == 1
+
+
+def test_no_table(session: orm.Session) -> None:
+    session.execute(sqlalchemy.text("DROP TABLE data_version"))
+    assert DataVersion.fetch() is None
+    assert DataVersion.bump([DataDomain.CONFIG]) == {}
+
+
+@pytest.mark.parametrize(
+    ("domain", "changed"),
+    [
+        (DataDomain.TRANSACTIONS, {"transactions", "budget"}),
+        (DataDomain.VALUATIONS, {"valuations"}),
+        (DataDomain.CONFIG, {"config"}),
+    ],
+)
+def test_commit(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    asset: Asset,
+    asset_valuation: AssetValuation,
+    transactions: list[Transaction],
+    domain: DataDomain,
+    changed: set[str],
+) -> None:
+    session.commit()
+
+    with empty_portfolio.begin_session():
+        versions = fetch()
+
+    with empty_portfolio.begin_session():
+        if domain == DataDomain.TRANSACTIONS:
+            TransactionSplit.query().where(
+                TransactionSplit.id_ == transactions[0].splits[0].id_,
+            ).update({"memo": "new memo"})
+        elif domain == DataDomain.VALUATIONS:
+            query = AssetValuation.query().where(AssetValuation.asset_id == asset.id_)
+            sql.one(query).value = Decimal(4)
+        else:
+            Config.set_(ConfigKey.LAST_HEALTH_CHECK_TS, "changed")
+
+    with empty_portfolio.begin_session():
+        result = fetch()
+    target = versions._replace(
+        **{field: getattr(versions, field) + 1 for field in changed},
+    )
+    assert result == target
+
+
+def test_not_bumped_by_read(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    session.commit()
+
+    with empty_portfolio.begin_session():
+        versions = fetch()
+        TransactionSplit.all()
+
+    with empty_portfolio.begin_session():
+        assert fetch() == versions
+
+
+def test_not_bumped_by_rollback(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    session.commit()
+
+    with empty_portfolio.begin_session():
+        versions = fetch()
+
+    with empty_portfolio.begin_session() as s:
+        TransactionSplit.query().where(
+            TransactionSplit.id_ == transactions[0].splits[0].id_,
+        ).update({"memo": "new memo"})
+        s.rollback()
+
+    with empty_portfolio.begin_session():
+        assert fetch() == versions
+
+
+def test_other_portfolio(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    session.commit()
+
+    with empty_portfolio.begin_session():
+        versions = fetch()
+        # Unchanged PRAGMA data_version reuses the versions
+        assert fetch() is versions
+
+    # Such as another web worker
+    p = Portfolio(empty_portfolio.path, None)
+    with p.begin_session():
+        TransactionSplit.query().where(
+            TransactionSplit.id_ == transactions[0].splits[0].id_,
+        ).update({"memo": "new memo"})
+
+    with empty_portfolio.begin_session():
+        assert fetch().transactions == versions.transactions + 1
+
+
+@pytest.mark.parametrize(
+    ("params", "target"),
+    [
+        (None, None),
+        ({"asset_id": 1}, {1}),
+        ([{"asset_id": 1}, {"asset_id": 2}], {1, 2}),
+        ([{"asset_id": 1}, {}], None),
+    ],
+)
+def test_insert_ids(
+    params: dict[str, object] | list[dict[str, object]] | None,
+    target: set[int] | None,
+) -> None:
+    assert data_version._insert_ids(params, "asset_id") == target
+
+
+@pytest.mark.parametrize(
+    ("where", "target"),
+    [
+        (None, None),
+        (AssetValuation.asset_id == 1, {1}),
+        (AssetValuation.asset_id.in_([1, 2]), {1, 2}),
+        (
+            sqlalchemy.and_(
+                sqlalchemy.or_(AssetValuation.value > 0, AssetValuation.value < 0),
+                AssetValuation.date_ord == 2,
+                AssetValuation.asset_id == Asset.id_,
+                AssetValuation.asset_id > 0,
+                AssetValuation.asset_id == 1,
+            ),
+            {1},
+        ),
+        (AssetValuation.asset_id > 0, None),
+        (AssetValuation.asset_id == AssetValuation.date_ord, None),
+    ],
+)
+def test_delete_ids(
+    where: sqlalchemy.ColumnElement[bool] | None,
+    target: set[int] | None,
+) -> None:
+    assert data_version._delete_ids(where, "asset_id") == target
+
+
+def test_bulk_statements(
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    asset: Asset,
+    asset_valuation: AssetValuation,
+) -> None:
+    session.commit()
+
+    with empty_portfolio.begin_session() as s:
+        AssetValuation.query().where(AssetValuation.asset_id == asset.id_).delete()
+        assert s.info[data_version._INFO_ASSETS] == {asset.id_}
+
+        s.execute(
+            sqlalchemy.insert(AssetValuation),
+            [{"asset_id": asset.id_, "date_ord": 0, "value": Decimal(1)}],
+        )
+        assert s.info[data_version._INFO_ASSETS] == {asset.id_}
+
+        # Bulk UPDATE is not limited to specific Assets
+        AssetValuation.query().update({"value": Decimal(2)})
+        assert s.info[data_version._INFO_ASSETS] is None
+        s.rollback()
+
+    with empty_portfolio.begin_session() as s:
+        # DELETE without WHERE
+        AssetValuation.query().delete()
+        assert s.info[data_version._INFO_ASSETS] is None
+
+        # Not an ORM entity, has no mapper
+        s.execute(sqlalchemy.text("DELETE FROM asset_valuation"))
+        s.execute(sqlalchemy.delete(Config.sql_table()).where(Config.id_ == 0))
+        s.rollback()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Any, TYPE_CHECKING
+
+import pytest
+import sqlalchemy
+from sqlalchemy import func
+
+from nummus.models.asset import AssetValuation
+from nummus.models.transaction import TransactionSplit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from decimal import Decimal
+
+    from sqlalchemy import orm
+
+
+def query_plan[T](session: orm.Session, query: orm.Query[T]) -> str:
+    stmt = query.statement.compile(
+        session.get_bind(),
+        compile_kwargs={"literal_binds": True},
+    )
+    rows = session.execute(sqlalchemy.text(f"EXPLAIN QUERY PLAN {stmt}"))
+    return "\n".join(row[-1] for row in rows)
+
+
+def query_balances() -> orm.query.RowReturningQuery[tuple[int, Decimal]]:
+    return (
+        TransactionSplit.query(
+            TransactionSplit.account_id,
+            func.sum(TransactionSplit.amount),
+        )
+        .where(
+            TransactionSplit.account_id.in_([1, 2]),
+            TransactionSplit.date_ord.between(1, 2),
+        )
+        .group_by(TransactionSplit.account_id)
+    )
+
+
+def query_assets() -> orm.query.RowReturningQuery[tuple[int | None, int]]:
+    return TransactionSplit.query(
+        TransactionSplit.asset_id,
+        TransactionSplit.date_ord,
+    ).where(
+        TransactionSplit.asset_id.is_not(None),
+        TransactionSplit.date_ord <= 1,
+    )
+
+
+def query_monthly_activity() -> orm.query.RowReturningQuery[tuple[int, Decimal, int]]:
+    return (
+        TransactionSplit.query(
+            TransactionSplit.category_id,
+            func.sum(TransactionSplit.amount),
+            TransactionSplit.month_ord,
+        )
+        .where(
+            TransactionSplit.account_id.in_([1]),
+            TransactionSplit.month_ord < 2,
+            TransactionSplit.month_ord >= 1,
+            TransactionSplit.category_id.in_([1, 2]),
+        )
+        .group_by(
+            TransactionSplit.category_id,
+            TransactionSplit.month_ord,
+        )
+    )
+
+
+def query_valuations() -> orm.query.RowReturningQuery[tuple[int, Decimal]]:
+    return AssetValuation.query(
+        AssetValuation.date_ord,
+        AssetValuation.value,
+    ).where(
+        AssetValuation.asset_id == 1,
+        AssetValuation.date_ord <= 1,
+    )
+
+
+@pytest.mark.parametrize(
+    ("query", "index"),
+    [
+        (query_balances, "transaction_split_account_id_date_ord"),
+        (query_assets, "transaction_split_asset_id_date_ord"),
+        (query_monthly_activity, "transaction_split_category_id_month_ord"),
+        (query_valuations, "asset_valuation_asset_id_date_ord"),
+    ],
+)
+def test_covering_index(
+    session: orm.Session,
+    query: Callable[[], orm.Query[Any]],
+    index: str,
+) -> None:
+    plan = query_plan(session, query())
+    assert f"USING COVERING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan
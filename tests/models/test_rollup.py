@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import func
+
+from nummus import sql, utils
+from nummus.models import rollup
+from nummus.models.label import LabelLink
+from nummus.models.rollup import MonthlyRollup, RollupTotal
+from nummus.models.transaction import TransactionSplit
+
+if TYPE_CHECKING:
+    from sqlalchemy import orm
+
+    from nummus.models.account import Account
+    from nummus.models.rollup import _Key
+    from nummus.models.transaction import Transaction
+
+
+def rollup_rows() -> set[tuple[object, ...]]:
+    return {
+        (
+            r.month_ord,
+            r.account_id,
+            r.category_id,
+            r.payee,
+            r.label_id,
+            r.n_splits,
+            r.amount,
+            r.amount_unlabeled,
+        )
+        for r in sql.yield_(MonthlyRollup.query())
+    }
+
+
+def rebuilt_rows(session: orm.Session) -> set[tuple[object, ...]]:
+    with session.begin_nested() as nested:
+        rollup.rebuild(session)
+        rows = rollup_rows()
+        nested.rollback()
+    return rows
+
+
+def test_empty(session: orm.Session) -> None:
+    assert rollup_rows() == set()
+
+
+def test_insert(
+    session: orm.Session,
+    today: datetime.date,
+    account: Account,
+    categories: dict[str, int],
+    labels: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    rows = rollup_rows()
+    month_ord = utils.start_of_month(today - datetime.timedelta(days=3)).toordinal()
+    key = (month_ord, account.id_, categories["other income"], "Monkey Bank")
+    assert (*key, None, 1, Decimal(100), Decimal()) in rows
+    assert (*key, labels["engineer"], 1, Decimal(100), Decimal()) in rows
+
+    query = MonthlyRollup.query(func.sum(MonthlyRollup.n_splits)).where(
+        MonthlyRollup.label_id.is_(None),
+    )
+    assert sql.scalar(query) == len(transactions)
+    assert rows == rebuilt_rows(session)
+
+
+@pytest.mark.parametrize(
+    ("column", "value"),
+    [
+        ("amount", Decimal(20)),
+        ("memo", "new memo"),
+        ("payee", "Banana Bank"),
+        ("payee", None),
+    ],
+)
+def test_update(
+    session: orm.Session,
+    transactions: list[Transaction],
+    column: str,
+    value: object,
+) -> None:
+    with session.begin_nested():
+        TransactionSplit.query().where(
+            TransactionSplit.id_ == transactions[0].splits[0].id_,
+        ).update({column: value})
+    assert rollup_rows() == rebuilt_rows(session)
+
+
+def test_update_date(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    txn = transactions[0]
+    with session.begin_nested():
+        txn.date -= datetime.timedelta(days=62)
+    assert rollup_rows() == rebuilt_rows(session)
+
+
+def test_labels(
+    session: orm.Session,
+    labels: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    t_split = transactions[2].splits[0]
+    with session.begin_nested():
+        LabelLink.create(label_id=labels["engineer"], t_split_id=t_split.id_)
+    assert rollup_rows() == rebuilt_rows(session)
+
+    # Move a link to another split
+    with session.begin_nested():
+        LabelLink.query().where(LabelLink.t_split_id == t_split.id_).update(
+            {"t_split_id": transactions[3].splits[0].id_},
+        )
+    assert rollup_rows() == rebuilt_rows(session)
+
+    # Change label of a link
+    with session.begin_nested():
+        LabelLink.query().where(
+            LabelLink.t_split_id == transactions[3].splits[0].id_,
+        ).update({"label_id": labels["fruit"]})
+    assert rollup_rows() == rebuilt_rows(session)
+
+    with session.begin_nested():
+        LabelLink.query().delete()
+    rows = rollup_rows()
+    assert rows == rebuilt_rows(session)
+    assert all(row[4] is None for row in rows)
+
+
+def test_delete(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    t_split = transactions[1].splits[0]
+    with session.begin_nested():
+        LabelLink.query().where(LabelLink.t_split_id == t_split.id_).delete()
+        TransactionSplit.query().where(
+            TransactionSplit.id_ == t_split.id_,
+        ).delete()
+    assert rollup_rows() == rebuilt_rows(session)
+
+    with session.begin_nested():
+        LabelLink.query().delete()
+        TransactionSplit.query().delete()
+    assert rollup_rows() == set()
+
+
+def test_rebuild(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    target = rollup_rows()
+
+    rollup.rebuild(session)
+    assert rollup_rows() == target
+
+
+def raw_totals(
+    start: datetime.date | None,
+    end: datetime.date | None,
+) -> set[RollupTotal]:
+    query = TransactionSplit.query()
+    if start:
+        query = query.where(TransactionSplit.date_ord >= start.toordinal())
+    if end:
+        query = query.where(TransactionSplit.date_ord <= end.toordinal())
+    n_splits: dict[_Key, int] = defaultdict(int)
+    amounts: dict[_Key, Decimal] = defaultdict(Decimal)
+    amounts_unlabeled: dict[_Key, Decimal] = defaultdict(Decimal)
+    for t_split in sql.yield_(query):
+        query_labels = LabelLink.query(LabelLink.label_id).where(
+            LabelLink.t_split_id == t_split.id_,
+        )
+        label_ids = list(sql.col0(query_labels))
+        unlabeled = Decimal() if label_ids else t_split.amount
+        label_amounts: list[tuple[int | None, Decimal]] = [
+            (None, unlabeled),
+            *((label_id, Decimal()) for label_id in label_ids),
+        ]
+        for label_id, amount_unlabeled in label_amounts:
+            key = (t_split.account_id, t_split.category_id, t_split.payee, label_id)
+            n_splits[key] += 1
+            amounts[key] += t_split.amount
+            amounts_unlabeled[key] += amount_unlabeled
+    return {
+        RollupTotal(*key, n, amounts[key], amounts_unlabeled[key])
+        for key, n in n_splits.items()
+    }
+
+
+@pytest.mark.parametrize(
+    ("start", "end"),
+    [
+        (None, None),
+        (0, None),
+        (None, 0),
+        (-3, 1),
+        (-2, 7),
+        (-60, -1),
+        (1, 1),
+        (2, 90),
+    ],
+)
+def test_get_totals(
+    today: datetime.date,
+    transactions: list[Transaction],
+    start: int | None,
+    end: int | None,
+) -> None:
+    date_start = None if start is None else today + datetime.timedelta(days=start)
+    date_end = None if end is None else today + datetime.timedelta(days=end)
+
+    result = MonthlyRollup.get_totals(date_start, date_end, [], [])
+    assert set(result) == raw_totals(date_start, date_end)
+
+
+def test_get_totals_whole_months(
+    today: datetime.date,
+    account: Account,
+    categories: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    month = utils.start_of_month(today)
+    result = MonthlyRollup.get_totals(
+        month,
+        utils.end_of_month(month),
+        [],
+        [categories["securities traded"]],
+    )
+    target = {
+        total
+        for total in raw_totals(month, utils.end_of_month(month))
+        if total.category_id != categories["securities traded"]
+    }
+    assert set(result) == target
+
+    result = MonthlyRollup.get_totals(None, None, [account.id_], [])
+    assert result == []
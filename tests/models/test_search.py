@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import sqlalchemy
+
+from nummus.models import search
+from nummus.models.label import Label, LabelLink
+from nummus.models.transaction import TransactionSplit
+from nummus.models.transaction_category import TransactionCategory
+
+if TYPE_CHECKING:
+    from sqlalchemy import orm
+
+    from nummus.models.transaction import Transaction
+
+
+def index_rows(session: orm.Session) -> dict[int, tuple[str | None, ...]]:
+    query = sqlalchemy.select(
+        search.fts.c.rowid,
+        search.fts.c.category,
+        search.fts.c.payee,
+        search.fts.c.memo,
+        search.fts.c.statement,
+        search.fts.c.labels,
+    )
+    return {row[0]: tuple(row[1:]) for row in session.execute(query)}
+
+
+def test_empty(session: orm.Session) -> None:
+    assert index_rows(session) == {}
+
+
+def test_insert(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    rows = index_rows(session)
+    t_split = transactions[1].splits[0]
+    target = (
+        "securities traded",
+        "Monkey Bank",
+        None,
+        transactions[1].statement,
+        "engineer",
+    )
+    assert rows[t_split.id_] == target
+    assert len(rows) == len(transactions)
+
+
+def test_update_memo(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    t_split = transactions[0].splits[0]
+    with session.begin_nested():
+        t_split.memo = "new memo"
+
+    assert index_rows(session)[t_split.id_][2] == "new memo"
+
+
+def test_update_statement(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    txn = transactions[0]
+    with session.begin_nested():
+        txn.statement = "new statement"
+
+    assert index_rows(session)[txn.splits[0].id_][3] == "new statement"
+
+
+def test_update_category_name(
+    session: orm.Session,
+    categories: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    with session.begin_nested():
+        TransactionCategory.query().where(
+            TransactionCategory.id_ == categories["other income"],
+        ).update({"name": "paycheck"})
+
+    assert index_rows(session)[transactions[0].splits[0].id_][0] == "paycheck"
+
+
+def test_labels(
+    session: orm.Session,
+    labels: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    t_split = transactions[0].splits[0]
+    with session.begin_nested():
+        Label.query().where(Label.id_ == labels["engineer"]).update(
+            {"name": "doctor"},
+        )
+    assert index_rows(session)[t_split.id_][4] == "doctor"
+
+    with session.begin_nested():
+        LabelLink.query().where(LabelLink.t_split_id == t_split.id_).delete()
+    assert index_rows(session)[t_split.id_][4] is None
+
+
+def test_delete(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    t_split = transactions[1].splits[0]
+    with session.begin_nested():
+        LabelLink.query().where(LabelLink.t_split_id == t_split.id_).delete()
+        TransactionSplit.query().where(
+            TransactionSplit.id_ == t_split.id_,
+        ).delete()
+
+    assert t_split.id_ not in index_rows(session)
+
+
+def test_rebuild(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    target = index_rows(session)
+
+    search.rebuild(session)
+    assert index_rows(session) == target
+
+
+def test_matches_short_token(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    with session.begin_nested():
+        transactions[2].splits[0].memo = "4 U"
+
+    query = search.matches({"4"}, match_all=True)
+    assert list(session.execute(query).scalars()) == [transactions[2].splits[0].id_]
+
+    # Mixed with a trigram token
+    query = search.matches({"4", "engineer"}, match_all=False)
+    result = set(session.execute(query).scalars())
+    target = {transactions[i].splits[0].id_ for i in (0, 1, 2)}
+    assert result == target
+
+
+def test_matches_mixed_all(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    with session.begin_nested():
+        transactions[2].splits[0].memo = "4 U rent"
+
+    query = search.matches({"rent"}, match_all=True)
+    result = set(session.execute(query).scalars())
+    target = {transactions[i].splits[0].id_ for i in (2, 3)}
+    assert result == target
+
+    query = search.matches({"4", "rent"}, match_all=True)
+    assert list(session.execute(query).scalars()) == [transactions[2].splits[0].id_]
+
+
+def test_ranks(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    with session.begin_nested():
+        transactions[2].splits[0].memo = "4 U"
+    id_2 = transactions[2].splits[0].id_
+    id_3 = transactions[3].splits[0].id_
+
+    def ranked(tokens: set[str]) -> list[int]:
+        sub = search.ranks(tokens)
+        query = sqlalchemy.select(sub.c.rowid).order_by(sub.c.rank, sub.c.rowid)
+        return list(session.execute(query).scalars())
+
+    assert ranked({"rent"}) == [id_3]
+    assert ranked({"4"}) == [id_2]
+    # bm25 matches rank ahead of short token matches
+    assert ranked({"4", "rent"}) == [id_3, id_2]
+
+
+def test_is_index_table() -> None:
+    assert search.is_index_table(search.FTS_TABLE)
+    assert search.is_index_table(f"{search.FTS_TABLE}_data")
+    assert not search.is_index_table("transaction_split")
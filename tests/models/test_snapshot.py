@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+from nummus import sql
+from nummus.models import snapshot
+from nummus.models.label import LabelLink
+from nummus.models.snapshot import AssetQtySnapshot, CashSnapshot
+from nummus.models.transaction import TransactionSplit
+
+if TYPE_CHECKING:
+    from sqlalchemy import orm
+
+    from nummus.models.account import Account
+    from nummus.models.asset import Asset
+    from nummus.models.transaction import Transaction
+
+
+def snapshot_rows() -> tuple[set[tuple[object, ...]], set[tuple[object, ...]]]:
+    query_cash = CashSnapshot.query(
+        CashSnapshot.account_id,
+        CashSnapshot.category_id,
+        CashSnapshot.date_ord,
+        CashSnapshot.n_splits,
+        CashSnapshot.flow,
+    )
+    query_asset = AssetQtySnapshot.query(
+        AssetQtySnapshot.account_id,
+        AssetQtySnapshot.asset_id,
+        AssetQtySnapshot.date_ord,
+        AssetQtySnapshot.n_splits,
+        AssetQtySnapshot.flow,
+    )
+    return set(sql.yield_(query_cash)), set(sql.yield_(query_asset))
+
+
+def test_empty(session: orm.Session) -> None:
+    assert snapshot_rows() == (set(), set())
+
+
+def test_insert(
+    today_ord: int,
+    account: Account,
+    asset: Asset,
+    categories: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    cash, assets = snapshot_rows()
+    cat_income = categories["other income"]
+    cat_traded = categories["securities traded"]
+    target = {
+        (account.id_, cat_income, today_ord - 3, 1, Decimal(100)),
+        (account.id_, cat_traded, today_ord - 2, 1, Decimal(-10)),
+        (account.id_, cat_traded, today_ord + 1, 1, Decimal(50)),
+        (account.id_, cat_traded, today_ord + 7, 1, Decimal(50)),
+    }
+    assert cash == target
+    target = {
+        (account.id_, asset.id_, today_ord - 2, 1, Decimal(10)),
+        (account.id_, asset.id_, today_ord + 1, 1, Decimal(-5)),
+        (account.id_, asset.id_, today_ord + 7, 1, Decimal(-5)),
+    }
+    assert assets == target
+
+
+def test_update_amount(
+    session: orm.Session,
+    today_ord: int,
+    account: Account,
+    categories: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    t_split = transactions[0].splits[0]
+    with session.begin_nested():
+        t_split.amount = Decimal(120)
+
+    cash, _ = snapshot_rows()
+    cat_income = categories["other income"]
+    cat_traded = categories["securities traded"]
+    target = {
+        (account.id_, cat_income, today_ord - 3, 1, Decimal(120)),
+        (account.id_, cat_traded, today_ord - 2, 1, Decimal(-10)),
+        (account.id_, cat_traded, today_ord + 1, 1, Decimal(50)),
+        (account.id_, cat_traded, today_ord + 7, 1, Decimal(50)),
+    }
+    assert cash == target
+
+
+def test_update_date(
+    session: orm.Session,
+    today_ord: int,
+    account: Account,
+    asset: Asset,
+    categories: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    txn = transactions[2]
+    with session.begin_nested():
+        txn.date_ord = today_ord - 2
+        for t_split in txn.splits:
+            t_split.parent = txn
+
+    cash, assets = snapshot_rows()
+    cat_income = categories["other income"]
+    cat_traded = categories["securities traded"]
+    target = {
+        (account.id_, cat_income, today_ord - 3, 1, Decimal(100)),
+        (account.id_, cat_traded, today_ord - 2, 2, Decimal(40)),
+        (account.id_, cat_traded, today_ord + 7, 1, Decimal(50)),
+    }
+    assert cash == target
+    target = {
+        (account.id_, asset.id_, today_ord - 2, 2, Decimal(5)),
+        (account.id_, asset.id_, today_ord + 7, 1, Decimal(-5)),
+    }
+    assert assets == target
+
+
+def test_update_remove_asset(
+    session: orm.Session,
+    today_ord: int,
+    account: Account,
+    asset: Asset,
+    categories: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    t_split = transactions[3].splits[0]
+    with session.begin_nested():
+        t_split.asset_id = None
+        t_split.asset_quantity_unadjusted = None
+        t_split.category_id = categories["other income"]
+
+    cash, assets = snapshot_rows()
+    cat_income = categories["other income"]
+    cat_traded = categories["securities traded"]
+    target = {
+        (account.id_, cat_income, today_ord - 3, 1, Decimal(100)),
+        (account.id_, cat_income, today_ord + 7, 1, Decimal(50)),
+        (account.id_, cat_traded, today_ord - 2, 1, Decimal(-10)),
+        (account.id_, cat_traded, today_ord + 1, 1, Decimal(50)),
+    }
+    assert cash == target
+    target = {
+        (account.id_, asset.id_, today_ord - 2, 1, Decimal(10)),
+        (account.id_, asset.id_, today_ord + 1, 1, Decimal(-5)),
+    }
+    assert assets == target
+
+
+def test_delete(
+    session: orm.Session,
+    today_ord: int,
+    account: Account,
+    asset: Asset,
+    categories: dict[str, int],
+    transactions: list[Transaction],
+) -> None:
+    t_split = transactions[1].splits[0]
+    with session.begin_nested():
+        LabelLink.query().where(LabelLink.t_split_id == t_split.id_).delete()
+        TransactionSplit.query().where(
+            TransactionSplit.id_ == t_split.id_,
+        ).delete()
+
+    cash, assets = snapshot_rows()
+    cat_income = categories["other income"]
+    cat_traded = categories["securities traded"]
+    target = {
+        (account.id_, cat_income, today_ord - 3, 1, Decimal(100)),
+        (account.id_, cat_traded, today_ord + 1, 1, Decimal(50)),
+        (account.id_, cat_traded, today_ord + 7, 1, Decimal(50)),
+    }
+    assert cash == target
+    target = {
+        (account.id_, asset.id_, today_ord + 1, 1, Decimal(-5)),
+        (account.id_, asset.id_, today_ord + 7, 1, Decimal(-5)),
+    }
+    assert assets == target
+
+
+def test_rebuild(
+    session: orm.Session,
+    transactions: list[Transaction],
+) -> None:
+    target = snapshot_rows()
+
+    snapshot.rebuild(session)
+    assert snapshot_rows() == target
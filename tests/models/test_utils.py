@@ -4,8 +4,10 @@ from decimal import Decimal
 from typing import TYPE_CHECKING
 
 import pytest
+import sqlalchemy.event
 from sqlalchemy import CheckConstraint, ForeignKeyConstraint, UniqueConstraint
 
+from nummus import exceptions as exc
 from nummus import sql
 from nummus.models import utils
 from nummus.models.account import Account
@@ -13,11 +15,14 @@ from nummus.models.asset import (
     AssetSplit,
     AssetValuation,
 )
+from nummus.models.health_checks import HealthCheckIssue
 from nummus.models.transaction import Transaction, TransactionSplit
 
 if TYPE_CHECKING:
     import datetime
 
+    from sqlalchemy import orm
+
     from nummus.models.asset import (
         Asset,
     )
@@ -155,6 +160,84 @@ def test_update_rows_delete(valuations: list[AssetValuation]) -> None:
     assert not sql.any_(query)
 
 
+def test_update_rows_upsert(
+    session: orm.Session,
+    today_ord: int,
+    asset: Asset,
+    valuations: list[AssetValuation],
+) -> None:
+    query = AssetValuation.query(AssetValuation.date_ord, AssetValuation.id_)
+    ids = sql.to_dict(query)
+    statements: list[str] = []
+
+    def before_cursor_execute(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    updates: dict[object, dict[str, object]] = {
+        today_ord + i: {"value": Decimal(i), "asset_id": asset.id_} for i in range(1000)
+    }
+    engine = session.get_bind()
+    sqlalchemy.event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        utils.update_rows(AssetValuation, AssetValuation.query(), "date_ord", updates)
+    finally:
+        sqlalchemy.event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    # One DELETE and one INSERT
+    assert len(statements) == 2
+
+    # Existing rows are updated in place
+    assert sql.to_dict(query)[today_ord] == ids[today_ord]
+    # Loaded instances are refreshed
+    v = next(v for v in valuations if v.date_ord == today_ord)
+    assert v.value == Decimal()
+    assert sql.count(AssetValuation.query()) == len(updates)
+
+
+def test_update_rows_validates(today_ord: int, asset: Asset) -> None:
+    query = AssetValuation.query()
+    updates: dict[object, dict[str, object]] = {
+        today_ord: {"value": Decimal("1.23456789"), "asset_id": asset.id_},
+    }
+    utils.update_rows(AssetValuation, query, "date_ord", updates)
+
+    v = sql.one(query)
+    assert v.value == Decimal("1.234567")
+    assert v.date_ord == today_ord
+
+
+def test_update_rows_validates_strings() -> None:
+    query = HealthCheckIssue.query()
+    updates: dict[object, dict[str, object]] = {
+        " a ": {"check": " Check ", "msg": "msg", "ignore": False},
+    }
+    utils.update_rows(HealthCheckIssue, query, "value", updates)
+
+    i = sql.one(query)
+    assert i.value == "a"
+    assert i.check == "Check"
+
+    # Cleaned id is kept on the next update
+    utils.update_rows(HealthCheckIssue, query, "value", updates)
+    assert sql.one(query).id_ == i.id_
+
+
+def test_update_rows_validates_short() -> None:
+    query = HealthCheckIssue.query()
+    updates: dict[object, dict[str, object]] = {
+        "a": {"check": "C", "msg": "msg", "ignore": False},
+    }
+    with pytest.raises(exc.InvalidORMValueError):
+        utils.update_rows(HealthCheckIssue, query, "value", updates)
+    assert not sql.any_(query)
+
+
+def test_update_rows_no_unique(valuations: list[AssetValuation]) -> None:
+    updates: dict[object, dict[str, object]] = {Decimal(1): {"date_ord": 1}}
+    with pytest.raises(ValueError, match="no unique constraint"):
+        utils.update_rows(AssetValuation, AssetValuation.query(), "value", updates)
+    assert sql.count(AssetValuation.query()) == len(valuations)
+
+
 def test_update_rows_list_edit(
     transactions: list[Transaction],
     categories: dict[str, int],
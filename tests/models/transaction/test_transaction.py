@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING
 
 import pytest
 
-from nummus.models.transaction import Transaction
+from nummus.models.transaction import SimilarityIndex, Transaction
 
 if TYPE_CHECKING:
     import datetime
@@ -79,3 +79,33 @@ def test_find_similar_cache(transactions_spending: list[Transaction]) -> None:
     assert result == transactions_spending[1].id_
     assert txn.similar_txn_id == transactions_spending[1].id_
     assert txn.find_similar(cache_ok=True) == transactions_spending[1].id_
+
+
+def test_find_similar_empty_index(
+    today: datetime.date,
+    account: Account,
+    rand_str: str,
+) -> None:
+    # Built before any Transactions so it stays empty
+    index = SimilarityIndex()
+    assert len(index) == 0
+
+    txns = [
+        Transaction.create(
+            account_id=account.id_,
+            date=today,
+            amount=10,
+            statement=rand_str,
+        )
+        for _ in range(2)
+    ]
+    txn = txns[0]
+    assert txn.find_similar(set_property=False, index=index) is None
+    assert txn.find_similar(set_property=False) == txns[1].id_
+
+
+def test_similarity_index_near(transactions_spending: list[Transaction]) -> None:
+    txn = transactions_spending[3]
+    index = SimilarityIndex(near=txn)
+    assert len(index) < len(SimilarityIndex())
+    assert index.find(txn) == transactions_spending[4].id_
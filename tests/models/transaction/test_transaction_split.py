@@ -165,7 +165,7 @@ def test_search_none(transactions: list[Transaction]) -> None:
         ("+engineer", [1, 0]),  # same qty so sort by newest first
         ("-engineer", [3, 2]),  # same qty so sort by newest first
         ("engineer -other", [1]),
-        ("rent", [3, 2]),  # same qty so sort by newest first
+        ("rent", [2, 3]),  # same matches so shorter text ranks higher
         ("rent transfer", [3, 2]),
         ('"rent transfer"', [3]),
         ("+fake", []),
@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING
 import pytest
 
 from nummus import exceptions as exc
+from nummus import sql
 from nummus.encryption.top import ENCRYPTION_AVAILABLE
 from nummus.models.config import Config, ConfigKey
 from nummus.portfolio import Portfolio
@@ -111,9 +112,11 @@ def test_clean(empty_portfolio: Portfolio) -> None:
     path_2.touch()
     path_dir.mkdir()
     assert path_1.stat().st_size == 0
+    size_before = empty_portfolio.path.stat().st_size
 
     size_b = empty_portfolio.clean()
-    assert size_b[0] == empty_portfolio.path.stat().st_size
+    assert size_b[0] == size_before
+    assert size_b[1] == empty_portfolio.path.stat().st_size
     assert size_b[0] >= size_b[1]
 
     assert path_1.exists()
@@ -185,3 +188,35 @@ def test_restore_path(empty_portfolio: Portfolio) -> None:
 def test_restore_version_not_found(empty_portfolio: Portfolio) -> None:
     with pytest.raises(FileNotFoundError):
         Portfolio.restore(empty_portfolio, tar_ver=100)
+
+
+def test_backup_restore_wal(
+    monkeypatch: pytest.MonkeyPatch,
+    empty_portfolio: Portfolio,
+) -> None:
+    # Pool connections so the write-ahead log stays open
+    monkeypatch.setattr(sql, "_ENGINE_ARGS", {})
+    p = Portfolio(empty_portfolio.path, None, engine_profile=sql.WEB_ENGINE_PROFILE)
+    path_wal = p.path.with_name(f"{p.path.name}-wal")
+
+    with p.begin_session():
+        Config.set_(ConfigKey.BASE_CURRENCY, "100")
+    assert path_wal.exists()
+    path_backup, _ = p.backup()
+
+    with p.begin_session():
+        Config.set_(ConfigKey.BASE_CURRENCY, "200")
+
+    # Backup has the committed changes without the log
+    p_backup = p.path.with_suffix(".check.db")
+    with tarfile.open(path_backup, "r") as tar:
+        member = tar.getmember(p.path.name)
+        file = tar.extractfile(member)
+        assert file is not None
+        p_backup.write_bytes(file.read())
+    with Portfolio(p_backup, None).begin_session():
+        assert Config.fetch(ConfigKey.BASE_CURRENCY) == "100"
+
+    Portfolio.restore(p)
+    with p.begin_session():
+        assert Config.fetch(ConfigKey.BASE_CURRENCY) == "100"
@@ -52,6 +52,63 @@ def test_import_file(
         assert sql.count(Transaction.query()) == len(TRANSACTIONS_REQUIRED)
 
 
+def test_import_file_match(
+    data_path: Path,
+    empty_portfolio: Portfolio,
+    account: Account,
+    account_investments: Account,
+    asset: Asset,
+    categories: dict[str, int],
+) -> None:
+    path = data_path / "transactions_required.csv"
+    path_debug = empty_portfolio.path.with_suffix(".importer-debug")
+
+    # Two uncleared candidates, only the closest is linked
+    d = TRANSACTIONS_REQUIRED[0]
+    date = d["date"]
+    assert isinstance(date, datetime.date)
+    with empty_portfolio.begin_session():
+        for days, statement in [(2, "Closest"), (4, "Further")]:
+            txn = Transaction.create(
+                account_id=account.id_,
+                date=date + datetime.timedelta(days=days),
+                amount=d["amount"],
+                statement=statement,
+            )
+            TransactionSplit.create(
+                parent=txn,
+                amount=txn.amount,
+                category_id=categories["uncategorized"],
+            )
+
+    empty_portfolio.import_file(path, path_debug)
+
+    with empty_portfolio.begin_session():
+        assert sql.count(Transaction.query()) == len(TRANSACTIONS_REQUIRED) + 1
+
+        query = Transaction.query().where(Transaction.statement == d["statement"])
+        txn = sql.one(query)
+        assert txn.cleared
+        assert txn.date == date + datetime.timedelta(days=2)
+        assert all(t_split.cleared for t_split in txn.splits)
+
+        query = Transaction.query().where(Transaction.statement == "Further")
+        assert not sql.one(query).cleared
+
+        d = TRANSACTIONS_REQUIRED[1]
+        date = d["date"]
+        assert isinstance(date, datetime.date)
+        query = Transaction.query().where(Transaction.statement == d["statement"])
+        txn = sql.one(query)
+        assert txn.cleared
+        assert txn.month_ord == date.replace(day=1).toordinal()
+        t_split = txn.splits[0]
+        assert t_split.amount == d["amount"]
+        assert t_split.date_ord == txn.date_ord
+        assert t_split.account_id == account.id_
+        assert t_split.category_id == categories["uncategorized"]
+
+
 def test_import_file_duplicate(
     data_path: Path,
     empty_portfolio: Portfolio,
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
 import datetime
+import threading
+import time
 from typing import TYPE_CHECKING
 
+from nummus import sql
 from nummus.models.asset import (
     Asset,
     AssetCategory,
+    AssetSector,
+    USSector,
 )
 from nummus.portfolio import AssetUpdate, Portfolio
 
 if TYPE_CHECKING:
+    from decimal import Decimal
+
     import pytest
     from sqlalchemy import orm
 
+    from nummus.models.asset import AssetHistory
     from nummus.models.transaction import Transaction
     from nummus.portfolio import Portfolio
 
@@ -76,3 +84,101 @@ def test_error(
     ]
 
     assert empty_portfolio.update_assets(no_bars=True) == target
+
+
+def test_concurrent(
+    monkeypatch: pytest.MonkeyPatch,
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    asset: Asset,
+    asset_etf: Asset,
+) -> None:
+    with session.begin_nested():
+        Asset.query().where(Asset.category == AssetCategory.INDEX).delete()
+
+    # Each download waits for the other, fails if run serially
+    barrier = threading.Barrier(2, timeout=5)
+    fetch_sectors = Asset.fetch_sectors
+
+    def mock_fetch_sectors(ticker: str) -> dict[USSector, Decimal]:
+        barrier.wait()
+        return fetch_sectors(ticker)
+
+    monkeypatch.setattr(Asset, "fetch_sectors", staticmethod(mock_fetch_sectors))
+
+    assert empty_portfolio.update_assets(no_bars=True, max_workers=2) == []
+
+    query = AssetSector.query(AssetSector.sector).where(
+        AssetSector.asset_id == asset_etf.id_,
+    )
+    assert set(sql.col0(query)) == {USSector.REAL_ESTATE, USSector.ENERGY}
+
+
+def test_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    asset: Asset,
+    transactions: list[Transaction],
+) -> None:
+    with session.begin_nested():
+        Asset.query().where(Asset.category == AssetCategory.INDEX).delete()
+    event = threading.Event()
+    fetch_history = Asset.fetch_history
+
+    def mock_fetch_history(ticker: str, start: datetime.date) -> AssetHistory:
+        event.wait(5)
+        return fetch_history(ticker, start)
+
+    monkeypatch.setattr(Asset, "fetch_history", staticmethod(mock_fetch_history))
+
+    target: list[AssetUpdate] = [
+        AssetUpdate(
+            asset.name,
+            asset.ticker or "",
+            None,
+            None,
+            "Timed out after 0.01s",
+        ),
+    ]
+    try:
+        assert empty_portfolio.update_assets(no_bars=True, timeout=0.01) == target
+    finally:
+        event.set()
+
+
+def test_timeout_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+    empty_portfolio: Portfolio,
+    session: orm.Session,
+    asset: Asset,
+    asset_etf: Asset,
+) -> None:
+    with session.begin_nested():
+        Asset.query().where(Asset.category == AssetCategory.INDEX).delete()
+    event = threading.Event()
+    fetch_sectors = Asset.fetch_sectors
+
+    def mock_fetch_sectors(ticker: str) -> dict[USSector, Decimal]:
+        event.wait(5)
+        return fetch_sectors(ticker)
+
+    monkeypatch.setattr(Asset, "fetch_sectors", staticmethod(mock_fetch_sectors))
+
+    target = [
+        AssetUpdate(a.name, a.ticker or "", None, None, "Timed out after 0.5s")
+        for a in [asset, asset_etf]
+    ]
+    start = time.perf_counter()
+    try:
+        result = empty_portfolio.update_assets(
+            no_bars=True,
+            max_workers=2,
+            timeout=0.5,
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        event.set()
+    assert result == target
+    # One deadline shared by every Asset, not one each
+    assert elapsed < 1
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 import pytest
-from sqlalchemy import orm
+from sqlalchemy import orm, pool
 
 from nummus import sql
 from nummus.encryption.top import Encryption, ENCRYPTION_AVAILABLE
@@ -55,6 +55,63 @@ def test_get_engine_encrypted(tmp_path: Path, rand_str: str) -> None:
     assert b"SQLite" not in path.read_bytes()
 
 
+def test_get_engine_profile(tmp_path: Path) -> None:
+    path = (tmp_path / "absolute.db").absolute()
+    e = sql.get_engine(path, profile=sql.WEB_ENGINE_PROFILE)
+    with e.connect() as conn:
+        pragmas = {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").first()
+            for name in ["journal_mode", "synchronous", "temp_store"]
+        }
+    # PRAGMA reports synchronous NORMAL as 1 and temp_store MEMORY as 2
+    target = {"journal_mode": ("wal",), "synchronous": (1,), "temp_store": (2,)}
+    assert pragmas == target
+
+
+@pytest.mark.parametrize(
+    "profile",
+    [
+        sql.EngineProfile(journal_mode="fast"),
+        sql.EngineProfile(synchronous="sometimes"),
+        sql.EngineProfile(temp_store="disk"),
+        sql.EngineProfile(pool_size=0),
+    ],
+)
+def test_engine_profile_invalid(profile: sql.EngineProfile) -> None:
+    with pytest.raises(ValueError, match="Invalid"):
+        profile.validate()
+
+
+def test_get_engine_pool_size(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(sql, "_ENGINE_ARGS", {})
+    path = (tmp_path / "absolute.db").absolute()
+    e = sql.get_engine(path, profile=sql.EngineProfile(pool_size=2))
+    assert isinstance(e.pool, pool.QueuePool)
+    assert e.pool.size() == 2
+    e.dispose()
+
+
+def test_get_engine_profile_invalid(tmp_path: Path) -> None:
+    path = (tmp_path / "absolute.db").absolute()
+    profile = sql.EngineProfile(journal_mode="fast")
+    with pytest.raises(ValueError, match="Invalid journal_mode"):
+        sql.get_engine(path, profile=profile)
+
+
+def test_dispose_engines(tmp_path: Path) -> None:
+    path = (tmp_path / "absolute.db").absolute()
+    e = sql.get_engine(path, profile=sql.WEB_ENGINE_PROFILE)
+    assert e in sql._ENGINES
+    pool = e.pool
+
+    # Same as what runs in a forked child
+    sql._dispose_engines()
+    assert e.pool is not pool
+
+
 def test_escape_not_reserved() -> None:
     assert sql.escape("abc") == "abc"
 
@@ -926,3 +926,10 @@ def test_low_pass_n3() -> None:
     data = [Decimal(1), Decimal(), Decimal(), Decimal()]
     target = [Decimal(1), Decimal("0.5"), Decimal("0.25"), Decimal("0.125")]
     assert utils.low_pass(data, 3) == target
+
+
+@pytest.mark.parametrize("n", [0, 1, 3, 5, 6])
+def test_rolling_sum(n: int) -> None:
+    data = [Decimal(1), Decimal(-2), Decimal("0.5"), Decimal(4), Decimal(3)]
+    target = [sum(data[i : i + n], Decimal()) for i in range(len(data) - n + 1)]
+    assert utils.rolling_sum(data, n) == target
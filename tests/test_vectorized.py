@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from nummus import utils, vectorized
+
+
+@pytest.mark.parametrize(
+    ("values", "precision"),
+    [
+        ([], 6),
+        ([Decimal(), Decimal("1.5"), Decimal("-0.000001")], 6),
+        ([Decimal("1.123456789"), Decimal(-100)], 9),
+        ([Decimal("1234567890123.456789"), Decimal("-9876543210.987653")], 6),
+    ],
+)
+def test_round_trip(values: list[Decimal], precision: int) -> None:
+    array = vectorized.to_array(values, precision)
+    assert array.dtype == np.int64
+    assert vectorized.to_decimals(array, precision) == values
+
+
+def test_to_array_none() -> None:
+    assert vectorized.to_array([None, Decimal(1)]).tolist() == [0, 1_000_000]
+
+
+def test_to_array_round() -> None:
+    values = [Decimal("0.0000005"), Decimal("0.0000015"), Decimal("-0.0000025")]
+    assert vectorized.to_array(values).tolist() == [0, 2, -2]
+
+
+@pytest.mark.parametrize(
+    "deltas",
+    [
+        [],
+        [Decimal()] * 5,
+        [None] * 5,
+        [None, None, Decimal(20), None, None],
+        [Decimal(1), Decimal(3), Decimal(5)],
+    ],
+)
+def test_integrate(deltas: list[Decimal | None]) -> None:
+    result = vectorized.integrate(vectorized.to_array(deltas))
+    assert vectorized.to_decimals(result) == utils.integrate(deltas)
+
+
+def test_multiply() -> None:
+    a = vectorized.to_array([Decimal("2.5"), Decimal(-3), Decimal("0.1")])
+    b = vectorized.to_array([Decimal("1.5"), Decimal("1000.123456789"), None], 9)
+    result = vectorized.to_decimals(vectorized.multiply(a, b, 9))
+    assert result == [Decimal("3.75"), Decimal("-3000.370370"), Decimal()]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [],
+        [(-3, Decimal(-1))],
+        [(-3, Decimal(-1)), (1, Decimal(1))],
+        [(-3, Decimal(-1)), (1, Decimal(1)), (3, Decimal(3))],
+        [(2, Decimal(1)), (7, Decimal(3))],
+    ],
+)
+def test_interpolate_step(values: list[tuple[int, Decimal]]) -> None:
+    result = vectorized.to_decimals(vectorized.interpolate_step(values, 5))
+    assert result == utils.interpolate_step(values, 5)
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [],
+        [(-3, Decimal(-1))],
+        [(-3, Decimal(-1)), (1, Decimal(1))],
+        [(-3, Decimal(-1)), (1, Decimal(1)), (3, Decimal(3))],
+        [(2, Decimal(1)), (6, Decimal(3))],
+    ],
+)
+def test_interpolate_linear(values: list[tuple[int, Decimal]]) -> None:
+    result = vectorized.to_decimals(vectorized.interpolate_linear(values, 5))
+    assert result == utils.interpolate_linear(values, 5)
+
+
+@pytest.mark.parametrize("precision", [0, 2, 6])
+def test_rescale(precision: int) -> None:
+    values = [
+        Decimal("1.005"),
+        Decimal("1.015"),
+        Decimal("-1.005"),
+        Decimal("-2.5"),
+        Decimal("3.5"),
+        Decimal("123456789012.345678"),
+    ]
+    array = vectorized.to_array(values)
+    result = vectorized.rescale(array, precision)
+    assert result.tolist() == vectorized.to_array(values, precision).tolist()
+
+
+@pytest.mark.parametrize(
+    "starts",
+    [
+        [0],
+        [0, 1],
+        [0, 3, 4],
+        list(range(10)),
+    ],
+)
+def test_downsample(starts: list[int]) -> None:
+    rng = np.random.default_rng(42)
+    arrays = [rng.integers(-1000, 1000, 10), rng.integers(0, 5, 10)]
+    v_min, v_avg, v_max = vectorized.downsample(arrays, starts)
+    assert v_min.shape == (len(arrays), len(starts))
+
+    ends = [*starts[1:], 10]
+    for i, array in enumerate(arrays):
+        target = [array[s:e] for s, e in zip(starts, ends, strict=True)]
+        assert v_min[i].tolist() == [min(v) for v in target]
+        assert v_avg[i].tolist() == [round(sum(v) / len(v)) for v in target]
+        assert v_max[i].tolist() == [max(v) for v in target]
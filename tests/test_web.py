@@ -7,7 +7,7 @@ import flask
 import pytest
 
 from nummus import exceptions as exc
-from nummus import web
+from nummus import sql, web
 from nummus.encryption.top import ENCRYPTION_AVAILABLE
 from nummus.models.config import Config, ConfigKey
 from tests import conftest
@@ -70,6 +70,48 @@ def test_create_app_encrypted_key_file(
     assert len(app.before_request_funcs[None]) == 2
 
 
+def test_open_portfolio_engine_profile(empty_portfolio: Portfolio) -> None:
+    config: dict[str, object] = {
+        "PORTFOLIO": str(empty_portfolio.path),
+        "DB_JOURNAL_MODE": "TRUNCATE",
+        "DB_POOL_SIZE": 2,
+    }
+    p = web.FlaskExtension._open_portfolio(config)
+    target = sql.WEB_ENGINE_PROFILE._replace(journal_mode="TRUNCATE", pool_size=2)
+    assert p._engine_profile == target
+
+
+def test_open_portfolio_engine_profile_type(empty_portfolio: Portfolio) -> None:
+    config: dict[str, object] = {
+        "PORTFOLIO": str(empty_portfolio.path),
+        "DB_POOL_SIZE": "many",
+    }
+    with pytest.raises(TypeError):
+        web.FlaskExtension._open_portfolio(config)
+
+
+def test_open_portfolio_engine_profile_env(
+    monkeypatch: pytest.MonkeyPatch,
+    empty_portfolio: Portfolio,
+) -> None:
+    monkeypatch.setenv("NUMMUS_PORTFOLIO", str(empty_portfolio.path))
+    monkeypatch.setenv("NUMMUS_DB_SYNCHRONOUS", "FULL")
+    monkeypatch.setenv("NUMMUS_DB_MMAP_SIZE", "0")
+
+    web.create_app()
+    target = sql.WEB_ENGINE_PROFILE._replace(synchronous="FULL", mmap_size=0)
+    assert web.portfolio._engine_profile == target
+
+
+def test_open_portfolio_key_type(empty_portfolio: Portfolio) -> None:
+    config: dict[str, object] = {
+        "PORTFOLIO": str(empty_portfolio.path),
+        "KEY": 1234,
+    }
+    with pytest.raises(TypeError):
+        web.FlaskExtension._open_portfolio(config)
+
+
 def test_getattr() -> None:
     with pytest.raises(AttributeError):
         _ = web.fake
@@ -0,0 +1,42 @@
+# Only what nummus uses
+
+from collections.abc import Sequence
+
+class DataType: ...
+
+class Field:
+    @property
+    def name(self) -> str: ...
+    @property
+    def type(self) -> DataType: ...
+
+class Schema:
+    @property
+    def names(self) -> list[str]: ...
+    def field(self, i: int | str) -> Field: ...
+
+class ChunkedArray:
+    @property
+    def type(self) -> DataType: ...
+    def to_pylist(self) -> list[object]: ...
+
+class Table:
+    @property
+    def column_names(self) -> list[str]: ...
+    @property
+    def num_rows(self) -> int: ...
+    @property
+    def schema(self) -> Schema: ...
+    def column(self, i: int | str) -> ChunkedArray: ...
+    def to_pylist(self) -> list[dict[str, object]]: ...
+    @staticmethod
+    def from_arrays(
+        arrays: Sequence[Sequence[object]],
+        names: Sequence[str] | None = ...,
+        schema: Schema | None = ...,
+    ) -> Table: ...
+
+def schema(fields: Sequence[tuple[str, DataType]]) -> Schema: ...
+def string() -> DataType: ...
+def date32() -> DataType: ...
+def decimal128(precision: int, scale: int = ...) -> DataType: ...
@@ -0,0 +1,26 @@
+# Only what nummus uses
+
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Self
+
+from pyarrow import Schema, Table
+
+class ParquetWriter:
+    def __init__(
+        self,
+        where: str | Path | IO[bytes],
+        schema: Schema,
+        compression: str = ...,
+    ) -> None: ...
+    def write_table(self, table: Table) -> None: ...
+    def close(self) -> None: ...
+    def __enter__(self) -> Self: ...
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None: ...
+
+def read_table(source: str | Path | IO[bytes]) -> Table: ...